@@ -0,0 +1,173 @@
+from typing import List, Optional, Union, NamedTuple, Iterable, Any, Set, TYPE_CHECKING
+from concurrent.futures import Executor
+from enum import Enum
+from random import Random
+import asyncio
+import time
+import math
+
+from GameEngines.abstract import AbsPlayer, AsyncAbsPlayer, AbsBoardState
+from GameEngines.Game import Game, BoardOrType
+from GameEngines.GameHistory import HistoryPolicy
+
+if TYPE_CHECKING:
+    from GameEngines.dataset import DatasetWriter
+
+AnyPlayer = Union[AbsPlayer, AsyncAbsPlayer]
+
+
+class TimeoutPolicy(Enum):
+    LOSE = 0    # the player who runs out of time loses the game
+    RANDOM = 1  # a random legal move is played for the player
+
+
+class TimeControl(NamedTuple):
+    initial: float          # the time of each player for the whole game, in seconds
+    increment: float = 0.   # the time added to the clock of a player after each of its moves
+
+
+class AsyncGame(Game):
+    """
+    This Class represents a game between two players driven by an asyncio event loop, so that a single loop can play
+    many games at once while their players wait, e.g. on a model server or on a human over a socket (see
+    `play_games`). The players can be `AsyncAbsPlayer`, whose moves are awaited, or `AbsPlayer`, which are run in a
+    thread pool by default so they do not block the loop.
+
+    The moves can be limited by a timeout and the players by a clock. A player that runs out of time loses the game or
+    has a random move played for it, depending on the timeout policy.
+
+    The engine calls of the game itself hold the GIL and are run on the loop by default. The engine calls releasing
+    the GIL, like `random_playout` and `rollout` of the rust engines, are best offloaded by the players themselves with
+    `loop.run_in_executor`.
+    """
+    def __init__(self, board: BoardOrType, p0: AnyPlayer, p1: AnyPlayer, *,
+                 history: HistoryPolicy = HistoryPolicy.FULL, keep: int = 1,
+                 recorder: Optional['DatasetWriter'] = None,
+                 move_timeout: Optional[float] = None, time_control: Optional[TimeControl] = None,
+                 timeout_policy: TimeoutPolicy = TimeoutPolicy.LOSE, executor: Optional[Executor] = None,
+                 offload_players: bool = True, offload_engine: bool = False, seed: int = None):
+        """
+        :param board: the BoardState class of the game or the state from which the game starts
+        :param p0: the first player
+        :param p1: the second player
+        :param history: the policy deciding which states of the game are kept in memory
+        :param keep: the number of states kept with the `HistoryPolicy.LAST_K` policy
+        :param recorder: the dataset writer to which the positions of the game are appended
+        :param move_timeout: the maximum time of a move in seconds, None for no limit
+        :param time_control: the clocks of the players, None for no clock
+        :param timeout_policy: what happens when a player runs out of time
+        :param executor: the executor running the offloaded calls, None for the default executor of the loop
+        :param offload_players: if the moves of the synchronous players are computed in the executor
+        :param offload_engine: if the engine calls of the game (moves generation, play and winner) run in the executor
+        :param seed: the seed of the random moves of the `TimeoutPolicy.RANDOM` policy
+        """
+        super().__init__(board, p0, p1, history=history, keep=keep, recorder=recorder)
+
+        self.move_timeout = move_timeout
+        self.time_control = time_control
+        self.timeout_policy = timeout_policy
+        self.executor = executor
+        self.offload_players = offload_players
+        self.offload_engine = offload_engine
+        self._rng = Random(seed)
+
+        self.clocks: Optional[List[float]] = None if time_control is None else [time_control.initial] * 2
+        self.timeouts: List[int] = []           # the turns at which a random move was played after a timeout
+        self.lost_on_time: Optional[int] = None  # the player who lost the game on time
+
+    async def play_full(self):
+        """
+        the play_full method plays a full game
+        """
+        await self.play(math.inf)
+
+    async def play(self, n=1):
+        """
+        the play method will play the next n turns of the game
+
+        :param n: the number of turns to be played
+        """
+        played = 0
+        while self.winner == 0 and played < n:
+            state = self.history[-1]
+            p_nb = state.curr_pid
+            player = self.players[p_nb - 1]
+            moves = await self._engine(state.get_legal_moves)
+
+            beg = time.perf_counter()
+            try:
+                move = await asyncio.wait_for(self._ask(player, state, moves, p_nb), self._budget(p_nb))
+                timed_out = False
+            except asyncio.TimeoutError:
+                move, timed_out = None, True
+            elapsed = time.perf_counter() - beg
+
+            if self.clocks is not None:
+                self.clocks[p_nb - 1] -= elapsed
+            if timed_out and self.timeout_policy is TimeoutPolicy.LOSE:
+                self.lost_on_time = p_nb
+                self.winner = 3 - p_nb
+                if self.recorder is not None:
+                    self.recorder.end_game(self.winner)
+                break
+
+            if timed_out:
+                move = self._rng.choice(list(moves))
+                self.timeouts.append(len(self.move_history))
+            if self.clocks is not None:
+                self.clocks[p_nb - 1] += self.time_control.increment
+            self.time_data.append(elapsed)
+
+            if self.recorder is not None:
+                self.recorder.record(state, move, moves)
+
+            next_step = await self._engine(state.play, move)
+
+            self.move_history.append(move)
+            self.history.append(next_step)
+
+            self.winner = await self._engine(next_step.winner)
+            if self.winner != 0 and self.recorder is not None:
+                self.recorder.end_game(self.winner)
+            played += 1
+
+    def _budget(self, pid: int) -> Optional[float]:
+        """returns the time the player has for its move, None for no limit"""
+        limits = [] if self.move_timeout is None else [self.move_timeout]
+        if self.clocks is not None:
+            limits.append(max(0., self.clocks[pid - 1]))
+        return min(limits) if len(limits) > 0 else None
+
+    async def _ask(self, player: AnyPlayer, state: AbsBoardState, moves: Set[Any], pid: int) -> Any:
+        if isinstance(player, AsyncAbsPlayer):
+            return await player.play(state, moves, pid)
+        if self.offload_players:
+            # a timed out move cannot stop its thread, the move is ignored once computed
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, player.play, state, moves, pid)
+        return player.play(state, moves, pid)
+
+    async def _engine(self, func, *args) -> Any:
+        if self.offload_engine:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        return func(*args)
+
+
+async def play_games(games: Iterable[AsyncGame], *, max_concurrent: Optional[int] = None) -> List[int]:
+    """
+    plays games concurrently on the running event loop
+
+    :param games: the games to be played to the end
+    :param max_concurrent: the maximum number of games played at once, None for no limit
+    :return: the winner of every game
+    """
+    games = list(games)
+    semaphore = asyncio.Semaphore(max_concurrent if max_concurrent is not None else max(1, len(games)))
+
+    async def play(game: AsyncGame) -> int:
+        async with semaphore:
+            await game.play_full()
+        return game.winner
+
+    return list(await asyncio.gather(*(play(g) for g in games)))
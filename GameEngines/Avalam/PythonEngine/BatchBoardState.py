@@ -0,0 +1,10 @@
+from GameEngines import BaseBatchBoardState
+from GameEngines.Avalam.PythonEngine.BoardState import BoardState
+
+
+class BatchBoardState(BaseBatchBoardState):
+    """
+    This class is the Python implementation of BatchBoardState for the `Avalam` game.
+    """
+    _STATE_CLASS = BoardState
+    ACTION_SIZE = BoardState.ACTION_SIZE
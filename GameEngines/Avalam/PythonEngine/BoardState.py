@@ -2,7 +2,8 @@ from typing import Set, Type, Optional
 import numpy as np
 
 from GameEngines import BaseBoardState, AbsSaveModule
-from GameEngines.cache_utils import cache_moves
+from GameEngines.cache_utils import cache_moves, clear_cache
+from GameEngines.symmetry import D4, check_transform, inverse as inverse_of, transform_coords
 
 from GameEngines.Avalam.repr import _repr
 from GameEngines.Avalam.SaveModule import AvalamSave
@@ -17,12 +18,20 @@ class BoardState(BaseBoardState):
     """
     INIT_INFO = utils.board_setup()
     _DEFAULT_SAVE_MOD = AvalamSave
+    ACTION_SIZE = ACTION_SIZE
+    N_SYMMETRIES = D4
 
     def __init__(self, *, save_module: Type[AbsSaveModule] = _DEFAULT_SAVE_MOD):
         super().__init__(save_module=save_module)
 
-        self._board: np.ndarray = self.INIT_INFO[0]
-        self._ratios: np.ndarray = self.INIT_INFO[1] # Table of the ratios of each piece type in towers
+        # copies, as `push` modifies the arrays in place
+        self._board: np.ndarray = self.INIT_INFO[0].copy()
+        self._ratios: np.ndarray = self.INIT_INFO[1].copy() # Table of the ratios of each piece type in towers
+        # the directions of the legal moves of each cell as bits, built on the first move generation, then updated by
+        # `play` for the cells around the move only
+        self._dirs: Optional[np.ndarray] = None
+        self._n_moves = 0
+        self._rehash()
 
     def __eq__(self, other: 'BoardState') -> bool:
         return (
@@ -32,6 +41,9 @@ class BoardState(BaseBoardState):
             self._curr_pid == other._curr_pid
         )
 
+    def __hash__(self) -> int:
+        return self._zobrist
+
     @property
     def board(self) -> np.ndarray:
         return self._board
@@ -44,50 +56,76 @@ class BoardState(BaseBoardState):
         return _repr(self)
 
     def play(self, move: Move) -> 'BoardState':
+        new_board = self.copy()
+        new_board._apply(move)
+        return new_board
+
+    @clear_cache
+    def push(self, move: Move):
         origin: Coords = move[0]
         dest: Coords = move[1]
 
-        new_board = self.copy()
-        new_board._turn += 1
-
-        top = new_board._board[origin]
-        new_board._board[origin] = 0
-        bottom = new_board._board[dest]
-        new_board._board[dest] = np.sign(top) * abs(bottom) + top
+        self._undo.append((move, self._board[origin], self._board[dest], self._ratios[:, origin[0], origin[1]].copy()))
+        self._apply(move)
 
-        new_board._update_ratios(origin, dest)
+    @clear_cache
+    def pop(self) -> Move:
+        move, top, bottom, ratios = self._pop_undo()
+        origin: Coords = move[0]
+        dest: Coords = move[1]
 
-        new_board._curr_pid = (self._curr_pid % 2) + 1
-        return new_board
+        self._zobrist ^= (
+            tower_key(origin, top) ^ tower_key(dest, bottom) ^ tower_key(dest, self._board[dest]) ^
+            ZOBRIST_KEYS[Z_SIDE]
+        )
+        self._board[origin] = top
+        self._board[dest] = bottom
+        self._ratios[:, dest[0], dest[1]] -= ratios
+        self._ratios[:, origin[0], origin[1]] = ratios
+        self._update_moves(origin, dest)
+
+        self._turn -= 1
+        self._curr_pid = (self._curr_pid % 2) + 1
+        return move
+
+    def _apply(self, move: Move):
+        """plays a move in place"""
+        origin: Coords = move[0]
+        dest: Coords = move[1]
+        self._turn += 1
 
-    @cache_moves
-    def get_legal_moves(self, *, cache=False) -> Set[Move]:
-        abs_board: np.ndarray[int] = np.abs(self._board)
-        towers = ((0 < abs_board) & (abs_board < 5))
+        top = self._board[origin]
+        self._board[origin] = 0
+        bottom = self._board[dest]
+        self._board[dest] = np.sign(top) * abs(bottom) + top
 
-        def f(i, j):
-            base = np.zeros((3, 3))
-            base[
-            max(0, i-1) - i+1: min(9, i+2) - i+1,
-            max(0, j-1) - j+1: min(9, j+2) - j+1
-            ] = abs_board[max(0, i-1):i+2, max(0, j-1):j+2]
-            return base.flatten()
+        self._update_ratios(origin, dest)
+        self._update_moves(origin, dest)
 
-        non_zero = towers.nonzero()
-        coords = list(zip(*non_zero))
+        self._curr_pid = (self._curr_pid % 2) + 1
+        self._zobrist ^= (
+            tower_key(origin, top) ^ tower_key(dest, bottom) ^ tower_key(dest, self._board[dest]) ^
+            ZOBRIST_KEYS[Z_SIDE]
+        )
 
-        to = np.fromiter((f(i, j) for i, j in coords), np.dtype((np.int64, (9,))))
-        to[:, 4] = 0
+    @cache_moves
+    def get_legal_moves(self, *, cache=False) -> Set[Move]:
+        dirs = self._move_dirs()
+        return set(
+            utils.MOVES[cell][d] for cell in np.flatnonzero(dirs).tolist() for d in utils.DIRECTIONS_OF[dirs.item(cell)]
+        )
 
-        value = np.repeat(abs_board[non_zero][:, np.newaxis], 9, axis=1)
+    def legal_action_mask(self, out: np.ndarray = None) -> np.ndarray:
+        mask = self._action_mask(out)
+        # the bits of the cells in the order of the action space, 8 * cell + direction
+        mask[:] = np.unpackbits(self._move_dirs(), bitorder='little')
+        return mask
 
-        possibilities = value + to
-        positions = zip(*((value < possibilities) & (possibilities <= 5)).nonzero())
+    def move_to_action(self, move: Move) -> int:
+        return move_to_action(move)
 
-        return set(
-            (coords[i], (coords[i][0] - 1 + (j // 3), coords[i][1] - 1 + (j % 3)))
-            for i, j in positions
-        )
+    def action_to_move(self, action: int) -> Move:
+        return action_to_move(action)
 
     def score(self) -> Tuple[int, int]:
         return (
@@ -106,28 +144,65 @@ class BoardState(BaseBoardState):
         # winner
         return int(p1 < p2) + 1
 
+    def transform(self, transform: int) -> 'BoardState':
+        check_transform(transform, self.N_SYMMETRIES)
+        new_state = self.copy()
+        source = utils.SOURCES[transform]
+        new_state._board = self._board.reshape(81)[source].reshape((9, 9))
+        new_state._ratios = self._ratios.reshape((2, 81))[:, source].reshape((2, 9, 9))
+        new_state._dirs = None
+        new_state._rehash()
+        return new_state
+
+    def transform_move(self, move: Move, transform: int, *, inverse=False) -> Move:
+        check_transform(transform, self.N_SYMMETRIES)
+        transform = inverse_of(transform) if inverse else transform
+        return transform_coords(move[0], transform, 9), transform_coords(move[1], transform, 9)
+
+    def transform_action(self, action: int, transform: int, *, inverse=False) -> int:
+        check_transform(transform, self.N_SYMMETRIES)
+        return utils.ACTIONS[inverse_of(transform) if inverse else transform][action]
+
+    def _rehash(self):
+        key = ZOBRIST_KEYS[Z_SIDE] if self._curr_pid == 2 else 0
+        for cell, tower in np.ndenumerate(self._board):
+            key ^= tower_key(cell, tower)
+        self._zobrist = key
+
     def _update_ratios(self, origin: Coords, dest: Coords):
         """method used to update the ratios for the state upon creation"""
         self._ratios[:, dest[0], dest[1]] += self._ratios[:, origin[0], origin[1]]
         self._ratios[:, origin[0], origin[1]] = 0
 
     def _has_moves(self) -> bool:
-        abs_board: np.ndarray[int] = np.abs(self._board)
-        towers = ((0 < abs_board) & (abs_board < 5))
-
-        for i, j in zip(*towers.nonzero()):
-            to = np.zeros((3, 3))
-            to[
-            max(0, i-1) - i+1: min(9, i+2) - i+1,
-            max(0, j-1) - j+1: min(9, j+2) - j+1
-            ] = abs_board[max(0, i-1):i+2, max(0, j-1):j+2]
-            to = to.flatten()
-            to[4] = 0
-
-            value = abs_board[(i, j)]
-
-            possibilities = to + value
-            if np.sum((value < possibilities) & (possibilities <= 5)) >= 1:
-                return True
+        self._move_dirs()
+        return self._n_moves > 0
+
+    def _move_dirs(self) -> np.ndarray:
+        """returns the directions of the legal moves of each cell as bits"""
+        if self._dirs is None:
+            self._dirs = np.array([self._cell_dirs(cell) for cell in range(81)], dtype=np.uint8)
+            self._n_moves = sum(utils.POPCOUNT[dirs] for dirs in self._dirs.tolist())
+        return self._dirs
+
+    def _cell_dirs(self, cell: int) -> int:
+        height = abs(self._board.item(cell))
+        if height == 0 or height >= 5:
+            return 0
 
-        return False
\ No newline at end of file
+        dirs = 0
+        for d, n in utils.NEIGHBOURS[cell]:
+            other = abs(self._board.item(n))
+            if other != 0 and height + other <= 5:
+                dirs |= 1 << d
+        return dirs
+
+    def _update_moves(self, origin: Coords, dest: Coords):
+        """updates the legal moves of the cells around a move, the only ones it changes"""
+        if self._dirs is None:
+            return
+
+        for cell in utils.AROUND[9 * origin[0] + origin[1]] | utils.AROUND[9 * dest[0] + dest[1]]:
+            dirs = self._cell_dirs(cell)
+            self._n_moves += utils.POPCOUNT[dirs] - utils.POPCOUNT[self._dirs.item(cell)]
+            self._dirs[cell] = dirs
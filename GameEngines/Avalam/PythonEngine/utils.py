@@ -1,7 +1,10 @@
 import numpy as np
 from itertools import product
 from functools import reduce
-from typing import Tuple
+from typing import Tuple, List, Optional
+
+from GameEngines.Avalam.utilsTypes import DIRECTIONS
+from GameEngines.symmetry import D4, transform_coords, transform_vector
 
 Coords = Tuple[int, int]
 Move = Tuple[Coords, Coords]
@@ -57,3 +60,33 @@ def gen_moves(board: np.ndarray):
         reduce(accumulate, legit, moves)
     return moves
 
+
+def _neighbours(cell: int) -> List[Tuple[int, int]]:
+    i, j = divmod(cell, 9)
+    return [
+        (d, 9 * (i + di) + j + dj) for d, (di, dj) in enumerate(DIRECTIONS)
+        if 0 <= i + di < 9 and 0 <= j + dj < 9
+    ]
+
+def _move(cell: int, d: int) -> Optional[Move]:
+    i, j = divmod(cell, 9)
+    k, l = i + DIRECTIONS[d][0], j + DIRECTIONS[d][1]
+    return ((i, j), (k, l)) if 0 <= k < 9 and 0 <= l < 9 else None
+
+# the neighbours (direction, cell) of each cell (9 * i + j)
+NEIGHBOURS: List[List[Tuple[int, int]]] = [_neighbours(cell) for cell in range(81)]
+# the cells whose moves change when the tower of a cell changes: the cell and its neighbours
+AROUND: List[frozenset] = [frozenset([cell] + [n for _, n in NEIGHBOURS[cell]]) for cell in range(81)]
+# the move of each cell in each direction, None if it leaves the board
+MOVES: List[List[Optional[Move]]] = [[_move(cell, d) for d in range(8)] for cell in range(81)]
+# the directions set in each mask of 8 directions, and their number
+DIRECTIONS_OF: List[Tuple[int, ...]] = [tuple(d for d in range(8) if mask >> d & 1) for mask in range(256)]
+POPCOUNT: List[int] = [len(dirs) for dirs in DIRECTIONS_OF]
+
+# the cell, the direction and the action (8 * cell + direction) under each symmetry, and the cell each cell comes from
+CELLS: List[List[int]] = [
+    [9 * i + j for i, j in (transform_coords(divmod(c, 9), t, 9) for c in range(81))] for t in range(D4)
+]
+DIRS: List[List[int]] = [[DIRECTIONS.index(transform_vector(d, t)) for d in DIRECTIONS] for t in range(D4)]
+ACTIONS: List[List[int]] = [[8 * CELLS[t][a // 8] + DIRS[t][a % 8] for a in range(81 * 8)] for t in range(D4)]
+SOURCES: List[np.ndarray] = [np.argsort(cells) for cells in CELLS]
@@ -4,7 +4,8 @@ import numpy as np
 from typing import Union, Type, Any, Dict
 from GameEngines.abstract import AbsSaveModule, AbsBoardState
 from GameEngines import cache_utils
-from GameEngines.Avalam.utilsTypes import to_move
+from GameEngines.BinarySaveModule import BinarySaveModule
+from GameEngines.Avalam.utilsTypes import to_move, ACTION_SIZE, Move, move_to_action, action_to_move
 
 
 class AvalamSave(AbsSaveModule):
@@ -50,5 +51,49 @@ class AvalamSave(AbsSaveModule):
         state._ratios = data["ratios"]
         state._turn = data["turn"]
         state._curr_pid = data["curr_pid"]
+        state._rehash()
 
-        return state
\ No newline at end of file
+        return state
+
+
+class AvalamBinarySave(BinarySaveModule):
+    """ Binary Record Template
+    {
+        board: int8[81],        // Flattened board from (9,9) to (81,)
+        ratios: uint8[162],     // Flattened ratio board from (2, 9,9) to (162,)
+        turn: uint32,           // The current turn
+        curr_pid: uint8,        // The active player
+        has_cache: uint8,       // If the moves are cached (only when the file keeps the moves cache)
+        move_cache: uint8[81]   // The cached moves as bits of the action space
+    }
+    """
+    GAME = "Avalam"
+    FIELDS = [("board", "i1", (81,)), ("ratios", "u1", (162,)), ("turn", "<u4"), ("curr_pid", "u1")]
+    ACTION_SIZE = ACTION_SIZE
+    MOVE_SIZE = ACTION_SIZE
+    JSON_MODULE = AvalamSave
+
+    @classmethod
+    def encode_move(cls, move: Move) -> int:
+        # the actions of the game do not depend on the position
+        return move_to_action(move)
+
+    @classmethod
+    def decode_move(cls, code: int) -> Move:
+        return action_to_move(code)
+
+    @classmethod
+    def _to_record(cls, state: AbsBoardState, record: np.void):
+        record["board"] = state.board.ravel()
+        record["ratios"] = state.ratios.ravel()
+        record["turn"] = state.turn
+        record["curr_pid"] = state.curr_pid
+
+    @classmethod
+    def _from_record(cls, record: np.void) -> Dict[str, Any]:
+        return {
+            "board": record["board"].astype(np.int64).reshape((9, 9)),
+            "ratios": record["ratios"].astype(np.int64).reshape((2, 9, 9)),
+            "turn": int(record["turn"]),
+            "curr_pid": int(record["curr_pid"])
+        }
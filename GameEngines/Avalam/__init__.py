@@ -1,13 +1,14 @@
 import GameEngines
 from GameEngines.Avalam import *
-from .utilsTypes import Move, Coords
+from .utilsTypes import Move, Coords, ACTION_SIZE, move_to_action, action_to_move
 
 try:
     __doc__ = GameEngines.Avalam.__doc__
     if hasattr(GameEngines.Avalam, "__all__"):
         __all__ = GameEngines.Avalam.__all__
 
-    from .BoardState import BoardState
+    from .BoardState import BoardState, BatchBoardState
 
 except AttributeError:
     from .PythonEngine.BoardState import BoardState
+    from .PythonEngine.BatchBoardState import BatchBoardState
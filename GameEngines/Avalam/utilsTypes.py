@@ -1,7 +1,33 @@
 from typing import Tuple, List
+from GameEngines.zobrist import zobrist_keys
 
 Coords = Tuple[int, int]
 Move = Tuple[Coords, Coords]
 
 def to_move(move: List[List[int]]) -> Move:
     return (move[0][0], move[0][1]), (move[1][0], move[1][1])
+
+
+# Action space: 81 origin cells x 8 directions
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+ACTION_SIZE = 81 * len(DIRECTIONS)
+_DIRECTION_INDEX = {d: i for i, d in enumerate(DIRECTIONS)}
+
+def move_to_action(move: Move) -> int:
+    (i, j), (k, l) = move
+    return (9 * i + j) * 8 + _DIRECTION_INDEX[(k - i, l - j)]
+
+def action_to_move(action: int) -> Move:
+    cell, d = divmod(int(action), 8)
+    i, j = divmod(cell, 9)
+    return (i, j), (i + DIRECTIONS[d][0], j + DIRECTIONS[d][1])
+
+
+# Zobrist keys: one key per cell and tower (5 heights x 2 owners), then the second player to move
+ZOBRIST_KEYS = zobrist_keys(81 * 10 + 1, seed=2)
+Z_SIDE = 81 * 10
+
+def tower_key(cell: Coords, tower: int) -> int:
+    if tower == 0:
+        return 0
+    return ZOBRIST_KEYS[10 * (9 * cell[0] + cell[1]) + (tower - 1 if tower > 0 else 4 - tower)]
@@ -0,0 +1,70 @@
+from typing import Type, List, Optional
+import numpy as np
+from GameEngines.abstract import AbsBoardState, AbsBatchBoardState
+
+
+class BaseBatchBoardState(AbsBatchBoardState):
+    """
+    Generic python implementation of a batch of board states. It keeps one BoardState per game and steps them one by
+    one, so it is only meant as a fallback of the native batches.
+
+    Subclasses set the BoardState class of the game.
+    """
+    _STATE_CLASS: Type[AbsBoardState] = None
+    ACTION_SIZE: int = 0
+
+    def __init__(self, n_games: int, auto_reset: bool = True):
+        self.auto_reset = auto_reset
+        self._states: List[AbsBoardState] = [self._STATE_CLASS() for _ in range(n_games)]
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    @property
+    def boards(self) -> np.ndarray:
+        return np.stack([s.board for s in self._states])
+
+    @property
+    def turns(self) -> np.ndarray:
+        return np.array([s.turn for s in self._states], dtype=np.uint32)
+
+    @property
+    def curr_pids(self) -> np.ndarray:
+        return np.array([s.curr_pid for s in self._states], dtype=np.uint32)
+
+    def play_batch(self, actions: np.ndarray) -> np.ndarray:
+        if len(actions) != len(self._states):
+            raise ValueError("one action per game is expected")
+
+        winners = np.zeros(len(self._states), dtype=np.int64)
+        for g, action in enumerate(actions):
+            if action >= 0:
+                self._states[g] = self._states[g].play(self._states[g].action_to_move(action))
+            winners[g] = self._states[g].winner()
+
+            if self.auto_reset and winners[g] != 0:
+                self._states[g] = self._STATE_CLASS()
+        return winners
+
+    def legal_move_mask_batch(self) -> np.ndarray:
+        mask = np.zeros((len(self._states), self.ACTION_SIZE), dtype=bool)
+        for g, state in enumerate(self._states):
+            state.legal_action_mask(mask[g])
+        return mask
+
+    def winner_batch(self) -> np.ndarray:
+        return np.array([s.winner() for s in self._states], dtype=np.int64)
+
+    def score_batch(self) -> np.ndarray:
+        return np.array([s.score() for s in self._states], dtype=np.int64)
+
+    def reset(self, indexes: Optional[List[int]] = None):
+        indexes = range(len(self._states)) if indexes is None else indexes
+        for g in indexes:
+            self._states[g] = self._STATE_CLASS()
+
+    def get_state(self, i: int) -> AbsBoardState:
+        return self._states[i].copy()
+
+    def set_state(self, i: int, state: AbsBoardState):
+        self._states[i] = state.copy()
@@ -1,21 +1,39 @@
 from pathlib import Path
 from copy import deepcopy
-from typing import Type, Union, Any
+from typing import Type, Union, Any, List, Tuple, Optional
+from random import Random
+import numpy as np
 from GameEngines.abstract import AbsBoardState, AbsSaveModule
-from GameEngines.cache_utils import ignore_cache
+from GameEngines.symmetry import check_transform
 
 class BaseBoardState(AbsBoardState):
     _DEFAULT_SAVE_MOD = None
+    ACTION_SIZE: int = 0
+    N_SYMMETRIES: int = 1 # only the identity, unless the game overrides the transforms
 
     def __init__(self, *, save_module: Type[AbsSaveModule] = _DEFAULT_SAVE_MOD):
         self._board = None
         self._turn: int = 0
         self._curr_pid: int = 1
+        self._zobrist: int = 0
+        self._undo: List[tuple] = [] # what is needed to undo the pushed moves, the last one at the end
+        self._move_cache: Optional[set] = None # the legal moves cached by `cache_utils.cache_moves`
 
         self._save_mod = save_module
 
     def __eq__(self, other: 'BaseBoardState') -> bool:
-        raise NotImplemented("The __eq__ method has not been implemented")
+        raise NotImplementedError("The __eq__ method has not been implemented")
+
+    def __hash__(self) -> int:
+        return self._zobrist
+
+    @property
+    def zobrist(self) -> int:
+        return self._zobrist
+
+    def _rehash(self):
+        """computes the zobrist key of the state from scratch, when the state was not created by `play`"""
+        raise NotImplementedError("The _rehash method has not been implemented")
 
     @property
     def turn(self) -> int:
@@ -30,20 +48,127 @@ class BaseBoardState(AbsBoardState):
         return self._board
 
     def play(self, move) -> 'AbsBoardState':
-        raise NotImplemented("The play method has not been implemented")
+        raise NotImplementedError("The play method has not been implemented")
+
+    def push(self, move):
+        raise NotImplementedError("The push method has not been implemented")
+
+    def pop(self) -> Any:
+        raise NotImplementedError("The pop method has not been implemented")
+
+    def _pop_undo(self) -> tuple:
+        """returns the undo information of the last pushed move"""
+        if len(self._undo) == 0:
+            raise IndexError("no pushed move to pop")
+        return self._undo.pop()
 
-    @ignore_cache
     def copy(self, *, cache=False) -> 'BaseBoardState':
-        return deepcopy(self)
+        # the copy does not inherit the pushed moves, nor the cached moves unless asked to
+        new = deepcopy(self, {id(self._undo): [], id(self._move_cache): None})
+        if cache and self._move_cache is not None:
+            new._move_cache = set(self._move_cache)
+        return new
 
     def get_legal_moves(self, *, cache=False) -> set:
-        raise NotImplemented("The get_legal_moves method has not been implemented")
+        raise NotImplementedError("The get_legal_moves method has not been implemented")
+
+    def legal_action_mask(self, out: np.ndarray = None) -> np.ndarray:
+        raise NotImplementedError("The legal_action_mask method has not been implemented")
+
+    def move_to_action(self, move) -> int:
+        raise NotImplementedError("The move_to_action method has not been implemented")
+
+    def action_to_move(self, action: int) -> Any:
+        raise NotImplementedError("The action_to_move method has not been implemented")
+
+    def _action_mask(self, out: np.ndarray = None) -> np.ndarray:
+        """returns a cleared mask over the action space, reusing the `out` array if one is given"""
+        if out is None:
+            return np.zeros(self.ACTION_SIZE, dtype=bool)
+
+        if out.shape != (self.ACTION_SIZE,):
+            raise ValueError(f"the mask must be of size {self.ACTION_SIZE}")
+        out[:] = False
+        return out
 
     def winner(self) -> int:
-        raise NotImplemented("The winner method has not been implemented")
+        raise NotImplementedError("The winner method has not been implemented")
 
     def score(self) -> tuple:
-        raise NotImplemented("The score method has not been implemented")
+        raise NotImplementedError("The score method has not been implemented")
+
+    def random_playout(self, seed: int = None, max_plies: int = None) -> Tuple[int, tuple, int]:
+        # the moves are pushed on the state itself, and popped once the game is over. The positions of a playout are
+        # rarely seen again, so their moves skip the caches of `cache_utils.cache_moves`
+        get_moves = type(self).get_legal_moves
+        get_moves = getattr(get_moves, '__wrapped__', get_moves)
+        rng = Random(seed)
+        plies = 0
+        winner = self.winner()
+        while winner == 0 and (max_plies is None or plies < max_plies):
+            self.push(rng.choice(list(get_moves(self))))
+            plies += 1
+            winner = self.winner()
+
+        score = self.score()
+        for _ in range(plies):
+            self.pop()
+        return winner, score, plies
+
+    def rollout(self, n_games: int, seed: int = None,
+                max_plies: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rng = Random(seed)
+        playouts = [self.random_playout(rng.getrandbits(64), max_plies) for _ in range(n_games)]
+
+        winners = np.array([p[0] for p in playouts], dtype=np.int64)
+        scores = np.array([p[1] for p in playouts], dtype=np.int64).reshape(n_games, 2)
+        plies = np.array([p[2] for p in playouts], dtype=np.uint32)
+        return winners, scores, plies
+
+    def perft(self, depth: int) -> int:
+        # the moves skip the caches of `cache_utils.cache_moves`, as for the random playouts
+        get_moves = type(self).get_legal_moves
+        get_moves = getattr(get_moves, '__wrapped__', get_moves)
+        return self._perft(get_moves, depth)
+
+    def _perft(self, get_moves, depth: int) -> int:
+        if depth == 0:
+            return 1
+
+        moves = get_moves(self)
+        if self.winner() != 0:
+            return 0
+        # the leaves are counted without being played
+        if depth == 1:
+            return len(moves)
+
+        nodes = 0
+        for move in moves:
+            self.push(move)
+            nodes += self._perft(get_moves, depth - 1)
+            self.pop()
+        return nodes
+
+    def transform(self, transform: int) -> 'BaseBoardState':
+        check_transform(transform, self.N_SYMMETRIES)
+        return self.copy()
+
+    def symmetries(self) -> List['BaseBoardState']:
+        return [self.transform(t) for t in range(self.N_SYMMETRIES)]
+
+    def canonical(self) -> Tuple['BaseBoardState', int]:
+        states = self.symmetries()
+        # the first transform wins the ties, which are the symmetric positions
+        transform = min(range(len(states)), key=lambda t: states[t].zobrist)
+        return states[transform], transform
+
+    def transform_move(self, move, transform: int, *, inverse=False) -> Any:
+        check_transform(transform, self.N_SYMMETRIES)
+        return move
+
+    def transform_action(self, action: int, transform: int, *, inverse=False) -> int:
+        check_transform(transform, self.N_SYMMETRIES)
+        return action
 
     def save(self, file: Union[str, Path]):
         self._save_mod.save_state(file, self)
@@ -0,0 +1,192 @@
+from pathlib import Path
+from typing import Union, Type, Any, Dict, List, Tuple, Iterable, NamedTuple
+import struct
+import numpy as np
+
+from GameEngines.abstract import AbsSaveModule, AbsBoardState
+
+_MAGIC = b"GEBS"
+# magic, version, flags, game name, record size, number of records, padded to 64 bytes
+_HEADER = struct.Struct("<4sHH16sIQ28x")
+HEADER_SIZE = _HEADER.size
+_CACHE_FLAG = 1
+
+
+class BinaryHeader(NamedTuple):
+    version: int
+    game: str
+    cache: bool         # if the records keep the moves cache of the states
+    record_size: int
+    count: int          # the number of records of the file
+
+
+def pack_header(magic: bytes, header: BinaryHeader) -> bytes:
+    """
+    :param magic: the 4 bytes identifying the kind of file
+    :param header: the header of the file
+    :return: the header as the first `HEADER_SIZE` bytes of a file
+    """
+    flags = _CACHE_FLAG if header.cache else 0
+    return _HEADER.pack(magic, header.version, flags, header.game.encode(), header.record_size, header.count)
+
+def unpack_header(file: Union[str, Path], magic: bytes) -> BinaryHeader:
+    """
+    :param file: the path of the file
+    :param magic: the 4 bytes identifying the kind of file
+    :return: the header of the file
+    """
+    with open(file, "rb") as f:
+        raw = f.read(_HEADER.size)
+    if len(raw) < _HEADER.size or raw[:4] != magic:
+        raise ValueError(f"{file} is not a {magic.decode()} file")
+
+    _, version, flags, game, record_size, count = _HEADER.unpack(raw)
+    return BinaryHeader(version, game.rstrip(b"\0").decode(), bool(flags & _CACHE_FLAG), record_size, count)
+
+
+class BinarySaveModule(AbsSaveModule):
+    """
+    This is the base of the binary save modules. A file is a fixed size header followed by one fixed width record per
+    state, so that many states are saved compactly and read back with numpy in one go (see `save_many` and
+    `load_many`). The moves cache of the states can be kept in the records as a bit mask over the action space.
+
+    The games define the fields of their records (`FIELDS`), how a state fills a record (`_to_record`) and the data of
+    the `_put_data` function of their json save module given by a record (`_from_record`), so that both modules load
+    the exact same states.
+    """
+    GAME: str = ""
+    VERSION: int = 1
+    FIELDS: List[Tuple] = []            # the numpy fields of a record, without the moves cache
+    ACTION_SIZE: int = 0
+    MOVE_SIZE: int = 0                  # the number of codes of `encode_move`
+    JSON_MODULE: Type[AbsSaveModule] = None
+
+    @classmethod
+    def record_dtype(cls, cache: bool = True) -> np.dtype:
+        """
+        :param cache: if the records keep the moves cache of the states
+        :return: the numpy type of a record
+        """
+        fields = list(cls.FIELDS)
+        if cache:
+            fields += [("has_cache", "u1"), ("move_cache", "u1", ((cls.ACTION_SIZE + 7) // 8,))]
+        return np.dtype(fields)
+
+    @classmethod
+    def load_state(cls, file: Union[str, Path], state_type: Type[AbsBoardState]) -> AbsBoardState:
+        states = cls.load_many(file, state_type)
+        if len(states) != 1:
+            raise ValueError(f"{file} holds {len(states)} states, use `load_many` to load them")
+        return states[0]
+
+    @classmethod
+    def save_state(cls, file: Union[str, Path], state: AbsBoardState):
+        cls.save_many(file, [state])
+
+    @classmethod
+    def save_many(cls, file: Union[str, Path], states: Iterable[AbsBoardState], *, cache: bool = True):
+        """
+        saves states in a single file
+
+        :param file: the path of the file
+        :param states: the states to save
+        :param cache: if the moves cache of the states is saved
+        """
+        states = list(states)
+        records = np.zeros(len(states), dtype=cls.record_dtype(cache))
+        for i, state in enumerate(states):
+            record = records[i]
+            cls._to_record(state, record)
+            if cache and state._move_cache is not None:
+                record["has_cache"] = 1
+                record["move_cache"] = cls._pack_moves(state, state._move_cache)
+
+        header = BinaryHeader(cls.VERSION, cls.GAME, cache, records.dtype.itemsize, len(records))
+        with open(file, "wb") as f:
+            f.write(pack_header(_MAGIC, header))
+            f.write(records.tobytes())
+
+    @classmethod
+    def load_many(cls, file: Union[str, Path], state_type: Type[AbsBoardState]) -> List[AbsBoardState]:
+        """
+        loads all the states of a file
+
+        :param file: the path of the file
+        :param state_type: the BoardState class of the loaded states
+        :return: the states in the order they were saved
+        """
+        return [cls.from_record(record, state_type) for record in cls.read_records(file)]
+
+    @classmethod
+    def read_header(cls, file: Union[str, Path]) -> BinaryHeader:
+        """
+        reads and checks the header of a file
+
+        :param file: the path of the file
+        :return: the header of the file
+        """
+        header = unpack_header(file, _MAGIC)
+        if header.game != cls.GAME:
+            raise ValueError(f"{file} holds {header.game} states, not {cls.GAME} states")
+        if header.version != cls.VERSION:
+            raise ValueError(f"{file} uses the version {header.version} of the format, expected {cls.VERSION}")
+        if header.record_size != cls.record_dtype(header.cache).itemsize:
+            raise ValueError(f"{file} has records of {header.record_size} bytes, which do not match the format")
+        return header
+
+    @classmethod
+    def read_records(cls, file: Union[str, Path]) -> np.ndarray:
+        """
+        :param file: the path of the file
+        :return: the records of a file as a numpy structured array
+        """
+        header = cls.read_header(file)
+        return np.fromfile(file, dtype=cls.record_dtype(header.cache), count=header.count, offset=HEADER_SIZE)
+
+    @classmethod
+    def from_record(cls, record: np.void, state_type: Type[AbsBoardState]) -> AbsBoardState:
+        """
+        :param record: a record of a binary save file
+        :param state_type: the BoardState class of the state
+        :return: the state of the record
+        """
+        state = cls.JSON_MODULE._put_data(cls._from_record(record), state_type)
+        if "has_cache" in record.dtype.names and record["has_cache"]:
+            bits = np.unpackbits(record["move_cache"], count=cls.ACTION_SIZE, bitorder="little")
+            state._move_cache = set(state.action_to_move(int(a)) for a in np.flatnonzero(bits))
+        return state
+
+    @classmethod
+    def _to_record(cls, state: AbsBoardState, record: np.void):
+        """fills the fields of a record with a state"""
+        raise NotImplementedError("The _to_record method has not been implemented")
+
+    @classmethod
+    def _from_record(cls, record: np.void) -> Dict[str, Any]:
+        """returns the data of the `_put_data` function of the json save module given by a record"""
+        raise NotImplementedError("The _from_record method has not been implemented")
+
+    @classmethod
+    def encode_move(cls, move: Any) -> int:
+        """
+        unlike `move_to_action`, the code of a move does not depend on the position, so the moves of a game are decoded
+        without playing them (see `GameRecord`)
+
+        :param move: a move of the game
+        :return: the code of the move, between 0 and MOVE_SIZE
+        """
+        raise NotImplementedError("The encode_move method has not been implemented")
+
+    @classmethod
+    def decode_move(cls, code: int) -> Any:
+        """
+        :param code: the code of a move, see `encode_move`
+        :return: the move
+        """
+        raise NotImplementedError("The decode_move method has not been implemented")
+
+    @staticmethod
+    def _pack_moves(state: AbsBoardState, moves: Iterable[Any]) -> np.ndarray:
+        bits = np.zeros(state.ACTION_SIZE, dtype=bool)
+        bits[[state.move_to_action(m) for m in moves]] = True
+        return np.packbits(bits, bitorder="little")
@@ -1,12 +1,19 @@
 import GameEngines
 from GameEngines.Checkers.repr import _repr
-from GameEngines.cache_utils import cache_moves, ignore_cache
+from GameEngines.cache_utils import cache_moves
 
-BoardState = GameEngines.Checkers.RawCheckersState
+RawCheckersState = GameEngines.Checkers.RawCheckersState
+BoardState = RawCheckersState
+
+# allows the rust class to be pickled by reference (e.g. when sent to a process pool)
+BoardState.__module__ = __name__
 
 
 # addition of the __repr__ method on the rust implementation of the class
 BoardState.__repr__ = _repr
 
+# the moves cache is a field of the rust class, which drops it on push, pop and copy
 BoardState.get_legal_moves = cache_moves(BoardState.get_legal_moves)
-BoardState.copy = ignore_cache(BoardState.copy)
\ No newline at end of file
+
+
+BatchBoardState = GameEngines.Checkers.RawCheckersBatch
@@ -1,7 +1,7 @@
 from pathlib import Path
-from typing import Set, Tuple, Dict, Any, Union
+from typing import Set, Tuple, Dict, Any, List, Optional, Union
 from numpy import ndarray
-from GameEngines.abstract import AbsBoardState
+from GameEngines.abstract import AbsBoardState, AbsBatchBoardState
 from GameEngines.Checkers.utilsTypes import Move
 
 class BoardState(AbsBoardState):
@@ -9,6 +9,8 @@ class BoardState(AbsBoardState):
     This class is the implementation of BoardState for the `Avalam` game.
     Rules for the game can be found online
     """
+    ACTION_SIZE: int
+    N_SYMMETRIES: int
 
     def __init__(self): ...
 
@@ -21,21 +23,89 @@ class BoardState(AbsBoardState):
     @property
     def board(self) -> ndarray: ...
 
+    @property
+    def zobrist(self) -> int: ...
+
     def __repr__(self) -> str: ...
 
     def __eq__(self, other: 'BoardState') -> bool: ...
 
+    def __hash__(self) -> int: ...
+
     def copy(self, *, cache=False) -> 'BoardState': ...
 
     def play(self, move: Move) -> 'BoardState': ...
 
+    def push(self, move: Move): ...
+
+    def pop(self) -> Move: ...
+
     def get_legal_moves(self, *, cache=False) -> Set[Move]: ...
 
+    def legal_action_mask(self, out: Optional[ndarray] = None) -> ndarray: ...
+
+    def move_to_action(self, move: Move) -> int: ...
+
+    def action_to_move(self, action: int) -> Move: ...
+
     def score(self) -> Tuple[int, int]: ...
 
     def winner(self) -> int: ...
 
+    def random_playout(self, seed: Optional[int] = None, max_plies: Optional[int] = None) -> Tuple[int, Tuple[int, int], int]: ...
+
+    def rollout(self, n_games: int, seed: Optional[int] = None, max_plies: Optional[int] = None) -> Tuple[ndarray, ndarray, ndarray]: ...
+
+    def perft(self, depth: int) -> int: ...
+
+    def transform(self, transform: int) -> 'BoardState': ...
+
+    def symmetries(self) -> List['BoardState']: ...
+
+    def canonical(self) -> Tuple['BoardState', int]: ...
+
+    def transform_move(self, move: Move, transform: int, *, inverse: bool = False) -> Move: ...
+
+    def transform_action(self, action: int, transform: int, *, inverse: bool = False) -> int: ...
+
     def save(self, file: Union[str, Path]): ...
 
     @staticmethod
     def load(file: Union[str, Path]) -> 'BoardState': ...
+
+
+class BatchBoardState(AbsBatchBoardState):
+    """
+    This class is the implementation of BatchBoardState for the `Checkers` game.
+    The boards of all the games are stored as bitboards, `boards` builds their arrays when accessed
+    """
+    ACTION_SIZE: int
+
+    auto_reset: bool
+
+    def __init__(self, n_games: int, auto_reset: bool = True): ...
+
+    def __len__(self) -> int: ...
+
+    @property
+    def boards(self) -> ndarray: ...
+
+    @property
+    def turns(self) -> ndarray: ...
+
+    @property
+    def curr_pids(self) -> ndarray: ...
+
+    def play_batch(self, actions: ndarray) -> ndarray: ...
+
+    def legal_move_mask_batch(self) -> ndarray: ...
+
+    def winner_batch(self) -> ndarray: ...
+
+    def score_batch(self) -> ndarray: ...
+
+    def reset(self, indexes: Optional[List[int]] = None): ...
+
+    def get_state(self, i: int) -> BoardState: ...
+
+    def set_state(self, i: int, state: BoardState): ...
@@ -1,9 +1,9 @@
-from typing import Set, Iterator, Type
+from typing import Set, Type, Optional, List
 from enum import Enum
 import numpy as np
 
 from GameEngines import BaseBoardState, AbsSaveModule
-from GameEngines.cache_utils import cache_moves
+from GameEngines.cache_utils import cache_moves, clear_cache
 from GameEngines.Checkers.repr import _repr
 from GameEngines.Checkers.SaveModule import CheckersSave
 from GameEngines.Checkers.utilsTypes import *
@@ -18,155 +18,212 @@ class BoardState(BaseBoardState):
     """
     This class is the Python implementation of BoardState for the `Checkers` game.
     Rules for the game can be found online
+
+    The board is kept as bitboards over the 32 dark squares (see `utils`), the pieces of each player and the kings, so
+    that the moves of all the pieces are found with a few bitwise operations. The `board` array is only built when
+    accessed.
     """
 
     _DEFAULT_SAVE_MOD = CheckersSave
+    ACTION_SIZE = ACTION_SIZE
 
     def __init__(self, *, save_module: Type[AbsSaveModule] = _DEFAULT_SAVE_MOD):
         super().__init__(save_module=save_module)
 
-        self._board = utils.board_setup()
+        self._p1, self._p2, self._kings = utils.INITIAL
+        self._view: Optional[np.ndarray] = None # The board array, built on access
         self._cached_moves = None # The moves cached on a multi jump move
+        self._result: Optional[int] = None # The winner of the position, None until its moves are generated
+        self._rehash()
 
     def __eq__(self, other: 'BoardState') -> bool:
         return (
-                np.array_equal(
-                    self._board[self._board != 3],
-                    other._board[other._board != 3]
-                ) and
+                self._p1 == other._p1 and
+                self._p2 == other._p2 and
+                self._kings == other._kings and
                 self._cached_moves == other._cached_moves and
                 self._turn == other._turn and
                 self._curr_pid == other._curr_pid
         )
 
+    def __hash__(self) -> int:
+        return self._zobrist
+
     @property
     def board(self) -> np.ndarray:
-        return self._board
+        """the (7, 8) board rotated by 45 degrees, the squares off the board holding 3. The array is read only"""
+        if self._view is None:
+            self._view = utils.to_array(self._p1, self._p2, self._kings)
+            self._view.setflags(write=False)
+        return self._view
+
+    @property
+    def _board(self) -> np.ndarray:
+        return self.board
+
+    @_board.setter
+    def _board(self, board: Optional[np.ndarray]):
+        # `BaseBoardState.__init__` sets the board to None before the bitboards exist
+        if board is not None:
+            self._p1, self._p2, self._kings = utils.from_array(board)
+            self._view = None
 
     def __repr__(self) -> str:
         return _repr(self)
 
+    def copy(self, *, cache=False) -> 'BoardState':
+        new_state = type(self).__new__(type(self))
+        new_state.__dict__.update(self.__dict__)
+        new_state._undo = []
+        new_state._move_cache = set(self._move_cache) if cache and self._move_cache is not None else None
+        return new_state
+
     def play(self, global_move: Move) -> 'BoardState':
         new_state = self.copy()
-        new_state._turn += 1
-
-        move = self._to_local(global_move)
+        new_state._apply(utils.played_action(global_move))
+        return new_state
 
-        # move the pawn and remove whatever is in its path
-        beg_val = new_state._board[move[0]]
-        xs = sorted([move[0][0], move[1][0]])
-        ys = sorted([move[0][1], move[1][1]])
-        new_state._board[xs[0]: xs[1] + 1, ys[0]: ys[1] + 1] = 0
-        new_state._board[move[1]] = beg_val
+    @clear_cache
+    def push(self, global_move: Move):
+        undo = (global_move, self._p1, self._p2, self._kings, self._cached_moves, self._curr_pid, self._zobrist)
+        self._apply(utils.played_action(global_move))
+        self._undo.append(undo)
+
+    @clear_cache
+    def pop(self) -> Move:
+        global_move, self._p1, self._p2, self._kings, self._cached_moves, self._curr_pid, self._zobrist = \
+            self._pop_undo()
+        self._result = None
+        self._view = None
+        self._turn -= 1
+        return global_move
+
+    def _apply(self, action: int):
+        """plays an action in place"""
+        s, rest = divmod(action, 8)
+        d, jump = divmod(rest, 2)
+        dest = (utils.JUMPS if jump else utils.NEIGHBOURS)[s][d]
+        moved = self._piece(s)
+        if dest < 0 or moved == 0:
+            raise ValueError(f"{action_to_move(action)} does not move a piece")
+
+        self._turn += 1
+        self._result = None
+        self._view = None
+        self._zobrist ^= ZOBRIST_KEYS[4 * s + self._piece_index(moved)]
+
+        # move the pawn and remove the captured piece, which is halfway between the origin and the destination
+        owner = 1 if moved > 0 else 2
+        squares = 1 << s | 1 << dest
+        if owner == 1:
+            self._p1 ^= squares
+        else:
+            self._p2 ^= squares
+        if self._kings >> s & 1:
+            self._kings ^= squares
+
+        if jump:
+            middle = utils.NEIGHBOURS[s][d]
+            self._zobrist ^= ZOBRIST_KEYS[4 * middle + self._piece_index(self._piece(middle))]
+            kept = utils.FULL ^ 1 << middle
+            self._p1 &= kept
+            self._p2 &= kept
+            self._kings &= kept
 
         # change from 1 -> 2 on the end row
-        if global_move[1][0] == [0, 7][self._curr_pid % 2]:
-            if abs(beg_val) == PieceType.Single.value:
-                new_state._board[move[1]] *= 2
+        if self._kings >> dest & 1 == 0 and utils.PROMOTION[self._curr_pid] >> dest & 1:
+            self._kings |= 1 << dest
+
+        self._zobrist ^= ZOBRIST_KEYS[4 * dest + self._piece_index(self._piece(dest))]
+        if self._cached_moves is not None:
+            self._zobrist ^= ZOBRIST_KEYS[Z_JUMPING + s]
 
         # If the played move is a capture, check if multi jump available
-        is_capture = (xs[1] - xs[0] + ys[1] - ys[0]) > 1
-        if is_capture:
+        if jump:
             # If multi jump available, cache them for next step
-            moves, _ = new_state._get_moves(new_state._board, move[1], True)
-            if len(moves) > 0:
-                new_state._cached_moves = set(self._from_local((move[1], d)) for d in moves)
-                return new_state
-
-        new_state._cached_moves = None
-        new_state._curr_pid = (self._curr_pid % 2) + 1
-        return new_state
+            own, opp = (self._p1, self._p2) if owner == 1 else (self._p2, self._p1)
+            jumps = utils.jump_actions_from(dest, own, opp, self._kings, owner)
+            if len(jumps) > 0:
+                self._cached_moves = set(action_to_move(a) for a in jumps)
+                self._zobrist ^= ZOBRIST_KEYS[Z_JUMPING + dest]
+                # the jumping piece still has a piece to capture
+                self._result = 0
+                return
+
+        self._cached_moves = None
+        self._curr_pid = (self._curr_pid % 2) + 1
+        self._zobrist ^= ZOBRIST_KEYS[Z_SIDE]
 
     @cache_moves
     def get_legal_moves(self, *, cache=False) -> Set[Move]:
         if self._cached_moves is not None:
             return self._cached_moves.copy()
 
-        pieces = (self._board > 0 if self._curr_pid == 1 else self._board < 0) & (self._board < 3)
-        coords: Iterator[Coords] = zip(*pieces.nonzero())
+        actions = self._legal_actions()
+        self._result = self._result_of(len(actions) > 0)
+        return set(action_to_move(a) for a in actions)
+
+    def legal_action_mask(self, out: np.ndarray = None) -> np.ndarray:
+        mask = self._action_mask(out)
+        if self._cached_moves is not None:
+            mask[[move_to_action(m) for m in self._cached_moves]] = True
+            return mask
+
+        actions = self._legal_actions()
+        mask[actions] = True
+        self._result = self._result_of(len(actions) > 0)
+        return mask
 
-        moves = []
-        capture = False
-        for coord in coords:
-            destinations, _capture = self._get_moves(self._board, coord, capture)
-            iter_dest = (self._from_local((coord, d)) for d in destinations)
-            # If a capture is detected, drop normal moves and only keep captures
-            if _capture and not capture:
-                moves = []
-                capture = True
+    def move_to_action(self, move: Move) -> int:
+        return move_to_action(move)
 
-            moves.extend(iter_dest)
-        return set(moves)
+    def action_to_move(self, action: int) -> Move:
+        return action_to_move(action)
 
     def score(self) -> Tuple[int, int]:
-        return (
-            np.sum((self._board > 0) & (self._board < 3)),
-            np.sum(self._board < 0)
-        )
+        return utils.popcount(self._p1), utils.popcount(self._p2)
 
     def winner(self) -> int:
-        p1, p2 = self.score()
-
-        if p1 <= 0 or p2 <= 0:
-            return 1 if p1 > 0 else 2
-
-        if not self._has_moves():
+        # the result is found with the moves of the position, so it is free after `get_legal_moves`
+        if self._result is None:
+            own, opp = self._sides()
+            self._result = self._result_of(utils.has_moves(own, opp, self._kings, self._curr_pid))
+        return self._result
+
+    def _rehash(self):
+        key = ZOBRIST_KEYS[Z_SIDE] if self._curr_pid == 2 else 0
+        for s in utils.squares(self._p1 | self._p2):
+            key ^= ZOBRIST_KEYS[4 * s + self._piece_index(self._piece(s))]
+
+        # all the cached moves of a multi jump start from the jumping piece
+        if self._cached_moves:
+            key ^= jumping_key(next(iter(self._cached_moves))[0])
+        self._zobrist = key
+
+    def _result_of(self, has_moves: bool) -> int:
+        """returns the winner of the position given whether the current player can move"""
+        if self._p1 == 0 or self._p2 == 0:
+            return 1 if self._p1 != 0 else 2
+
+        if not has_moves:
             return (self._curr_pid % 2) + 1
 
         return 0
 
-    def _has_moves(self) -> bool:
-        pieces = (self._board > 0 if self._curr_pid == 1 else self._board < 0) & (self._board < 3)
-        coords: Iterator[Coords] = zip(*pieces.nonzero())
+    def _legal_actions(self) -> List[int]:
+        own, opp = self._sides()
+        return utils.legal_actions(own, opp, self._kings, self._curr_pid)
 
-        for coord in coords:
-            moves, _ = self._get_moves(self._board, coord, False)
-            if len(moves) > 0:
-                return True
-        return False
+    def _sides(self) -> Tuple[int, int]:
+        """returns the pieces of the current player and of its opponent"""
+        return (self._p1, self._p2) if self._curr_pid == 1 else (self._p2, self._p1)
 
+    def _piece(self, s: int) -> int:
+        """returns the value of the piece on the dark square s, as on the board"""
+        sign = (self._p1 >> s & 1) - (self._p2 >> s & 1)
+        return sign * (1 + (self._kings >> s & 1))
 
     @staticmethod
-    def _from_local(move: Move) -> Move:
-        return (
-            (4 + int(move[0][0] - move[0][1]), int(move[0][0] + move[0][1]) - 3),  # x_res = (4 + x - y)
-            (4 + int(move[1][0] - move[1][1]), int(move[1][0] + move[1][1]) - 3)   # y_res = (x + y - 3)
-        )
-
-    @staticmethod
-    def _to_local(move: Move) -> Move:
-        return (
-            (int(move[0][0] + move[0][1] - 1) // 2, int(move[0][1] - move[0][0] + 7) // 2),  # x_res = (x + y - 1) // 2
-            (int(move[1][0] + move[1][1] - 1) // 2, int(move[1][1] - move[1][0] + 7) // 2)   # y_res = (y - x + 7) // 2
-        )
-
-    @staticmethod
-    def _get_moves(board: np.ndarray, pos: Coords, capture_found: bool = False) -> Tuple[list, bool]:
-        val = board[pos]
-        piece_type, piece_sign = abs(val), np.sign(val)
-
-        normalized: np.ndarray = board * piece_sign
-        directions = [
-            ((0, -1), normalized[pos[0], :pos[1]][:-3:-1],  1),
-            ((0, +1), normalized[pos[0], pos[1] + 1:][:2], -1),
-            ((-1, 0), normalized[:pos[0], pos[1]][:-3:-1], -1),
-            ((+1, 0), normalized[pos[0] + 1:, pos[1]][:2],  1),
-        ]
-        # If the piece is not a king, only keep allowed diagonals
-        if piece_type == PieceType.Single.value:
-            directions = [d for d in directions if piece_sign == d[2]]
-
-        # Filtering out directions if no adjacent spaces
-        directions = [d[:2] for d in directions if len(d[1]) >= 1]
-
-        # Getting the captures if there are any
-        captures = [
-            (pos[0] + 2 * c[0], pos[1] + 2 * c[1])
-            for c, d in directions
-            # If there is space for a jump, the next space is an enemy and the jump space is open,
-            if len(d) >= 2 and d[0] < 0 and d[1] == 0
-        ]
-        if len(captures) > 0 or capture_found:
-            return captures, True
-        else:
-            return [(pos[0] + c[0], pos[1] + c[1]) for c, d in directions if d[0] == 0], False
+    def _piece_index(piece: int) -> int:
+        """returns the index of the zobrist key of a piece on its square"""
+        return piece - 1 if piece > 0 else 1 - piece
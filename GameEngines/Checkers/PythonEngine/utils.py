@@ -1,5 +1,8 @@
+from typing import List, Tuple, Iterator
 import numpy as np
 
+from GameEngines.Checkers.utilsTypes import DIRECTIONS, Move, move_to_action
+
 
 def board_setup():
     n = 3
@@ -13,3 +16,137 @@ def board_setup():
         [ n, n, n,-1,-1, n, n, n],
     ], dtype=int)
     return board
+
+
+# global coordinates of the 32 dark squares, in the order of the action space
+SQUARES_R = np.arange(32) // 4
+SQUARES_C = 2 * (np.arange(32) % 4) + (SQUARES_R + 1) % 2
+
+# local coordinates of the same squares
+SQUARES_X = (SQUARES_R + SQUARES_C - 1) // 2
+SQUARES_Y = (SQUARES_C - SQUARES_R + 7) // 2
+
+
+# Bitboards: the bit s of a board is the dark square of index s, the squares of the action space. A board is made of
+# the bitboards of the pieces of each player and of the kings
+FULL = (1 << 32) - 1
+FORWARD = {1: (2, 3), 2: (0, 1)}          # the directions of the single pieces of each player, see `DIRECTIONS`
+PROMOTION = {1: 0xF << 28, 2: 0xF}      # the squares of the last row of each player
+INITIAL = (0xFFF, 0xFFF << 20, 0)       # the pieces of the first and second players and the kings
+
+
+def _square_at(r: int, c: int) -> int:
+    return 4 * r + c // 2 if 0 <= r < 8 and 0 <= c < 8 else -1
+
+def _neighbour_table(distance: int) -> List[List[int]]:
+    return [
+        [_square_at(r + distance * dr, c + distance * dc) for dr, dc in DIRECTIONS]
+        for r, c in zip(SQUARES_R.tolist(), SQUARES_C.tolist())
+    ]
+
+# the neighbour of each square in each direction, and the landing square of a jump, -1 if off the board
+NEIGHBOURS = _neighbour_table(1)
+JUMPS = _neighbour_table(2)
+
+def _shift_table() -> List[List[Tuple[int, int]]]:
+    """the masks and offsets moving the squares of the even and odd rows to their neighbour in each direction"""
+    table = [[(0, 0), (0, 0)] for _ in DIRECTIONS]
+    for s in range(32):
+        for d in range(len(DIRECTIONS)):
+            if NEIGHBOURS[s][d] >= 0:
+                mask, _ = table[d][(s // 4) % 2]
+                table[d][(s // 4) % 2] = (mask | 1 << s, NEIGHBOURS[s][d] - s)
+    return table
+
+SHIFTS = _shift_table()
+
+
+def shift(board: int, d: int) -> int:
+    """moves every square of a bitboard to its neighbour in the direction d, the squares leaving the board are lost"""
+    (even, e_offset), (odd, o_offset) = SHIFTS[d]
+    even, odd = board & even, board & odd
+    return (
+        (even << e_offset if e_offset >= 0 else even >> -e_offset) |
+        (odd << o_offset if o_offset >= 0 else odd >> -o_offset)
+    )
+
+def squares(board: int) -> Iterator[int]:
+    """the squares of a bitboard in increasing order"""
+    while board:
+        low = board & -board
+        yield low.bit_length() - 1
+        board ^= low
+
+def popcount(board: int) -> int:
+    return bin(board).count("1")
+
+
+def movers(own: int, kings: int, pid: int, d: int) -> int:
+    """the pieces of the player allowed to move in the direction d"""
+    return own if d in FORWARD[pid] else own & kings
+
+def step_origins(own: int, opp: int, kings: int, pid: int, d: int) -> int:
+    """the pieces of the player that can step in the direction d"""
+    empty = FULL & ~(own | opp)
+    return movers(own, kings, pid, d) & shift(empty, 3 - d)
+
+def jump_origins(own: int, opp: int, kings: int, pid: int, d: int) -> int:
+    """the pieces of the player that can capture in the direction d"""
+    empty = FULL & ~(own | opp)
+    # the opposite direction of d is 3 - d, the squares next to an opponent followed by an empty square
+    return movers(own, kings, pid, d) & shift(opp & shift(empty, 3 - d), 3 - d)
+
+def legal_actions(own: int, opp: int, kings: int, pid: int) -> List[int]:
+    """the legal actions of the player, the captures being mandatory"""
+    jumps = [jump_origins(own, opp, kings, pid, d) for d in range(4)]
+    if any(jumps):
+        return [(s * 4 + d) * 2 + 1 for d in range(4) for s in squares(jumps[d])]
+    return [(s * 4 + d) * 2 for d in range(4) for s in squares(step_origins(own, opp, kings, pid, d))]
+
+def has_moves(own: int, opp: int, kings: int, pid: int) -> bool:
+    return any(
+        step_origins(own, opp, kings, pid, d) or jump_origins(own, opp, kings, pid, d) for d in range(4)
+    )
+
+def jump_actions_from(s: int, own: int, opp: int, kings: int, pid: int) -> List[int]:
+    """the captures of the piece on the square s, which continue a multi jump"""
+    empty = FULL & ~(own | opp)
+    king = kings >> s & 1
+    return [
+        (s * 4 + d) * 2 + 1
+        for d in range(4)
+        if (king or d in FORWARD[pid]) and JUMPS[s][d] >= 0 and
+        opp >> NEIGHBOURS[s][d] & 1 and empty >> JUMPS[s][d] & 1
+    ]
+
+def played_action(move: Move) -> int:
+    """
+    the action of a played move. The move is read on the local board like the moves of the previous engine, so that a
+    move from a light square is played from the dark square sharing its local coordinates
+    """
+    (r, c), (k, l) = move
+    if (r + c) % 2 == 1:
+        return move_to_action(move)
+
+    x, y = (r + c - 1) // 2, (c - r + 7) // 2
+    dx, dy = (k + l - 1) // 2 - x, (l - k + 7) // 2 - y
+    r, c = 4 + x - y, x + y - 3
+    return move_to_action(((r, c), (r + dx - dy, c + dx + dy)))
+
+def to_array(p1: int, p2: int, kings: int) -> np.ndarray:
+    """the (7, 8) local board of the bitboards, the squares off the board holding 3"""
+    bits = np.array([p1, p2, kings], dtype="<u4").view(np.uint8)
+    p1, p2, kings = np.unpackbits(bits, bitorder="little").reshape(3, 32).astype(int)
+    board = board_setup()
+    board[SQUARES_X, SQUARES_Y] = (p1 - p2) * (1 + kings)
+    return board
+
+def from_array(board: np.ndarray) -> Tuple[int, int, int]:
+    """the bitboards of a (7, 8) local board, which may be flattened"""
+    values = np.asarray(board).reshape(7, 8)[SQUARES_X, SQUARES_Y]
+    weights = 1 << np.arange(32, dtype=np.uint64)
+    return (
+        int(np.sum(weights[values > 0])),
+        int(np.sum(weights[values < 0])),
+        int(np.sum(weights[np.abs(values) == 2])),
+    )
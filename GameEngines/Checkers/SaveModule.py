@@ -4,7 +4,8 @@ import numpy as np
 from typing import Union, Type, Dict, Any
 from GameEngines.abstract import AbsBoardState, AbsSaveModule
 from GameEngines import cache_utils
-from GameEngines.Checkers.utilsTypes import to_move
+from GameEngines.BinarySaveModule import BinarySaveModule
+from GameEngines.Checkers.utilsTypes import to_move, action_to_move, ACTION_SIZE, Move, move_to_action
 
 
 class CheckersSave(AbsSaveModule):
@@ -51,5 +52,52 @@ class CheckersSave(AbsSaveModule):
         state._cached_moves = data["cached_moves"]
         state._turn = data["turn"]
         state._curr_pid = data["curr_pid"]
+        state._rehash()
 
         return state
+
+
+class CheckersBinarySave(BinarySaveModule):
+    """ Binary Record Template
+    {
+        board: int8[56],        // Flattened board from (7,8) to (56,)
+        cached_moves: uint8[32],// The moves of a multi jump as bits of the action space, all 0 if none
+        turn: uint32,           // The current turn
+        curr_pid: uint8,        // The active player
+        has_cache: uint8,       // If the moves are cached (only when the file keeps the moves cache)
+        move_cache: uint8[32]   // The cached moves as bits of the action space
+    }
+    """
+    GAME = "Checkers"
+    FIELDS = [("board", "i1", (56,)), ("cached_moves", "u1", (ACTION_SIZE // 8,)), ("turn", "<u4"), ("curr_pid", "u1")]
+    ACTION_SIZE = ACTION_SIZE
+    MOVE_SIZE = ACTION_SIZE
+    JSON_MODULE = CheckersSave
+
+    @classmethod
+    def encode_move(cls, move: Move) -> int:
+        # the actions of the game do not depend on the position
+        return move_to_action(move)
+
+    @classmethod
+    def decode_move(cls, code: int) -> Move:
+        return action_to_move(code)
+
+    @classmethod
+    def _to_record(cls, state: AbsBoardState, record: np.void):
+        record["board"] = state.board.ravel()
+        # the moves of a multi jump are never empty
+        if state._cached_moves is not None:
+            record["cached_moves"] = cls._pack_moves(state, state._cached_moves)
+        record["turn"] = state.turn
+        record["curr_pid"] = state.curr_pid
+
+    @classmethod
+    def _from_record(cls, record: np.void) -> Dict[str, Any]:
+        jumps = np.flatnonzero(np.unpackbits(record["cached_moves"], bitorder="little"))
+        return {
+            "board": record["board"].astype(np.int64).reshape((7, 8)),
+            "cached_moves": set(action_to_move(a) for a in jumps) if len(jumps) > 0 else None,
+            "turn": int(record["turn"]),
+            "curr_pid": int(record["curr_pid"])
+        }
@@ -1,4 +1,4 @@
 from .utilsTypes import *
-from .BoardState import BoardState as BoardState
+from .BoardState import BoardState as BoardState, BatchBoardState as BatchBoardState
 
 from .Checkers import *
@@ -1,7 +1,43 @@
 from typing import Tuple, List
+from GameEngines.zobrist import zobrist_keys
 
 Coords = Tuple[int, int]
 Move = Tuple[Coords, Coords]
 
 def to_move(move: List[List[int]]) -> Move:
-    return (move[0][0], move[0][1]), (move[1][0], move[1][1])
\ No newline at end of file
+    return (move[0][0], move[0][1]), (move[1][0], move[1][1])
+
+# Action space: 32 dark squares x 4 diagonal directions x (step, jump)
+# The dark square (r, c) has the index 4 * r + c // 2
+DIRECTIONS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+ACTION_SIZE = 32 * len(DIRECTIONS) * 2
+_DIRECTION_INDEX = {d: i for i, d in enumerate(DIRECTIONS)}
+
+def move_to_action(move: Move) -> int:
+    # the moves may come with numpy ints, which would spread to the bitboards
+    (r, c), (k, l) = map(int, move[0]), map(int, move[1])
+    jump = int(abs(k - r) == 2)
+    d = _DIRECTION_INDEX[((k - r) // (1 + jump), (l - c) // (1 + jump))]
+    return ((4 * r + c // 2) * 4 + d) * 2 + jump
+
+def action_to_move(action: int) -> Move:
+    square, rest = divmod(int(action), 8)
+    d, jump = divmod(rest, 2)
+    r = square // 4
+    c = 2 * (square % 4) + (r + 1) % 2
+    return (r, c), (r + (1 + jump) * DIRECTIONS[d][0], c + (1 + jump) * DIRECTIONS[d][1])
+
+
+# Zobrist keys: one key per dark square and piece (single & king of both players), then the second player to move,
+# then one key per dark square for the piece in the middle of a multi jump
+ZOBRIST_KEYS = zobrist_keys(32 * 4 + 1 + 32, seed=3)
+Z_SIDE = 32 * 4
+Z_JUMPING = Z_SIDE + 1
+
+def piece_key(square: Coords, piece: int) -> int:
+    if piece == 0 or abs(piece) > 2:
+        return 0
+    return ZOBRIST_KEYS[4 * (4 * square[0] + square[1] // 2) + (piece - 1 if piece > 0 else 1 - piece)]
+
+def jumping_key(square: Coords) -> int:
+    return ZOBRIST_KEYS[Z_JUMPING + 4 * square[0] + square[1] // 2]
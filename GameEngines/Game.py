@@ -1,8 +1,16 @@
-from typing import Type, List, Any, Union
+from typing import Type, List, Any, Union, Optional, Dict, TYPE_CHECKING
+from pathlib import Path
 from inspect import isclass
 import time
 import math
+import numpy as np
 from GameEngines.abstract import AbsBoardState, AbsPlayer
+from GameEngines import profiling
+from GameEngines.GameHistory import GameHistory, HistoryPolicy
+
+if TYPE_CHECKING:
+    from GameEngines.dataset import DatasetWriter
+    from GameEngines.BinarySaveModule import BinarySaveModule
 
 BoardOrType = Union[AbsBoardState, Type[AbsBoardState]]
 class Game:
@@ -10,17 +18,28 @@ class Game:
     This Class represents a game between two AbsPlayer agent.
     It can play any game implementing AbsBoardState
     """
-    def __init__(self, board: BoardOrType, p0: AbsPlayer, p1: AbsPlayer):
+    def __init__(self, board: BoardOrType, p0: AbsPlayer, p1: AbsPlayer, *,
+                 history: HistoryPolicy = HistoryPolicy.FULL, keep: int = 1,
+                 recorder: Optional['DatasetWriter'] = None):
+        """
+        :param board: the BoardState class of the game or the state from which the game starts
+        :param p0: the first player
+        :param p1: the second player
+        :param history: the policy deciding which states of the game are kept in memory
+        :param keep: the number of states kept with the `HistoryPolicy.LAST_K` policy
+        :param recorder: the dataset writer to which the positions of the game are appended
+        """
         self.players = [p0, p1]
+        self.move_history: List[Any] = []
         if isclass(board): # If the given board is the class type, initiate it for the first step
             self.board_class = board
-            self.history: List[AbsBoardState] = [board()]
+            self.history = GameHistory(board(), self.move_history, history, keep=keep, board_class=board)
         else: # If the given board is instance, keep it as the first step
             self.board_class = type(board)
-            self.history: List[AbsBoardState] = [board]
+            self.history = GameHistory(board, self.move_history, history, keep=keep)
 
-        self.move_history: List[Any] = []
         self.time_data: List[float] = []
+        self.recorder = recorder
 
         self.winner = 0
 
@@ -52,22 +71,85 @@ class Game:
         """
         played = 0
         while self.winner == 0 and played < n:
-            p_nb = self.history[-1].curr_pid
+            state = self.history[-1]
+            p_nb = state.curr_pid
             player = self.players[p_nb - 1]
-            moves = self.history[-1].get_legal_moves()
+            moves = state.get_legal_moves()
+
+            beg = time.perf_counter()
+            move = player.play(state, moves, p_nb)
+            self.time_data.append(time.perf_counter() - beg)
 
-            beg = time.time()
-            move = player.play(self.history[-1], moves, p_nb)
-            self.time_data.append(time.time() - beg)
+            if self.recorder is not None:
+                self.recorder.record(state, move, moves)
 
-            next_step = self.history[-1].play(move)
+            next_step = state.play(move)
 
             self.move_history.append(move)
             self.history.append(next_step)
 
-            self.winner = self.history[-1].winner()
+            self.winner = next_step.winner()
+            if self.winner != 0 and self.recorder is not None:
+                self.recorder.end_game(self.winner)
             played += 1
 
+    def stats(self) -> Dict[str, Any]:
+        """
+        statistics on the time taken by the players, and on the calls of the engines if the profiling is enabled (see
+        `profiling.enable`). The engine statistics are those of every game played since the profiling was enabled
+
+        :return: a dict with the number of turns, a dict per player with the number of moves and the total, mean, max
+        and percentile times of its moves in seconds, and the statistics of the profiler (None if disabled)
+        """
+        times = [[], []]
+        for state, t in zip(self.history, self.time_data):
+            times[state.curr_pid - 1].append(t)
+
+        return {
+            "turns": len(self.move_history),
+            "players": [
+                {
+                    "moves": len(t),
+                    "total": float(np.sum(t)) if len(t) > 0 else 0.,
+                    "mean": float(np.mean(t)) if len(t) > 0 else 0.,
+                    "max": float(np.max(t)) if len(t) > 0 else 0.,
+                    **{f"p{q}": float(np.percentile(t, q)) if len(t) > 0 else 0. for q in profiling.PERCENTILES},
+                }
+                for t in times
+            ],
+            "engine": profiling.stats(),
+        }
+
+    def save(self, file: Union[str, Path], save_module: Type['BinarySaveModule']):
+        """
+        saves the initial state, the moves and the timings of the game, see `GameRecordWriter` to save many games
+
+        :param file: the path of the file
+        :param save_module: the binary save module of the game
+        """
+        from GameEngines.GameRecord import GameRecordWriter
+        with GameRecordWriter(file, save_module) as writer:
+            writer.write(self)
+
+    @staticmethod
+    def load(file: Union[str, Path], save_module: Type['BinarySaveModule'], board_class: Type[AbsBoardState], *,
+             history: HistoryPolicy = HistoryPolicy.MOVES, keep: int = 1) -> 'Game':
+        """
+        loads a game saved by `save`. Its states are replayed from the moves when accessed and it has no players
+
+        :param file: the path of the file
+        :param save_module: the binary save module of the game
+        :param board_class: the BoardState class of the game
+        :param history: the policy deciding which states of the game are kept in memory
+        :param keep: the number of states kept with the `HistoryPolicy.LAST_K` policy
+        :return: the game
+        """
+        from GameEngines.GameRecord import GameRecordReader
+        reader = GameRecordReader(file, save_module, board_class, history=history, keep=keep)
+        if len(reader) != 1:
+            raise ValueError(f"{file} holds {len(reader)} games, use a `GameRecordReader` to load them")
+        return reader[0]
+
     def branch(self, i: int) -> 'Game':
         """
         This method creates a new game branching from a point in the game
@@ -75,10 +157,10 @@ class Game:
         :param i: the turn after which the game will be forked
         :return: the forked game
         """
-        i += 1
         new_game = Game(self.board_class, *self.players)
-        new_game.history = self.history[:i]
-        new_game.time_data = self.time_data[:i-1]
-        new_game.winner = self.winner
+        new_game.move_history = self.move_history[:i]
+        new_game.history = self.history.branch(i, new_game.move_history)
+        new_game.time_data = self.time_data[:i]
+        new_game.winner = new_game.history[-1].winner()
 
         return new_game
@@ -0,0 +1,130 @@
+from typing import List, Any, Dict, Iterator, Union, Type, Optional
+from collections.abc import Sequence
+from enum import Enum
+from GameEngines.abstract import AbsBoardState
+
+
+class HistoryPolicy(Enum):
+    FULL = 0    # every state of the game is kept
+    MOVES = 1   # only the initial and current states are kept, the others are rebuilt from the moves
+    LAST_K = 2  # the initial state and the last K states are kept, the others are rebuilt from the moves
+    NONE = 3    # only the current state is kept, the initial state is recreated from the board class if possible
+
+
+class GameHistory(Sequence):
+    """
+    This Class represents the sequence of states of a game. Depending on its policy, only some states are kept in
+    memory and the others are rebuilt lazily by replaying the moves of the game.
+    """
+    def __init__(self, initial: Optional[AbsBoardState], moves: List[Any], policy: HistoryPolicy = HistoryPolicy.FULL,
+                 *, keep: int = 1, board_class: Type[AbsBoardState] = None):
+        """
+        :param initial: the first state of the game. It can only be None if the board class is given
+        :param moves: the list of moves of the game. The list is shared and not copied
+        :param policy: the policy deciding which states are kept
+        :param keep: the number of states kept by the LAST_K policy
+        :param board_class: the class used to recreate the initial state. If given, the initial state is assumed to be
+        the default state of the class
+        """
+        if keep < 1:
+            raise ValueError("At least one state must be kept")
+        if initial is None and board_class is None:
+            raise ValueError("The initial state cannot be recreated without a board class")
+
+        self.policy = policy
+        self.keep = keep
+        self.board_class = board_class
+        self._moves = moves
+        self._states: Dict[int, AbsBoardState] = {} if initial is None else {0: initial}
+
+    def __len__(self) -> int:
+        return len(self._moves) + 1
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[AbsBoardState, List[AbsBoardState]]:
+        if isinstance(i, slice):
+            return list(self._replay(*i.indices(len(self))))
+
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("history index out of range")
+
+        if i in self._states:
+            return self._states[i]
+        return next(self._replay(i, i + 1, 1))
+
+    def __iter__(self) -> Iterator[AbsBoardState]:
+        return self._replay(0, len(self), 1)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"GameHistory({self.policy.name}, {len(self)} states, {len(self._states)} kept)"
+
+    @property
+    def kept(self) -> int:
+        """
+        number of states currently kept in memory
+        """
+        return len(self._states)
+
+    def append(self, state: AbsBoardState):
+        """
+        adds the state following the last move of the game. The move must already be in the move list
+
+        :param state: the new current state
+        """
+        n = len(self._moves)
+        self._states[n] = state
+
+        if self.policy is HistoryPolicy.FULL:
+            return
+
+        keep = self.keep if self.policy is HistoryPolicy.LAST_K else 1
+        if n - keep > 0:
+            self._states.pop(n - keep, None)
+
+        if self.policy is HistoryPolicy.NONE and self.board_class is not None:
+            self._states.pop(0, None)
+
+    def branch(self, i: int, moves: List[Any]) -> 'GameHistory':
+        """
+        creates the history of a game forked after the i-th turn
+
+        :param i: the index of the last state of the new history
+        :param moves: the move list of the new history. It should contain the first i moves
+        :return: the truncated history
+        """
+        new_history = GameHistory.__new__(GameHistory)
+        new_history.policy = self.policy
+        new_history.keep = self.keep
+        new_history.board_class = self.board_class
+        new_history._moves = moves
+        new_history._states = {k: v for k, v in self._states.items() if k <= i}
+
+        # the current state is always kept
+        new_history._states[i] = self[i]
+        return new_history
+
+    def _replay(self, start: int, stop: int, step: int) -> Iterator[AbsBoardState]:
+        """generates the states of the range by replaying the moves from the closest kept state"""
+        indexes = range(start, stop, step)
+        if len(indexes) == 0:
+            return
+        if step < 0:
+            # a reversed range is rebuilt in order then reversed
+            yield from reversed(list(self._replay(indexes[-1], indexes[0] + 1, -step)))
+            return
+
+        base = max((k for k in self._states if k <= start), default=None)
+        state = self._states[base] if base is not None else self.board_class()
+        base = base if base is not None else 0
+
+        for i in range(base, stop):
+            if i > base:
+                state = self._states[i] if i in self._states else state.play(self._moves[i - 1])
+            if i >= start and (i - start) % step == 0:
+                yield state
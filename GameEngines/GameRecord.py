@@ -0,0 +1,161 @@
+from pathlib import Path
+from typing import Union, Type, List, Iterator, Optional
+import struct
+import numpy as np
+
+from GameEngines.abstract import AbsBoardState
+from GameEngines.BinarySaveModule import BinarySaveModule, BinaryHeader, HEADER_SIZE, pack_header, unpack_header
+from GameEngines.Game import Game
+from GameEngines.GameHistory import GameHistory, HistoryPolicy
+
+_MAGIC = b"GEGR"
+VERSION = 2
+# number of moves, winner, if the initial state is saved (it is omitted when it is the default state of the game)
+_GAME = struct.Struct("<IbB")
+_MOVE = np.dtype("<u2")
+_TIME = np.dtype("<f4")
+
+
+class GameRecordWriter:
+    """
+    This Class streams whole games to a binary file: a header, then for each game its initial state (a record of the
+    binary save module, omitted for the default state), the codes of its moves (see `BinarySaveModule.encode_move`) and
+    the time taken by each move. The states of the game are not saved, they are replayed from the moves when they are
+    accessed (see `GameRecordReader`).
+    """
+    def __init__(self, file: Union[str, Path], save_module: Type[BinarySaveModule], *, append: bool = False):
+        """
+        :param file: the path of the file
+        :param save_module: the binary save module of the game, which encodes the initial states
+        :param append: if the games are added after the games of an existing file
+        """
+        if save_module.MOVE_SIZE > np.iinfo(_MOVE).max + 1:
+            raise ValueError(f"The moves of {save_module.GAME} do not fit in the records")
+
+        self.file = Path(file)
+        self.save_module = save_module
+        self.dtype = save_module.record_dtype(cache=False)
+        self.n_games = 0
+
+        if append and self.file.exists():
+            _check_header(self.file, save_module)
+            self._file = open(self.file, "ab")
+        else:
+            self._file = open(self.file, "wb")
+            header = BinaryHeader(VERSION, save_module.GAME, False, self.dtype.itemsize, 0)
+            self._file.write(pack_header(_MAGIC, header))
+
+    def __enter__(self) -> 'GameRecordWriter':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, game: Game):
+        """
+        appends a game to the file
+
+        :param game: the game, over or not
+        """
+        initial = game.history[0]
+        has_initial = initial != game.board_class()
+        self._file.write(_GAME.pack(len(game.move_history), game.winner, has_initial))
+
+        if has_initial:
+            record = np.zeros((), dtype=self.dtype)
+            self.save_module._to_record(initial, record)
+            self._file.write(record.tobytes())
+
+        codes = np.array([self.save_module.encode_move(m) for m in game.move_history], dtype=_MOVE)
+        self._file.write(codes.tobytes())
+        self._file.write(np.array(game.time_data, dtype=_TIME).tobytes())
+        self.n_games += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class GameRecordReader:
+    """
+    This Class reads the games of a file written by a `GameRecordWriter`. The games are indexed when first accessed,
+    and only the initial state and the moves of a game are kept: the moves are decoded without the engine, and the
+    other states are rebuilt on demand by the history of the game, by playing the moves.
+    """
+    def __init__(self, file: Union[str, Path], save_module: Type[BinarySaveModule], board_class: Type[AbsBoardState],
+                 *, history: HistoryPolicy = HistoryPolicy.MOVES, keep: int = 1):
+        """
+        :param file: the path of the file
+        :param save_module: the binary save module of the game
+        :param board_class: the BoardState class of the loaded games
+        :param history: the policy of the history of the loaded games
+        :param keep: the number of states kept with the `HistoryPolicy.LAST_K` policy
+        """
+        self.file = Path(file)
+        self.save_module = save_module
+        self.board_class = board_class
+        self.policy = history
+        self.keep = keep
+        self.dtype = save_module.record_dtype(cache=False)
+        _check_header(self.file, save_module)
+
+        self._offsets: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def __getitem__(self, i: int) -> Game:
+        offsets = self._index()
+        with open(self.file, "rb") as f:
+            f.seek(offsets[i])
+            return self._read_game(f)
+
+    def __iter__(self) -> Iterator[Game]:
+        size = self.file.stat().st_size
+        with open(self.file, "rb") as f:
+            f.seek(HEADER_SIZE)
+            while f.tell() < size:
+                yield self._read_game(f)
+
+    def _index(self) -> List[int]:
+        """returns the offsets of the games, found by skipping over the games of the file"""
+        if self._offsets is None:
+            offsets = []
+            size = self.file.stat().st_size
+            with open(self.file, "rb") as f:
+                offset = HEADER_SIZE
+                while offset < size:
+                    offsets.append(offset)
+                    f.seek(offset)
+                    n_moves, _, has_initial = _GAME.unpack(f.read(_GAME.size))
+                    offset += _GAME.size + has_initial * self.dtype.itemsize
+                    offset += n_moves * (_MOVE.itemsize + _TIME.itemsize)
+            self._offsets = offsets
+        return self._offsets
+
+    def _read_game(self, f) -> Game:
+        n_moves, winner, has_initial = _GAME.unpack(f.read(_GAME.size))
+        initial = None
+        if has_initial:
+            record = np.frombuffer(f.read(self.dtype.itemsize), dtype=self.dtype)[0]
+            initial = self.save_module.from_record(record, self.board_class)
+        codes = np.frombuffer(f.read(n_moves * _MOVE.itemsize), dtype=_MOVE)
+        times = np.frombuffer(f.read(n_moves * _TIME.itemsize), dtype=_TIME)
+
+        game = Game(self.board_class, None, None)
+        game.move_history = [self.save_module.decode_move(c) for c in codes.tolist()]
+        game.history = GameHistory(initial, game.move_history, self.policy, keep=self.keep,
+                                   board_class=self.board_class if initial is None else None)
+        game.time_data = times.tolist()
+        game.winner = winner
+        return game
+
+
+def _check_header(file: Path, save_module: Type[BinarySaveModule]):
+    header = unpack_header(file, _MAGIC)
+    if header.game != save_module.GAME or header.version != VERSION:
+        raise ValueError(f"{file} is not a version {VERSION} game record of {save_module.GAME}")
+    if header.record_size != save_module.record_dtype(cache=False).itemsize:
+        raise ValueError(f"{file} has records of {header.record_size} bytes, which do not match the format")
@@ -1,18 +1,30 @@
-from typing import Tuple, Set, Type, List
+from typing import Tuple, Set, Type, List, Optional
 
 from GameEngines.Quoridor.utilsTypes import MoveType, WallType, Wall, Move, PlayerInfo
+from GameEngines.Quoridor.utilsTypes import ACTION_SIZE, WALL_ACTIONS, PAWN_MOVES, move_to_action, action_to_move
 from GameEngines.Quoridor.repr import _repr
-from GameEngines.Quoridor.PythonEngine.utils import init_board, validate_walls, cut_wall, _Wall, _Jump, _Move, _PlayerInfo
+from GameEngines.Quoridor.PythonEngine.utils import init_board, cut_wall, wall_cuts, _Wall, _Jump, _Move, _PlayerInfo
+from GameEngines.Quoridor.PythonEngine.utils import ZOBRIST_KEYS, Z_SIDE, pawn_key, wall_key, walls_left_key
+from GameEngines.Quoridor.PythonEngine.connectivity import Connectivity
 from GameEngines.Quoridor.SaveModule import QuoridorSave
 from GameEngines import BaseBoardState, AbsSaveModule
-from GameEngines.cache_utils import cache_moves
+from GameEngines.cache_utils import cache_moves, clear_cache
+from GameEngines.symmetry import check_transform
 import numpy as np
 from itertools import chain
 
 
+# index of the pawn moves of the action space by (row, column) displacement, shifted by 2
+_PAWN_TABLE = np.zeros((5, 5), dtype=int)
+_PAWN_TABLE[tuple(np.array(PAWN_MOVES).T + 2)] = np.arange(len(PAWN_MOVES))
+
+
 class BoardState(BaseBoardState):
 
     _DEFAULT_SAVE_MOD = QuoridorSave
+    ACTION_SIZE = ACTION_SIZE
+    # the board is only symmetric by the left/right mirror: the transform 1 mirrors the columns
+    N_SYMMETRIES = 2
     def __init__(self, b_size=9, max_wall=10, *, save_module: Type[AbsSaveModule] = _DEFAULT_SAVE_MOD):
         if b_size % 2 == 0 or b_size < 5:
             raise ValueError("Board size must be odd and at least 5")
@@ -28,6 +40,8 @@ class BoardState(BaseBoardState):
             _PlayerInfo(b_size // 2, max_wall),
             _PlayerInfo(b_size**2 - 1 - b_size // 2, max_wall)
         ]
+        self._connectivity: Optional[Connectivity] = None # built on the first wall check, then updated by `play`
+        self._rehash()
 
     def __deepcopy__(self, memodict={}):
         cp = BoardState.__new__(BoardState)
@@ -38,10 +52,12 @@ class BoardState(BaseBoardState):
 
         cp._turn = self._turn
         cp._curr_pid = self._curr_pid
+        cp._zobrist = self._zobrist
 
         cp._board = self._board.copy()
         cp._walls = self._walls.copy()
         cp._players = self._players.copy()
+        cp._connectivity = self._connectivity
         return cp
 
     def __eq__(self, other: 'BoardState') -> bool:
@@ -52,6 +68,9 @@ class BoardState(BaseBoardState):
             self._curr_pid == other._curr_pid
         )
 
+    def __hash__(self) -> int:
+        return self._zobrist
+
     @property
     def board(self) -> Tuple[Set[Wall], Tuple[PlayerInfo, PlayerInfo]]:
         return (
@@ -63,34 +82,141 @@ class BoardState(BaseBoardState):
         return _repr(self)
 
     def play(self, move: Move) -> 'BoardState':
-        move = self._to_local(move)
+        new_state = self.copy()
+        new_state._apply(self._to_local(move))
+        return new_state
 
+    @clear_cache
+    def push(self, move: Move):
+        local = self._to_local(move)
+        # the raw board is only changed by walls
+        cuts = self._board[wall_cuts(local[1])] if local[0] is MoveType.WALL else None
+
+        self._undo.append((move, self._players[self._curr_pid - 1], cuts, self._connectivity, self._zobrist))
+        self._apply(local)
+
+    @clear_cache
+    def pop(self) -> Move:
+        move, info, cuts, self._connectivity, self._zobrist = self._pop_undo()
+        self._turn -= 1
+        self._curr_pid = (self._curr_pid % 2) + 1
+        self._players[self._curr_pid - 1] = info
+
+        if cuts is not None:
+            wall = self._to_local(move)[1]
+            self._walls.remove(wall)
+            self._board[wall_cuts(wall)] = cuts
+        return move
+
+    def _apply(self, move: _Move):
+        """plays a (local) move in place"""
         old_info: _PlayerInfo = self._players[self._curr_pid - 1]
+        player = self._curr_pid - 1
 
-        new_state = self.copy()
-        new_state._curr_pid = (self._curr_pid % 2) + 1
-        new_state._turn += 1
+        self._curr_pid = (self._curr_pid % 2) + 1
+        self._turn += 1
+        self._zobrist ^= ZOBRIST_KEYS[Z_SIDE]
 
         if move[0] is MoveType.JUMP:
-            new_state._players[self._curr_pid - 1] = _PlayerInfo(move[1][1], old_info.walls)
-            return new_state
-
-        new_state._walls.add(move[1])
-        cut_wall(new_state._board, move[1], inplace=True)
-        new_state._players[self._curr_pid - 1] = _PlayerInfo(old_info.pos, old_info.walls - 1)
-
-        return new_state
+            self._players[player] = _PlayerInfo(move[1][1], old_info.walls)
+            self._zobrist ^= pawn_key(player, old_info.pos) ^ pawn_key(player, move[1][1])
+            if self._connectivity is not None:
+                self._connectivity = self._connectivity.move_pawn(player, move[1][1])
+            return
+
+        self._walls.add(move[1])
+        cut_wall(self._board, move[1], inplace=True)
+        self._players[player] = _PlayerInfo(old_info.pos, old_info.walls - 1)
+        self._zobrist ^= (
+            wall_key(move[1]) ^ walls_left_key(player, old_info.walls) ^ walls_left_key(player, old_info.walls - 1)
+        )
+        if self._connectivity is not None:
+            self._connectivity = self._connectivity.add_wall(move[1])
 
     @cache_moves
     def get_legal_moves(self, *, cache=False) -> Set[Move]:
         moves: Set[Move] = set(self._from_local((MoveType.JUMP, i)) for i in self._get_jumps())
         if self._players[self._curr_pid - 1].walls > 0:
-            walls = self._get_potential_walls()
-            results = validate_walls(self._board, [p.pos for p in self._players], walls, self._walls)
-            moves.update(self._from_local((MoveType.WALL, w)) for w in results)
+            moves.update(self._from_local((MoveType.WALL, w)) for w in self._get_legal_walls())
 
         return moves
 
+    def legal_action_mask(self, out: np.ndarray = None) -> np.ndarray:
+        mask = self._action_mask(out)
+
+        s_pos = self._players[self._curr_pid - 1].pos
+        dest = np.array([j[1] for j in self._get_jumps()], dtype=int)
+        mask[WALL_ACTIONS + _PAWN_TABLE[dest // 9 - s_pos // 9 + 2, dest % 9 - s_pos % 9 + 2]] = True
+
+        if self._players[self._curr_pid - 1].walls > 0:
+            walls = np.array(self._get_legal_walls(), dtype=int).reshape(-1, 2)
+            mask[64 * walls[:, 0] + 8 * (walls[:, 1] // 9) + walls[:, 1] % 9] = True
+
+        return mask
+
+    def move_to_action(self, move: Move) -> int:
+        return move_to_action(move)
+
+    def action_to_move(self, action: int) -> Move:
+        return action_to_move(action, self._players[self._curr_pid - 1].from_local().pos)
+
+    def transform(self, transform: int) -> 'BoardState':
+        check_transform(transform, self.N_SYMMETRIES)
+        new_state = self.copy()
+        if transform == 0:
+            return new_state
+
+        new_state._walls = set(self._mirror_local((MoveType.WALL, w))[1] for w in self._walls)
+        new_state._players = [_PlayerInfo(self._mirror_cell(p.pos), p.walls) for p in self._players]
+        new_state._board = init_board(self.BOARD_SIZE)
+        for w in new_state._walls:
+            cut_wall(new_state._board, w, inplace=True)
+        new_state._connectivity = None
+        new_state._rehash()
+        return new_state
+
+    def transform_move(self, move: Move, transform: int, *, inverse=False) -> Move:
+        # the mirror is its own inverse
+        check_transform(transform, self.N_SYMMETRIES)
+        return self._from_local(self._mirror_local(self._to_local(move))) if transform == 1 else move
+
+    def transform_action(self, action: int, transform: int, *, inverse=False) -> int:
+        check_transform(transform, self.N_SYMMETRIES)
+        if transform == 0:
+            return action
+        if action < WALL_ACTIONS:
+            w_type, slot = divmod(action, 64)
+            return 64 * w_type + slot - slot % 8 + 7 - slot % 8
+        dr, dc = PAWN_MOVES[action - WALL_ACTIONS]
+        return WALL_ACTIONS + PAWN_MOVES.index((dr, -dc))
+
+    def _mirror_cell(self, cell: int) -> int:
+        return cell - cell % self.BOARD_SIZE + self.BOARD_SIZE - 1 - cell % self.BOARD_SIZE
+
+    def _mirror_local(self, move: _Move) -> _Move:
+        """returns a (local) move mirrored left/right. A wall covers two columns, its anchor being the left one"""
+        if move[0] == MoveType.JUMP:
+            return MoveType.JUMP, (self._mirror_cell(move[1][0]), self._mirror_cell(move[1][1]))
+        w_type, cell = move[1]
+        return MoveType.WALL, (w_type, self._mirror_cell(cell) - 1)
+
+    def _rehash(self):
+        key = ZOBRIST_KEYS[Z_SIDE] if self._curr_pid == 2 else 0
+        for p, info in enumerate(self._players):
+            key ^= pawn_key(p, info.pos) ^ walls_left_key(p, info.walls)
+        for w in self._walls:
+            key ^= wall_key(w)
+        self._zobrist = key
+
+    def _get_legal_walls(self) -> List[_Wall]:
+        walls = self._get_potential_walls()
+        if len(self._walls) < 2:  # Cannot block a player with less than 3 walls
+            return walls
+
+        if self._connectivity is None:
+            self._connectivity = Connectivity(self._board, [p.pos for p in self._players])
+        return self._connectivity.legal_walls(walls, self._walls)
+
     def _get_potential_walls(self) -> List[_Wall]:
         # getting potential horizontal walls
         top_down = self._board[1, np.ravel([np.arange(0, 71), np.arange(1, 72)])].reshape(2, -1).T
@@ -0,0 +1,199 @@
+from typing import List, Set, Tuple, Optional, Iterable
+from itertools import chain
+from heapq import heappush, heappop
+import numpy as np
+
+from GameEngines.Quoridor.utilsTypes import WallType
+
+_Edge = Tuple[int, int]
+_Wall = Tuple[WallType, int]
+
+GOALS = [range(72, 81), range(0, 9)]
+_GOAL = 81 # virtual node linked to all the cells of the goal row of a player
+
+
+def wall_edges(wall: _Wall) -> Tuple[_Edge, _Edge]:
+    """returns the two edges between cells cut by a wall"""
+    pos = wall[1]
+    if wall[0] == WallType.H:
+        return (pos, pos + 9), (pos + 1, pos + 10)
+    return (pos, pos + 1), (pos + 9, pos + 10)
+
+
+class Connectivity:
+    """
+    Connectivity information of a Quoridor board used to check the legality of walls without searching the board for
+    each of them. For each player, it keeps a shortest path to its goal row and the bridges of the board, the edges
+    whose cut disconnects the cells on one side from the goal row.
+
+    The object is never modified: `move_pawn` and `add_wall` return the updated connectivity, so states can share it.
+    """
+    def __init__(self, board: np.ndarray, positions: List[int]):
+        """
+        :param board: the raw board of the python engine
+        :param positions: the (local) positions of both players
+        """
+        self._adj: List[Set[int]] = [set(n for n in cell if n != -1) for cell in board.T.tolist()]
+        self._bridges: List[Set[_Edge]] = [_find_bridges(self._adj, GOALS[p]) for p in range(2)]
+        self._paths: List[List[int]] = [_shortest_path(self._adj, positions[p], GOALS[p]) for p in range(2)]
+        self._path_edges: List[Set[_Edge]] = [_path_edges(path) for path in self._paths]
+
+    def move_pawn(self, player: int, pos: int) -> 'Connectivity':
+        """
+        :param player: the index of the player (0 or 1)
+        :param pos: the new (local) position of its pawn
+        :return: the connectivity after the move of a pawn
+        """
+        new = self._copy()
+        path = self._paths[player]
+
+        # moving along the shortest path keeps the rest of it
+        if pos in path:
+            new._paths[player] = path[path.index(pos):]
+        else:
+            new._paths[player] = _shortest_path(self._adj, pos, GOALS[player])
+        new._path_edges[player] = _path_edges(new._paths[player])
+        return new
+
+    def add_wall(self, wall: _Wall) -> 'Connectivity':
+        """
+        :param wall: the (local) wall placed on the board
+        :return: the connectivity after the placement of a wall
+        """
+        new = self._copy()
+        new._adj = self._adj.copy()
+        for a, b in wall_edges(wall):
+            new._adj[a] = new._adj[a] - {b}
+            new._adj[b] = new._adj[b] - {a}
+
+        new._bridges = [_find_bridges(new._adj, GOALS[p]) for p in range(2)]
+        for p in range(2):
+            # the paths only change if the wall cuts them
+            if any(e in self._path_edges[p] for e in wall_edges(wall)):
+                new._paths[p] = _shortest_path(new._adj, self._paths[p][0], GOALS[p])
+                new._path_edges[p] = _path_edges(new._paths[p])
+        return new
+
+    def legal_walls(self, walls: Iterable[_Wall], placed: Set[_Wall]) -> List[_Wall]:
+        """
+        filters out the walls blocking a player
+
+        :param walls: the (local) walls to check, which must not overlap the placed walls
+        :param placed: the walls already on the board
+        :return: the walls leaving a path to both players
+        """
+        anchors = [(w[1] // 9, w[1] % 9) for w in placed]
+        return [w for w in walls if self._is_legal(w, anchors)]
+
+    def _is_legal(self, wall: _Wall, anchors: List[Tuple[int, int]]) -> bool:
+        edges = wall_edges(wall)
+        touches: Optional[bool] = None
+
+        for p in range(2):
+            cut = [e for e in edges if e in self._path_edges[p]]
+            # the wall does not cut the path of the player
+            if len(cut) == 0:
+                continue
+            # the wall cuts an edge all the paths of the player go through
+            if any(e in self._bridges[p] for e in cut):
+                return False
+
+            # a wall touching no other wall cannot close a region, as it can only touch one side of the board
+            if touches is None:
+                r, c = wall[1] // 9, wall[1] % 9
+                touches = any(max(abs(r - i), abs(c - j)) <= 2 for i, j in anchors)
+            if not touches:
+                return True
+
+            if not _has_detour(self._adj, self._paths[p], GOALS[p], edges):
+                return False
+        return True
+
+    def _copy(self) -> 'Connectivity':
+        new = Connectivity.__new__(Connectivity)
+        new._adj = self._adj
+        new._bridges = self._bridges
+        new._paths = self._paths.copy()
+        new._path_edges = self._path_edges.copy()
+        return new
+
+
+def _edge(a: int, b: int) -> _Edge:
+    return (a, b) if a < b else (b, a)
+
+def _path_edges(path: List[int]) -> Set[_Edge]:
+    return set(_edge(a, b) for a, b in zip(path, path[1:]))
+
+def _shortest_path(adj: List[Set[int]], ini_pos: int, goal: range) -> List[int]:
+    """breadth first search of a shortest path from a cell to the goal row, given from the cell"""
+    parents = {ini_pos: ini_pos}
+    fifo = [ini_pos]
+    for pos in fifo:
+        if pos in goal:
+            path = [pos]
+            while path[-1] != ini_pos:
+                path.append(parents[path[-1]])
+            return path[::-1]
+
+        for n in adj[pos]:
+            if n not in parents:
+                parents[n] = pos
+                fifo.append(n)
+    return []
+
+def _has_detour(adj: List[Set[int]], path: List[int], goal: range, cut: Tuple[_Edge, _Edge]) -> bool:
+    """
+    checks that a path to the goal row still exists once some edges of the given path are cut. The cells before the
+    first cut edge and after the last one being unaffected, it is a best first search between them, which usually
+    stays around the wall
+    """
+    cut_at = [i for i, (a, b) in enumerate(zip(path, path[1:])) if _edge(a, b) in cut]
+    start, targets = path[cut_at[0]], set(path[cut_at[-1] + 1:])
+    t_row, t_col = path[cut_at[-1] + 1] // 9, path[cut_at[-1] + 1] % 9
+
+    heap = [(0, start)]
+    visited = {start}
+    while len(heap) > 0:
+        _, pos = heappop(heap)
+        if pos in targets or pos in goal:
+            return True
+
+        for n in adj[pos]:
+            if n not in visited and _edge(pos, n) not in cut:
+                visited.add(n)
+                heappush(heap, (abs(n // 9 - t_row) + abs(n % 9 - t_col), n))
+    return False
+
+def _find_bridges(adj: List[Set[int]], goal: range) -> Set[_Edge]:
+    """
+    Tarjan's bridge finding algorithm on the cells connected to the goal row, the goal row being linked to a virtual
+    node. The edges of the virtual node are never cut by a wall, so they are left out of the result.
+    """
+    def neighbours(node: int) -> Iterable[int]:
+        if node == _GOAL:
+            return goal
+        return chain(adj[node], (_GOAL,)) if node in goal else adj[node]
+
+    disc = {_GOAL: 0}
+    low = {_GOAL: 0}
+    bridges = set()
+
+    stack = [(_GOAL, None, iter(neighbours(_GOAL)))]
+    while len(stack) > 0:
+        node, parent, children = stack[-1]
+        for n in children:
+            if n == parent:
+                continue
+            if n in disc:
+                low[node] = min(low[node], disc[n])
+            else:
+                disc[n] = low[n] = len(disc)
+                stack.append((n, node, iter(neighbours(n))))
+                break
+        else:
+            stack.pop()
+            if parent is not None:
+                low[parent] = min(low[parent], low[node])
+                if low[node] > disc[parent] and parent != _GOAL:
+                    bridges.add(_edge(parent, node))
+    return bridges
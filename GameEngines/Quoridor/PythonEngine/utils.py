@@ -5,6 +5,7 @@ from functools import reduce
 
 from GameEngines.Quoridor.utilsTypes import WallType, MoveType, PlayerInfo
 from GameEngines.Quoridor.PythonEngine.pathfinding import dfs
+from GameEngines.zobrist import zobrist_keys
 
 
 _Jump = Tuple[int, int]
@@ -19,6 +20,23 @@ class _PlayerInfo(NamedTuple):
         return PlayerInfo((self.pos// 9, self.pos % 9), self.walls)
 
 
+# Zobrist keys: one key per player and cell, per wall (2 types x 64 anchors), per player and walls left (more than 31
+# walls share the last key), then the second player to move
+ZOBRIST_KEYS = zobrist_keys(2 * 81 + 2 * 64 + 2 * 32 + 1, seed=4)
+Z_WALLS = 2 * 81
+Z_WALLS_LEFT = Z_WALLS + 2 * 64
+Z_SIDE = Z_WALLS_LEFT + 2 * 32
+
+def pawn_key(player: int, pos: int) -> int:
+    return ZOBRIST_KEYS[81 * player + pos]
+
+def wall_key(wall: _Wall) -> int:
+    return ZOBRIST_KEYS[Z_WALLS + 64 * int(wall[0]) + 8 * (wall[1] // 9) + wall[1] % 9]
+
+def walls_left_key(player: int, walls: int) -> int:
+    return ZOBRIST_KEYS[Z_WALLS_LEFT + 32 * player + min(walls, 31)]
+
+
 def init_board(size: int) -> np.ndarray:
     board = np.zeros((4, size**2), int)
     board[0, :] = np.arange(-size, size**2 - size)  # Top
@@ -33,15 +51,18 @@ def init_board(size: int) -> np.ndarray:
     return board
 
 
-def cut_wall(board: np.ndarray, wall: _Wall, *, inplace=False) -> np.ndarray:
-    # creates a new board if inplace is set to false
-    new_board = board if inplace else board.copy()
-
-    new_board[(
+def wall_cuts(wall: _Wall) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """returns the index of the connections of the raw board cut by a wall"""
+    return (
         (1, 1, 0, 0) if wall[0] is WallType.H else (3, 2, 3, 2), # vertical or horizontal connection cut
         (wall[1], wall[1] + 1, wall[1] + 9, wall[1] + 10)
-    )] = -1
+    )
+
 
+def cut_wall(board: np.ndarray, wall: _Wall, *, inplace=False) -> np.ndarray:
+    # creates a new board if inplace is set to false
+    new_board = board if inplace else board.copy()
+    new_board[wall_cuts(wall)] = -1
     return new_board
 
 def validate_walls(board, poses, new_walls: List[_Wall], old_walls: Set[_Wall]) -> List[_Wall]:
@@ -1,19 +1,23 @@
 from pathlib import Path
-from typing import Set, Tuple, Dict, Any, Union
+from typing import Optional, Set, Tuple, Dict, Any, Union, List
 from numpy import ndarray
 from GameEngines.abstract import AbsBoardState
-from GameEngines.Quoridor.utilsTypes import Move
+from GameEngines.Quoridor.utilsTypes import Move, Wall, PlayerInfo
 
 class BoardState(AbsBoardState):
     """
     This class is the implementation of BoardState for the `Quoridor` game.
     Rules for the game can be found online
     """
+    ACTION_SIZE: int
+    N_SYMMETRIES: int
 
-    def __init__(self): ...
+    def __init__(self, b_size: int = 9, max_wall: int = 10): ...
 
     def __eq__(self, other: 'BoardState') -> bool: ...
 
+    def __hash__(self) -> int: ...
+
     @property
     def curr_pid(self) -> int: ...
 
@@ -21,7 +25,10 @@ class BoardState(AbsBoardState):
     def turn(self) -> int: ...
 
     @property
-    def board(self) -> ndarray: ... # todo
+    def board(self) -> Tuple[Set[Wall], Tuple[PlayerInfo, PlayerInfo]]: ...
+
+    @property
+    def zobrist(self) -> int: ...
 
     def __repr__(self) -> str: ...
 
@@ -29,12 +36,38 @@ class BoardState(AbsBoardState):
 
     def play(self, move: Move,) -> 'BoardState': ...
 
+    def push(self, move: Move): ...
+
+    def pop(self) -> Move: ...
+
     def get_legal_moves(self, *, cache=False) -> Set[Move]: ...
 
+    def legal_action_mask(self, out: Optional[ndarray] = None) -> ndarray: ...
+
+    def move_to_action(self, move: Move) -> int: ...
+
+    def action_to_move(self, action: int) -> Move: ...
+
     def score(self) -> Tuple[int, int]: ...
 
     def winner(self) -> int: ...
 
+    def random_playout(self, seed: Optional[int] = None, max_plies: Optional[int] = None) -> Tuple[int, Tuple[int, int], int]: ...
+
+    def rollout(self, n_games: int, seed: Optional[int] = None, max_plies: Optional[int] = None) -> Tuple[ndarray, ndarray, ndarray]: ...
+
+    def perft(self, depth: int) -> int: ...
+
+    def transform(self, transform: int) -> 'BoardState': ...
+
+    def symmetries(self) -> List['BoardState']: ...
+
+    def canonical(self) -> Tuple['BoardState', int]: ...
+
+    def transform_move(self, move: Move, transform: int, *, inverse: bool = False) -> Move: ...
+
+    def transform_action(self, action: int, transform: int, *, inverse: bool = False) -> int: ...
+
     @staticmethod
     def load(file: Union[str, Path]) -> 'BoardState': ...
 
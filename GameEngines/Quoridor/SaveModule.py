@@ -1,10 +1,13 @@
 from pathlib import Path
 import json
+import numpy as np
 from typing import Union, Type, Dict, Any
 
 from GameEngines import cache_utils
 from GameEngines.abstract import AbsBoardState, AbsSaveModule
-from GameEngines.Quoridor.utilsTypes import PlayerInfo, to_move, WallType
+from GameEngines.BinarySaveModule import BinarySaveModule
+from GameEngines.Quoridor.utilsTypes import PlayerInfo, to_move, WallType, ACTION_SIZE, Move, MOVE_CODES
+from GameEngines.Quoridor.utilsTypes import move_to_code, code_to_move
 from GameEngines.Quoridor.PythonEngine.utils import cut_wall, init_board, _PlayerInfo
 
 
@@ -53,5 +56,61 @@ class QuoridorSave(AbsSaveModule):
         state._players = data["players"]
         state._turn = data["turn"]
         state._curr_pid = data["curr_pid"]
+        state._rehash()
 
-        return state
\ No newline at end of file
+        return state
+
+
+class QuoridorBinarySave(BinarySaveModule):
+    """ Binary Record Template
+    {
+        walls: uint64[2],       // The walls of each type as bits of their position 8 * r + c
+        players: uint8[2, 2],   // the player infos (position & walls left)
+        turn: uint32,           // The current turn
+        curr_pid: uint8,        // The active player
+        has_cache: uint8,       // If the moves are cached (only when the file keeps the moves cache)
+        move_cache: uint8[18]   // The cached moves as bits of the action space
+    }
+    """
+    GAME = "Quoridor"
+    FIELDS = [("walls", "<u8", (2,)), ("players", "u1", (2, 2)), ("turn", "<u4"), ("curr_pid", "u1")]
+    ACTION_SIZE = ACTION_SIZE
+    MOVE_SIZE = MOVE_CODES
+    JSON_MODULE = QuoridorSave
+
+    @classmethod
+    def encode_move(cls, move: Move) -> int:
+        # the pawn actions are relative to the active pawn, the codes keep both cells of the jump
+        return move_to_code(move)
+
+    @classmethod
+    def decode_move(cls, code: int) -> Move:
+        return code_to_move(code)
+
+    @classmethod
+    def _to_record(cls, state: AbsBoardState, record: np.void):
+        walls = [0, 0]
+        for w_type, pos in state._walls:
+            walls[int(w_type)] |= 1 << (8 * (pos // 9) + pos % 9)
+        record["walls"] = walls
+        record["players"] = [tuple(p) for p in state._players]
+        record["turn"] = state.turn
+        record["curr_pid"] = state.curr_pid
+
+    @classmethod
+    def _from_record(cls, record: np.void) -> Dict[str, Any]:
+        walls = set(
+            (WallType(w_type), 9 * (s // 8) + s % 8)
+            for w_type, mask in enumerate(record["walls"].tolist()) for s in range(64) if mask >> s & 1
+        )
+        board = init_board(9)
+        for w in walls:
+            cut_wall(board, w, inplace=True)
+
+        return {
+            "walls": walls,
+            "board": board,
+            "players": [_PlayerInfo(*p) for p in record["players"].tolist()],
+            "turn": int(record["turn"]),
+            "curr_pid": int(record["curr_pid"])
+        }
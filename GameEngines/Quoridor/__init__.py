@@ -2,6 +2,7 @@ import GameEngines
 from GameEngines.Quoridor import *
 
 from .utilsTypes import Move, MoveType, Jump, Wall, WallType, Coords, PlayerInfo
+from .utilsTypes import ACTION_SIZE, move_to_action, action_to_move
 
 try:
     __doc__ = GameEngines.Quoridor.__doc__
@@ -27,4 +27,50 @@ def to_move(move: Any) -> Move:
     elif move[0] == MoveType.JUMP:
         return MoveType.JUMP, ((move[1][0][0], move[1][0][1]), (move[1][1][0], move[1][1][1]))
     else:
-        raise ValueError(f"{move} is cannot be converted to Move")
\ No newline at end of file
+        raise ValueError(f"{move} is cannot be converted to Move")
+
+
+# Action space: 2 wall types x 64 wall anchors, then the pawn moves relative to the active pawn
+# The wall anchored on the cell (r, c) has the index 64 * WallType + 8 * r + c
+PAWN_MOVES = [(-1, 0), (1, 0), (0, -1), (0, 1), (-2, 0), (2, 0), (0, -2), (0, 2), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+WALL_ACTIONS = 2 * 64
+ACTION_SIZE = WALL_ACTIONS + len(PAWN_MOVES)
+_PAWN_INDEX = {d: i for i, d in enumerate(PAWN_MOVES)}
+
+def move_to_action(move: Move) -> int:
+    if move[0] == MoveType.WALL:
+        w_type, (r, c) = move[1]
+        return 64 * int(w_type) + 8 * r + c
+
+    (r, c), (k, l) = move[1]
+    return WALL_ACTIONS + _PAWN_INDEX[(k - r, l - c)]
+
+def action_to_move(action: int, pos: Coords) -> Move:
+    """pawn moves being relative, the position of the active pawn is required to decode them"""
+    action = int(action)
+    if action < WALL_ACTIONS:
+        w_type, cell = divmod(action, 64)
+        return MoveType.WALL, (WallType(w_type), divmod(cell, 8))
+
+    dr, dc = PAWN_MOVES[action - WALL_ACTIONS]
+    return MoveType.JUMP, ((pos[0], pos[1]), (pos[0] + dr, pos[1] + dc))
+
+
+# Move codes: the walls as in the action space, then the pawn moves as 81 * source cell + destination cell. Unlike the
+# actions, the codes do not depend on the position, so stored moves are decoded without playing them
+MOVE_CODES = WALL_ACTIONS + 81 * 81
+
+def move_to_code(move: Move) -> int:
+    if move[0] == MoveType.WALL:
+        return move_to_action(move)
+
+    (r, c), (k, l) = move[1]
+    return WALL_ACTIONS + 81 * (9 * r + c) + 9 * k + l
+
+def code_to_move(code: int) -> Move:
+    code = int(code)
+    if code < WALL_ACTIONS:
+        return action_to_move(code, (0, 0))
+
+    source, dest = divmod(code - WALL_ACTIONS, 81)
+    return MoveType.JUMP, (divmod(source, 9), divmod(dest, 9))
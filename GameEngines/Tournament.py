@@ -0,0 +1,184 @@
+from typing import Type, List, Any, Callable, Dict, NamedTuple, Sequence, Optional
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+import random
+import os
+
+import numpy as np
+
+from GameEngines.abstract import AbsBoardState, AbsPlayer
+from GameEngines.Game import Game
+
+PlayerFactory = Callable[[], AbsPlayer]
+
+
+class GameResult(NamedTuple):
+    index: int               # index of the game in the tournament
+    seed: int                # seed used for the game
+    swapped: bool            # if the second factory played as the first player
+    winner: int              # winner of the game as returned by `AbsBoardState.winner`
+    moves: int               # number of moves played
+    time_data: List[float]   # time taken by the players for each move
+    pids: List[int]          # pid of the player that played each move
+
+    @property
+    def winner_index(self) -> Optional[int]:
+        """
+        index of the factory (0 or 1) that won the game. Ties return None
+        """
+        if self.winner <= 0:
+            return None
+        return (self.winner - 1) ^ int(self.swapped)
+
+
+class TournamentResult:
+    """
+    This Class aggregates the results of all the games played in a tournament
+    """
+    def __init__(self, games: List[GameResult]):
+        self.games = sorted(games, key=lambda g: g.index)
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def __repr__(self) -> str:
+        return f"TournamentResult({self.summary()})"
+
+    @property
+    def winner_counts(self) -> Dict[int, int]:
+        """
+        number of games won by each pid. Ties are counted under -1
+        """
+        return dict(Counter(g.winner for g in self.games))
+
+    @property
+    def wins(self) -> List[int]:
+        """
+        number of games won by each factory, independently of the side it played
+        """
+        counts = Counter(g.winner_index for g in self.games)
+        return [counts[0], counts[1]]
+
+    @property
+    def ties(self) -> int:
+        return sum(1 for g in self.games if g.winner == -1)
+
+    @property
+    def move_counts(self) -> List[int]:
+        return [g.moves for g in self.games]
+
+    def time_stats(self) -> List[Dict[str, float]]:
+        """
+        statistics on the time taken by each factory to play a move
+
+        :return: a list (one per factory) of dict containing the number of moves, the total, mean and max time
+        """
+        times = [[], []]
+        for g in self.games:
+            for pid, t in zip(g.pids, g.time_data):
+                times[(pid - 1) ^ int(g.swapped)].append(t)
+
+        return [
+            {
+                "moves": len(t),
+                "total": float(np.sum(t)) if len(t) > 0 else 0.,
+                "mean": float(np.mean(t)) if len(t) > 0 else 0.,
+                "max": float(np.max(t)) if len(t) > 0 else 0.,
+            }
+            for t in times
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        moves = self.move_counts
+        return {
+            "games": len(self.games),
+            "winner_counts": self.winner_counts,
+            "wins": self.wins,
+            "ties": self.ties,
+            "mean_moves": float(np.mean(moves)) if len(moves) > 0 else 0.,
+            "time": self.time_stats(),
+        }
+
+
+class Tournament:
+    """
+    This Class runs many games between two player factories, sharding them across a process pool.
+
+    Every game gets its own seed derived from the tournament seed and the game index. The python `random` module and
+    the numpy global generator are seeded with it before the players are created, so a tournament can be reproduced
+    independently of the number of workers used.
+
+    The board class and the factories are sent to the workers, so they must be picklable (module level classes or
+    functions, not lambdas).
+    """
+    def __init__(self, board: Type[AbsBoardState], p0: PlayerFactory, p1: PlayerFactory, *,
+                 seed: int = 0, swap_sides: bool = False):
+        """
+        :param board: the BoardState class of the game to be played
+        :param p0: factory creating the first player
+        :param p1: factory creating the second player
+        :param seed: the base seed of the tournament
+        :param swap_sides: if the factories should alternate sides on every other game
+        """
+        self.board_class = board
+        self.factories = (p0, p1)
+        self.seed = seed
+        self.swap_sides = swap_sides
+
+    def game_seed(self, i: int) -> int:
+        """
+        returns the seed of the i-th game of the tournament
+        """
+        return int(np.random.SeedSequence(self.seed, spawn_key=(i,)).generate_state(1)[0])
+
+    def run(self, n_games: int, n_workers: int = None, chunk_size: int = None) -> TournamentResult:
+        """
+        plays n games and returns the aggregated results
+
+        :param n_games: the number of games to be played
+        :param n_workers: the number of processes used. By default, all the cores are used. 1 plays the games in the
+        current process
+        :param chunk_size: the number of games sent to a worker at once
+        :return: the results of the tournament
+        """
+        n_workers = n_workers if n_workers is not None else (os.cpu_count() or 1)
+        games = [(i, self.game_seed(i), self.swap_sides and i % 2 == 1) for i in range(n_games)]
+
+        if n_workers <= 1:
+            return TournamentResult(_play_games(self.board_class, self.factories, games))
+
+        if chunk_size is None:
+            # a few chunks per worker to balance games of different lengths
+            chunk_size = max(1, n_games // (4 * n_workers))
+        chunks = [games[i: i + chunk_size] for i in range(0, n_games, chunk_size)]
+
+        results = []
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [pool.submit(_play_games, self.board_class, self.factories, c) for c in chunks]
+            for f in futures:
+                results.extend(f.result())
+
+        return TournamentResult(results)
+
+
+def _play_games(board: Type[AbsBoardState], factories: Sequence[PlayerFactory], games: List[tuple]) -> List[GameResult]:
+    """worker function playing a shard of games of a tournament"""
+    results = []
+    for i, seed, swapped in games:
+        random.seed(seed)
+        np.random.seed(seed % 2**32)
+
+        p0, p1 = factories[0](), factories[1]()
+        game = Game(board, *((p1, p0) if swapped else (p0, p1)))
+        game.play_full()
+
+        results.append(GameResult(
+            index=i,
+            seed=seed,
+            swapped=swapped,
+            winner=int(game.winner),
+            moves=len(game.move_history),
+            time_data=game.time_data,
+            pids=[int(s.curr_pid) for s in game.history[:-1]],
+        ))
+    return results
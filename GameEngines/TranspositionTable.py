@@ -0,0 +1,146 @@
+from typing import Any, Optional, Union, NamedTuple, List, Dict
+from enum import Enum
+from GameEngines.abstract import AbsBoardState
+
+
+class ReplacementPolicy(Enum):
+    ALWAYS = 0  # a new entry always replaces the entry of its slot
+    DEPTH = 1   # a new entry only replaces another position searched deeper if that one is from an older search
+
+
+class ScoreBound(Enum):
+    EXACT = 0   # the value is the exact value of the position
+    LOWER = 1   # the search was cut off, the value of the position is at least the stored value
+    UPPER = 2   # no move reached alpha, the value of the position is at most the stored value
+
+
+class TTEntry(NamedTuple):
+    key: int                # the zobrist key of the position, to tell apart the positions sharing a slot
+    value: Any
+    depth: int = 0
+    bound: ScoreBound = ScoreBound.EXACT
+    move: Any = None        # the best move found for the position
+    generation: int = 0     # the search that stored the entry, see `TranspositionTable.new_search`
+
+
+StateOrKey = Union[AbsBoardState, int]
+class TranspositionTable:
+    """
+    This Class is a fixed size table of search results indexed by the zobrist key of the states, so that search players
+    can recognize positions reached by different move orders and share their results. Each key maps to a single slot,
+    storing an entry can therefore evict another position according to the replacement policy.
+    """
+    def __init__(self, size: int = 2 ** 20, policy: ReplacementPolicy = ReplacementPolicy.DEPTH):
+        """
+        :param size: the number of slots of the table, i.e. the maximum number of entries
+        :param policy: the policy deciding if an entry replaces the entry of another position in its slot
+        """
+        if size < 1:
+            raise ValueError("The table must have at least one slot")
+
+        self.size = size
+        self.policy = policy
+        self._slots: List[Optional[TTEntry]] = [None] * size
+        self._used = 0
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.replacements = 0   # entries evicted by an entry of another position
+        self.rejections = 0     # entries not stored because of the replacement policy
+
+    def __len__(self) -> int:
+        return self._used
+
+    def __contains__(self, state: StateOrKey) -> bool:
+        key = self._key(state)
+        entry = self._slots[key % self.size]
+        return entry is not None and entry.key == key
+
+    def get(self, state: StateOrKey) -> Optional[TTEntry]:
+        """
+        looks up the entry of a position and counts the hit or the miss
+
+        :param state: the state or its zobrist key
+        :return: the entry of the position, None if the position is not in the table
+        """
+        key = self._key(state)
+        entry = self._slots[key % self.size]
+        if entry is None or entry.key != key:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def store(self, state: StateOrKey, value: Any, depth: int = 0, bound: ScoreBound = ScoreBound.EXACT,
+              move: Any = None) -> bool:
+        """
+        stores the result of a search of a position. An entry of the same position is always replaced
+
+        :param state: the state or its zobrist key
+        :param value: the value of the position
+        :param depth: the depth of the search that gave the value
+        :param bound: whether the value is exact or a bound of the value of the position
+        :param move: the best move found for the position
+        :return: if the entry was stored
+        """
+        key = self._key(state)
+        slot = key % self.size
+        old = self._slots[slot]
+
+        if old is not None and old.key != key:
+            if (
+                self.policy == ReplacementPolicy.DEPTH and
+                old.generation == self._generation and old.depth > depth
+            ):
+                self.rejections += 1
+                return False
+            self.replacements += 1
+
+        if old is None:
+            self._used += 1
+        self._slots[slot] = TTEntry(key, value, depth, bound, move, self._generation)
+        self.stores += 1
+        return True
+
+    def new_search(self):
+        """
+        starts a new search: the entries of the previous searches can be replaced by any entry
+        """
+        self._generation += 1
+
+    def clear(self):
+        """
+        removes all the entries of the table. The statistics are kept, see `reset_stats`
+        """
+        self._slots = [None] * self.size
+        self._used = 0
+
+    def reset_stats(self):
+        self.hits = self.misses = self.stores = self.replacements = self.rejections = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        :return: the usage statistics of the table
+        """
+        return {
+            "size": self.size,
+            "used": self._used,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "stores": self.stores,
+            "replacements": self.replacements,
+            "rejections": self.rejections,
+        }
+
+    @staticmethod
+    def _key(state: StateOrKey) -> int:
+        return state if isinstance(state, int) else state.zobrist
@@ -1,84 +1,165 @@
-from typing import List, Tuple, Set, Type
+from typing import List, Tuple, Set, Type, Optional
 from GameEngines import BaseBoardState, AbsSaveModule
-from GameEngines.UltiTTT import Move
+from GameEngines.UltiTTT.utilsTypes import Move, ACTION_SIZE, move_to_action, action_to_move
+from GameEngines.UltiTTT.utilsTypes import ZOBRIST_KEYS, Z_SIDE, Z_ACTIVE, cell_key
 from GameEngines.UltiTTT.repr import _repr
 from GameEngines.UltiTTT.SaveModule import UltiTTTSave
-from GameEngines.cache_utils import cache_moves
+from GameEngines.cache_utils import cache_moves, clear_cache
+from GameEngines.symmetry import D4, check_transform, inverse as inverse_of, transform_coords
+import GameEngines.UltiTTT.PythonEngine.utils as utils
 import numpy as np
 
 
 class BoardState(BaseBoardState):
+    """
+    This class is the Python implementation of BoardState for the `UltiTTT` game.
+
+    The cells of each player are kept as masks (see `utils`), as well as the sub-boards won by each player and the tied
+    ones, so that the wins are found in a lookup table and the legal moves with a few bitwise operations. The `board`
+    array is only built when accessed.
+    """
 
     _DEFAULT_SAVE_MOD = UltiTTTSave
+    ACTION_SIZE = ACTION_SIZE
+    N_SYMMETRIES = D4
     def __init__(self, *, save_module: Type[AbsSaveModule] = _DEFAULT_SAVE_MOD):
         super().__init__(save_module=save_module)
 
-        self._board = np.zeros((9, 9), dtype=np.int8)
-        self._win_state = [0] * 9 # The top level tic-tac-toe game
+        self._p1, self._p2 = 0, 0 # The cells of each player
+        self._won1, self._won2, self._tied = 0, 0, 0 # The top level tic-tac-toe game
         self._active_cell = -1 # The active cell in the top level game
-
-    def __deepcopy__(self, memodict={}):
-        cp = BoardState.__new__(BoardState)
-        BaseBoardState.__init__(cp, save_module=self._save_mod)
-        cp._turn = self._turn
-        cp._curr_pid = self._curr_pid
-
-        cp._active_cell = self._active_cell
-
-        cp._board = self._board.copy()
-        cp._win_state = self._win_state.copy()
-        return cp
+        self._view: Optional[np.ndarray] = None # The board array, built on access
+        self._rehash()
 
     def __eq__(self, other: 'BoardState') -> bool:
         return (
-            np.array_equal(self._board, other._board) and
-            self._win_state == other._win_state and
+            self._p1 == other._p1 and
+            self._p2 == other._p2 and
+            self._won1 == other._won1 and
+            self._won2 == other._won2 and
+            self._tied == other._tied and
             self._turn == other._turn and
             self._active_cell == other._active_cell and
             self._curr_pid == other._curr_pid
         )
 
+    def __hash__(self) -> int:
+        return self._zobrist
+
     @property
     def board(self) -> np.ndarray:
-        return self._board
+        """the (9, 9) board, a row per sub-board. The array is read only"""
+        if self._view is None:
+            p1, p2 = utils.unpack(self._p1, ACTION_SIZE), utils.unpack(self._p2, ACTION_SIZE)
+            self._view = (p1.astype(np.int8) + 2 * p2.astype(np.int8)).reshape((9, 9))
+            self._view.setflags(write=False)
+        return self._view
+
+    @property
+    def _board(self) -> np.ndarray:
+        return self.board
+
+    @_board.setter
+    def _board(self, board: Optional[np.ndarray]):
+        # `BaseBoardState.__init__` sets the board to None before the masks exist
+        if board is not None:
+            board = np.asarray(board)
+            self._p1, self._p2 = utils.pack(board == 1), utils.pack(board == 2)
+            self._view = None
+
+    @property
+    def _win_state(self) -> List[int]:
+        """the state of the cells of the meta-board: the winner of the sub-board, -1 for a tie and 0 if not over"""
+        return [
+            1 if self._won1 >> i & 1 else 2 if self._won2 >> i & 1 else -1 if self._tied >> i & 1 else 0
+            for i in range(9)
+        ]
+
+    @_win_state.setter
+    def _win_state(self, win_state: List[int]):
+        self._won1, self._won2, self._tied = (
+            sum(1 << i for i, w in enumerate(win_state) if w == value) for value in (1, 2, -1)
+        )
 
     def __repr__(self):
         return _repr(self)
 
+    def copy(self, *, cache=False) -> 'BoardState':
+        new_state = type(self).__new__(type(self))
+        new_state.__dict__.update(self.__dict__)
+        new_state._undo = []
+        new_state._move_cache = set(self._move_cache) if cache and self._move_cache is not None else None
+        return new_state
+
     def play(self, move: Move) -> 'BoardState':
         new_board = self.copy()
-        new_board._turn += 1
-
-        tile = 3 * move[0][0] + move[0][1]
-        sub_tile = 3 * move[1][0] + move[1][1]
+        new_board._apply(move)
+        return new_board
 
-        new_board._board[tile, sub_tile] = self._curr_pid
+    @clear_cache
+    def push(self, move: Move):
+        self._undo.append((
+            move, self._p1, self._p2, self._won1, self._won2, self._tied, self._active_cell, self._zobrist
+        ))
+        self._apply(move)
+
+    @clear_cache
+    def pop(self) -> Move:
+        move, self._p1, self._p2, self._won1, self._won2, self._tied, self._active_cell, self._zobrist = \
+            self._pop_undo()
+        self._view = None
+
+        self._turn -= 1
+        self._curr_pid = (self._curr_pid % 2) + 1
+        return move
+
+    def _apply(self, move: Move):
+        """plays a move in place"""
+        self._turn += 1
+        self._view = None
+
+        action = move_to_action(move)
+        tile, sub_tile = divmod(action, 9)
+        if self._curr_pid == 1:
+            self._p1 |= 1 << action
+        else:
+            self._p2 |= 1 << action
+
+        p1, p2 = self._p1 >> 9 * tile & utils.FULL, self._p2 >> 9 * tile & utils.FULL
+        winner = utils.winner_of(p1, p2, p1 | p2)
+        if winner == 1:
+            self._won1 |= 1 << tile
+        elif winner == 2:
+            self._won2 |= 1 << tile
+        elif winner == -1:
+            self._tied |= 1 << tile
+
+        old_active = self._active_cell
+        self._active_cell = -1 if self._decided() >> sub_tile & 1 else sub_tile
+
+        self._zobrist ^= (
+            cell_key(action, self._curr_pid) ^ ZOBRIST_KEYS[Z_SIDE] ^
+            self._active_key(old_active) ^ self._active_key(self._active_cell)
+        )
+        self._curr_pid = (self._curr_pid % 2) + 1
 
-        new_board._win_state[tile] = new_board._get_winner_of(new_board._board[tile])
-        new_board._active_cell = sub_tile if new_board._win_state[sub_tile] == 0 else -1
+    @cache_moves
+    def get_legal_moves(self, *, cache=False) -> Set[Move]:
+        return {utils.MOVES[a] for a in utils.squares(self._legal_cells())}
 
-        new_board._curr_pid = (self._curr_pid % 2) + 1
+    def legal_action_mask(self, out: np.ndarray = None) -> np.ndarray:
+        mask = self._action_mask(out)
+        mask[:] = utils.unpack(self._legal_cells(), ACTION_SIZE)
+        return mask
 
-        return new_board
+    def move_to_action(self, move: Move) -> int:
+        return move_to_action(move)
 
-    @cache_moves
-    def get_legal_moves(self, *, cache=False) -> Set[Move]:
-        # if fist move or the active cell is full and any move can be taken
-        if self._active_cell == -1:
-            return {
-                ((i // 3, i % 3), (j // 3, j % 3))
-                for i, j in zip(*np.where(self._board == 0))
-                if self._win_state[i] == 0
-            }
-
-        # if space left in the active cell
-        return {
-            ((self._active_cell // 3, self._active_cell % 3), (j // 3, j % 3))
-            for j in np.where(self._board[self._active_cell] == 0)[0]
-        }
+    def action_to_move(self, action: int) -> Move:
+        return action_to_move(action)
 
     def winner(self) -> int:
-        return self._get_winner_of(self._win_state)
+        return utils.winner_of(self._won1, self._won2, self._decided())
 
     def score(self) -> Tuple[int, int]:
         w = self.winner()
@@ -89,21 +170,52 @@ class BoardState(BaseBoardState):
         if w == 2:
             return 0, 1
 
+    def transform(self, transform: int) -> 'BoardState':
+        check_transform(transform, self.N_SYMMETRIES)
+        new_state = self.copy()
+        # the sub-boards and their cells move the same way
+        source = utils.SOURCES[transform]
+        new_state._p1 = utils.pack(utils.unpack(self._p1, ACTION_SIZE)[source])
+        new_state._p2 = utils.pack(utils.unpack(self._p2, ACTION_SIZE)[source])
+
+        tiles = utils.TILES[transform]
+        new_state._won1 = utils.transform_cells(self._won1, tiles)
+        new_state._won2 = utils.transform_cells(self._won2, tiles)
+        new_state._tied = utils.transform_cells(self._tied, tiles)
+        new_state._active_cell = tiles[self._active_cell] if self._active_cell != -1 else -1
+        new_state._view = None
+        new_state._rehash()
+        return new_state
+
+    def transform_move(self, move: Move, transform: int, *, inverse=False) -> Move:
+        check_transform(transform, self.N_SYMMETRIES)
+        transform = inverse_of(transform) if inverse else transform
+        return transform_coords(move[0], transform, 3), transform_coords(move[1], transform, 3)
+
+    def transform_action(self, action: int, transform: int, *, inverse=False) -> int:
+        check_transform(transform, self.N_SYMMETRIES)
+        return utils.ACTIONS[inverse_of(transform) if inverse else transform][action]
+
+    def _rehash(self):
+        key = self._active_key(self._active_cell) ^ (ZOBRIST_KEYS[Z_SIDE] if self._curr_pid == 2 else 0)
+        for pid, cells in ((1, self._p1), (2, self._p2)):
+            for cell in utils.squares(cells):
+                key ^= cell_key(cell, pid)
+        self._zobrist = key
+
+    def _decided(self) -> int:
+        """returns the mask of the sub-boards which are won or tied"""
+        return self._won1 | self._won2 | self._tied
+
+    def _legal_cells(self) -> int:
+        """returns the mask of the cells that can be played"""
+        empty = ~(self._p1 | self._p2)
+        decided = self._decided()
+        # if first move or the active cell is over, any cell of the sub-boards not over can be played
+        if self._active_cell == -1 or decided >> self._active_cell & 1:
+            return empty & utils.SPREAD[utils.FULL ^ decided]
+        return empty & utils.FULL << 9 * self._active_cell
+
     @staticmethod
-    def _get_winner_of(section: List[int]) -> int:
-        """function that take in a TTT board and return's the winner"""
-         # winner
-        diags = [section[0::4], section[2:8:2]]
-        rows = [section[0 + (3 * i): 3 + (3 * i)] for i in range(3)]
-        cols = [section[i::3] for i in range(3)]
-
-        for line in diags + rows + cols:
-            if (0 not in line) and (-1 not in line) and len(set(line)) == 1:
-                return int(line[0])
-
-        # tie
-        if 0 not in section:
-            return -1
-
-        # not over
-        return 0
+    def _active_key(active_cell: int) -> int:
+        return ZOBRIST_KEYS[Z_ACTIVE + active_cell] if active_cell != -1 else 0
@@ -1 +1,2 @@
 from .BoardState import BoardState
+from .BatchBoardState import BatchBoardState
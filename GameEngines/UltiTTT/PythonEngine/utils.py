@@ -0,0 +1,61 @@
+from typing import Iterator
+import numpy as np
+
+from GameEngines.UltiTTT.utilsTypes import action_to_move
+from GameEngines.symmetry import D4, transform_coords
+
+
+# Masks: the bit i of a 9 bits mask is the cell i (3 * row + col) of a tic-tac-toe board. The 81 cells of the game are
+# kept as one integer per player, the sub-board i being the bits 9 * i to 9 * i + 8, in the order of the action space
+FULL = (1 << 9) - 1
+LINES = [
+    0b100010001, 0b001010100,               # diagonals
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # cols
+]
+
+# if a mask holds a full line, for every mask
+WINS = [any(mask & line == line for line in LINES) for mask in range(1 << 9)]
+# the cells of the sub-boards of a mask of the meta-board
+SPREAD = [sum(FULL << 9 * i for i in range(9) if mask >> i & 1) for mask in range(1 << 9)]
+MOVES = [action_to_move(a) for a in range(81)]
+
+# the cell of a tic-tac-toe board (and the sub-board of the meta-board) under each symmetry
+TILES = [[3 * i + j for i, j in (transform_coords(divmod(c, 3), t, 3) for c in range(9))] for t in range(D4)]
+# the action (9 * sub-board + cell) under each symmetry, and the action each action comes from
+ACTIONS = [[9 * TILES[t][a // 9] + TILES[t][a % 9] for a in range(81)] for t in range(D4)]
+SOURCES = [np.argsort(actions) for actions in ACTIONS]
+
+
+def winner_of(p1: int, p2: int, taken: int) -> int:
+    """
+    :param p1: the mask of the cells of the first player
+    :param p2: the mask of the cells of the second player
+    :param taken: the mask of the cells which are not free
+    :return: the winner of a tic-tac-toe board, -1 for a tie and 0 if the board is not over
+    """
+    if WINS[p1]:
+        return 1
+    if WINS[p2]:
+        return 2
+    return -1 if taken == FULL else 0
+
+def transform_cells(cells: int, tiles: list) -> int:
+    """the mask of a meta-board under a symmetry, given by its `TILES`"""
+    return sum(1 << tiles[c] for c in squares(cells))
+
+def squares(cells: int) -> Iterator[int]:
+    """the cells of a mask in increasing order"""
+    while cells:
+        low = cells & -cells
+        yield low.bit_length() - 1
+        cells ^= low
+
+def unpack(cells: int, n: int) -> np.ndarray:
+    """the n first bits of a mask as a boolean array"""
+    data = np.frombuffer(cells.to_bytes((n + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(data, bitorder="little")[:n].astype(bool)
+
+def pack(values: np.ndarray) -> int:
+    """the mask of a boolean array"""
+    return int.from_bytes(np.packbits(np.asarray(values, dtype=bool).ravel(), bitorder="little").tobytes(), "little")
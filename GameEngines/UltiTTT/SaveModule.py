@@ -4,7 +4,8 @@ import numpy as np
 from typing import Union, Type, Dict, Any
 from GameEngines.abstract import AbsBoardState, AbsSaveModule
 from GameEngines import cache_utils
-from GameEngines.UltiTTT.utilsTypes import to_move
+from GameEngines.BinarySaveModule import BinarySaveModule
+from GameEngines.UltiTTT.utilsTypes import to_move, ACTION_SIZE, Move, move_to_action, action_to_move
 
 
 class UltiTTTSave(AbsSaveModule):
@@ -35,7 +36,7 @@ class UltiTTTSave(AbsSaveModule):
     def _get_data(state: AbsBoardState) -> Dict[str, Any]:
         return {
             "board": state.board.flatten().tolist(),
-            "win_state": state._win_state,
+            "win_state": [int(w) for w in state._win_state],
             "active_cell": int(state._active_cell),
             "turn": state.turn,
             "curr_pid": int(state.curr_pid)
@@ -51,5 +52,53 @@ class UltiTTTSave(AbsSaveModule):
         state._active_cell = data["active_cell"]
         state._turn = data["turn"]
         state._curr_pid = data["curr_pid"]
+        state._rehash()
 
         return state
+
+
+class UltiTTTBinarySave(BinarySaveModule):
+    """ Binary Record Template
+    {
+        board: int8[81],        // Flattened board from (9,9) to (81,)
+        win_state: int8[9],     // The state of the cells of the meta-board
+        active_cell: int8,      // The current active cell of the meta-board
+        turn: uint32,           // The current turn
+        curr_pid: uint8,        // The active player
+        has_cache: uint8,       // If the moves are cached (only when the file keeps the moves cache)
+        move_cache: uint8[11]   // The cached moves as bits of the action space
+    }
+    """
+    GAME = "UltiTTT"
+    FIELDS = [("board", "i1", (81,)), ("win_state", "i1", (9,)), ("active_cell", "i1"), ("turn", "<u4"),
+              ("curr_pid", "u1")]
+    ACTION_SIZE = ACTION_SIZE
+    MOVE_SIZE = ACTION_SIZE
+    JSON_MODULE = UltiTTTSave
+
+    @classmethod
+    def encode_move(cls, move: Move) -> int:
+        # the actions of the game do not depend on the position
+        return move_to_action(move)
+
+    @classmethod
+    def decode_move(cls, code: int) -> Move:
+        return action_to_move(code)
+
+    @classmethod
+    def _to_record(cls, state: AbsBoardState, record: np.void):
+        record["board"] = np.asarray(state.board).ravel()
+        record["win_state"] = state._win_state
+        record["active_cell"] = state._active_cell
+        record["turn"] = state.turn
+        record["curr_pid"] = state.curr_pid
+
+    @classmethod
+    def _from_record(cls, record: np.void) -> Dict[str, Any]:
+        return {
+            "board": record["board"].astype(np.int64).reshape((9, 9)),
+            "win_state": record["win_state"].tolist(),
+            "active_cell": int(record["active_cell"]),
+            "turn": int(record["turn"]),
+            "curr_pid": int(record["curr_pid"])
+        }
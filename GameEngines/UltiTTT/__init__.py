@@ -1,14 +1,15 @@
 import GameEngines
 from GameEngines.UltiTTT import *
 
-from .utilsTypes import Move, Coords
+from .utilsTypes import Move, Coords, ACTION_SIZE, move_to_action, action_to_move
 
 try:
     __doc__ = GameEngines.UltiTTT.__doc__
     if hasattr(GameEngines.UltiTTT, "__all__"):
         __all__ = GameEngines.UltiTTT.__all__
 
-    from .BoardState import BoardState
+    from .BoardState import BoardState, BatchBoardState
 
 except AttributeError:
     from .PythonEngine.BoardState import BoardState
+    from .PythonEngine.BatchBoardState import BatchBoardState
@@ -1,7 +1,29 @@
 from typing import Tuple, List
+from GameEngines.zobrist import zobrist_keys
 
 Coords = Tuple[int, int]
 Move = Tuple[Coords, Coords]
 
 def to_move(move: List[List[int]]) -> Move:
     return (move[0][0], move[0][1]), (move[1][0], move[1][1])
+
+
+# Action space: 9 sub-boards x 9 cells
+ACTION_SIZE = 81
+
+def move_to_action(move: Move) -> int:
+    # the moves may come with numpy ints, which would spread to the cell masks
+    return int(9 * (3 * move[0][0] + move[0][1]) + 3 * move[1][0] + move[1][1])
+
+def action_to_move(action: int) -> Move:
+    tile, sub_tile = divmod(int(action), 9)
+    return (tile // 3, tile % 3), (sub_tile // 3, sub_tile % 3)
+
+
+# Zobrist keys: one key per cell of the action space and player, then the second player to move, then the active cell
+ZOBRIST_KEYS = zobrist_keys(81 * 2 + 1 + 9, seed=1)
+Z_SIDE = 81 * 2
+Z_ACTIVE = Z_SIDE + 1
+
+def cell_key(cell: int, pid: int) -> int:
+    return ZOBRIST_KEYS[2 * cell + pid - 1] if pid > 0 else 0
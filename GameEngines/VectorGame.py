@@ -0,0 +1,72 @@
+from typing import Type, Union, Dict
+from inspect import isclass
+import numpy as np
+from GameEngines.abstract import AbsBatchBoardState
+
+BatchOrType = Union[AbsBatchBoardState, Type[AbsBatchBoardState]]
+class VectorGame:
+    """
+    This Class drives a batch of games of the same type, e.g. as a vectorized environment for reinforcement learning.
+    Finished games are put back in their initial state by the batch and their results are accumulated.
+    """
+    def __init__(self, batch: BatchOrType, n_games: int = None, *, seed: int = None):
+        """
+        :param batch: the BatchBoardState class of the game or an existing batch
+        :param n_games: the number of games created if a class is given
+        :param seed: the seed of the generator used by `random_actions`
+        """
+        if isclass(batch):
+            if n_games is None:
+                raise ValueError("The number of games is required to create the batch")
+            batch = batch(n_games, auto_reset=True)
+
+        self.batch = batch
+        self.batch.auto_reset = True
+        self.rng = np.random.default_rng(seed)
+
+        self.steps = 0
+        self.finished = 0
+        self.winner_counts: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.batch)
+
+    def step(self, actions: np.ndarray) -> np.ndarray:
+        """
+        plays one action in every game of the batch
+
+        :param actions: the actions to be played, -1 skips a game
+        :return: the winner of every game after the step. Games with a non-zero winner were reset
+        """
+        winners = self.batch.play_batch(np.asarray(actions, dtype=np.int64))
+        self.steps += 1
+
+        done = winners[winners != 0]
+        self.finished += len(done)
+        for w, c in zip(*np.unique(done, return_counts=True)):
+            self.winner_counts[int(w)] = self.winner_counts.get(int(w), 0) + int(c)
+
+        return winners
+
+    def random_actions(self) -> np.ndarray:
+        """
+        draws a uniformly random legal action for every game. Games without legal actions get -1
+
+        :return: a ndarray of shape (n_games,) of actions
+        """
+        mask = self.batch.legal_move_mask_batch()
+        scores = self.rng.random(mask.shape)
+        scores[~mask] = -1
+
+        actions = scores.argmax(axis=1)
+        actions[~mask.any(axis=1)] = -1
+        return actions
+
+    def play_random(self, n_steps: int):
+        """
+        plays n steps of random legal actions in every game
+
+        :param n_steps: the number of steps to be played
+        """
+        for _ in range(n_steps):
+            self.step(self.random_actions())
@@ -8,11 +8,20 @@ try:
 except ModuleNotFoundError:
     ...
 
-from .abstract import AbsPlayer, AbsBoardState, AbsSaveModule
+from .abstract import AbsPlayer, AsyncAbsPlayer, AbsBoardState, AbsSaveModule, AbsBatchBoardState
 from .Game import Game
+from .AsyncGame import AsyncGame, TimeControl, TimeoutPolicy
+from .VectorGame import VectorGame
+from .GameHistory import HistoryPolicy
+from .Tournament import Tournament
 from .RandomPlayer import RandomPlayer
+from .players import MCTSPlayer, AlphaBetaPlayer
+from .TranspositionTable import TranspositionTable, ReplacementPolicy, ScoreBound, TTEntry
 from .BaseBoardState import BaseBoardState
+from .BaseBatchBoardState import BaseBatchBoardState
+from .BinarySaveModule import BinarySaveModule
 
 import GameEngines.UltiTTT
 import GameEngines.Avalam
 import GameEngines.Checkers
+import GameEngines.Quoridor
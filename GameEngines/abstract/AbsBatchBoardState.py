@@ -0,0 +1,104 @@
+from typing import List, Optional
+from abc import ABC, abstractmethod
+import numpy as np
+from GameEngines.abstract.AbsBoardState import AbsBoardState
+
+
+class AbsBatchBoardState(ABC):
+    """
+    This is the abstract implementation of a batch of board states.
+    It steps many games of the same type at once using the fixed action space of the game
+    """
+    ACTION_SIZE: int
+
+    @abstractmethod
+    def __init__(self, n_games: int, auto_reset: bool = True): ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @property
+    @abstractmethod
+    def boards(self) -> np.ndarray:
+        """
+        getter for the raw boards of all the games stacked in a single numpy array
+
+        :return: a ndarray of shape (n_games, *board_shape)
+        """
+        ...
+
+    @property
+    @abstractmethod
+    def turns(self) -> np.ndarray:
+        """
+        getter for the current turn of every game
+
+        :return: a ndarray of shape (n_games,)
+        """
+        ...
+
+    @property
+    @abstractmethod
+    def curr_pids(self) -> np.ndarray:
+        """
+        getter for the current player ID of every game
+
+        :return: a ndarray of shape (n_games,)
+        """
+        ...
+
+    @abstractmethod
+    def play_batch(self, actions: np.ndarray) -> np.ndarray:
+        """
+        method used to play one action in every game. A negative action skips the game. The method does NOT verify that
+        the actions are legal. If `auto_reset` is set, the finished games are put back in their initial state
+
+        :param actions: a int64 ndarray of shape (n_games,) of actions
+        :return: the winner of every game after the actions were played
+        """
+        ...
+
+    @abstractmethod
+    def legal_move_mask_batch(self) -> np.ndarray:
+        """
+        method used to get the legal actions of every game
+
+        :return: a boolean ndarray of shape (n_games, ACTION_SIZE)
+        """
+        ...
+
+    @abstractmethod
+    def winner_batch(self) -> np.ndarray:
+        """
+        method used to get the winner of every game. See `AbsBoardState.winner`
+
+        :return: a ndarray of shape (n_games,)
+        """
+        ...
+
+    @abstractmethod
+    def reset(self, indexes: Optional[List[int]] = None):
+        """
+        puts the given games back in their initial state
+
+        :param indexes: the indexes of the games to reset. By default, all the games are reset
+        """
+        ...
+
+    @abstractmethod
+    def get_state(self, i: int) -> AbsBoardState:
+        """
+        :param i: the index of a game
+        :return: a copy of the state of the game
+        """
+        ...
+
+    @abstractmethod
+    def set_state(self, i: int, state: AbsBoardState):
+        """
+        replaces a game of the batch by the given state
+
+        :param i: the index of a game
+        :param state: the new state of the game
+        """
+        ...
@@ -1,4 +1,4 @@
-from typing import Type, Union
+from typing import Type, Union, Tuple
 from abc import ABC, abstractmethod
 import numpy as np
 from pathlib import Path
@@ -9,6 +9,8 @@ class AbsBoardState(ABC):
     This is the abstract implementation of any board state.
     It defines all necessary methods for a player to play a move
     """
+    ACTION_SIZE: int
+    N_SYMMETRIES: int
     @abstractmethod
     def __init__(self, *, save_module: Type['AbsSaveModule'] = None): ...
 
@@ -16,6 +18,25 @@ class AbsBoardState(ABC):
     @abstractmethod
     def __eq__(self, other: 'AbsBoardState') -> bool: ...
 
+    @abstractmethod
+    def __hash__(self) -> int:
+        """
+        states are hashed by their zobrist key. See `zobrist`
+        """
+        ...
+
+    @property
+    @abstractmethod
+    def zobrist(self) -> int:
+        """
+        getter for the zobrist key of the state. The key is updated in O(1) by `play`, which makes it the cheap way to
+        identify a position, e.g. in a `TranspositionTable`. Equal states have the same key, but different states can
+        collide.
+
+        :return: an unsigned 64 bits int
+        """
+        ...
+
     @property
     @abstractmethod
     def turn(self) -> int:
@@ -57,10 +78,31 @@ class AbsBoardState(ABC):
         """
         ...
 
+    @abstractmethod
+    def push(self, move):
+        """
+        method used to play a move in place, without creating a new state as `play` does. The state keeps what is needed
+        to undo the move with `pop`, which makes it the fast way to explore the moves in a search. The method does NOT
+        verify that the move is legal
+
+        :param move: the move to be played
+        """
+        ...
+
+    @abstractmethod
+    def pop(self):
+        """
+        method used to undo the last move played by `push`, in place
+
+        :return: the undone move
+        """
+        ...
+
     @abstractmethod
     def copy(self, *, cache=False) -> 'AbsBoardState':
         """
-        method used to get a deep copy of the BoardState
+        method used to get a deep copy of the BoardState. The moves pushed on the BoardState cannot be popped from the
+        copy
 
         :param cache: if the cache state should be copied
         :return: a copy if the BoardState
@@ -76,6 +118,38 @@ class AbsBoardState(ABC):
         """
         ...
 
+    @abstractmethod
+    def legal_action_mask(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        method used to get the legal moves of the current player as a mask over the fixed action space of the game.
+        See `move_to_action` for the index of a move
+
+        :param out: a preallocated boolean array of shape (ACTION_SIZE,) in which the mask is written
+        :return: a boolean ndarray of shape (ACTION_SIZE,)
+        """
+        ...
+
+    @abstractmethod
+    def move_to_action(self, move) -> int:
+        """
+        method used to get the index of a move in the fixed action space of the game
+
+        :param move: a move of the game
+        :return: the index of the move, between 0 and ACTION_SIZE
+        """
+        ...
+
+    @abstractmethod
+    def action_to_move(self, action: int):
+        """
+        method used to get the move of an index of the fixed action space of the game. The method does NOT verify that
+        the move is legal
+
+        :param action: the index of the move
+        :return: the move
+        """
+        ...
+
     @abstractmethod
     def winner(self) -> int:
         """
@@ -97,6 +171,100 @@ class AbsBoardState(ABC):
         """
         ...
 
+    @abstractmethod
+    def random_playout(self, seed: int = None, max_plies: int = None) -> Tuple[int, tuple, int]:
+        """
+        method used to play random moves from the state until the end of the game, which is the core of the rollouts of
+        Monte Carlo searches. The state is left unchanged. The rust engines play the whole game natively without
+        holding the GIL, so playouts can run in parallel threads
+
+        :param seed: the seed of the random moves
+        :param max_plies: the maximum number of moves played, the winner is 0 if the game is stopped before its end
+        :return: the winner, the final score and the number of moves played
+        """
+        ...
+
+    @abstractmethod
+    def rollout(self, n_games: int, seed: int = None, max_plies: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        method used to play many random playouts from the state, see `random_playout`
+
+        :param n_games: the number of playouts
+        :param seed: the seed of the random moves
+        :param max_plies: the maximum number of moves played per playout
+        :return: the winners (n_games,), the final scores (n_games, 2) and the numbers of moves played (n_games,)
+        """
+        ...
+
+    @abstractmethod
+    def perft(self, depth: int) -> int:
+        """
+        method used to count the positions reached by playing every sequence of `depth` moves from the state, which
+        measures and verifies the move generation. A finished game has no moves, so its count is 0 before the last
+        depth. The state is left unchanged and the rust engines count natively without holding the GIL. See
+        `GameEngines.perft` for the reference counts of the games
+
+        :param depth: the number of moves played
+        :return: the number of leaf positions
+        """
+        ...
+
+    @abstractmethod
+    def transform(self, transform: int) -> 'AbsBoardState':
+        """
+        method used to get the state under one of the symmetries of the game. The symmetries are indexed from 0 to
+        N_SYMMETRIES, the transform 0 being the identity. The moves of the transformed state are the transformed moves
+        of the state, see `transform_move`
+
+        :param transform: the index of the symmetry
+        :return: a new transformed BoardState
+        """
+        ...
+
+    @abstractmethod
+    def symmetries(self) -> list:
+        """
+        method used to get the state under all the symmetries of the game, e.g. for data augmentation
+
+        :return: a list of N_SYMMETRIES states, indexed by transform
+        """
+        ...
+
+    @abstractmethod
+    def canonical(self) -> Tuple['AbsBoardState', int]:
+        """
+        method used to get the canonical representative of the symmetric states: the transformed state with the
+        smallest zobrist key. All the symmetric states have the same representative, so a search can store them once
+
+        :return: the canonical state and the transform giving it
+        """
+        ...
+
+    @abstractmethod
+    def transform_move(self, move, transform: int, *, inverse=False):
+        """
+        method used to map a move of the state to the same move on the transformed state, or back with `inverse`. The
+        method does NOT verify that the move is legal
+
+        :param move: a move of the state, or of the transformed state if `inverse` is set
+        :param transform: the index of the symmetry
+        :param inverse: if the move is mapped from the transformed state to the state
+        :return: the transformed move
+        """
+        ...
+
+    @abstractmethod
+    def transform_action(self, action: int, transform: int, *, inverse=False) -> int:
+        """
+        method used to map an index of the action space like `transform_move`
+
+        :param action: the index of a move of the state, or of the transformed state if `inverse` is set
+        :param transform: the index of the symmetry
+        :param inverse: if the action is mapped from the transformed state to the state
+        :return: the index of the transformed move
+        """
+        ...
+
     @staticmethod
     @abstractmethod
     def load(file: Union[str, Path]) -> 'AbsBoardState':
@@ -1,2 +1,4 @@
 from .AbsBoardState import AbsBoardState, AbsSaveModule
-from .AbsPlayer import AbsPlayer
\ No newline at end of file
+from .AbsPlayer import AbsPlayer
+from .AbsBatchBoardState import AbsBatchBoardState
+from .AsyncAbsPlayer import AsyncAbsPlayer
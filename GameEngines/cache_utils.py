@@ -1,36 +1,208 @@
+from collections import OrderedDict
 from collections.abc import Callable
+from functools import wraps
+from typing import Optional, Dict, Union, Tuple, Any
+import sys
 
 from GameEngines import AbsBoardState
 
 
+class CacheStats:
+    """hit and miss counters of a moves cache"""
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.
+
+    def reset_stats(self):
+        self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        :return: the usage statistics of the cache
+        """
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+
+class MoveCache(CacheStats):
+    """
+    This Class is a least recently used cache of the legal moves of the states of all the games, indexed by the type and
+    the zobrist key of the states. It lets the positions reached again, e.g. by another move order during a search,
+    skip the move generation. Its size is bounded by a number of entries and/or an estimated number of bytes.
+    """
+    def __init__(self, max_entries: Optional[int] = 2 ** 16, max_bytes: Optional[int] = None):
+        """
+        :param max_entries: the maximum number of positions in the cache, None for no limit
+        :param max_bytes: the maximum estimated size of the cached moves in bytes, None for no limit
+        """
+        if max_entries is None and max_bytes is None:
+            raise ValueError("The cache needs an entry or a byte bound")
+        super().__init__()
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Tuple[type, int], Tuple[frozenset, int]] = OrderedDict()
+        self.nbytes = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, state: AbsBoardState) -> Optional[frozenset]:
+        """
+        looks up the moves of a position and counts the hit or the miss
+
+        :param state: the state
+        :return: the legal moves of the state, None if the position is not in the cache
+        """
+        key = (type(state), state.zobrist)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, state: AbsBoardState, moves: set):
+        """
+        stores the moves of a position, evicting the least recently used positions beyond the bounds of the cache
+
+        :param state: the state
+        :param moves: the legal moves of the state
+        """
+        key = (type(state), state.zobrist)
+        moves = frozenset(moves)
+        size = _size_of(moves)
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[1]
+        self._entries[key] = (moves, size)
+        self.nbytes += size
+
+        while len(self._entries) > 1 and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries) or
+            (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+            self.evictions += 1
+
+    def clear(self):
+        """
+        removes all the entries of the cache. The statistics are kept, see `reset_stats`
+        """
+        self._entries.clear()
+        self.nbytes = 0
+
+    def reset_stats(self):
+        super().reset_stats()
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            **super().stats(),
+            "evictions": self.evictions,
+        }
+
+
+def _size_of(moves: frozenset) -> int:
+    """
+    estimated size of a set of moves, the moves of a game all having the same shape. Only their tuples are counted, the
+    small ints and enum members in them being shared
+    """
+    def deep_size(obj: Any) -> int:
+        if isinstance(obj, tuple):
+            return sys.getsizeof(obj) + sum(deep_size(o) for o in obj)
+        return 0
+
+    return sys.getsizeof(moves) + len(moves) * (deep_size(next(iter(moves))) if len(moves) > 0 else 0)
+
+
+state_stats = CacheStats()  # the lookups of the moves cached on the states
+_global_cache: Optional[MoveCache] = None
+
+
+def enable_global_cache(max_entries: Optional[int] = 2 ** 16, max_bytes: Optional[int] = None) -> MoveCache:
+    """
+    enables a cache of the legal moves shared by all the states, replacing the previous one
+
+    :param max_entries: the maximum number of positions in the cache, None for no limit
+    :param max_bytes: the maximum estimated size of the cached moves in bytes, None for no limit
+    :return: the new cache
+    """
+    global _global_cache
+    _global_cache = MoveCache(max_entries, max_bytes)
+    return _global_cache
+
+def disable_global_cache():
+    global _global_cache
+    _global_cache = None
+
+def global_cache() -> Optional[MoveCache]:
+    """
+    :return: the cache shared by all the states, None if it is disabled
+    """
+    return _global_cache
+
+def cache_stats() -> Dict[str, Optional[Dict[str, Union[int, float]]]]:
+    """
+    :return: the statistics of the moves cached on the states and of the global cache (None if disabled)
+    """
+    return {
+        "state": state_stats.stats(),
+        "global": None if _global_cache is None else _global_cache.stats(),
+    }
+
+
 def cache_moves(func):
     """
-    Wrapper for the `get_legal_moves` method of BoardState to allow for generic moves caching in case of multiple lookups.
+    Wrapper for the `get_legal_moves` method of BoardState to cache the moves in case of multiple lookups. The moves
+    are kept in the `_move_cache` field of the state when `cache` is true, and in the global cache if it is enabled.
     :param func: `get_legal_moves` function.
     :return: set of moves allowed for this state
     """
+    @wraps(func)
     def wrapper(self, *args, cache=False, **kwargs):
-        if not cache and not hasattr(self, '__move_cache'):
-            return func(self, *args, **kwargs)
+        moves = self._move_cache
+        if moves is not None:
+            state_stats.hits += 1
+            return moves
+        if cache:
+            state_stats.misses += 1
 
-        if hasattr(self, '__move_cache'):
-            return self.__move_cache
+        shared = _global_cache
+        if shared is None:
+            moves = func(self, *args, **kwargs)
+        else:
+            shared_moves = shared.get(self)
+            if shared_moves is None:
+                moves = func(self, *args, **kwargs)
+                shared.put(self, moves)
+            else:
+                moves = set(shared_moves)
 
-        self.__move_cache = func(self, *args, **kwargs)
-        return self.__move_cache
+        if cache:
+            self._move_cache = moves
+        return moves
     return wrapper
 
-def ignore_cache(func):
+def clear_cache(func):
     """
-    Wrapper for the `copy` method of BoardState to let the copy method ignore the moves cache.
-    :param func: `copy` function.
-    :return: set of moves allowed for this state
+    Wrapper for the methods modifying a python BoardState in place (`push` and `pop`) to drop the moves cache of the
+    previous position. The rust engines drop it themselves.
+    :param func: `push` or `pop` function.
     """
     def wrapper(self, *args, **kwargs):
-        # removes the cache before the copy
-        if hasattr(self, '__move_cache'):
-            delattr(self, '__move_cache')
-
+        self._move_cache = None
         return func(self, *args, **kwargs)
     return wrapper
 
@@ -42,8 +214,8 @@ def get_cache(func):
     def wrapper(state: AbsBoardState, *args, **kwargs):
         data = func(state, *args, **kwargs)
 
-        if hasattr(state, '__move_cache'):
-            data["__move_cache"] = list(state.__move_cache)
+        if state._move_cache is not None:
+            data["__move_cache"] = list(state._move_cache)
 
         return data
     return wrapper
@@ -60,8 +232,8 @@ def put_cache(to_move: Callable):
             obj = func(data, *args, **kwargs)
 
             if "__move_cache" in data:
-                obj.__move_cache = set(to_move(m) for m in data["__move_cache"])
+                obj._move_cache = set(to_move(m) for m in data["__move_cache"])
 
             return obj
         return wrapper
-    return wrapper_1
\ No newline at end of file
+    return wrapper_1
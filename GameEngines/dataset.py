@@ -0,0 +1,239 @@
+from pathlib import Path
+from typing import Union, Type, Any, List, Optional, Set, Tuple
+import numpy as np
+
+from GameEngines.abstract import AbsBoardState
+from GameEngines.BinarySaveModule import BinarySaveModule, BinaryHeader, HEADER_SIZE, pack_header, unpack_header
+
+_MAGIC = b"GEDS"
+VERSION = 1
+UNFINISHED = 0  # the winner of the records of a game which is not over
+
+
+def record_dtype(save_module: Type[BinarySaveModule]) -> np.dtype:
+    """
+    :param save_module: the binary save module of the game
+    :return: the numpy type of a record of a dataset of the game
+    """
+    return np.dtype([
+        ("state", save_module.record_dtype(cache=False)),
+        ("mask", "?", (save_module.ACTION_SIZE,)),  # the legal actions of the state
+        ("action", "<i4"),                          # the action played from the state
+        ("winner", "i1"),                           # the winner of the game, `UNFINISHED` until it is over
+        ("game", "<u4"),                            # the index of the game in the dataset
+        ("ply", "<u4"),                             # the index of the state in its game
+    ])
+
+def shard_files(directory: Union[str, Path]) -> List[Path]:
+    """
+    :param directory: the directory of a dataset
+    :return: the shards of the dataset in order
+    """
+    return sorted(Path(directory).glob("shard-*.bin"))
+
+
+class DatasetWriter:
+    """
+    This Class appends the positions of games to a dataset: a directory of shards, binary files made of a header
+    followed by fixed width records (see `record_dtype`). The records are written as the games are played and the
+    winner of a game is written in its records once it is over. A `Game` given a writer records its trajectory by
+    itself.
+
+    The writer never modifies the shards that existed before it, it starts a new shard after them.
+    """
+    def __init__(self, directory: Union[str, Path], save_module: Type[BinarySaveModule], *,
+                 shard_size: int = 2 ** 20):
+        """
+        :param directory: the directory of the shards, created if needed
+        :param save_module: the binary save module of the game, which encodes the states
+        :param shard_size: the maximum number of records of a shard
+        """
+        if shard_size < 1:
+            raise ValueError("The shards must hold at least one record")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.save_module = save_module
+        self.shard_size = shard_size
+        self.dtype = record_dtype(save_module)
+
+        shards = shard_files(self.directory)
+        self._next_shard = 0 if len(shards) == 0 else int(shards[-1].stem.split("-")[-1]) + 1
+        self._game = 0 if len(shards) == 0 else PositionDataset(self.directory, save_module).n_games
+        self._ply = 0
+        self._path: Optional[Path] = None
+        self._file = None
+        self._count = 0                         # the number of records of the current shard
+        self._pending: List[Tuple[Path, int]] = []  # the shard and index of the records of the current game
+        self._record = np.zeros((), dtype=self.dtype)
+
+        self.n_records = 0
+        self.n_games = 0
+
+    def __enter__(self) -> 'DatasetWriter':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def record(self, state: AbsBoardState, move: Any, moves: Optional[Set[Any]] = None):
+        """
+        appends a position of the current game to the dataset
+
+        :param state: the state from which the move is played
+        :param move: the move played
+        :param moves: the legal moves of the state, computed if not given
+        """
+        if self._file is None or self._count == self.shard_size:
+            self._open_shard()
+
+        record = self._record
+        record.fill(0)
+        self.save_module._to_record(state, record["state"])
+        if moves is None:
+            record["mask"] = state.legal_action_mask()
+        else:
+            record["mask"][[state.move_to_action(m) for m in moves]] = True
+        record["action"] = state.move_to_action(move)
+        record["game"] = self._game
+        record["ply"] = self._ply
+
+        self._file.write(record.tobytes())
+        self._pending.append((self._path, self._count))
+        self._count += 1
+        self._ply += 1
+        self.n_records += 1
+
+    def end_game(self, winner: int):
+        """
+        writes the winner of the current game in its records, the next records belong to a new game
+
+        :param winner: the winner of the game
+        """
+        offset = self.dtype.fields["winner"][1]
+        winner = np.int8(winner).tobytes()
+        for path in dict.fromkeys(p for p, _ in self._pending):
+            indexes = [i for p, i in self._pending if p == path]
+            if path == self._path:
+                self._patch(self._file, indexes, offset, winner)
+                self._file.seek(0, 2)
+            else:
+                with open(path, "r+b") as f:
+                    self._patch(f, indexes, offset, winner)
+
+        self._pending = []
+        self._game += 1
+        self._ply = 0
+        self.n_games += 1
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """
+        closes the current shard. The records of an unfinished game keep `UNFINISHED` as winner
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _patch(self, file, indexes: List[int], offset: int, value: bytes):
+        for i in indexes:
+            file.seek(HEADER_SIZE + i * self.dtype.itemsize + offset)
+            file.write(value)
+
+    def _open_shard(self):
+        self.close()
+        self._path = self.directory / f"shard-{self._next_shard:05d}.bin"
+        self._file = open(self._path, "w+b")
+        # the number of records of a shard is given by its size, the count of the header is left to 0
+        header = BinaryHeader(VERSION, self.save_module.GAME, False, self.dtype.itemsize, 0)
+        self._file.write(pack_header(_MAGIC, header))
+        self._next_shard += 1
+        self._count = 0
+
+
+class PositionDataset:
+    """
+    This Class reads the shards of a dataset written by a `DatasetWriter`. Each shard is memory mapped as a numpy
+    structured array, so the records and their fields are read without copy, e.g. `dataset.shards[0]["mask"]`. The
+    records of all the shards can also be indexed as a single sequence.
+    """
+    def __init__(self, files: Union[str, Path, List[Union[str, Path]]], save_module: Type[BinarySaveModule]):
+        """
+        :param files: the directory of the dataset, or a list of shards
+        :param save_module: the binary save module of the game
+        """
+        if isinstance(files, (str, Path)):
+            files = shard_files(files)
+
+        self.save_module = save_module
+        self.dtype = record_dtype(save_module)
+        self.files = [Path(f) for f in files]
+        self.shards: List[np.ndarray] = [self._map(f) for f in self.files]
+        self._ends = np.cumsum([len(s) for s in self.shards], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return int(self._ends[-1]) if len(self._ends) > 0 else 0
+
+    def __getitem__(self, index: Union[int, slice, np.ndarray]) -> Union[np.void, np.ndarray]:
+        """
+        :param index: the index of a record, or a slice, an array of indexes or a boolean mask of the records
+        :return: the record, a view of its shard, or a new array of the records
+        """
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError(f"record {index} out of range")
+            shard = int(np.searchsorted(self._ends, index, side="right"))
+            return self.shards[shard][index - self._start(shard)]
+
+        if isinstance(index, slice):
+            indexes = np.arange(len(self))[index]
+        else:
+            indexes = np.asarray(index)
+            if indexes.dtype == bool:
+                if indexes.shape != (len(self),):
+                    raise IndexError(f"the mask has {indexes.size} values for {len(self)} records")
+                indexes = np.flatnonzero(indexes)
+        indexes = np.where(indexes < 0, indexes + len(self), indexes)
+        if np.any((indexes < 0) | (indexes >= len(self))):
+            raise IndexError(f"record indexes out of range for {len(self)} records")
+        shards = np.searchsorted(self._ends, indexes, side="right")
+        out = np.empty(len(indexes), dtype=self.dtype)
+        for shard in np.unique(shards):
+            selected = shards == shard
+            out[selected] = self.shards[shard][indexes[selected] - self._start(shard)]
+        return out
+
+    @property
+    def n_games(self) -> int:
+        """
+        :return: the number of games of the dataset, the game indexes being consecutive
+        """
+        return int(max((s["game"][-1] for s in self.shards if len(s) > 0), default=-1)) + 1
+
+    def state(self, index: int, state_type: Type[AbsBoardState]) -> AbsBoardState:
+        """
+        :param index: the index of a record
+        :param state_type: the BoardState class of the state
+        :return: the state of the record
+        """
+        return self.save_module.from_record(self[index]["state"], state_type)
+
+    def _start(self, shard: int) -> int:
+        return int(self._ends[shard - 1]) if shard > 0 else 0
+
+    def _map(self, file: Path) -> np.ndarray:
+        header = unpack_header(file, _MAGIC)
+        if header.game != self.save_module.GAME or header.version != VERSION:
+            raise ValueError(f"{file} is not a version {VERSION} dataset of {self.save_module.GAME}")
+        if header.record_size != self.dtype.itemsize:
+            raise ValueError(f"{file} has records of {header.record_size} bytes, which do not match the format")
+
+        count = (file.stat().st_size - HEADER_SIZE) // self.dtype.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=self.dtype)
+        return np.memmap(file, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
@@ -0,0 +1,53 @@
+from time import perf_counter
+from typing import Dict, List, NamedTuple, Any
+
+from GameEngines.abstract import AbsBoardState
+
+# the number of leaf positions from the initial state of each game, the index being the depth. A finished game has no
+# moves, and every jump of a Checkers multi jump is a move: its counts differ from the usual tables from the depth 7
+REFERENCE: Dict[str, List[int]] = {
+    "Avalam": [1, 292, 81488, 21711440],
+    "Checkers": [1, 7, 49, 302, 1469, 7361, 36768, 179255, 838248, 3866526],
+    "UltiTTT": [1, 81, 720, 6336, 55080, 473256, 4020960],
+    "Quoridor": [1, 131, 16677, 2062264],
+}
+
+
+class PerftResult(NamedTuple):
+    depth: int
+    nodes: int
+    seconds: float
+
+    @property
+    def nodes_per_sec(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else 0.
+
+
+def perft(state: AbsBoardState, depth: int) -> PerftResult:
+    """
+    counts the leaf positions `depth` moves away from a state, see `AbsBoardState.perft`, and times the count
+
+    :param state: the root of the count, left unchanged
+    :param depth: the number of moves played
+    :return: the depth, the number of leaf positions and the duration of the count
+    """
+    beg = perf_counter()
+    nodes = state.perft(depth)
+    return PerftResult(depth, nodes, perf_counter() - beg)
+
+
+def divide(state: AbsBoardState, depth: int) -> Dict[Any, int]:
+    """
+    splits the count of `perft` by the first move, which locates the moves two engines disagree on
+
+    :param state: the root of the count, left unchanged
+    :param depth: the number of moves played, at least 1
+    :return: the number of leaf positions after each legal move of the state, none if the game is over
+    """
+    if depth < 1:
+        raise ValueError("the depth of a divide must be at least 1")
+
+    moves = state.get_legal_moves()
+    if state.winner() != 0:
+        return {}
+    return {move: state.play(move).perft(depth - 1) for move in moves}
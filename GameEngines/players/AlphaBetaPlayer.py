@@ -0,0 +1,267 @@
+from typing import Any, Optional, Set, List, Dict, Union, Callable, Tuple
+import math
+import time
+
+from GameEngines.abstract import AbsPlayer, AbsBoardState
+from GameEngines.TranspositionTable import TranspositionTable, ScoreBound
+
+# the value of a won position, the evaluations must stay below it. Wins are worth WIN minus their number of plies so the
+# search picks the fastest win and the slowest loss
+WIN = 1e9
+MAX_PLY = 10_000
+
+Evaluation = Callable[[AbsBoardState, int], float]
+
+
+def score_evaluation(state: AbsBoardState, pid: int) -> float:
+    """
+    the default evaluation of `AlphaBetaPlayer`: the score of a player minus the score of the opponent
+
+    :param state: the evaluated state, its game is not over
+    :param pid: the player the value is given for
+    :return: the value of the state for the player
+    """
+    score = state.score()
+    return score[pid - 1] - score[2 - pid]
+
+
+class _Timeout(Exception):
+    """raised by the search when the time budget is spent"""
+
+
+class AlphaBetaPlayer(AbsPlayer):
+    """
+    Negamax alpha-beta player working with the BoardState of any game. The search deepens one ply at a time until the
+    depth or the time budget of the turn is reached, and plays the best move of the deepest completed search.
+
+    The moves are ordered with the best move of the transposition table, the killer moves (the moves that cut the search
+    at the same ply) and the history heuristic (the moves that cut the search anywhere, weighted by the depth). A player
+    can play twice in a row, e.g. a multi jump of Checkers, so the value is only negated when the player changes.
+    """
+    def __init__(self, p_name: str = None, *, depth: Optional[int] = None, time_limit: Optional[float] = 1.0,
+                 evaluate: Evaluation = score_evaluation, table: Optional[TranspositionTable] = None,
+                 killers: bool = True, history: bool = True):
+        """
+        :param p_name: the name of the player
+        :param depth: the maximum depth of the search in plies, None for no limit
+        :param time_limit: the maximum time of search per turn in seconds, None for no limit
+        :param evaluate: the value of a state for a player, called at the leaves of the search
+        :param table: the transposition table storing the results of the search, None to search without one
+        :param killers: if the moves are ordered with the killer moves
+        :param history: if the moves are ordered with the history heuristic
+        """
+        if depth is None and time_limit is None:
+            raise ValueError("The search needs a depth or a time budget")
+        if depth is not None and depth < 1:
+            raise ValueError("The depth of the search must be at least 1")
+
+        self._name = p_name
+        self.depth = depth
+        self.time_limit = time_limit
+        self.evaluate = evaluate
+        self.table = table
+        self.use_killers = killers
+        self.use_history = history
+
+        self._killers: List[List[Any]] = []
+        self._history: Dict[Tuple[int, Any], int] = {}
+        self._deadline = math.inf
+        self._nodes = 0
+        self._depth_limited = False  # if a leaf of the last iteration was cut by the depth and not by the end of a game
+
+        self.last_depth = 0
+        self.last_nodes = 0
+        self.last_time = 0.
+        self.last_value = 0.
+        self.total_nodes = 0
+        self.total_time = 0.
+
+    def play(self, board: AbsBoardState, moves: Set[Any], pid: int) -> Any:
+        if len(moves) == 1:
+            return next(iter(moves))
+
+        start = time.perf_counter()
+        self._deadline = math.inf if self.time_limit is None else start + self.time_limit
+        self._nodes = 0
+        self._killers = []
+        self._history = {}
+        if self.table is not None:
+            self.table.new_search()
+
+        state = board.copy()
+        best_move = None
+        self.last_depth = 0
+        depth = 1
+        while self.depth is None or depth <= self.depth:
+            self._depth_limited = False
+            try:
+                best_move, self.last_value = self._search_root(state, moves, depth, best_move)
+            except _Timeout:
+                break
+            self.last_depth = depth
+            # the whole game tree was searched, or the result is known
+            if not self._depth_limited or abs(self.last_value) > WIN - MAX_PLY:
+                break
+            depth += 1
+
+        self.last_nodes = self._nodes
+        self.last_time = time.perf_counter() - start
+        self.total_nodes += self.last_nodes
+        self.total_time += self.last_time
+
+        if best_move is None:
+            # not even the first depth was searched in time
+            return self._order(moves, 0, state.curr_pid, None)[0]
+        return best_move
+
+    @property
+    def nodes_per_second(self) -> float:
+        """
+        :return: the number of nodes searched per second in the last turn
+        """
+        return self.last_nodes / self.last_time if self.last_time > 0 else 0.
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        :return: the search statistics of the last turn and the totals of the player
+        """
+        return {
+            "depth": self.last_depth,
+            "nodes": self.last_nodes,
+            "time": self.last_time,
+            "nodes_per_second": self.nodes_per_second,
+            "value": self.last_value,
+            "total_nodes": self.total_nodes,
+            "total_time": self.total_time,
+        }
+
+    def _search_root(self, state: AbsBoardState, moves: Set[Any], depth: int, pv_move: Any) -> Tuple[Any, float]:
+        """searches the moves of the root, the best move of the previous depth first"""
+        pid = state.curr_pid
+        alpha = -math.inf
+        best_move, best_value = None, -math.inf
+        for move in self._order(moves, 0, pid, pv_move):
+            value = self._child_value(state, move, pid, depth, 0, alpha, math.inf)
+            if value > best_value:
+                best_move, best_value = move, value
+                alpha = value
+
+        if self.table is not None:
+            self.table.store(state, self._to_table(best_value, 0), depth, ScoreBound.EXACT, best_move)
+        return best_move, best_value
+
+    def _negamax(self, state: AbsBoardState, depth: int, ply: int, alpha: float, beta: float) -> float:
+        """returns the value of the state for its current player"""
+        self._nodes += 1
+        # a node of the python engines takes up to a few milliseconds, far longer than reading the clock
+        if time.perf_counter() > self._deadline:
+            raise _Timeout()
+
+        alpha_orig = alpha
+        tt_move = None
+        if self.table is not None:
+            entry = self.table.get(state)
+            if entry is not None:
+                tt_move = entry.move
+                if entry.depth >= depth:
+                    value = self._from_table(entry.value, ply)
+                    if entry.bound == ScoreBound.EXACT:
+                        return self._stored(value)
+                    if entry.bound == ScoreBound.LOWER:
+                        alpha = max(alpha, value)
+                    else:
+                        beta = min(beta, value)
+                    if alpha >= beta:
+                        return self._stored(value)
+
+        # the engines find the winner along with the moves
+        pid = state.curr_pid
+        moves = state.get_legal_moves()
+        winner = state.winner()
+        if winner != 0:
+            return 0. if winner == -1 else WIN - ply if winner == pid else ply - WIN
+        if depth == 0 or len(moves) == 0:
+            self._depth_limited = True
+            return float(self.evaluate(state, pid))
+
+        best_move, best_value = None, -math.inf
+        for move in self._order(moves, ply, pid, tt_move):
+            value = self._child_value(state, move, pid, depth, ply, alpha, beta)
+            if value > best_value:
+                best_move, best_value = move, value
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    self._cutoff(move, ply, pid, depth)
+                    break
+
+        if self.table is not None:
+            if best_value <= alpha_orig:
+                bound = ScoreBound.UPPER
+            elif best_value >= beta:
+                bound = ScoreBound.LOWER
+            else:
+                bound = ScoreBound.EXACT
+            self.table.store(state, self._to_table(best_value, ply), depth, bound, best_move)
+        return best_value
+
+    def _child_value(self, state: AbsBoardState, move: Any, pid: int, depth: int, ply: int,
+                     alpha: float, beta: float) -> float:
+        """returns the value of a move for the player playing it"""
+        state.push(move)
+        if state.curr_pid == pid:
+            value = self._negamax(state, depth - 1, ply + 1, alpha, beta)
+        else:
+            value = -self._negamax(state, depth - 1, ply + 1, -beta, -alpha)
+        state.pop()
+        return value
+
+    def _order(self, moves: Set[Any], ply: int, pid: int, first: Any) -> List[Any]:
+        """returns the moves by search order: the given move, the killer moves, then by history"""
+        ordered = list(moves)
+        if self.use_history:
+            ordered.sort(key=lambda m: self._history.get((pid, m), 0), reverse=True)
+
+        front = [first] if first is not None else []
+        if self.use_killers and ply < len(self._killers):
+            front.extend(self._killers[ply])
+        front = [m for m in dict.fromkeys(front) if m in moves]
+        if len(front) == 0:
+            return ordered
+        return front + [m for m in ordered if m not in front]
+
+    def _cutoff(self, move: Any, ply: int, pid: int, depth: int):
+        """records a move which cut the search"""
+        if self.use_killers:
+            while len(self._killers) <= ply:
+                self._killers.append([])
+            killers = self._killers[ply]
+            if move not in killers:
+                # two killers per ply, the last cut first
+                killers.insert(0, move)
+                del killers[2:]
+        if self.use_history:
+            key = (pid, move)
+            self._history[key] = self._history.get(key, 0) + depth * depth
+
+    def _stored(self, value: float) -> float:
+        """returns a value of the table, which may come from a search cut by the depth unless it is a result"""
+        if abs(value) <= WIN - MAX_PLY:
+            self._depth_limited = True
+        return value
+
+    @staticmethod
+    def _to_table(value: float, ply: int) -> float:
+        """the wins are stored as a number of plies from the stored position rather than from the root"""
+        if value > WIN - MAX_PLY:
+            return value + ply
+        if value < MAX_PLY - WIN:
+            return value - ply
+        return value
+
+    @staticmethod
+    def _from_table(value: float, ply: int) -> float:
+        if value > WIN - MAX_PLY:
+            return value - ply
+        if value < MAX_PLY - WIN:
+            return value + ply
+        return value
@@ -0,0 +1,195 @@
+from typing import Any, Optional, Set, List, Dict, Union
+from random import Random
+import math
+import time
+
+from GameEngines.abstract import AbsPlayer, AbsBoardState
+
+
+class _Node:
+    """node of the search tree, the states are not kept: they are rebuilt by pushing the moves from the root"""
+    __slots__ = ("move", "pid", "key", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, move: Any, pid: int, key: int, parent: Optional['_Node']):
+        self.move = move        # the move leading to the node
+        self.pid = pid          # the player who played the move
+        self.key = key          # the zobrist key of the state of the node
+        self.parent = parent
+        self.children: Dict[Any, '_Node'] = {}
+        self.untried: Optional[List[Any]] = None  # None until the moves of the node are generated
+        self.visits = 0
+        self.wins = 0.          # ties count as half a win
+
+    def size(self) -> int:
+        count = 0
+        stack = [self]
+        while len(stack) > 0:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children.values())
+        return count
+
+
+class MCTSPlayer(AbsPlayer):
+    """
+    Monte Carlo tree search player using the UCT selection. It works with the BoardState of any game: the tree is
+    explored by pushing and popping moves on a single copy of the state, and the rollouts are `random_playout`, which
+    the rust engines play natively.
+
+    The tree of a turn is kept, so the next turn starts from the subtree of the position reached, found by its zobrist
+    key among the descendants of the previous root.
+    """
+    def __init__(self, p_name: str = None, *, iterations: Optional[int] = 1000, time_limit: Optional[float] = None,
+                 exploration: float = math.sqrt(2), max_rollout_plies: int = 1000, reuse_tree: bool = True,
+                 seed: int = None):
+        """
+        :param p_name: the name of the player
+        :param iterations: the maximum number of iterations per turn, None for no limit
+        :param time_limit: the maximum time of search per turn in seconds, None for no limit
+        :param exploration: the exploration constant of the UCT formula
+        :param max_rollout_plies: the number of plies after which a rollout is stopped and scored with `score`
+        :param reuse_tree: if the subtree of the previous turn is reused
+        :param seed: the seed of the random moves
+        """
+        if iterations is None and time_limit is None:
+            raise ValueError("The search needs an iteration or a time budget")
+
+        self._name = p_name
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.max_rollout_plies = max_rollout_plies
+        self.reuse_tree = reuse_tree
+        self._rng = Random(seed)
+
+        self._root: Optional[_Node] = None
+        self.last_iterations = 0
+        self.last_time = 0.
+        self.reused_nodes = 0
+        self.total_rollouts = 0
+        self.total_time = 0.
+
+    def play(self, board: AbsBoardState, moves: Set[Any], pid: int) -> Any:
+        if len(moves) == 1:
+            return next(iter(moves))
+
+        self._root = self._find_root(board)
+        self.reused_nodes = self._root.size() - 1
+        self._search(board.copy(), self._root)
+
+        if len(self._root.children) == 0:
+            return self._rng.choice(list(moves))
+        best = max(self._root.children.values(), key=lambda n: n.visits)
+        return best.move
+
+    def reset(self):
+        """
+        drops the search tree, e.g. before a new game
+        """
+        self._root = None
+
+    @property
+    def node_count(self) -> int:
+        """
+        :return: the number of nodes of the current search tree
+        """
+        return 0 if self._root is None else self._root.size()
+
+    @property
+    def rollouts_per_second(self) -> float:
+        """
+        :return: the number of rollouts per second of the last turn
+        """
+        return self.last_iterations / self.last_time if self.last_time > 0 else 0.
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        :return: the search statistics of the last turn and the totals of the player
+        """
+        return {
+            "iterations": self.last_iterations,
+            "time": self.last_time,
+            "rollouts_per_second": self.rollouts_per_second,
+            "nodes": self.node_count,
+            "reused_nodes": self.reused_nodes,
+            "total_rollouts": self.total_rollouts,
+            "total_time": self.total_time,
+        }
+
+    def _find_root(self, board: AbsBoardState) -> _Node:
+        """returns the node of the given state in the previous tree, or a new root"""
+        key = board.zobrist
+        if self.reuse_tree and self._root is not None:
+            # the state is a few plies below the previous root: our move, then the moves of the opponent
+            level = [self._root]
+            for _ in range(4):
+                level = [c for n in level for c in n.children.values()]
+                for node in level:
+                    if node.key == key:
+                        node.parent = None
+                        return node
+
+        return _Node(None, 0, key, None)
+
+    def _search(self, state: AbsBoardState, root: _Node):
+        start = time.perf_counter()
+        deadline = math.inf if self.time_limit is None else start + self.time_limit
+        iterations = 0
+
+        while (self.iterations is None or iterations < self.iterations) and time.perf_counter() < deadline:
+            node = root
+            depth = 0
+
+            # selection
+            while node.untried is not None and len(node.untried) == 0 and len(node.children) > 0:
+                node = self._select(node)
+                state.push(node.move)
+                depth += 1
+
+            # expansion
+            if node.untried is None:
+                # the engines find the winner along with the moves
+                moves = state.get_legal_moves()
+                node.untried = list(moves) if state.winner() == 0 else []
+                self._rng.shuffle(node.untried)
+            if len(node.untried) > 0:
+                move = node.untried.pop()
+                pid = state.curr_pid
+                state.push(move)
+                depth += 1
+                child = _Node(move, pid, state.zobrist, node)
+                node.children[move] = child
+                node = child
+
+            winner = self._rollout(state)
+            for _ in range(depth):
+                state.pop()
+
+            # backpropagation
+            while node is not None:
+                node.visits += 1
+                if node.pid == winner:
+                    node.wins += 1
+                elif winner == -1:
+                    node.wins += .5
+                node = node.parent
+            iterations += 1
+
+        self.last_iterations = iterations
+        self.last_time = time.perf_counter() - start
+        self.total_rollouts += iterations
+        self.total_time += self.last_time
+
+    def _select(self, node: _Node) -> _Node:
+        log_visits = math.log(node.visits)
+        return max(
+            node.children.values(),
+            key=lambda c: c.wins / c.visits + self.exploration * math.sqrt(log_visits / c.visits)
+        )
+
+    def _rollout(self, state: AbsBoardState) -> int:
+        """plays a random game from the state and returns the winner, a stopped game is won by the best score"""
+        winner, score, _ = state.random_playout(self._rng.getrandbits(64), self.max_rollout_plies)
+        if winner == 0:
+            winner = -1 if score[0] == score[1] else 1 + int(score[1] > score[0])
+        return winner
@@ -0,0 +1,2 @@
+from .MCTSPlayer import MCTSPlayer
+from .AlphaBetaPlayer import AlphaBetaPlayer
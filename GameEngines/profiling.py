@@ -0,0 +1,234 @@
+from array import array
+from functools import wraps
+from inspect import getattr_static, isclass
+from random import Random
+from time import perf_counter_ns
+from typing import Optional, Dict, Union, List, Tuple, Iterable
+import importlib
+import sys
+import numpy as np
+
+from GameEngines.abstract import AbsSaveModule
+
+STATE_METHODS = [
+    "get_legal_moves", "legal_action_mask", "play", "push", "pop", "copy", "winner", "score", "random_playout"
+]
+SAVE_METHODS = ["save_state", "load_state", "save_many", "load_many"]
+PERCENTILES = (50, 90, 99)
+_MISSING = object()
+
+Target = Tuple[type, str]
+
+
+class MethodStats:
+    """
+    call statistics of a method. The latencies include the nested instrumented calls, their percentiles are computed
+    on a uniform sample of the calls
+    """
+    def __init__(self, max_samples: int = 10_000):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.allocations = 0  # the net number of memory blocks allocated by the calls, when tracked
+        self.max_samples = max_samples
+        self._samples = array("q")
+        self._rng = Random(0)
+
+    def add(self, ns: int, allocations: int = 0):
+        self.calls += 1
+        self.total_ns += ns
+        self.allocations += allocations
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+        if len(self._samples) < self.max_samples:
+            self._samples.append(ns)
+        else:
+            # reservoir sampling, every call has the same chance of being in the sample
+            i = self._rng.randrange(self.calls)
+            if i < self.max_samples:
+                self._samples[i] = ns
+
+    def percentile(self, q: float) -> float:
+        """
+        :param q: the percentile, between 0 and 100
+        :return: the percentile of the latency in nanoseconds
+        """
+        return float(np.percentile(self._samples, q)) if len(self._samples) > 0 else 0.
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        :return: the number of calls, the allocations and the total, mean, max and percentile latencies in nanoseconds
+        """
+        return {
+            "calls": self.calls,
+            "total_ns": self.total_ns,
+            "mean_ns": self.total_ns / self.calls if self.calls > 0 else 0.,
+            "max_ns": self.max_ns,
+            **{f"p{q}_ns": self.percentile(q) for q in PERCENTILES},
+            "allocations": self.allocations,
+        }
+
+
+class Profiler:
+    """
+    This Class measures the calls of methods of classes, by replacing the methods with timed wrappers until it is
+    removed. The classes are left untouched when no profiler is installed, so that the instrumentation costs nothing
+    when disabled.
+    """
+    def __init__(self, *, allocations: bool = False, max_samples: int = 10_000):
+        """
+        :param allocations: if the memory blocks allocated by the calls are counted
+        :param max_samples: the number of latencies kept per method to compute the percentiles
+        """
+        self.allocations = allocations
+        self.max_samples = max_samples
+        self.methods: Dict[str, MethodStats] = {}
+        self._originals: List[Tuple[type, str, object]] = []
+
+    def install(self, targets: Iterable[Target]):
+        """
+        replaces the methods by timed wrappers
+
+        :param targets: the classes and names of the methods to measure
+        """
+        for cls, name in targets:
+            static = getattr_static(cls, name)
+            wrapper = self._wrap(_label(cls, name), getattr(cls, name))
+            if isinstance(static, (staticmethod, classmethod)):
+                # the method is already bound to the class
+                wrapper = staticmethod(wrapper)
+
+            self._originals.append((cls, name, cls.__dict__.get(name, _MISSING)))
+            setattr(cls, name, wrapper)
+
+    def uninstall(self):
+        """
+        restores the original methods
+        """
+        for cls, name, original in reversed(self._originals):
+            if original is _MISSING:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+        self._originals = []
+
+    def reset(self):
+        self.methods = {}
+
+    def stats(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """
+        :return: the statistics of the called methods, see `MethodStats.stats`
+        """
+        return {name: m.stats() for name, m in self.methods.items() if m.calls > 0}
+
+    def report(self) -> str:
+        """
+        :return: a table of the statistics of the called methods, by decreasing total time
+        """
+        header = f"{'method':<48}{'calls':>10}{'total ms':>12}{'mean us':>10}" + \
+                 "".join(f"{f'p{q} us':>10}" for q in PERCENTILES) + f"{'max us':>10}{'allocs':>10}"
+        lines = [header, "-" * len(header)]
+        for name, s in sorted(self.stats().items(), key=lambda kv: -kv[1]["total_ns"]):
+            lines.append(
+                f"{name:<48}{s['calls']:>10}{s['total_ns'] / 1e6:>12.2f}{s['mean_ns'] / 1e3:>10.2f}" +
+                "".join(f"{s[f'p{q}_ns'] / 1e3:>10.2f}" for q in PERCENTILES) +
+                f"{s['max_ns'] / 1e3:>10.2f}{s['allocations']:>10}"
+            )
+        return "\n".join(lines)
+
+    def _wrap(self, label: str, func):
+        stats = self.methods.setdefault(label, MethodStats(self.max_samples))
+
+        if self.allocations:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                blocks = sys.getallocatedblocks()
+                beg = perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    stats.add(perf_counter_ns() - beg, sys.getallocatedblocks() - blocks)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                beg = perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    stats.add(perf_counter_ns() - beg)
+
+        # the wrapper is transparent to the methods unwrapping the caches of `cache_utils.cache_moves`
+        wrapper.__wrapped__ = getattr(func, "__wrapped__", func)
+        return wrapper
+
+
+def _label(cls: type, name: str) -> str:
+    """name of a method in the reports, e.g. `Avalam.PythonEngine.BoardState.play`"""
+    module = cls.__module__
+    if module.startswith("GameEngines."):
+        module = module[len("GameEngines."):]
+    if module.split(".")[-1] != cls.__qualname__:
+        module = f"{module}.{cls.__qualname__}"
+    return f"{module}.{name}"
+
+def default_targets() -> List[Target]:
+    """
+    :return: the methods of the rust and python BoardState and of the save modules of every game
+    """
+    targets = []
+    for game in ("Avalam", "Checkers", "UltiTTT", "Quoridor"):
+        package = importlib.import_module(f"GameEngines.{game}")
+        python_engine = importlib.import_module(f"GameEngines.{game}.PythonEngine.BoardState")
+        for cls in dict.fromkeys([package.BoardState, python_engine.BoardState]):
+            targets += [(cls, m) for m in STATE_METHODS]
+
+        save = importlib.import_module(f"GameEngines.{game}.SaveModule")
+        for cls in vars(save).values():
+            if isclass(cls) and issubclass(cls, AbsSaveModule) and cls.__module__ == save.__name__:
+                targets += [(cls, m) for m in SAVE_METHODS if hasattr(cls, m)]
+    return targets
+
+
+_profiler: Optional[Profiler] = None
+
+
+def enable(targets: Optional[Iterable[Target]] = None, *, allocations: bool = False,
+           max_samples: int = 10_000) -> Profiler:
+    """
+    enables the profiling of the engines, replacing the previous profiler
+
+    :param targets: the classes and names of the methods to measure, `default_targets()` if None
+    :param allocations: if the memory blocks allocated by the calls are counted
+    :param max_samples: the number of latencies kept per method to compute the percentiles
+    :return: the new profiler
+    """
+    global _profiler
+    disable()
+    _profiler = Profiler(allocations=allocations, max_samples=max_samples)
+    _profiler.install(default_targets() if targets is None else targets)
+    return _profiler
+
+def disable():
+    global _profiler
+    if _profiler is not None:
+        _profiler.uninstall()
+    _profiler = None
+
+def profiler() -> Optional[Profiler]:
+    """
+    :return: the enabled profiler, None if the profiling is disabled
+    """
+    return _profiler
+
+def stats() -> Optional[Dict[str, Dict[str, Union[int, float]]]]:
+    """
+    :return: the statistics of the enabled profiler, None if the profiling is disabled
+    """
+    return None if _profiler is None else _profiler.stats()
+
+def report() -> str:
+    """
+    :return: the report of the enabled profiler
+    """
+    return "profiling is disabled" if _profiler is None else _profiler.report()
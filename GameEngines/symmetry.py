@@ -0,0 +1,42 @@
+from typing import Tuple
+
+# The symmetries of a square board: the transform t mirrors the columns if t >= 4, then rotates the board by t % 4
+# quarter turns clockwise. The transform 0 is the identity
+D4 = 8
+
+
+def transform_coords(coords: Tuple[int, int], transform: int, size: int) -> Tuple[int, int]:
+    """
+    returns the coordinates of a cell of a square board after a transform. The rust engines use the same transforms
+
+    :param coords: the (row, column) of the cell
+    :param transform: the index of the transform, between 0 and D4
+    :param size: the size of the board
+    :return: the (row, column) of the cell on the transformed board
+    """
+    i, j = coords
+    if transform >= 4:
+        j = size - 1 - j
+    for _ in range(transform % 4):
+        i, j = j, size - 1 - i
+    return i, j
+
+
+def transform_vector(vector: Tuple[int, int], transform: int) -> Tuple[int, int]:
+    """returns a (row, column) displacement on the board after a transform"""
+    di, dj = vector
+    if transform >= 4:
+        dj = -dj
+    for _ in range(transform % 4):
+        di, dj = dj, -di
+    return di, dj
+
+
+def inverse(transform: int) -> int:
+    """returns the transform undoing a transform: the mirrors are their own inverse"""
+    return transform if transform >= 4 else -transform % 4
+
+
+def check_transform(transform: int, n_symmetries: int):
+    if not 0 <= transform < n_symmetries:
+        raise ValueError(f"invalid transform {transform}, the game has {n_symmetries} symmetries")
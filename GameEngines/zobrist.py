@@ -0,0 +1,23 @@
+from typing import List
+
+_MASK = (1 << 64) - 1
+
+
+def zobrist_keys(n: int, seed: int) -> List[int]:
+    """
+    generates the random keys used for the zobrist hashing of a game. The keys come from a splitmix64 generator, so the
+    rust engines generate the exact same keys and both engines give the same hash to the same state
+
+    :param n: the number of keys
+    :param seed: the seed of the generator, one per game
+    :return: a list of n unsigned 64 bits keys
+    """
+    keys = []
+    state = seed
+    for _ in range(n):
+        state = (state + 0x9E3779B97F4A7C15) & _MASK
+        z = state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+        keys.append(z ^ (z >> 31))
+    return keys
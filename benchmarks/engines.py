@@ -0,0 +1,251 @@
+"""
+Benchmarks of the engines of every game, for the rust and the python back ends.
+
+    python benchmarks/engines.py --out results.json
+    python benchmarks/engines.py --out new.json --compare results.json
+
+Each benchmark runs its operation on a fixed set of positions taken along seeded random games, and reports the best
+time per operation over a few repeats. The results are written as JSON with the commit they were measured on, and
+comparing them to a previous run lists the benchmarks that got slower than a threshold.
+"""
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional, Tuple, Type
+import argparse
+import importlib
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from GameEngines import Game, RandomPlayer
+from GameEngines.abstract import AbsBoardState
+
+GAMES = ["Avalam", "Checkers", "UltiTTT", "Quoridor"]
+BACKENDS = ["rust", "python"]
+
+
+def backend_class(game: str, backend: str) -> Optional[Type[AbsBoardState]]:
+    """
+    :return: the BoardState class of a back end of a game, None if the rust engine is not built
+    """
+    python = importlib.import_module(f"GameEngines.{game}.PythonEngine.BoardState").BoardState
+    if backend == "python":
+        return python
+    rust = importlib.import_module(f"GameEngines.{game}").BoardState
+    return None if rust is python else rust
+
+
+def positions(board_class: Type[AbsBoardState], n: int, seed: int) -> List[Tuple[AbsBoardState, Any]]:
+    """positions along seeded random games, with a legal move of each position"""
+    rng = random.Random(seed)
+    out = []
+    while len(out) < n:
+        state = board_class()
+        while len(out) < n and state.winner() == 0:
+            move = rng.choice(sorted(state.get_legal_moves(), key=str))
+            out.append((state, move))
+            state = state.play(move)
+    return out
+
+
+def measure(op: Callable[[], Any], ops: int, min_time: float, repeat: int) -> Dict[str, float]:
+    """
+    :param op: a function running `ops` operations
+    :param ops: the number of operations of a call
+    :param min_time: the minimum duration of a repeat in seconds, the calls are repeated to reach it
+    :param repeat: the number of repeats, the best is kept
+    :return: the time per operation and the number of operations per second
+    """
+    calls = 1
+    while True:
+        beg = time.perf_counter()
+        for _ in range(calls):
+            op()
+        elapsed = time.perf_counter() - beg
+        if elapsed >= min_time:
+            break
+        calls *= 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        beg = time.perf_counter()
+        for _ in range(calls):
+            op()
+        best = min(best, time.perf_counter() - beg)
+
+    per_op = best / (calls * ops)
+    return {"ns_per_op": per_op * 1e9, "ops_per_sec": 1 / per_op if per_op > 0 else 0.}
+
+
+def bench_game(game: str, board_class: Type[AbsBoardState], *, n_positions: int, min_time: float, repeat: int,
+               seed: int) -> Dict[str, Dict[str, float]]:
+    """runs the benchmarks of a back end of a game"""
+    save = importlib.import_module(f"GameEngines.{game}.SaveModule")
+    json_module = getattr(save, f"{game}Save")
+    binary_module = getattr(save, f"{game}BinarySave")
+
+    sample = positions(board_class, n_positions, seed)
+    states = [s for s, _ in sample]
+    n = len(sample)
+
+    def legal_moves():
+        for s in states:
+            s.get_legal_moves()
+
+    def play():
+        for s, m in sample:
+            s.play(m)
+
+    def push_pop():
+        for s, m in sample:
+            s.push(m)
+            s.pop()
+
+    def copy():
+        for s in states:
+            s.copy()
+
+    def winner():
+        for s in states:
+            s.winner()
+
+    def random_games():
+        random.seed(seed)
+        Game(board_class, RandomPlayer(), RandomPlayer()).play_full()
+
+    def playouts():
+        for i, s in enumerate(states[:8]):
+            s.copy().random_playout(seed + i)
+
+    results = {
+        "get_legal_moves": measure(legal_moves, n, min_time, repeat),
+        "play": measure(play, n, min_time, repeat),
+        "push_pop": measure(push_pop, n, min_time, repeat),
+        "copy": measure(copy, n, min_time, repeat),
+        "winner": measure(winner, n, min_time, repeat),
+        "random_game": measure(random_games, 1, min_time, repeat),
+        "random_playout": measure(playouts, min(8, n), min_time, repeat),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file, binary_file = Path(tmp) / "state.json", Path(tmp) / "states.bin"
+
+        def json_save():
+            for s in states:
+                json_module.save_state(json_file, s)
+
+        def json_load():
+            for _ in states:
+                json_module.load_state(json_file, board_class)
+
+        def binary_save():
+            binary_module.save_many(binary_file, states)
+
+        def binary_load():
+            binary_module.load_many(binary_file, board_class)
+
+        results["json_save"] = measure(json_save, n, min_time, repeat)
+        results["json_load"] = measure(json_load, n, min_time, repeat)
+        results["binary_save"] = measure(binary_save, n, min_time, repeat)
+        results["binary_load"] = measure(binary_load, n, min_time, repeat)
+
+    return results
+
+
+def run(games: List[str], backends: List[str], *, n_positions: int, min_time: float, repeat: int,
+        seed: int) -> Dict[str, Dict[str, float]]:
+    """
+    :return: the results indexed by `game/backend/benchmark`
+    """
+    results = {}
+    for game in games:
+        for backend in backends:
+            board_class = backend_class(game, backend)
+            if board_class is None:
+                print(f"{game}/{backend}: the rust engine is not built, skipped", file=sys.stderr)
+                continue
+
+            print(f"{game}/{backend}...", file=sys.stderr)
+            bench = bench_game(game, board_class, n_positions=n_positions, min_time=min_time, repeat=repeat, seed=seed)
+            results.update({f"{game}/{backend}/{name}": r for name, r in bench.items()})
+    return results
+
+
+def metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, cwd=Path(__file__).parent, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """
+    prints the speed ratio of the benchmarks present in both results
+
+    :param threshold: the relative slowdown above which a benchmark is a regression
+    :return: the regressed benchmarks
+    """
+    regressions = []
+    print(f"{'benchmark':<40}{'baseline ns':>14}{'new ns':>14}{'speedup':>10}")
+    for name in sorted(set(results) & set(baseline)):
+        old, new = baseline[name]["ns_per_op"], results[name]["ns_per_op"]
+        speedup = old / new if new > 0 else float("inf")
+        flag = ""
+        if new > old * (1 + threshold):
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40}{old:>14.0f}{new:>14.0f}{speedup:>9.2f}x{flag}")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", nargs="+", choices=GAMES, default=GAMES)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--positions", type=int, default=64, help="number of positions per benchmark")
+    parser.add_argument("--min-time", type=float, default=.2, help="minimum duration of a repeat in seconds")
+    parser.add_argument("--repeat", type=int, default=3, help="number of repeats, the best is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="the JSON file of the results")
+    parser.add_argument("--compare", type=Path, help="a previous JSON file of results to compare with")
+    parser.add_argument("--threshold", type=float, default=.1, help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.games, args.backends, n_positions=args.positions, min_time=args.min_time, repeat=args.repeat,
+                  seed=args.seed)
+    settings = {"positions": args.positions, "min_time": args.min_time, "repeat": args.repeat, "seed": args.seed}
+    data = {"meta": metadata(), "settings": settings, "results": results}
+
+    if args.out is not None:
+        args.out.write_text(json.dumps(data, indent=2))
+    else:
+        print(json.dumps(data, indent=2))
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())
+        if baseline.get("settings") != settings:
+            print(f"the settings differ from the baseline: {baseline.get('settings')}", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.threshold)
+        return 1 if len(regressions) > 0 else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Perft of the engines of every game, for the rust and the python back ends.
+
+    python benchmarks/perft.py --out perft.json
+    python benchmarks/perft.py --games UltiTTT --backends rust --depth 6
+
+Each engine counts the leaf positions a number of moves away from the initial state of the game. The counts are checked
+against the reference counts of `GameEngines.perft` and reported with the nodes per second, as JSON with the commit
+they were measured on. The exit code is 1 if a count differs from its reference.
+"""
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+import argparse
+import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from GameEngines.perft import REFERENCE, perft
+from engines import GAMES, BACKENDS, backend_class, metadata
+
+# the default depth of each game, a few seconds for the python engines
+DEPTHS = {"Avalam": 2, "Checkers": 7, "UltiTTT": 5, "Quoridor": 2}
+
+
+def run(games: List[str], backends: List[str], depth: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    :param depth: the depth of every game, the default depth of each game if None
+    :return: the results indexed by `game/backend`
+    """
+    results = {}
+    print(f"{'engine':<20}{'depth':>6}{'nodes':>14}{'seconds':>10}{'nodes/s':>14}  reference", file=sys.stderr)
+    for game in games:
+        for backend in backends:
+            board_class = backend_class(game, backend)
+            if board_class is None:
+                print(f"{game}/{backend}: the rust engine is not built, skipped", file=sys.stderr)
+                continue
+
+            result = perft(board_class(), DEPTHS[game] if depth is None else depth)
+            reference = REFERENCE[game][result.depth] if result.depth < len(REFERENCE[game]) else None
+            results[f"{game}/{backend}"] = {
+                "depth": result.depth,
+                "nodes": result.nodes,
+                "seconds": result.seconds,
+                "nodes_per_sec": result.nodes_per_sec,
+                "reference": reference,
+            }
+
+            check = "unknown" if reference is None else "ok" if reference == result.nodes else f"WRONG ({reference})"
+            print(
+                f"{game + '/' + backend:<20}{result.depth:>6}{result.nodes:>14}{result.seconds:>10.3f}"
+                f"{result.nodes_per_sec:>14.0f}  {check}", file=sys.stderr
+            )
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", nargs="+", choices=GAMES, default=GAMES)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--depth", type=int, help="the depth of every game, instead of the default depth of each game")
+    parser.add_argument("--out", type=Path, help="the JSON file of the results")
+    args = parser.parse_args(argv)
+
+    results = run(args.games, args.backends, args.depth)
+    data = {"meta": metadata(), "results": results}
+    if args.out is not None:
+        args.out.write_text(json.dumps(data, indent=2))
+    else:
+        print(json.dumps(data, indent=2))
+
+    wrong = [name for name, r in results.items() if r["reference"] is not None and r["reference"] != r["nodes"]]
+    return 1 if len(wrong) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
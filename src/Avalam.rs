@@ -1,26 +1,269 @@
 use itertools::{Itertools};
-use ndarray::{Array2, Array3, array, ArrayView2};
-use numpy::{PyArray2, PyArray3, PyArrayMethods};
+use ndarray::{Array2, Array3, Array4, array, ArrayView2, ArrayView3, ArrayViewMut1, ArrayViewMut2, ArrayViewMut3, Axis};
+use numpy::{PyArray1, PyArray2, PyArray3, PyArray4, PyArrayMethods, PyReadonlyArray1, PyReadonlyArray2, PyReadonlyArray3};
 use pyo3::prelude::*;
 use pyo3::{Py, pyclass, pymethods, Python, PyTypeInfo};
+use pyo3::exceptions::{PyIndexError, PyValueError};
 use pyo3::types::{PyBool, PyNotImplemented, PySet, PyString, PyType};
 use pyo3::class::basic::CompareOp;
+use crate::utils::{check_transform, copy_move_cache, d4_coords, d4_inverse, mask_buffer, rollouts_to_py, zobrist_keys, Playout, Rollouts, SplitMix64, D4};
 
 
 type Coords = (usize, usize);
 type Move = (Coords, Coords);
 
+/// Action space of the Avalam game: 81 origin cells x 8 directions
+const DIRECTIONS: [(isize, isize); 8] = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)];
+const ACTION_SIZE: usize = 81 * 8;
+
+/// Zobrist keys of the Avalam game: one key per cell and tower (5 heights x 2 owners), then the
+/// second player to move. They are the keys of `GameEngines.Avalam.utilsTypes`
+static ZOBRIST_KEYS: [u64; 81 * 10 + 1] = zobrist_keys(2);
+const Z_SIDE: usize = 81 * 10;
+
+/// The neighbour cell (9 * i + j) of each cell in each direction, NONE if it is off the board
+const NONE: u8 = u8::MAX;
+static NEIGHBOURS: [[u8; 8]; 81] = neighbours();
+
+const fn neighbours() -> [[u8; 8]; 81] {
+    let mut table = [[NONE; 8]; 81];
+    let mut cell = 0;
+    while cell < 81 {
+        let (i, j) = ((cell / 9) as isize, (cell % 9) as isize);
+        let mut d = 0;
+        while d < 8 {
+            let (k, l) = (i + DIRECTIONS[d].0, j + DIRECTIONS[d].1);
+            if 0 <= k && k < 9 && 0 <= l && l < 9 { table[cell][d] = (9 * k + l) as u8; }
+            d += 1;
+        }
+        cell += 1;
+    }
+    return table;
+}
+
+/// The cell and the direction under each symmetry of the board, see `d4_coords`
+static CELLS: [[u8; 81]; D4] = cells_table();
+static DIRS: [[u8; 8]; D4] = dirs_table();
+
+const fn cells_table() -> [[u8; 81]; D4] {
+    let mut table = [[0; 81]; D4];
+    let mut t = 0;
+    while t < D4 {
+        let mut cell = 0;
+        while cell < 81 {
+            let (i, j) = d4_coords(t, cell / 9, cell % 9, 9);
+            table[t][cell] = (9 * i + j) as u8;
+            cell += 1;
+        }
+        t += 1;
+    }
+    return table;
+}
+
+const fn dirs_table() -> [[u8; 8]; D4] {
+    let mut table = [[0; 8]; D4];
+    let mut t = 0;
+    while t < D4 {
+        let mut d = 0;
+        while d < 8 {
+            // the direction is the neighbour of the center of a 3x3 board, which all the symmetries keep
+            let (i, j) = d4_coords(t, (1 + DIRECTIONS[d].0) as usize, (1 + DIRECTIONS[d].1) as usize, 3);
+            let mut n = 0;
+            while DIRECTIONS[n].0 != i as isize - 1 || DIRECTIONS[n].1 != j as isize - 1 { n += 1; }
+            table[t][d] = n as u8;
+            d += 1;
+        }
+        t += 1;
+    }
+    return table;
+}
+
+fn coords(cell: usize) -> Coords { return (cell / 9, cell % 9) }
+
+fn cell_of(c: Coords) -> usize { return 9 * c.0 + c.1 }
+
+
+/// Compact representation of an Avalam board: the height of each tower, the owner of its top as a
+/// bit (set for the second player) and the number of pieces of each player in it. The raw board
+/// and ratios of the python engine are only built when python asks for them.
+///
+/// The directions of the legal moves of each cell are kept as bits: a move only changes the moves
+/// of the cells around its origin and destination, which are the only ones updated by `play`
+#[derive(Clone, Copy, PartialEq, Eq, Debug)]
+struct Towers {
+    heights: [u8; 81],
+    owners: u128,
+    ratios: [[u8; 81]; 2],
+    dirs: [u8; 81],
+    n_moves: u32,
+}
+
+impl Towers {
+    fn from_arrays(board: &ArrayView2<i64>, ratios: &ArrayView3<i64>) -> Self {
+        let mut towers = Towers { heights: [0; 81], owners: 0, ratios: [[0; 81]; 2], dirs: [0; 81], n_moves: 0 };
+        towers.set_board(board);
+        towers.set_ratios(ratios);
+        return towers;
+    }
+
+    fn set_board(&mut self, board: &ArrayView2<i64>) {
+        self.owners = 0;
+        for ((i, j), &v) in board.indexed_iter() {
+            self.heights[9 * i + j] = v.unsigned_abs() as u8;
+            if v < 0 { self.owners |= 1 << (9 * i + j); }
+        }
+        for cell in 0..81 { self.update_moves(cell); }
+    }
+
+    fn set_ratios(&mut self, ratios: &ArrayView3<i64>) {
+        for ((p, i, j), &v) in ratios.indexed_iter() {
+            self.ratios[p][9 * i + j] = v as u8;
+        }
+    }
+
+    /// returns the tower of a cell as in the raw board: its height, negative for the second player
+    fn tower(&self, cell: usize) -> i64 {
+        let height = self.heights[cell] as i64;
+        return if self.owners & (1 << cell) != 0 { -height } else { height };
+    }
+
+    fn board(&self) -> Array2<i64> {
+        return Array2::from_shape_fn((9, 9), |(i, j)| self.tower(9 * i + j));
+    }
+
+    fn ratios(&self) -> Array3<i64> {
+        return Array3::from_shape_fn((2, 9, 9), |(p, i, j)| self.ratios[p][9 * i + j] as i64);
+    }
+
+    /// stacks the tower of a cell on the tower of another cell
+    fn play(&mut self, origin: usize, dest: usize) {
+        self.heights[dest] += self.heights[origin];
+        self.heights[origin] = 0;
+        // the top of the moved tower becomes the top of the destination
+        self.owners = (self.owners & !(1 << dest)) | (((self.owners >> origin) & 1) << dest);
+        self.owners &= !(1 << origin);
+        for p in 0..2 {
+            self.ratios[p][dest] += self.ratios[p][origin];
+            self.ratios[p][origin] = 0;
+        }
+
+        for cell in [origin, dest] {
+            self.update_moves(cell);
+            for &n in NEIGHBOURS[cell].iter().filter(|&&n| n != NONE) { self.update_moves(n as usize); }
+        }
+    }
+
+    /// recomputes the directions of the legal moves of a cell
+    fn update_moves(&mut self, cell: usize) {
+        let height = self.heights[cell];
+        let dirs = if height == 0 || height >= 5 { 0 } else {
+            (0..8).fold(0u8, |dirs, d| {
+                let n = NEIGHBOURS[cell][d];
+                let legal = n != NONE && self.heights[n as usize] > 0 && height + self.heights[n as usize] <= 5;
+                dirs | (u8::from(legal) << d)
+            })
+        };
+        self.n_moves = self.n_moves + dirs.count_ones() - self.dirs[cell].count_ones();
+        self.dirs[cell] = dirs;
+    }
+
+    /// returns the legal moves as (cell, direction) pairs, the action of a pair being 8 * cell + direction
+    fn actions(&self) -> impl Iterator<Item = (usize, usize)> + '_ {
+        return (0..81).filter(move |&c| self.dirs[c] != 0)
+            .flat_map(move |c| (0..8).filter(move |&d| self.dirs[c] & (1 << d) != 0).map(move |d| (c, d)));
+    }
+
+    fn moves(&self) -> Vec<Move> {
+        return self.actions().map(|(c, d)| (coords(c), coords(NEIGHBOURS[c][d] as usize))).collect_vec();
+    }
+
+    fn has_moves(&self) -> bool {
+        return self.n_moves > 0;
+    }
+
+    /// sets the actions of the legal moves in a cleared mask
+    fn legal_mask(&self, mask: &mut ArrayViewMut1<bool>) {
+        for (c, d) in self.actions() { mask[8 * c + d] = true; }
+    }
+
+    /// returns the towers under a symmetry of the board. The directions of the moves are moved
+    /// with their cell instead of being recomputed
+    fn transformed(&self, transform: usize) -> Towers {
+        let mut towers = Towers { heights: [0; 81], owners: 0, ratios: [[0; 81]; 2], dirs: [0; 81], n_moves: self.n_moves };
+        for cell in 0..81 {
+            let to = CELLS[transform][cell] as usize;
+            towers.heights[to] = self.heights[cell];
+            towers.owners |= ((self.owners >> cell) & 1) << to;
+            towers.ratios[0][to] = self.ratios[0][cell];
+            towers.ratios[1][to] = self.ratios[1][cell];
+            towers.dirs[to] = (0..8).fold(0u8, |dirs, d| dirs | ((self.dirs[cell] >> d) & 1) << DIRS[transform][d]);
+        }
+        return towers;
+    }
+
+    /// returns the number of towers controlled by each player
+    fn score(&self) -> (usize, usize) {
+        let towers = self.heights.iter().enumerate().filter(|&(_, &h)| h > 0);
+        let p2 = towers.clone().filter(|&(c, _)| self.owners & (1 << c) != 0).count();
+        return (towers.count() - p2, p2);
+    }
+
+    /// returns the winner (0 if unfinished, -1 if tied)
+    fn winner(&self) -> isize {
+        if self.has_moves() { return 0; }
+
+        let (p1, p2) = self.score();
+        if p1 == p2 { return -1 }
+        return isize::from(p1 < p2) + 1
+    }
+
+    /// computes the zobrist key from scratch
+    fn zobrist(&self, curr_pid: u32) -> u64 {
+        let side = if curr_pid == 2 { ZOBRIST_KEYS[Z_SIDE] } else { 0 };
+        return (0..81).fold(side, |key, c| key ^ tower_key(coords(c), self.tower(c)));
+    }
+
+    /// counts the leaf positions `depth` moves away from the towers, see `RawAvalamState.perft`
+    fn perft(&self, depth: u32) -> u64 {
+        if depth == 0 { return 1; }
+        // the game is over when no move is left, the leaves are counted without being played
+        if depth == 1 { return self.n_moves as u64; }
+        return self.actions().map(|(c, d)| {
+            let mut child = *self;
+            child.play(c, NEIGHBOURS[c][d] as usize);
+            child.perft(depth - 1)
+        }).sum();
+    }
+
+    /// plays random moves until the end of the game or `max_plies` moves, see
+    /// `RawAvalamState.random_playout`
+    fn random_playout(mut self, rng: &mut SplitMix64, max_plies: u32) -> Playout {
+        let mut plies = 0;
+        while plies < max_plies && self.n_moves > 0 {
+            let (c, d) = self.actions().nth(rng.below(self.n_moves as usize)).unwrap();
+            self.play(c, NEIGHBOURS[c][d] as usize);
+            plies += 1;
+        }
+        return (self.winner() as i64, self.score(), plies);
+    }
+}
+
+
 #[derive(Clone)]
 #[pyclass(subclass, dict)]
 pub struct RawAvalamState {
-    #[pyo3(get, set)]
-    _board: Py<PyArray2<i64>>,
-    #[pyo3(get, set)]
-    _ratios: Py<PyArray3<i64>>,
+    _towers: Towers,
     #[pyo3(get, set)]
     _curr_pid: u32,
     #[pyo3(get, set)]
     _turn: u32,
+    #[pyo3(get, set)]
+    _zobrist: u64,
+    // the pushed moves with the towers and key they replaced, the last one at the end
+    _undo: Vec<(Move, Towers, u64)>,
+    // the legal moves cached by `GameEngines.cache_utils`, dropped when the State changes
+    #[pyo3(get, set)]
+    _move_cache: Option<Py<PySet>>,
 
     #[pyo3(get, set)]
     _save_mod: Py<PyType>
@@ -77,6 +320,26 @@ impl RawAvalamState {
         })
     }
 
+    /// plays a move on the State in place
+    fn apply(&mut self, c_move: Move) {
+        let (origin, dest) = (cell_of(c_move.0), cell_of(c_move.1));
+        let (top, bottom) = (self._towers.tower(origin), self._towers.tower(dest));
+        self._towers.play(origin, dest);
+
+        self._turn += 1;
+        self._curr_pid = (self._curr_pid % 2) + 1;
+        self._zobrist ^= tower_key(c_move.0, top) ^ tower_key(c_move.1, bottom)
+            ^ tower_key(c_move.1, self._towers.tower(dest)) ^ ZOBRIST_KEYS[Z_SIDE];
+    }
+
+    /// returns the State under a symmetry, see `Towers.transformed`
+    fn transformed(&self, py: Python, transform: usize) -> PyResult<Self> {
+        let mut new_state = self.copy(py, false)?;
+        new_state._towers = self._towers.transformed(transform);
+        new_state._zobrist = new_state._towers.zobrist(self._curr_pid);
+        return Ok(new_state);
+    }
+
     fn _moves_for(abs_board: &Array2<i64>, i: usize, j: usize) -> Vec<Move> {
         let (_i, _j) = (isize::try_from(i).unwrap(), isize::try_from(j).unwrap());
         let v = abs_board[(i, j)];
@@ -97,17 +360,6 @@ impl RawAvalamState {
             }
         }).collect_vec();
     }
-
-    fn _has_moves(&self, py: Python) -> bool {
-        let board:ArrayView2<i64> = unsafe { self._board.bind(py).as_array() };
-        let abs_board = board.mapv(|v|v.abs());
-        let towers = abs_board.map(|&v| ((0 < v) & (v < 5)));
-
-        return towers.indexed_iter().find(|((i, j), &v)| {
-            if v { Self::_moves_for(&abs_board, *i, *j).len() > 0 }
-            else { false }
-        }).is_some();
-    }
 }
 
 #[pymethods]
@@ -115,20 +367,21 @@ impl RawAvalamState {
     #[new]
     #[pyo3(signature=(save_module=None))]
     /// Creates the initial Avalam State python object
-    fn new<'py>(py: Python<'py>, save_module: Option<Bound<'_, PyType>>) -> PyResult<Self>{
+    fn new(save_module: Option<Bound<'_, PyType>>) -> PyResult<Self>{
         let avalam_save: Py<PyType> = match save_module {
             None => { Self::default_save_mod()}
             Some(save_mod) => {save_mod.unbind()}
         };
 
-        let board = PyArray2::from_owned_array(py, RawAvalamState::base_array());
-        let ratios = PyArray3::from_owned_array(py, RawAvalamState::base_ratios());
+        let towers = Towers::from_arrays(&Self::base_array().view(), &Self::base_ratios().view());
 
         return Ok(RawAvalamState {
-            _board: board.unbind(),
-            _ratios: ratios.unbind(),
+            _zobrist: towers.zobrist(1),
+            _towers: towers,
             _turn: 0,
             _curr_pid: 1,
+            _undo: Vec::new(),
+            _move_cache: None,
             _save_mod: avalam_save
         })
     }
@@ -136,106 +389,141 @@ impl RawAvalamState {
     fn __richcmp__<'py>(&self, py: Python<'py>, other: &Self, op: CompareOp) -> PyResult<Bound<'py, PyBool>> {
         return match op {
             CompareOp::Eq => {
-                let board_eq = std::iter::zip(
-                    self._board.bind(py).to_owned_array(),
-                    other._board.bind(py).to_owned_array()
-                ).all(|(a, b)| a == b);
-
-                let ratios_eq = std::iter::zip(
-                    self._ratios.bind(py).to_owned_array(),
-                    other._ratios.bind(py).to_owned_array()
-                ).all(|(a, b)| a == b);
-
-                let turn_eq = self._turn == other._turn;
-                let curr_pid_eq = self._curr_pid == other._curr_pid;
-
-                let res = board_eq && ratios_eq && turn_eq && curr_pid_eq;
+                let res = self._towers == other._towers &&
+                    self._turn == other._turn &&
+                    self._curr_pid == other._curr_pid;
                 Ok(PyBool::new(py, res).to_owned())
             },
             _ => { Err(PyErr::new::<PyNotImplemented, _>("")) },
         }
     }
 
-    /// copies and returns a python avalam State object
-    fn copy<'py>(&self, py: Python<'py>) -> PyResult<Self> {
-
-        let board = unsafe { PyArray2::new(py, self._board.bind(py).dims(), false) };
-        let ratios = unsafe { PyArray3::new(py, self._ratios.bind(py).dims(), false) };
-
-        self._board.bind(py).copy_to(&board)?;
-        self._ratios.bind(py).copy_to(&ratios)?;
-
+    #[pyo3(signature=(*, cache=false))]
+    /// copies and returns a python avalam State object. The cached moves are only copied if
+    /// `cache` is true
+    fn copy<'py>(&self, py: Python<'py>, cache: bool) -> PyResult<Self> {
         Ok(RawAvalamState {
-            _board: board.unbind(),
-            _ratios: ratios.unbind(),
+            _towers: self._towers,
             _turn: self._turn,
             _curr_pid: self._curr_pid,
+            _zobrist: self._zobrist,
+            _undo: Vec::new(),
+            _move_cache: copy_move_cache(py, &self._move_cache, cache)?,
             _save_mod: self._save_mod.clone_ref(py)
         })
     }
 
     /// play an action on the Avalam State and returns the following State object
-    fn play<'py>(&mut self, py: Python<'py>, c_move: Move) -> PyResult<Self> {
-        let origin = c_move.0;
-        let dest = c_move.1;
+    fn play<'py>(&self, py: Python<'py>, c_move: Move) -> PyResult<Self> {
+        let mut new_board = self.copy(py, false)?;
+        new_board.apply(c_move);
+        return Ok(new_board);
+    }
 
-        let mut new_board = self.copy(py)?;
-        new_board._turn += 1;
+    /// plays an action on the Avalam State in place. The replaced towers are kept to undo the
+    /// action with `pop`
+    fn push(&mut self, c_move: Move) {
+        self._undo.push((c_move, self._towers, self._zobrist));
+        self._move_cache = None;
+        self.apply(c_move);
+    }
 
-        // board Update
-        let b_ref = new_board._board.bind(py);
-        let top = unsafe{ *b_ref.uget(origin) };
-        let bottom = unsafe{ *b_ref.uget(dest) };
-        let final_val = top.signum() * bottom.abs() + top;
+    /// undoes the last action played by `push` in place and returns it
+    fn pop(&mut self) -> PyResult<Move> {
+        let (c_move, towers, zobrist) = self._undo.pop()
+            .ok_or_else(|| PyIndexError::new_err("no pushed move to pop"))?;
+        self._towers = towers;
+        self._zobrist = zobrist;
+        self._move_cache = None;
+
+        self._turn -= 1;
+        self._curr_pid = (self._curr_pid % 2) + 1;
+        return Ok(c_move);
+    }
 
-        b_ref.set_item(origin, 0).expect("Origin outside expected range");
-        b_ref.set_item(dest, final_val).expect("Destination outside expected range");
+    /// standard implementation of the `get_legal_moves` python method. it returns the legal
+    /// actions the specified player can take. In the case of the Avalam game, both players can
+    /// play the same set of moves
+    fn get_legal_moves<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PySet>> {
+        return PySet::new(py, self._towers.moves());
+    }
 
-        // Ratios Update
-        let r_ref = new_board._ratios.bind(py);
-        let top_0 = unsafe{ *r_ref.uget((0, origin.0, origin.1)) };
-        let top_1 = unsafe{ *r_ref.uget((1, origin.0, origin.1)) };
+    #[classattr]
+    const ACTION_SIZE: usize = ACTION_SIZE;
+
+    #[pyo3(signature=(out=None))]
+    /// returns the legal actions of the State as a boolean mask over the action space of the game
+    /// (81 origin cells x 8 directions). If `out` is given, the mask is written in it instead of a
+    /// new array
+    fn legal_action_mask<'py>(&self, py: Python<'py>, out: Option<Bound<'py, PyArray1<bool>>>) -> PyResult<Bound<'py, PyArray1<bool>>> {
+        let mask = mask_buffer(py, out, ACTION_SIZE)?;
+        self._towers.legal_mask(&mut unsafe { mask.as_array_mut() });
+        return Ok(mask);
+    }
 
-        let bottom_0 = unsafe{ *r_ref.uget((0, dest.0, dest.1)) };
-        let bottom_1 = unsafe{ *r_ref.uget((1, dest.0, dest.1)) };
+    /// returns the index of a move in the action space of the game
+    fn move_to_action(&self, c_move: Move) -> PyResult<usize> {
+        return move_to_action(c_move)
+            .ok_or_else(|| PyValueError::new_err(format!("{c_move:?} is not in the action space")));
+    }
 
-        r_ref.set_item((0, origin.0, origin.1), 0).expect("Origin outside expected range");
-        r_ref.set_item((1, origin.0, origin.1), 0).expect("Origin outside expected range");
+    /// returns the move of an index of the action space of the game
+    fn action_to_move(&self, action: usize) -> PyResult<Move> {
+        return action_to_move(action)
+            .ok_or_else(|| PyValueError::new_err(format!("invalid action {action}")));
+    }
 
-        r_ref.set_item((0, dest.0, dest.1), top_0 + bottom_0).expect("Destination outside expected range");
-        r_ref.set_item((1, dest.0, dest.1), top_1 + bottom_1).expect("Destination outside expected range");
+    #[classattr]
+    const N_SYMMETRIES: usize = D4;
 
-        new_board._curr_pid = (self._curr_pid % 2) + 1;
-        return Ok(new_board);
+    /// returns the State under a symmetry of the board (see `GameEngines.symmetry`)
+    fn transform(&self, py: Python, transform: usize) -> PyResult<Self> {
+        check_transform(transform, D4)?;
+        return self.transformed(py, transform);
     }
 
-    /// standard implementation of the `get_legal_moves` python method. it returns the legal
-    /// actions the specified player can take. In the case of the Avalam game, both players can
-    /// play the same set of moves
-    fn get_legal_moves<'py>(&mut self, py: Python<'py>) -> PyResult<Bound<'py, PySet>> {
-        let board:ArrayView2<i64> = unsafe { self._board.bind(py).as_array() };
-        let abs_board = board.mapv(|v|v.abs());
-        let towers = abs_board.map(|&v| ((0 < v) & (v < 5)));
+    /// returns the State under all the symmetries of the board, indexed by transform
+    fn symmetries(&self, py: Python) -> PyResult<Vec<Self>> {
+        return (0..D4).map(|t| self.transformed(py, t)).collect();
+    }
 
-        let moves = towers.indexed_iter().filter_map(|((i, j), &v)| {
-            if v {
-                Some(Self::_moves_for(&abs_board, i, j))
+    /// returns the canonical State, the transformed State with the smallest zobrist key, and the
+    /// transform giving it. The keys are computed on the towers, only the canonical State is built
+    fn canonical(&self, py: Python) -> PyResult<(Self, usize)> {
+        let transform = (0..D4).min_by_key(|&t| self._towers.transformed(t).zobrist(self._curr_pid)).unwrap();
+        return Ok((self.transformed(py, transform)?, transform));
+    }
 
-            } else { None }
-        }).flatten();
+    #[pyo3(signature=(c_move, transform, *, inverse=false))]
+    /// returns the move of the transformed State matching a move of the State, or the move of the
+    /// State matching a move of the transformed State if `inverse` is set
+    fn transform_move(&self, c_move: Move, transform: usize, inverse: bool) -> PyResult<Move> {
+        check_transform(transform, D4)?;
+        let transform = if inverse { d4_inverse(transform) } else { transform };
+        if c_move.0.0 > 8 || c_move.0.1 > 8 || c_move.1.0 > 8 || c_move.1.1 > 8 {
+            return Err(PyValueError::new_err(format!("{c_move:?} is not on the board")));
+        }
+        return Ok((
+            d4_coords(transform, c_move.0.0, c_move.0.1, 9),
+            d4_coords(transform, c_move.1.0, c_move.1.1, 9)
+        ));
+    }
 
-        return PySet::new(py, moves);
+    #[pyo3(signature=(action, transform, *, inverse=false))]
+    /// returns the index of the action space of `transform_move`
+    fn transform_action(&self, action: usize, transform: usize, inverse: bool) -> PyResult<usize> {
+        check_transform(transform, D4)?;
+        if action >= ACTION_SIZE {
+            return Err(PyValueError::new_err(format!("invalid action {action}")));
+        }
+        let transform = if inverse { d4_inverse(transform) } else { transform };
+        return Ok(8 * CELLS[transform][action / 8] as usize + DIRS[transform][action % 8] as usize);
     }
 
     /// returns the current score of the State. In the case of Avalam, this means the number of
     /// towers controlled by each player
-    fn score<'py>(&self, py: Python<'py>) -> (usize, usize){
-        let array = unsafe { self._board.bind(py).as_array() };
-        array.fold((0, 0), |b, &v| {
-            if v > 0 { return (b.0 + 1, b.1); }
-            if v < 0 { return (b.0, b.1 + 1); }
-            return b;
-        })
+    fn score(&self) -> (usize, usize){
+        return self._towers.score();
     }
 
     /// return the current winner of the game.
@@ -245,15 +533,37 @@ impl RawAvalamState {
     /// If the game is a tie it returns -1
     ///
     /// Otherwise, it returns the player id of the winner
-    fn winner<'py>(&mut self, py: Python<'py>) -> PyResult<isize> {
-        // unfinished
-        if self._has_moves(py) { return Ok(0); }
+    fn winner(&self) -> isize {
+        return self._towers.winner();
+    }
+
+    #[pyo3(signature=(seed=None, max_plies=None))]
+    /// plays random moves from the State until the end of the game, or until `max_plies` moves
+    /// were played, and returns the winner, the final score and the number of plies. The game is
+    /// played natively on a copy of the towers without holding the GIL
+    fn random_playout(&self, py: Python, seed: Option<u64>, max_plies: Option<u32>) -> Playout {
+        let towers = self._towers;
+        let mut rng = SplitMix64::new(seed);
+        return py.allow_threads(move || towers.random_playout(&mut rng, max_plies.unwrap_or(u32::MAX)));
+    }
 
-        let (p1, p2) = self.score(py);
-        // tie
-        if p1 == p2 { return Ok(-1) }
-        // winner
-        return Ok(isize::from(p1 < p2) + 1)
+    #[pyo3(signature=(n_games, seed=None, max_plies=None))]
+    /// plays n random playouts from the State (see `random_playout`) without holding the GIL and
+    /// returns the winners, the scores (n_games, 2) and the numbers of plies of the games
+    fn rollout<'py>(&self, py: Python<'py>, n_games: usize, seed: Option<u64>, max_plies: Option<u32>) -> Rollouts<'py> {
+        let towers = self._towers;
+        let mut rng = SplitMix64::new(seed);
+        let playouts = py.allow_threads(move || {
+            (0..n_games).map(|_| towers.random_playout(&mut rng, max_plies.unwrap_or(u32::MAX))).collect_vec()
+        });
+        return rollouts_to_py(py, playouts);
+    }
+
+    /// counts the leaf positions `depth` moves away from the State natively, without holding the
+    /// GIL. A finished game has no moves, see `GameEngines.perft`
+    fn perft(&self, py: Python, depth: u32) -> u64 {
+        let towers = self._towers;
+        return py.allow_threads(move || towers.perft(depth));
     }
 
     fn save<'py>(slf: Bound<'py, Self>, file: Bound<'py, PyAny>) {
@@ -281,9 +591,325 @@ impl RawAvalamState {
     #[getter]
     fn curr_pid(&self) -> u32 { return self._curr_pid }
 
+    /// the raw board, built from the towers of the State: modifying it does not modify the State
     #[getter]
-    fn board(&self) -> &Py<PyArray2<i64>> { return &self._board }
+    fn board<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<i64>> {
+        return PyArray2::from_owned_array(py, self._towers.board());
+    }
+
+    /// the ratios, built from the towers of the State: modifying them does not modify the State
+    #[getter]
+    fn ratios<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray3<i64>> {
+        return PyArray3::from_owned_array(py, self._towers.ratios());
+    }
+
+    #[getter(_board)]
+    fn get_raw_board<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<i64>> { return self.board(py) }
+
+    /// replaces the towers of the State by the ones of a raw board. The ratios are not updated
+    #[setter(_board)]
+    fn set_raw_board(&mut self, board: PyReadonlyArray2<i64>) -> PyResult<()> {
+        let board = board.as_array();
+        if board.shape() != [9, 9] {
+            return Err(PyValueError::new_err("the board must be of shape (9, 9)"));
+        }
+        self._towers.set_board(&board);
+        return Ok(());
+    }
+
+    #[getter(_ratios)]
+    fn get_raw_ratios<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray3<i64>> { return self.ratios(py) }
 
+    #[setter(_ratios)]
+    fn set_raw_ratios(&mut self, ratios: PyReadonlyArray3<i64>) -> PyResult<()> {
+        let ratios = ratios.as_array();
+        if ratios.shape() != [2, 9, 9] {
+            return Err(PyValueError::new_err("the ratios must be of shape (2, 9, 9)"));
+        }
+        self._towers.set_ratios(&ratios);
+        return Ok(());
+    }
+
+    /// the zobrist key of the State, updated by `play`
     #[getter]
-    fn ratios(&self) -> &Py<PyArray3<i64>> { return &self._ratios }
-}
\ No newline at end of file
+    fn zobrist(&self) -> u64 { return self._zobrist }
+
+    fn __hash__(&self) -> u64 { return self._zobrist }
+
+    /// computes the zobrist key of the State from scratch, when it was not created by `play`
+    fn _rehash(&mut self) {
+        self._zobrist = self._towers.zobrist(self._curr_pid);
+    }
+}
+
+/// returns the index of a move in the action space
+fn move_to_action(m: Move) -> Option<usize> {
+    let delta = (m.1.0 as isize - m.0.0 as isize, m.1.1 as isize - m.0.1 as isize);
+    let d = DIRECTIONS.iter().position(|&v| v == delta)?;
+    return Some((9 * m.0.0 + m.0.1) * 8 + d);
+}
+
+/// returns the move of an index of the action space. None if the move leaves the board
+fn action_to_move(action: usize) -> Option<Move> {
+    if action >= ACTION_SIZE { return None; }
+    let (cell, d) = (action / 8, action % 8);
+    let (i, j) = ((cell / 9) as isize, (cell % 9) as isize);
+    let (k, l) = (i + DIRECTIONS[d].0, j + DIRECTIONS[d].1);
+    if !(0..9).contains(&k) || !(0..9).contains(&l) { return None; }
+    return Some(((i as usize, j as usize), (k as usize, l as usize)));
+}
+
+/// returns the zobrist key of a tower on a cell, 0 for an empty cell
+fn tower_key(cell: Coords, tower: i64) -> u64 {
+    if tower == 0 { return 0; }
+    let index = (if tower > 0 { tower - 1 } else { 4 - tower }) as usize;
+    return ZOBRIST_KEYS[10 * (9 * cell.0 + cell.1) + index];
+}
+
+/// plays a move on a raw board and its ratios
+fn play_on(board: &mut ArrayViewMut2<i64>, ratios: &mut ArrayViewMut3<i64>, m: Move) {
+    let (origin, dest) = m;
+
+    // board Update
+    let top = board[origin];
+    let bottom = board[dest];
+    board[origin] = 0;
+    board[dest] = top.signum() * bottom.abs() + top;
+
+    // Ratios Update
+    for p in 0..2 {
+        let moved = ratios[(p, origin.0, origin.1)];
+        ratios[(p, origin.0, origin.1)] = 0;
+        ratios[(p, dest.0, dest.1)] += moved;
+    }
+}
+
+/// sets the actions of the legal moves of a raw board in a cleared mask
+fn legal_mask_on(board: &ArrayView2<i64>, mask: &mut ArrayViewMut1<bool>) {
+    for ((i, j), &v) in board.indexed_iter() {
+        let v = v.abs();
+        if v == 0 || v >= 5 { continue; }
+
+        for (d, &(di, dj)) in DIRECTIONS.iter().enumerate() {
+            let (k, l) = (i as isize + di, j as isize + dj);
+            if !(0..9).contains(&k) || !(0..9).contains(&l) { continue; }
+
+            let n = board[(k as usize, l as usize)].abs();
+            mask[(9 * i + j) * 8 + d] = 0 < n && v + n <= 5;
+        }
+    }
+}
+
+/// returns true if any move can be played on a raw board
+fn has_moves_on(board: &ArrayView2<i64>) -> bool {
+    let abs_board = board.mapv(|v|v.abs());
+    let towers = abs_board.map(|&v| ((0 < v) & (v < 5)));
+
+    return towers.indexed_iter().find(|((i, j), &v)| {
+        if v { RawAvalamState::_moves_for(&abs_board, *i, *j).len() > 0 }
+        else { false }
+    }).is_some();
+}
+
+/// returns the number of towers controlled by each player on a raw board
+fn score_on(board: &ArrayView2<i64>) -> (usize, usize) {
+    board.fold((0, 0), |b, &v| {
+        if v > 0 { return (b.0 + 1, b.1); }
+        if v < 0 { return (b.0, b.1 + 1); }
+        return b;
+    })
+}
+
+/// returns the winner of a raw board (0 if unfinished, -1 if tied)
+fn winner_on(board: &ArrayView2<i64>) -> isize {
+    // unfinished
+    if has_moves_on(board) { return 0; }
+
+    let (p1, p2) = score_on(board);
+    // tie
+    if p1 == p2 { return -1 }
+    // winner
+    return isize::from(p1 < p2) + 1
+}
+
+
+/// Batch of Avalam games stored in contiguous arrays, allowing a whole step of all the games in a
+/// single call
+#[pyclass(subclass)]
+pub struct RawAvalamBatch {
+    _boards: Py<PyArray3<i64>>,
+    _ratios: Py<PyArray4<i64>>,
+    _turns: Vec<u32>,
+    _curr_pids: Vec<u32>,
+
+    #[pyo3(get, set)]
+    auto_reset: bool,
+}
+
+unsafe impl Send for RawAvalamBatch {}
+
+impl RawAvalamBatch {
+    fn _reset_game(&mut self, py: Python, g: usize) {
+        let mut boards = unsafe { self._boards.bind(py).as_array_mut() };
+        let mut ratios = unsafe { self._ratios.bind(py).as_array_mut() };
+        boards.index_axis_mut(Axis(0), g).assign(&RawAvalamState::base_array());
+        ratios.index_axis_mut(Axis(0), g).assign(&RawAvalamState::base_ratios());
+        self._turns[g] = 0;
+        self._curr_pids[g] = 1;
+    }
+
+    fn _check_index(&self, g: usize) -> PyResult<()> {
+        if g >= self._turns.len() {
+            return Err(PyIndexError::new_err("game index out of range"));
+        }
+        return Ok(());
+    }
+}
+
+#[pymethods]
+impl RawAvalamBatch {
+    #[classattr]
+    const ACTION_SIZE: usize = ACTION_SIZE;
+
+    #[new]
+    #[pyo3(signature=(n_games, auto_reset=true))]
+    /// Creates a batch of n Avalam games in their initial state
+    fn new<'py>(py: Python<'py>, n_games: usize, auto_reset: bool) -> PyResult<Self> {
+        let base_board = RawAvalamState::base_array();
+        let base_ratios = RawAvalamState::base_ratios();
+
+        let boards = Array3::from_shape_fn((n_games, 9, 9), |(_, i, j)| base_board[(i, j)]);
+        let ratios = Array4::from_shape_fn((n_games, 2, 9, 9), |(_, p, i, j)| base_ratios[(p, i, j)]);
+
+        return Ok(RawAvalamBatch {
+            _boards: PyArray3::from_owned_array(py, boards).unbind(),
+            _ratios: PyArray4::from_owned_array(py, ratios).unbind(),
+            _turns: vec![0; n_games],
+            _curr_pids: vec![1; n_games],
+            auto_reset
+        })
+    }
+
+    fn __len__(&self) -> usize { return self._turns.len() }
+
+    /// plays one action per game and returns the winner of every game after the action. A negative
+    /// action skips the game. If `auto_reset` is set, finished games are put back in their initial state
+    fn play_batch<'py>(&mut self, py: Python<'py>, actions: PyReadonlyArray1<'py, i64>) -> PyResult<Bound<'py, PyArray1<i64>>> {
+        let actions = actions.as_array();
+        if actions.len() != self._turns.len() {
+            return Err(PyValueError::new_err("one action per game is expected"));
+        }
+
+        let mut winners = vec![0; actions.len()];
+        {
+            let mut boards = unsafe { self._boards.bind(py).as_array_mut() };
+            let mut ratios = unsafe { self._ratios.bind(py).as_array_mut() };
+
+            for (g, &action) in actions.iter().enumerate() {
+                let mut board = boards.index_axis_mut(Axis(0), g);
+                if action >= 0 {
+                    let c_move = action_to_move(action as usize)
+                        .ok_or_else(|| PyValueError::new_err(format!("invalid action {action}")))?;
+
+                    let mut ratio = ratios.index_axis_mut(Axis(0), g);
+                    play_on(&mut board, &mut ratio, c_move);
+                    self._turns[g] += 1;
+                    self._curr_pids[g] = (self._curr_pids[g] % 2) + 1;
+                }
+                winners[g] = winner_on(&board.view()) as i64;
+            }
+        }
+
+        if self.auto_reset {
+            for g in 0..winners.len() {
+                if winners[g] != 0 { self._reset_game(py, g); }
+            }
+        }
+        return Ok(PyArray1::from_vec(py, winners));
+    }
+
+    /// returns a (n_games, ACTION_SIZE) boolean mask of the legal actions of every game
+    fn legal_move_mask_batch<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<bool>> {
+        let boards = unsafe { self._boards.bind(py).as_array() };
+        let mut mask = Array2::from_elem((self._turns.len(), ACTION_SIZE), false);
+
+        for (board, mut row) in boards.outer_iter().zip(mask.outer_iter_mut()) {
+            legal_mask_on(&board, &mut row);
+        }
+        return PyArray2::from_owned_array(py, mask);
+    }
+
+    /// returns the winner of every game of the batch
+    fn winner_batch<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<i64>> {
+        let boards = unsafe { self._boards.bind(py).as_array() };
+        let winners = boards.outer_iter().map(|b| winner_on(&b) as i64).collect_vec();
+        return PyArray1::from_vec(py, winners);
+    }
+
+    /// returns the score of every game of the batch as a (n_games, 2) array
+    fn score_batch<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<i64>> {
+        let boards = unsafe { self._boards.bind(py).as_array() };
+        let mut scores = Array2::zeros((self._turns.len(), 2));
+        for (g, board) in boards.outer_iter().enumerate() {
+            let (p1, p2) = score_on(&board);
+            scores[(g, 0)] = p1 as i64;
+            scores[(g, 1)] = p2 as i64;
+        }
+        return PyArray2::from_owned_array(py, scores);
+    }
+
+    #[pyo3(signature=(indexes=None))]
+    /// puts the given games (or all of them) back in their initial state
+    fn reset(&mut self, py: Python, indexes: Option<Vec<usize>>) -> PyResult<()> {
+        let indexes = indexes.unwrap_or_else(|| (0..self._turns.len()).collect_vec());
+        for g in indexes {
+            self._check_index(g)?;
+            self._reset_game(py, g);
+        }
+        return Ok(());
+    }
+
+    /// returns a copy of the state of a game of the batch
+    fn get_state(&self, py: Python, g: usize) -> PyResult<RawAvalamState> {
+        self._check_index(g)?;
+        let boards = unsafe { self._boards.bind(py).as_array() };
+        let ratios = unsafe { self._ratios.bind(py).as_array() };
+
+        let towers = Towers::from_arrays(&boards.index_axis(Axis(0), g), &ratios.index_axis(Axis(0), g));
+
+        return Ok(RawAvalamState {
+            _towers: towers,
+            _turn: self._turns[g],
+            _curr_pid: self._curr_pids[g],
+            _zobrist: towers.zobrist(self._curr_pids[g]),
+            _undo: Vec::new(),
+            _move_cache: None,
+            _save_mod: RawAvalamState::default_save_mod(),
+        });
+    }
+
+    /// replaces a game of the batch by the given state
+    fn set_state(&mut self, py: Python, g: usize, state: PyRef<RawAvalamState>) -> PyResult<()> {
+        self._check_index(g)?;
+        let mut boards = unsafe { self._boards.bind(py).as_array_mut() };
+        let mut ratios = unsafe { self._ratios.bind(py).as_array_mut() };
+
+        boards.index_axis_mut(Axis(0), g).assign(&state._towers.board());
+        ratios.index_axis_mut(Axis(0), g).assign(&state._towers.ratios());
+        self._turns[g] = state._turn;
+        self._curr_pids[g] = state._curr_pid;
+        return Ok(());
+    }
+
+    #[getter]
+    fn boards(&self) -> &Py<PyArray3<i64>> { return &self._boards }
+
+    #[getter]
+    fn ratios(&self) -> &Py<PyArray4<i64>> { return &self._ratios }
+
+    #[getter]
+    fn turns<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u32>> { return PyArray1::from_slice(py, &self._turns) }
+
+    #[getter]
+    fn curr_pids<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u32>> { return PyArray1::from_slice(py, &self._curr_pids) }
+}
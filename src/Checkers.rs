@@ -1,12 +1,12 @@
-use std::cmp::{max, min};
-use std::collections::{HashSet};
-use itertools::{sorted, Itertools};
-use ndarray::{Array2, ArrayViewMut2, s, array};
-use numpy::{PyArray2, PyArrayMethods};
+use itertools::Itertools;
+use ndarray::{Array2, Array3, ArrayView2, ArrayViewMut1, array};
+use numpy::{PyArray1, PyArray2, PyArray3, PyArrayMethods, PyReadonlyArray1, PyReadonlyArray2};
 use pyo3::prelude::*;
 use pyo3::{Py, pyclass, pymethods, Python, PyTypeInfo};
+use pyo3::exceptions::{PyIndexError, PyValueError};
 use pyo3::types::{PyBool, PyNotImplemented, PySet, PyString, PyType};
 use pyo3::basic::CompareOp;
+use crate::utils::{check_transform, copy_move_cache, mask_buffer, rollouts_to_py, zobrist_keys, Playout, Rollouts, SplitMix64};
 
 trait Isize<T> {
     fn to_isize(&self) -> T;
@@ -35,12 +35,258 @@ impl Isize<((isize, isize), (isize, isize))> for Move {
     }
 }
 
+/// Action space of the Checkers game: 32 dark squares x 4 diagonal directions x (step, jump).
+/// The dark square (r, c) has the index 4 * r + c / 2
+const DIRECTIONS: [(isize, isize); 4] = [(-1, -1), (-1, 1), (1, -1), (1, 1)];
+const ACTION_SIZE: usize = 32 * 4 * 2;
+
+/// Zobrist keys of the Checkers game: one key per dark square and piece (single & king of both
+/// players), then the second player to move, then one key per dark square for the piece in the
+/// middle of a multi jump. They are the keys of `GameEngines.Checkers.utilsTypes`
+static ZOBRIST_KEYS: [u64; 32 * 4 + 1 + 32] = zobrist_keys(3);
+const Z_SIDE: usize = 32 * 4;
+const Z_JUMPING: usize = Z_SIDE + 1;
+
+/// squares of the last row of each player, where its single pieces become kings
+const PROMOTION: [u32; 2] = [0xF << 28, 0xF];
+
+/// returns the index of the dark square (r, c), -1 if it is off the board
+const fn square_at(r: isize, c: isize) -> i8 {
+    if 0 <= r && r < 8 && 0 <= c && c < 8 { (4 * r + c / 2) as i8 } else { -1 }
+}
+
+/// returns the square reached from each square in each direction after `distance` steps, -1 if it
+/// is off the board
+const fn neighbour_table(distance: isize) -> [[i8; 4]; 32] {
+    let mut table = [[-1i8; 4]; 32];
+    let mut s = 0;
+    while s < 32 {
+        let r = (s / 4) as isize;
+        let c = (2 * (s % 4)) as isize + (r + 1) % 2;
+        let mut d = 0;
+        while d < 4 {
+            table[s][d] = square_at(r + distance * DIRECTIONS[d].0, c + distance * DIRECTIONS[d].1);
+            d += 1;
+        }
+        s += 1;
+    }
+    return table;
+}
+
+/// the neighbour of each square in each direction, and the landing square of a jump
+const NEIGHBOURS: [[i8; 4]; 32] = neighbour_table(1);
+const JUMPS: [[i8; 4]; 32] = neighbour_table(2);
+
+/// returns the masks and offsets moving the squares of the even and odd rows to their neighbour
+/// in each direction
+const fn shift_table() -> [[(u32, i32); 2]; 4] {
+    let mut table = [[(0u32, 0i32); 2]; 4];
+    let mut s = 0;
+    while s < 32 {
+        let mut d = 0;
+        while d < 4 {
+            if NEIGHBOURS[s][d] >= 0 {
+                let parity = (s / 4) % 2;
+                table[d][parity] = (table[d][parity].0 | 1 << s, NEIGHBOURS[s][d] as i32 - s as i32);
+            }
+            d += 1;
+        }
+        s += 1;
+    }
+    return table;
+}
+
+const SHIFTS: [[(u32, i32); 2]; 4] = shift_table();
+
+/// moves every square of a bitboard to its neighbour in the direction d, the squares leaving the
+/// board are lost
+fn shift(board: u32, d: usize) -> u32 {
+    return SHIFTS[d].iter().fold(0, |out, &(mask, offset)| {
+        let squares = board & mask;
+        out | if offset >= 0 { squares << offset } else { squares >> -offset }
+    });
+}
+
+/// returns the squares of a bitboard in increasing order
+fn squares(mut board: u32) -> impl Iterator<Item=usize> {
+    return std::iter::from_fn(move || {
+        if board == 0 { return None; }
+        let s = board.trailing_zeros() as usize;
+        board &= board - 1;
+        Some(s)
+    });
+}
+
+/// returns true if the single pieces of the player move in the direction d
+fn forward(pid: u32, d: usize) -> bool {
+    return if pid == 1 { d >= 2 } else { d < 2 };
+}
+
+/// returns the square an action lands on, None if it leaves the board
+fn destination(action: usize) -> Option<usize> {
+    let (s, d) = (action / 8, (action % 8) / 2);
+    let dest = if action % 2 == 1 { JUMPS[s][d] } else { NEIGHBOURS[s][d] };
+    return if dest >= 0 { Some(dest as usize) } else { None };
+}
+
+/// returns the local coordinates of a dark square on the rotated (7, 8) board
+fn local_square(s: usize) -> Coords {
+    let r = s / 4;
+    let c = 2 * (s % 4) + (r + 1) % 2;
+    return ((r + c - 1) / 2, (c + 7 - r) / 2);
+}
+
+/// Bitboards of a Checkers board over the 32 dark squares: the bit s is the square of index s of
+/// the action space. The moves of all the pieces are found with a few bitwise operations
+#[derive(Clone, Copy, PartialEq, Eq)]
+struct Bitboard {
+    p1: u32,
+    p2: u32,
+    kings: u32,
+}
+
+const INITIAL: Bitboard = Bitboard { p1: 0xFFF, p2: 0xFFF << 20, kings: 0 };
+
+impl Bitboard {
+    /// returns the pieces of the player and of its opponent
+    fn sides(&self, pid: u32) -> (u32, u32) {
+        return if pid == 1 { (self.p1, self.p2) } else { (self.p2, self.p1) };
+    }
+
+    fn empty(&self) -> u32 { return !(self.p1 | self.p2) }
+
+    /// returns the pieces of the player allowed to move in the direction d
+    fn movers(&self, pid: u32, d: usize) -> u32 {
+        let own = self.sides(pid).0;
+        return if forward(pid, d) { own } else { own & self.kings };
+    }
+
+    /// returns the pieces of the player that can step in the direction d
+    fn step_origins(&self, pid: u32, d: usize) -> u32 {
+        return self.movers(pid, d) & shift(self.empty(), 3 - d);
+    }
+
+    /// returns the pieces of the player that can capture in the direction d
+    fn jump_origins(&self, pid: u32, d: usize) -> u32 {
+        // the opposite direction of d is 3 - d, the squares next to an opponent followed by an empty square
+        let opp = self.sides(pid).1;
+        return self.movers(pid, d) & shift(opp & shift(self.empty(), 3 - d), 3 - d);
+    }
+
+    /// returns the legal actions of the player, the captures being mandatory
+    fn legal_actions(&self, pid: u32) -> Vec<usize> {
+        let jumps: [u32; 4] = std::array::from_fn(|d| self.jump_origins(pid, d));
+        if jumps.iter().any(|&j| j != 0) {
+            return (0..4).flat_map(|d| squares(jumps[d]).map(move |s| (s * 4 + d) * 2 + 1)).collect_vec();
+        }
+        return (0..4).flat_map(|d| squares(self.step_origins(pid, d)).map(move |s| (s * 4 + d) * 2)).collect_vec();
+    }
+
+    /// returns true if the player can move any piece
+    fn has_moves(&self, pid: u32) -> bool {
+        return (0..4).any(|d| self.step_origins(pid, d) != 0 || self.jump_origins(pid, d) != 0);
+    }
+
+    /// returns the captures of the piece of the player on the square s, which continue a multi jump
+    fn jump_actions_from(&self, s: usize, pid: u32) -> Vec<usize> {
+        let (opp, empty) = (self.sides(pid).1, self.empty());
+        let king = self.kings >> s & 1 == 1;
+        return (0..4).filter(|&d| {
+            (king || forward(pid, d)) && JUMPS[s][d] >= 0 &&
+                opp >> NEIGHBOURS[s][d] as u32 & 1 == 1 && empty >> JUMPS[s][d] as u32 & 1 == 1
+        }).map(|d| (s * 4 + d) * 2 + 1).collect_vec();
+    }
+
+    /// returns the value of the piece on the dark square s, as on the board array
+    fn piece(&self, s: usize) -> i64 {
+        let sign = (self.p1 >> s & 1) as i64 - (self.p2 >> s & 1) as i64;
+        return sign * (1 + (self.kings >> s & 1) as i64);
+    }
+
+    /// plays an action in place, the current player promoting the pieces reaching its last row. It
+    /// returns the captures the moved piece can chain, which are empty if the turn is over, and
+    /// None if the action does not move a piece
+    fn play(&mut self, action: usize, curr_pid: u32) -> Option<Vec<usize>> {
+        if action >= ACTION_SIZE { return None; }
+        let (s, d, jump) = (action / 8, (action % 8) / 2, action % 2 == 1);
+        let dest = destination(action)?;
+        let moved = self.piece(s);
+        if moved == 0 { return None; }
+
+        // move the pawn and remove the captured piece, which is halfway between the origin and the destination
+        let owner = if moved > 0 { 1 } else { 2 };
+        let squares = 1u32 << s | 1u32 << dest;
+        if owner == 1 { self.p1 ^= squares } else { self.p2 ^= squares }
+        if self.kings >> s & 1 == 1 { self.kings ^= squares }
+
+        if jump {
+            let kept = !(1u32 << NEIGHBOURS[s][d] as u32);
+            self.p1 &= kept;
+            self.p2 &= kept;
+            self.kings &= kept;
+        }
+
+        // change from 1 -> 2 on the end row
+        if PROMOTION[(curr_pid - 1) as usize] >> dest & 1 == 1 {
+            self.kings |= 1 << dest;
+        }
+
+        // If the played move is a capture, check if multi jump available
+        return Some(if jump { self.jump_actions_from(dest, owner) } else { Vec::new() });
+    }
+
+    /// returns the number of pieces of each player
+    fn score(&self) -> (usize, usize) {
+        return (self.p1.count_ones() as usize, self.p2.count_ones() as usize);
+    }
+
+    /// returns the winner of the board, `has_moves` telling if the current player can move
+    fn result(&self, curr_pid: u32, has_moves: impl FnOnce() -> bool) -> u32 {
+        if self.p1 == 0 || self.p2 == 0 {
+            return if self.p1 != 0 { 1 } else { 2 }
+        }
+
+        if !has_moves() {
+            return (curr_pid % 2) + 1
+        }
+
+        return 0
+    }
+
+    /// returns the winner of the board (0 if unfinished)
+    fn winner(&self, curr_pid: u32) -> u32 {
+        return self.result(curr_pid, || self.has_moves(curr_pid));
+    }
+
+    /// returns the (7, 8) board rotated by 45 degrees, the squares off the board holding 3
+    fn to_array(&self) -> Array2<i64> {
+        let mut board = Array2::from_elem((7, 8), 3);
+        for s in 0..32 {
+            let (x, y) = local_square(s);
+            board[[x, y]] = self.piece(s);
+        }
+        return board;
+    }
+
+    /// returns the bitboards of a (7, 8) board
+    fn from_array(board: &ArrayView2<i64>) -> Self {
+        let mut bits = Bitboard { p1: 0, p2: 0, kings: 0 };
+        for s in 0..32 {
+            let (x, y) = local_square(s);
+            let piece = board[[x, y]];
+            if piece > 0 { bits.p1 |= 1 << s; }
+            if piece < 0 { bits.p2 |= 1 << s; }
+            if piece.abs() == 2 { bits.kings |= 1 << s; }
+        }
+        return bits;
+    }
+}
+
 
 #[derive(Clone)]
 #[pyclass(subclass, dict)]
 pub struct RawCheckersState {
-    #[pyo3(get, set)]
-    _board: Py<PyArray2<i64>>,
+    _bits: Bitboard,
     #[pyo3(get, set)]
     _turn: u32,
     #[pyo3(get, set)]
@@ -48,6 +294,16 @@ pub struct RawCheckersState {
     #[pyo3(get, set)]
     _cached_moves: Option<Py<PySet>>,
     #[pyo3(get, set)]
+    _zobrist: u64,
+    // the winner of the position, found with its moves and None until they are generated
+    _result: Option<u32>,
+    // the pushed moves with the bitboards, cached moves, player and key they replaced, the last
+    // one at the end
+    _undo: Vec<(Move, Bitboard, Option<Py<PySet>>, u32, u64)>,
+    // the legal moves cached by `GameEngines.cache_utils`, dropped when the State changes
+    #[pyo3(get, set)]
+    _move_cache: Option<Py<PySet>>,
+    #[pyo3(get, set)]
     _save_mod: Py<PyType>
 }
 
@@ -66,89 +322,67 @@ impl RawCheckersState {
         ]
     }
 
-    fn default_save_mod() -> Py<PyType> {
-        Python::with_gil(|_py| {
-            let SaveModule = _py.import("GameEngines.Checkers.SaveModule").unwrap();
-            SaveModule.getattr("CheckersSave").unwrap().extract().unwrap()
-        })
-    }
-
-    fn _has_moves(&self, py: Python) -> bool {
-        let new_board = self.copy(py).unwrap();
-        let board = unsafe { new_board._board.bind(py).as_array_mut() };
-
-        return board.indexed_iter().filter_map(|(index, &v)| {
-            let condition = if self._curr_pid == 1 { v > 0 } else { v < 0 } && v < 3;
-            if condition { Some(index) } else { None }
-        }).find(|&coord| {
-            Self::_get_moves(&board, coord, false).0.len() > 0
-        }).is_some();
-    }
-
-    fn _get_moves(board: &ArrayViewMut2<i64>, pos: Coords, capture_found: bool) -> (Vec<Coords>, bool) {
-        let val = board.get(pos).unwrap();
-        let piece_type = val.abs();
-        let piece_sign = val.signum();
-
-        let normalized = board * piece_sign;
-
-        let pos = pos.to_isize();
-        let s = normalized.shape().into_iter().map(|&v| isize::try_from(v).unwrap()).collect_vec();
-        let mut directions = vec![
-            ((0, -1), normalized.slice(s![pos.0, max(pos.1 - 2, 0)..pos.1; -1]  ),  1),
-            ((0,  1), normalized.slice(s![pos.0, (pos.1 + 1)..min(pos.1 + 3, s[1])]), -1),
-            ((-1, 0), normalized.slice(s![max(pos.0 - 2, 0)..pos.0; -1, pos.1]  ), -1),
-            (( 1, 0), normalized.slice(s![(pos.0 + 1)..min(pos.0 + 3, s[0]), pos.1]),  1),
-        ];
-
-        // If the piece is not a king, only keep allowed diagonals
-        if piece_type == 1 {
-            directions = directions.into_iter().filter(|v| piece_sign == i64::from(v.2)).collect_vec();
+    /// plays a move on the State in place
+    fn apply(&mut self, py: Python, c_move: Move) -> PyResult<()> {
+        let action = played_action(c_move)
+            .ok_or_else(|| PyValueError::new_err(format!("{c_move:?} is not a move of the board")))?;
+        let before = self._bits;
+        let continuation = self._bits.play(action, self._curr_pid)
+            .ok_or_else(|| PyValueError::new_err(format!("{c_move:?} does not move a piece")))?;
+        self._turn += 1;
+        self._result = None;
+
+        // the moved, captured and promoted pieces are the squares changed by the move
+        let after = self._bits;
+        let changed = (before.p1 ^ after.p1) | (before.p2 ^ after.p2) | (before.kings ^ after.kings);
+        for s in squares(changed) {
+            self._zobrist ^= piece_key(s, before.piece(s)) ^ piece_key(s, after.piece(s));
         }
-
-        // Filtering out directions if no adjacent spaces
-        directions = directions.into_iter().filter(|&v| v.1.len() >= 1).collect_vec();
-
-        let captures = directions.iter().filter_map(|(c,arr, _)| {
-            // If there is space for a jump, the next space is an enemy and the jump space is open
-            if arr.len() >= 2 && arr[0] < 0 && arr[1] == 0 {
-                Some((
-                    usize::try_from(pos.0 + 2 * c.0).unwrap(),
-                    usize::try_from(pos.1 + 2 * c.1).unwrap()
-                ))
-            } else { None }
-        }).collect_vec();
-
-         if captures.len() > 0 || capture_found {
-             return (captures, true);
+        if self._cached_moves.is_some() {
+            self._zobrist ^= ZOBRIST_KEYS[Z_JUMPING + action / 8];
         }
 
-        let moves = directions.iter().filter_map(|(c, arr, _)| {
-            if arr[0] == 0 {
-                Some((
-                    usize::try_from(pos.0 + c.0).unwrap(),
-                    usize::try_from(pos.1 + c.1).unwrap()
-                ))
-            } else { None }
-        }).collect_vec();
+        // If multi jump available, cache them for next step
+        if continuation.len() > 0 {
+            self._zobrist ^= ZOBRIST_KEYS[Z_JUMPING + destination(action).unwrap()];
+            self._cached_moves = Some(PySet::new(py, to_moves(continuation))?.unbind());
+            // the jumping piece still has a piece to capture
+            self._result = Some(0);
+            return Ok(())
+        }
+        self._cached_moves = None;
+        self._curr_pid = (self._curr_pid % 2) + 1;
+        self._zobrist ^= ZOBRIST_KEYS[Z_SIDE];
+        return Ok(());
+    }
 
-        return (moves, false);
+    /// returns the cached moves of a multi jump as actions
+    fn pending_jumps(&self, py: Python) -> PyResult<Option<Vec<usize>>> {
+        return match &self._cached_moves {
+            None => Ok(None),
+            Some(moves) => Ok(Some(moves.bind(py).iter().map(|m| {
+                let m: Move = m.extract()?;
+                move_to_action(m).ok_or_else(|| PyValueError::new_err(format!("{m:?} is not in the action space")))
+            }).collect::<PyResult<_>>()?)),
+        };
     }
 
-    fn _from_local(m: Move) -> Move {
-        let m = m.to_isize();
-        return Move::from_isize((
-            ((4 + m.0.0) - m.0.1, (m.0.0 + m.0.1) - 3),  // x_res = (4 + x - y)
-            ((4 + m.1.0) - m.1.1, (m.1.0 + m.1.1) - 3)   // y_res = (x + y - 3)
-        ))
+    /// returns the legal actions of the State, finding its winner along the way
+    fn legal_actions(&mut self, py: Python) -> PyResult<Vec<usize>> {
+        if let Some(actions) = self.pending_jumps(py)? {
+            return Ok(actions);
+        }
+
+        let actions = self._bits.legal_actions(self._curr_pid);
+        self._result = Some(self._bits.result(self._curr_pid, || !actions.is_empty()));
+        return Ok(actions);
     }
 
-    fn _to_local(m: Move) -> Move {
-        let m = m.to_isize();
-        return Move::from_isize((
-            ((m.0.0 + m.0.1 - 1) / 2, (m.0.1 - m.0.0 + 7) / 2),  // x_res = (x + y - 1) // 2
-            ((m.1.0 + m.1.1 - 1) / 2, (m.1.1 - m.1.0 + 7) / 2)   // y_res = (y - x + 7) // 2
-        ))
+    fn default_save_mod() -> Py<PyType> {
+        Python::with_gil(|_py| {
+            let SaveModule = _py.import("GameEngines.Checkers.SaveModule").unwrap();
+            SaveModule.getattr("CheckersSave").unwrap().extract().unwrap()
+        })
     }
 }
 
@@ -157,125 +391,151 @@ impl RawCheckersState {
     #[new]
     #[pyo3(signature=(save_module=None))]
     /// Creates the initial Checkers State python object
-    fn new<'py>(py: Python<'py>, save_module: Option<Bound<'py, PyType>>) -> PyResult<Self> {
+    fn new<'py>(_py: Python<'py>, save_module: Option<Bound<'py, PyType>>) -> PyResult<Self> {
         let checkers_save: Py<PyType> = match save_module {
             None => { Self::default_save_mod()}
             Some(save_mod) => {save_mod.unbind()}
         };
 
-        let board = PyArray2::from_owned_array(py, RawCheckersState::base_array());
-
         return Ok(RawCheckersState{
-            _board: board.unbind(),
+            _zobrist: zobrist_of(&INITIAL, 1, None),
+            _bits: INITIAL,
             _turn: 0,
             _curr_pid: 1,
             _cached_moves: None,
+            _result: None,
+            _undo: Vec::new(),
+            _move_cache: None,
             _save_mod: checkers_save,
         })
     }
 
-    /// copies and returns a python Checkers State object
-    fn copy<'py>(&self, py: Python<'py>) -> PyResult<Self> {
-        let board = unsafe { PyArray2::new(py, self._board.bind(py).dims(), false) };
-        self._board.bind(py).copy_to(&board).expect("");
-
+    #[pyo3(signature=(*, cache=false))]
+    /// copies and returns a python Checkers State object. The cached moves are only copied if
+    /// `cache` is true
+    fn copy<'py>(&self, py: Python<'py>, cache: bool) -> PyResult<Self> {
         return Ok(RawCheckersState{
-            _board: board.unbind(),
+            _bits: self._bits,
             _turn: self._turn,
             _curr_pid: self._curr_pid,
-            _cached_moves: None,
+            // the moves of a multi jump are part of the State, the set is never modified in place
+            _cached_moves: self._cached_moves.clone(),
+            _zobrist: self._zobrist,
+            _result: self._result,
+            _undo: Vec::new(),
+            _move_cache: copy_move_cache(py, &self._move_cache, cache)?,
             _save_mod: self._save_mod.clone()
         })
     }
 
     /// play an action on the Checkers State and returns the following State object
     fn play<'py>(&self, py: Python<'py>, c_move: Move) -> PyResult<Self> {
-        let l_move = Self::_to_local(c_move);
+        let mut new_board = self.copy(py, false)?;
+        new_board.apply(py, c_move)?;
+        return Ok(new_board);
+    }
 
-        let origin = l_move.0;
-        let dest = l_move.1;
+    /// plays an action on the Checkers State in place. The bitboards are kept to undo the action
+    /// with `pop`
+    fn push<'py>(&mut self, py: Python<'py>, c_move: Move) -> PyResult<()> {
+        self._undo.push((c_move, self._bits, self._cached_moves.clone(), self._curr_pid, self._zobrist));
+        self._move_cache = None;
+        let applied = self.apply(py, c_move);
+        if applied.is_err() {
+            self._undo.pop();
+        }
+        return applied;
+    }
 
-        let xs = sorted(vec![origin.0, dest.0]).collect_vec();
-        let ys = sorted(vec![origin.1, dest.1]).collect_vec();
+    /// undoes the last action played by `push` in place and returns it
+    fn pop<'py>(&mut self, _py: Python<'py>) -> PyResult<Move> {
+        let (c_move, bits, cached_moves, curr_pid, zobrist) = self._undo.pop()
+            .ok_or_else(|| PyIndexError::new_err("no pushed move to pop"))?;
+
+        self._bits = bits;
+        self._cached_moves = cached_moves;
+        self._curr_pid = curr_pid;
+        self._zobrist = zobrist;
+        self._result = None;
+        self._move_cache = None;
+        self._turn -= 1;
+        return Ok(c_move);
+    }
 
-        let mut new_board = self.copy(py)?;
-        let mut board = unsafe { new_board._board.bind(py).as_array_mut() };
-        new_board._turn += 1;
+    /// standard implementation of the `get_legal_moves` python method. it returns the legal
+    /// actions the specified player can take. The winner of the State is found along the way
+    fn get_legal_moves<'py>(&mut self, py: Python<'py>) -> PyResult<Bound<'py, PySet>> {
+        if let Some(moves) = &self._cached_moves {
+            return Ok(moves.bind(py).to_owned());
+        }
 
-        let beg_val = board[[origin.0, origin.1]];
+        let actions = self.legal_actions(py)?;
+        return PySet::new(py, to_moves(actions));
+    }
 
-        // removes all between origin and dest
-        board.slice_mut(s![xs[0]..(xs[1] + 1), ys[0]..(ys[1] + 1)]).fill(0);
+    #[classattr]
+    const ACTION_SIZE: usize = ACTION_SIZE;
+
+    #[pyo3(signature=(out=None))]
+    /// returns the legal actions of the State as a boolean mask over the action space of the game
+    /// (32 dark squares x 4 directions x step or jump). If `out` is given, the mask is written in
+    /// it instead of a new array
+    fn legal_action_mask<'py>(&mut self, py: Python<'py>, out: Option<Bound<'py, PyArray1<bool>>>) -> PyResult<Bound<'py, PyArray1<bool>>> {
+        let mask = mask_buffer(py, out, ACTION_SIZE)?;
+        mask_actions(self.legal_actions(py)?, &mut unsafe { mask.as_array_mut() });
+        return Ok(mask);
+    }
 
-        // setting the final
-        board[[dest.0, dest.1]] = beg_val;
+    /// returns the index of a move in the action space of the game
+    fn move_to_action(&self, c_move: Move) -> PyResult<usize> {
+        return move_to_action(c_move)
+            .ok_or_else(|| PyValueError::new_err(format!("{c_move:?} is not in the action space")));
+    }
 
-        // change from 1 -> 2 on the end row
-        if c_move.1.0 == [0, 7][usize::try_from(self._curr_pid % 2)?] && beg_val.abs() == 1 {
-            board[[dest.0, dest.1]] *= 2;
-        }
+    /// returns the move of an index of the action space of the game
+    fn action_to_move(&self, action: usize) -> PyResult<Move> {
+        return action_to_move(action)
+            .ok_or_else(|| PyValueError::new_err(format!("invalid action {action}")));
+    }
 
-        // If the played move is a capture, check if multi jump available
-        let is_capture = (xs[1] - xs[0] + ys[1] - ys[0]) > 1;
-        if is_capture {
-            // If multi jump available, cache them for next step
-            let (moves, _) = Self::_get_moves(&board, dest, true);
-            if moves.len() > 0 {
-                let move_set: HashSet<Move> = HashSet::from_iter(
-                    moves.into_iter().map(|d| Self::_from_local((dest, d)) )
-                );
-                new_board._cached_moves = Some(
-                        PySet::new(py, move_set)?.unbind()
-                );
-                return Ok(new_board)
-            }
-        }
-        new_board._cached_moves = None;
-        new_board._curr_pid = (self._curr_pid % 2) + 1;
-        return Ok(new_board);
+    /// Checkers has no symmetry: the mirrors of the board swap its dark and light squares, and
+    /// its rotation swaps the sides of the players. Only the identity is given, for the State to
+    /// have the symmetry methods of the other games
+    #[classattr]
+    const N_SYMMETRIES: usize = 1;
+
+    /// returns a copy of the State, the only symmetry of the game being the identity
+    fn transform(&self, py: Python, transform: usize) -> PyResult<Self> {
+        check_transform(transform, 1)?;
+        return self.copy(py, false);
     }
 
-    /// standard implementation of the `get_legal_moves` python method. it returns the legal
-    /// actions the specified player can take.
-    fn get_legal_moves<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PySet>> {
-        if let Some(moves) = &self._cached_moves {
-            return Ok(moves.bind(py).to_owned());
-        }
+    fn symmetries(&self, py: Python) -> PyResult<Vec<Self>> {
+        return Ok(vec![self.copy(py, false)?]);
+    }
 
-        let new_board = self.copy(py)?;
-        let board = unsafe { new_board._board.bind(py).as_array_mut() };
+    fn canonical(&self, py: Python) -> PyResult<(Self, usize)> {
+        return Ok((self.copy(py, false)?, 0));
+    }
 
-        let coords = board.indexed_iter().filter_map(|(index, &v)| {
-                let condition = if self._curr_pid == 1 {v > 0} else {v < 0} && v < 3;
-                if condition { Some(index) } else {None} })
-            .collect_vec();
+    #[pyo3(signature=(c_move, transform, *, inverse=false))]
+    #[allow(unused_variables)]
+    fn transform_move(&self, c_move: Move, transform: usize, inverse: bool) -> PyResult<Move> {
+        check_transform(transform, 1)?;
+        return Ok(c_move);
+    }
 
-        let mut moves: Vec<Move> = Vec::new();
-        let mut capture = false;
-        for coord in coords {
-            let (destinations, _capture) = Self::_get_moves(&board, coord, capture);
-            // If a capture is detected, drop normal moves and only keep captures
-            if _capture && !capture {
-                moves = Vec::new();
-                capture = true;
-            }
-            moves.extend(destinations.into_iter().map(|d| Self::_from_local((coord, d)) ))
-        }
-        let move_set: HashSet<Move> = HashSet::from_iter(moves.into_iter());
-        return PySet::new(py, move_set);
+    #[pyo3(signature=(action, transform, *, inverse=false))]
+    #[allow(unused_variables)]
+    fn transform_action(&self, action: usize, transform: usize, inverse: bool) -> PyResult<usize> {
+        check_transform(transform, 1)?;
+        return Ok(action);
     }
 
     /// returns the current score of the State. In the case of Checkers, this means the number of
     /// pieces on the board
-    fn score<'py>(&self, py: Python<'py>) -> (usize, usize) {
-        let array = self._board.bind(py).to_owned_array();
-        return array.fold((0, 0), |r, &v| {
-            return match v {
-                 1 |  2 => (r.0 + 1, r.1),
-                -1 | -2 => (r.0, r.1 + 1),
-                _ => r,
-            }
-        })
+    fn score(&self) -> (usize, usize) {
+        return self._bits.score();
     }
 
     /// return the current winner of the game.
@@ -285,18 +545,48 @@ impl RawCheckersState {
     /// If the game is a tie it returns -1
     ///
     /// Otherwise, it returns the player id of the winner
-    fn winner<'py>(&self, py: Python<'py>) -> u32{
-        let (p1, p2) = self.score(py);
-
-        if p1 <= 0 || p2 <= 0 {
-            return if p1 > 0 { 1 } else { 2 }
+    fn winner(&mut self) -> u32{
+        // the result is found with the moves of the State, so it is free after `get_legal_moves`
+        if let Some(result) = self._result {
+            return result;
         }
 
-        if !self._has_moves(py) {
-            return (self._curr_pid % 2) + 1
-        }
+        let result = self._bits.winner(self._curr_pid);
+        self._result = Some(result);
+        return result;
+    }
 
-        return 0
+    #[pyo3(signature=(seed=None, max_plies=None))]
+    /// plays random moves from the State until the end of the game, or until `max_plies` moves
+    /// were played, and returns the winner, the final score and the number of plies. The game is
+    /// played natively on a copy of the board without holding the GIL
+    fn random_playout(&self, py: Python, seed: Option<u64>, max_plies: Option<u32>) -> PyResult<Playout> {
+        let (bits, curr_pid, jumps) = (self._bits, self._curr_pid, self.pending_jumps(py)?);
+        let mut rng = SplitMix64::new(seed);
+        return Ok(py.allow_threads(move || {
+            playout_on(bits, curr_pid, jumps, &mut rng, max_plies.unwrap_or(u32::MAX))
+        }));
+    }
+
+    #[pyo3(signature=(n_games, seed=None, max_plies=None))]
+    /// plays n random playouts from the State (see `random_playout`) without holding the GIL and
+    /// returns the winners, the scores (n_games, 2) and the numbers of plies of the games
+    fn rollout<'py>(&self, py: Python<'py>, n_games: usize, seed: Option<u64>, max_plies: Option<u32>) -> PyResult<Rollouts<'py>> {
+        let (bits, curr_pid, jumps) = (self._bits, self._curr_pid, self.pending_jumps(py)?);
+        let mut rng = SplitMix64::new(seed);
+        let playouts = py.allow_threads(move || {
+            (0..n_games).map(|_| {
+                playout_on(bits, curr_pid, jumps.clone(), &mut rng, max_plies.unwrap_or(u32::MAX))
+            }).collect_vec()
+        });
+        return Ok(rollouts_to_py(py, playouts));
+    }
+
+    /// counts the leaf positions `depth` moves away from the State natively, without holding the
+    /// GIL. A finished game has no moves, see `GameEngines.perft`
+    fn perft(&self, py: Python, depth: u32) -> PyResult<u64> {
+        let (bits, curr_pid, jumps) = (self._bits, self._curr_pid, self.pending_jumps(py)?);
+        return Ok(py.allow_threads(move || perft_on(bits, curr_pid, jumps, depth)));
     }
 
     fn save<'py>(slf: Bound<'py, Self>, file: Bound<'py, PyAny>) {
@@ -324,16 +614,48 @@ impl RawCheckersState {
     #[getter]
     fn curr_pid(&self) -> u32 { return self._curr_pid }
 
+    /// the (7, 8) board rotated by 45 degrees, built from the bitboards when accessed. Modifying it
+    /// does not change the State
     #[getter]
-    fn board(&self) -> &Py<PyArray2<i64>> { return &self._board }
+    fn board<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<i64>> {
+        return PyArray2::from_owned_array(py, self._bits.to_array());
+    }
+
+    #[getter(_board)]
+    fn get_board_array<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<i64>> {
+        return self.board(py);
+    }
+
+    /// replaces the pieces of the State by the pieces of a (7, 8) board
+    #[setter(_board)]
+    fn set_board_array(&mut self, board: PyReadonlyArray2<i64>) -> PyResult<()> {
+        let board = board.as_array();
+        if board.shape() != [7, 8] {
+            return Err(PyValueError::new_err("the board must be of shape (7, 8)"));
+        }
+        self._bits = Bitboard::from_array(&board);
+        self._result = None;
+        return Ok(());
+    }
+
+    /// the zobrist key of the State, updated by `play`
+    #[getter]
+    fn zobrist(&self) -> u64 { return self._zobrist }
+
+    fn __hash__(&self) -> u64 { return self._zobrist }
+
+    /// computes the zobrist key of the State from scratch, when it was not created by `play`
+    fn _rehash(&mut self, py: Python) -> PyResult<()> {
+        // all the cached moves of a multi jump start from the jumping piece
+        let jumping = self.pending_jumps(py)?.and_then(|jumps| jumps.first().map(|a| a / 8));
+        self._zobrist = zobrist_of(&self._bits, self._curr_pid, jumping);
+        return Ok(());
+    }
 
     fn __richcmp__<'py>(&self, py: Python<'py>, other: &Self, op: CompareOp) -> PyResult<Bound<'py, PyBool>> {
         return match op {
             CompareOp::Eq => {
-                let board_eq = std::iter::zip(
-                    self._board.bind(py).to_owned_array(),
-                    other._board.bind(py).to_owned_array()
-                ).all(|(a, b)| a == b);
+                let board_eq = self._bits == other._bits;
 
                 let cache_eq = match (&self._cached_moves, &other._cached_moves)  {
                     (None, None) => true,
@@ -352,4 +674,300 @@ impl RawCheckersState {
             _ => { Err(PyErr::new::<PyNotImplemented, _>("")) },
         }
     }
-}
\ No newline at end of file
+}
+
+/// returns the zobrist key of a piece on a dark square, 0 for an empty square
+fn piece_key(square: usize, piece: i64) -> u64 {
+    if piece == 0 { return 0; }
+    let index = (if piece > 0 { piece - 1 } else { 1 - piece }) as usize;
+    return ZOBRIST_KEYS[4 * square + index];
+}
+
+/// computes the zobrist key of bitboards from scratch, given the square of the piece in the middle
+/// of a multi jump if any
+fn zobrist_of(bits: &Bitboard, curr_pid: u32, jumping: Option<usize>) -> u64 {
+    let mut key = if curr_pid == 2 { ZOBRIST_KEYS[Z_SIDE] } else { 0 };
+    for s in squares(bits.p1 | bits.p2) {
+        key ^= piece_key(s, bits.piece(s));
+    }
+    return key ^ jumping.map_or(0, |s| ZOBRIST_KEYS[Z_JUMPING + s]);
+}
+
+/// returns the index of a (global) move in the action space
+fn move_to_action(m: Move) -> Option<usize> {
+    let (o, d) = m.to_isize();
+    let jump: isize = if (d.0 - o.0).abs() == 2 { 1 } else { 0 };
+    let delta = ((d.0 - o.0) / (1 + jump), (d.1 - o.1) / (1 + jump));
+    let direction = DIRECTIONS.iter().position(|&v| v == delta)?;
+    return Some(((4 * m.0.0 + m.0.1 / 2) * 4 + direction) * 2 + jump as usize);
+}
+
+/// returns the action of a played (global) move. The move is read on the rotated board like the
+/// moves of the previous engine, so that a move from a light square is played from the dark square
+/// sharing its local coordinates
+fn played_action(m: Move) -> Option<usize> {
+    let ((r, c), (k, l)) = m.to_isize();
+    if (r + c) % 2 == 1 {
+        return move_to_action(m);
+    }
+
+    let (x, y) = ((r + c - 1).div_euclid(2), (c - r + 7).div_euclid(2));
+    let (dx, dy) = ((k + l - 1).div_euclid(2) - x, (l - k + 7).div_euclid(2) - y);
+    let (r, c) = (4 + x - y, x + y - 3);
+    let (k, l) = (r + dx - dy, c + dx + dy);
+    if [r, c, k, l].iter().any(|v| !(0..8).contains(v)) { return None; }
+    return move_to_action(Move::from_isize(((r, c), (k, l))));
+}
+
+/// returns the (global) move of an index of the action space. None if the move leaves the board
+fn action_to_move(action: usize) -> Option<Move> {
+    if action >= ACTION_SIZE { return None; }
+    let (square, direction, jump) = (action / 8, (action % 8) / 2, (action % 2) as isize);
+    let r = (square / 4) as isize;
+    let c = (2 * (square % 4)) as isize + (r + 1) % 2;
+
+    let (k, l) = (r + (1 + jump) * DIRECTIONS[direction].0, c + (1 + jump) * DIRECTIONS[direction].1);
+    if !(0..8).contains(&k) || !(0..8).contains(&l) { return None; }
+    return Some(Move::from_isize(((r, c), (k, l))));
+}
+
+/// returns the (global) moves of legal actions, which never leave the board
+fn to_moves(actions: Vec<usize>) -> Vec<Move> {
+    return actions.into_iter().map(|a| action_to_move(a).unwrap()).collect_vec();
+}
+
+/// sets the given actions in a cleared mask
+fn mask_actions(actions: Vec<usize>, mask: &mut ArrayViewMut1<bool>) {
+    for action in actions {
+        mask[action] = true;
+    }
+}
+
+
+/// plays random moves on bitboards until the end of the game or `max_plies` moves, see
+/// `RawCheckersState.random_playout`. The actions of a multi jump in progress are given
+fn playout_on(mut bits: Bitboard, mut curr_pid: u32, mut jumps: Option<Vec<usize>>, rng: &mut SplitMix64, max_plies: u32) -> Playout {
+    let mut plies = 0;
+    while plies < max_plies {
+        let actions = jumps.take().unwrap_or_else(|| bits.legal_actions(curr_pid));
+        if actions.is_empty() { break; }
+
+        let action = actions[rng.below(actions.len())];
+        let continuation = bits.play(action, curr_pid).unwrap();
+        plies += 1;
+
+        if continuation.is_empty() {
+            curr_pid = (curr_pid % 2) + 1;
+        } else {
+            jumps = Some(continuation);
+        }
+    }
+    return (bits.winner(curr_pid) as i64, bits.score(), plies);
+}
+
+/// counts the leaf positions `depth` moves away from bitboards, see `RawCheckersState.perft`. The
+/// actions of a multi jump in progress are given, every jump being a move
+fn perft_on(bits: Bitboard, curr_pid: u32, jumps: Option<Vec<usize>>, depth: u32) -> u64 {
+    if depth == 0 { return 1; }
+
+    // a multi jump in progress is never over, otherwise the game is over without pieces or moves
+    let actions = match jumps {
+        Some(actions) => actions,
+        None if bits.p1 == 0 || bits.p2 == 0 => return 0,
+        None => bits.legal_actions(curr_pid),
+    };
+    // the leaves are counted without being played
+    if depth == 1 { return actions.len() as u64; }
+    return actions.into_iter().map(|action| {
+        let mut child = bits;
+        let continuation = child.play(action, curr_pid).unwrap();
+        if continuation.is_empty() {
+            perft_on(child, (curr_pid % 2) + 1, None, depth - 1)
+        } else {
+            perft_on(child, curr_pid, Some(continuation), depth - 1)
+        }
+    }).sum();
+}
+
+/// Batch of Checkers games stored as bitboards, allowing a whole step of all the games in a single
+/// call
+#[pyclass(subclass)]
+pub struct RawCheckersBatch {
+    _boards: Vec<Bitboard>,
+    _turns: Vec<u32>,
+    _curr_pids: Vec<u32>,
+    // square of the piece in the middle of a multi jump, if any
+    _jumping: Vec<Option<usize>>,
+
+    #[pyo3(get, set)]
+    auto_reset: bool,
+}
+
+unsafe impl Send for RawCheckersBatch {}
+
+impl RawCheckersBatch {
+    fn _reset_game(&mut self, g: usize) {
+        self._boards[g] = INITIAL;
+        self._turns[g] = 0;
+        self._curr_pids[g] = 1;
+        self._jumping[g] = None;
+    }
+
+    fn _check_index(&self, g: usize) -> PyResult<()> {
+        if g >= self._turns.len() {
+            return Err(PyIndexError::new_err("game index out of range"));
+        }
+        return Ok(());
+    }
+
+    /// returns the legal actions of a game of the batch
+    fn _legal_actions(&self, g: usize) -> Vec<usize> {
+        return match self._jumping[g] {
+            Some(s) => self._boards[g].jump_actions_from(s, self._curr_pids[g]),
+            None => self._boards[g].legal_actions(self._curr_pids[g]),
+        }
+    }
+}
+
+#[pymethods]
+impl RawCheckersBatch {
+    #[classattr]
+    const ACTION_SIZE: usize = ACTION_SIZE;
+
+    #[new]
+    #[pyo3(signature=(n_games, auto_reset=true))]
+    /// Creates a batch of n Checkers games in their initial state
+    fn new(n_games: usize, auto_reset: bool) -> PyResult<Self> {
+        return Ok(RawCheckersBatch {
+            _boards: vec![INITIAL; n_games],
+            _turns: vec![0; n_games],
+            _curr_pids: vec![1; n_games],
+            _jumping: vec![None; n_games],
+            auto_reset
+        })
+    }
+
+    fn __len__(&self) -> usize { return self._turns.len() }
+
+    /// plays one action per game and returns the winner of every game after the action. A negative
+    /// action skips the game. If `auto_reset` is set, finished games are put back in their initial state
+    fn play_batch<'py>(&mut self, py: Python<'py>, actions: PyReadonlyArray1<'py, i64>) -> PyResult<Bound<'py, PyArray1<i64>>> {
+        let actions = actions.as_array();
+        if actions.len() != self._turns.len() {
+            return Err(PyValueError::new_err("one action per game is expected"));
+        }
+
+        let mut winners = vec![0; actions.len()];
+        for (g, &action) in actions.iter().enumerate() {
+            if action >= 0 {
+                let continuation = self._boards[g].play(action as usize, self._curr_pids[g])
+                    .ok_or_else(|| PyValueError::new_err(format!("invalid action {action}")))?;
+
+                self._turns[g] += 1;
+                if continuation.len() > 0 {
+                    self._jumping[g] = destination(action as usize);
+                } else {
+                    self._jumping[g] = None;
+                    self._curr_pids[g] = (self._curr_pids[g] % 2) + 1;
+                }
+            }
+            winners[g] = self._boards[g].winner(self._curr_pids[g]) as i64;
+        }
+
+        if self.auto_reset {
+            for g in 0..winners.len() {
+                if winners[g] != 0 { self._reset_game(g); }
+            }
+        }
+        return Ok(PyArray1::from_vec(py, winners));
+    }
+
+    /// returns a (n_games, ACTION_SIZE) boolean mask of the legal actions of every game
+    fn legal_move_mask_batch<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<bool>> {
+        let mut mask = Array2::from_elem((self._turns.len(), ACTION_SIZE), false);
+        for (g, mut row) in mask.outer_iter_mut().enumerate() {
+            mask_actions(self._legal_actions(g), &mut row);
+        }
+        return PyArray2::from_owned_array(py, mask);
+    }
+
+    /// returns the winner of every game of the batch
+    fn winner_batch<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<i64>> {
+        let winners = self._boards.iter().zip(&self._curr_pids)
+            .map(|(b, &pid)| b.winner(pid) as i64)
+            .collect_vec();
+        return PyArray1::from_vec(py, winners);
+    }
+
+    /// returns the score of every game of the batch as a (n_games, 2) array
+    fn score_batch<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<i64>> {
+        let mut scores = Array2::zeros((self._turns.len(), 2));
+        for (g, board) in self._boards.iter().enumerate() {
+            let (p1, p2) = board.score();
+            scores[(g, 0)] = p1 as i64;
+            scores[(g, 1)] = p2 as i64;
+        }
+        return PyArray2::from_owned_array(py, scores);
+    }
+
+    #[pyo3(signature=(indexes=None))]
+    /// puts the given games (or all of them) back in their initial state
+    fn reset(&mut self, indexes: Option<Vec<usize>>) -> PyResult<()> {
+        let indexes = indexes.unwrap_or_else(|| (0..self._turns.len()).collect_vec());
+        for g in indexes {
+            self._check_index(g)?;
+            self._reset_game(g);
+        }
+        return Ok(());
+    }
+
+    /// returns a copy of the state of a game of the batch
+    fn get_state(&self, py: Python, g: usize) -> PyResult<RawCheckersState> {
+        self._check_index(g)?;
+
+        let cached_moves = match self._jumping[g] {
+            None => None,
+            Some(_) => Some(PySet::new(py, to_moves(self._legal_actions(g)))?.unbind()),
+        };
+
+        return Ok(RawCheckersState {
+            _bits: self._boards[g],
+            _turn: self._turns[g],
+            _curr_pid: self._curr_pids[g],
+            _cached_moves: cached_moves,
+            _zobrist: zobrist_of(&self._boards[g], self._curr_pids[g], self._jumping[g]),
+            _result: None,
+            _undo: Vec::new(),
+            _move_cache: None,
+            _save_mod: RawCheckersState::default_save_mod(),
+        });
+    }
+
+    /// replaces a game of the batch by the given state
+    fn set_state(&mut self, py: Python, g: usize, state: PyRef<RawCheckersState>) -> PyResult<()> {
+        self._check_index(g)?;
+        self._boards[g] = state._bits;
+
+        // all the cached moves of a multi jump start from the jumping piece
+        self._jumping[g] = state.pending_jumps(py)?.and_then(|jumps| jumps.first().map(|a| a / 8));
+        self._turns[g] = state._turn;
+        self._curr_pids[g] = state._curr_pid;
+        return Ok(());
+    }
+
+    /// the (n_games, 7, 8) boards of the games, built from the bitboards when accessed
+    #[getter]
+    fn boards<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray3<i64>> {
+        let mut boards = Array3::from_elem((self._boards.len(), 7, 8), 3);
+        for (bits, mut board) in self._boards.iter().zip(boards.outer_iter_mut()) {
+            board.assign(&bits.to_array());
+        }
+        return PyArray3::from_owned_array(py, boards);
+    }
+
+    #[getter]
+    fn turns<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u32>> { return PyArray1::from_slice(py, &self._turns) }
+
+    #[getter]
+    fn curr_pids<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u32>> { return PyArray1::from_slice(py, &self._curr_pids) }
+}
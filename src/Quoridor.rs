@@ -1,23 +1,438 @@
-use std::collections::{HashSet};
-use itertools::{Itertools};
-use numpy::{PyArray2};
-use ndarray::{Array2};
-use pyo3::{IntoPy, Py, pyclass, pymethods, PyObject, Python};
+use std::collections::VecDeque;
+use itertools::Itertools;
+use ndarray::{Array2, ArrayViewMut1};
+use numpy::{PyArray1, PyArray2, PyArrayMethods};
+use pyo3::prelude::*;
+use pyo3::{Py, pyclass, pymethods, Python, PyTypeInfo, IntoPyObject};
+use pyo3::exceptions::{PyIndexError, PyValueError};
+use pyo3::sync::GILOnceCell;
+use pyo3::types::{PyBool, PyNotImplemented, PySet, PyString, PyType};
 use pyo3::basic::CompareOp;
-use pyo3::types::{PyType};
+use crate::utils::{check_transform, copy_move_cache, mask_buffer, rollouts_to_py, zobrist_keys, Playout, Rollouts, SplitMix64};
 
-type Move = todo!();
+type Coords = (usize, usize);
+
+const SIZE: usize = 9;
+const CELLS: usize = SIZE * SIZE;
+
+/// Action space of the Quoridor game: 2 wall types x 64 wall anchors, then the pawn moves relative
+/// to the active pawn. The wall anchored on the cell (r, c) has the index 64 * WallType + 8 * r + c
+const PAWN_MOVES: [(isize, isize); 12] = [
+    (-1, 0), (1, 0), (0, -1), (0, 1), (-2, 0), (2, 0), (0, -2), (0, 2), (-1, -1), (-1, 1), (1, -1), (1, 1)
+];
+const WALL_ACTIONS: usize = 2 * 64;
+const ACTION_SIZE: usize = WALL_ACTIONS + 12;
+
+// wall types, as in the WallType python enum
+const V: u8 = 0;
+const H: u8 = 1;
+
+// anchors of the first and last columns
+const COL_0: u64 = 0x0101_0101_0101_0101;
+const COL_7: u64 = 0x8080_8080_8080_8080;
+
+/// Zobrist keys of the Quoridor game: one key per player and cell, per wall (2 types x 64 anchors),
+/// per player and walls left (more than 31 walls share the last key), then the second player to
+/// move. They are the keys of `GameEngines.Quoridor.PythonEngine.utils`
+static ZOBRIST_KEYS: [u64; 2 * CELLS + 2 * 64 + 2 * 32 + 1] = zobrist_keys(4);
+const Z_WALLS: usize = 2 * CELLS;
+const Z_WALLS_LEFT: usize = Z_WALLS + 2 * 64;
+const Z_SIDE: usize = Z_WALLS_LEFT + 2 * 32;
+
+fn pawn_key(player: usize, pos: usize) -> u64 { return ZOBRIST_KEYS[CELLS * player + pos] }
+
+fn wall_key(w_type: u8, slot: usize) -> u64 { return ZOBRIST_KEYS[Z_WALLS + 64 * w_type as usize + slot] }
+
+fn walls_left_key(player: usize, walls: u32) -> u64 {
+    return ZOBRIST_KEYS[Z_WALLS_LEFT + 32 * player + walls.min(31) as usize]
+}
+
+/// Symmetries of the Quoridor game: the identity and the left/right mirror
+const N_SYMMETRIES: usize = 2;
+
+/// returns a cell (9 * r + c) mirrored left/right
+fn mirror_cell(p: usize) -> usize { return p - p % SIZE + SIZE - 1 - p % SIZE }
+
+/// returns a wall anchor (8 * r + c) mirrored left/right: the anchor being the left column of the
+/// wall, (r, c) becomes (r, 7 - c)
+fn mirror_slot(slot: usize) -> usize { return slot - slot % 8 + 7 - slot % 8 }
+
+static MOVE_TYPE: GILOnceCell<Py<PyType>> = GILOnceCell::new();
+static WALL_TYPE: GILOnceCell<Py<PyType>> = GILOnceCell::new();
+static PLAYER_INFO: GILOnceCell<Py<PyType>> = GILOnceCell::new();
+static LOCAL_PLAYER_INFO: GILOnceCell<Py<PyType>> = GILOnceCell::new();
+
+
+/// A Quoridor move in local positions (9 * r + c). Walls are stored with the slot of their anchor
+/// in the bitboards (8 * r + c)
+#[derive(Clone, Copy, PartialEq, Eq, Hash, Debug)]
+enum Move {
+    Wall(u8, usize),
+    Jump(usize, usize),
+}
+
+impl<'py> FromPyObject<'py> for Move {
+    fn extract_bound(ob: &Bound<'py, PyAny>) -> PyResult<Self> {
+        let (kind, body): (u8, Bound<'py, PyAny>) = ob.extract()?;
+        if kind == 0 {
+            let (w_type, (r, c)): (u8, Coords) = body.extract()?;
+            if w_type > 1 || r > 7 || c > 7 {
+                return Err(PyValueError::new_err("invalid wall"));
+            }
+            return Ok(Move::Wall(w_type, 8 * r + c));
+        }
+
+        let ((r0, c0), (r1, c1)): (Coords, Coords) = body.extract()?;
+        if r0 >= SIZE || c0 >= SIZE || r1 >= SIZE || c1 >= SIZE {
+            return Err(PyValueError::new_err("invalid jump"));
+        }
+        return Ok(Move::Jump(SIZE * r0 + c0, SIZE * r1 + c1));
+    }
+}
+
+impl Move {
+    /// converts the move to its python form, (MoveType, (WallType, Coords)) or
+    /// (MoveType, (Coords, Coords))
+    fn to_py<'py>(self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
+        let move_type = MOVE_TYPE.import(py, "GameEngines.Quoridor.utilsTypes", "MoveType")?;
+        return match self {
+            Move::Wall(w_type, slot) => {
+                let wall_type = WALL_TYPE.import(py, "GameEngines.Quoridor.utilsTypes", "WallType")?;
+                let body = (wall_type.call1((w_type,))?, (slot / 8, slot % 8));
+                Ok((move_type.call1((0,))?, body).into_pyobject(py)?.into_any())
+            }
+            Move::Jump(origin, dest) => {
+                let body = ((origin / SIZE, origin % SIZE), (dest / SIZE, dest % SIZE));
+                Ok((move_type.call1((1,))?, body).into_pyobject(py)?.into_any())
+            }
+        }
+    }
+
+    /// returns the move mirrored left/right
+    fn mirrored(self) -> Move {
+        return match self {
+            Move::Wall(w_type, slot) => Move::Wall(w_type, mirror_slot(slot)),
+            Move::Jump(origin, dest) => Move::Jump(mirror_cell(origin), mirror_cell(dest)),
+        }
+    }
+
+    /// returns the index of the move in the action space
+    fn to_action(self) -> Option<usize> {
+        return match self {
+            Move::Wall(w_type, slot) => Some(64 * w_type as usize + slot),
+            Move::Jump(origin, dest) => {
+                let delta = (
+                    (dest / SIZE) as isize - (origin / SIZE) as isize,
+                    (dest % SIZE) as isize - (origin % SIZE) as isize
+                );
+                PAWN_MOVES.iter().position(|&d| d == delta).map(|i| WALL_ACTIONS + i)
+            }
+        }
+    }
+
+    /// returns the move of an index of the action space, pawn moves being relative to the given
+    /// (local) pawn position. None if the move leaves the board
+    fn from_action(action: usize, pawn: usize) -> Option<Move> {
+        if action < WALL_ACTIONS {
+            return Some(Move::Wall((action / 64) as u8, action % 64));
+        }
+        let (dr, dc) = *PAWN_MOVES.get(action - WALL_ACTIONS)?;
+        let (r, c) = ((pawn / SIZE) as isize + dr, (pawn % SIZE) as isize + dc);
+        if !(0..SIZE as isize).contains(&r) || !(0..SIZE as isize).contains(&c) { return None; }
+        return Some(Move::Jump(pawn, SIZE * r as usize + c as usize));
+    }
+}
+
+
+/// Pure rust representation of a Quoridor board. The walls of each type are stored as bitboards of
+/// their anchor (8 * r + c), the wall anchored on (r, c) covering the cells (r, c) to (r+1, c+1)
+#[derive(Clone, Copy, PartialEq, Eq, Hash, Debug)]
+struct Board {
+    h: u64,
+    v: u64,
+    pawns: [usize; 2],
+    walls_left: [u32; 2],
+}
+
+impl Board {
+    fn new(max_wall: u32) -> Self {
+        return Board { h: 0, v: 0, pawns: [SIZE / 2, CELLS - 1 - SIZE / 2], walls_left: [max_wall; 2] };
+    }
+
+    /// returns the board mirrored left/right. Reversing the bits of a bitboard reverses its rows
+    /// and its columns, swapping its bytes puts the rows back in order
+    fn mirrored(&self) -> Self {
+        return Board {
+            h: self.h.reverse_bits().swap_bytes(),
+            v: self.v.reverse_bits().swap_bytes(),
+            pawns: self.pawns.map(mirror_cell),
+            walls_left: self.walls_left,
+        };
+    }
+
+    /// returns true if a wall of the mask is anchored on (r, c)
+    fn has_wall(mask: u64, r: isize, c: isize) -> bool {
+        return (0..8).contains(&r) && (0..8).contains(&c) && mask & (1 << (8 * r + c)) != 0;
+    }
+
+    /// returns the reachable neighbours of a cell in the order up, down, left, right
+    fn neighbours(&self, p: usize) -> [Option<usize>; 4] {
+        let (r, c) = ((p / SIZE) as isize, (p % SIZE) as isize);
+        let last = SIZE as isize - 1;
+
+        let up    = r > 0    && !Self::has_wall(self.h, r - 1, c) && !Self::has_wall(self.h, r - 1, c - 1);
+        let down  = r < last && !Self::has_wall(self.h, r, c)     && !Self::has_wall(self.h, r, c - 1);
+        let left  = c > 0    && !Self::has_wall(self.v, r, c - 1) && !Self::has_wall(self.v, r - 1, c - 1);
+        let right = c < last && !Self::has_wall(self.v, r, c)     && !Self::has_wall(self.v, r - 1, c);
+
+        return [
+            if up    { Some(p - SIZE) } else { None },
+            if down  { Some(p + SIZE) } else { None },
+            if left  { Some(p - 1) } else { None },
+            if right { Some(p + 1) } else { None },
+        ];
+    }
+
+    /// returns the goal row of a player (0 or 1)
+    fn goal(player: usize) -> usize {
+        return if player == 0 { SIZE - 1 } else { 0 };
+    }
+
+    /// breadth first search of a path from a cell to a row. It returns the path as a list of cells
+    fn path(&self, from: usize, goal_row: usize) -> Option<Vec<usize>> {
+        let mut parents = [usize::MAX; CELLS];
+        let mut fifo = VecDeque::from([from]);
+        parents[from] = from;
+
+        while let Some(p) = fifo.pop_front() {
+            if p / SIZE == goal_row {
+                let mut path = vec![p];
+                while *path.last().unwrap() != from { path.push(parents[*path.last().unwrap()]); }
+                return Some(path);
+            }
+            for n in self.neighbours(p).into_iter().flatten() {
+                if parents[n] == usize::MAX {
+                    parents[n] = p;
+                    fifo.push_back(n);
+                }
+            }
+        }
+        return None;
+    }
+
+    /// returns true if a path exists from a cell to a row
+    fn has_path(&self, from: usize, goal_row: usize) -> bool {
+        let mut visited: u128 = 1 << from;
+        let mut lifo = vec![from];
+
+        while let Some(p) = lifo.pop() {
+            if p / SIZE == goal_row { return true; }
+            for n in self.neighbours(p).into_iter().flatten() {
+                if visited & (1 << n) == 0 {
+                    visited |= 1 << n;
+                    lifo.push(n);
+                }
+            }
+        }
+        return false;
+    }
+
+    /// returns the bitboards of the walls that can be placed without overlapping or crossing an
+    /// existing wall
+    fn wall_candidates(&self) -> (u64, u64) {
+        let h = !(self.h | ((self.h << 1) & !COL_0) | ((self.h >> 1) & !COL_7) | self.v);
+        let v = !(self.v | (self.v << 8) | (self.v >> 8) | self.h);
+        return (h, v);
+    }
+
+    /// returns the walls that can be placed without blocking any player
+    fn legal_walls(&self) -> Vec<Move> {
+        let (cand_h, cand_v) = self.wall_candidates();
+        let candidates = (0..64).filter(|s| cand_v & (1 << s) != 0).map(|s| Move::Wall(V, s))
+            .chain((0..64).filter(|s| cand_h & (1 << s) != 0).map(|s| Move::Wall(H, s)))
+            .collect_vec();
+
+        // Cannot block a player with less than 3 walls
+        if (self.h | self.v).count_ones() < 2 { return candidates; }
+
+        // cells whose down (resp. right) edge is on the path of a player
+        let (mut downs, mut rights): (u128, u128) = (0, 0);
+        for player in 0..2 {
+            let path = self.path(self.pawns[player], Self::goal(player)).unwrap_or_default();
+            for (&a, &b) in path.iter().tuple_windows() {
+                let (low, high) = (a.min(b), a.max(b));
+                if high - low == SIZE { downs |= 1 << low; } else { rights |= 1 << low; }
+            }
+        }
+
+        return candidates.into_iter().filter(|&m| {
+            let Move::Wall(w_type, slot) = m else { return false };
+            let cell = SIZE * (slot / 8) + slot % 8;
+
+            // walls that do not cut a path cannot block a player
+            let cuts = if w_type == H { downs & (0b11 << cell) } else { rights & ((1 << cell) | (1 << (cell + SIZE))) };
+            if cuts == 0 { return true; }
+
+            let mut next = *self;
+            next.place_wall(w_type, slot);
+            (0..2).all(|player| next.has_path(next.pawns[player], Self::goal(player)))
+        }).collect_vec();
+    }
+
+    /// returns the moves of the pawn of a player, jumping over or besides the other pawn
+    fn jumps(&self, player: usize) -> Vec<Move> {
+        let s_pos = self.pawns[player];
+        let o_pos = self.pawns[(player + 1) % 2];
+        let dest = self.neighbours(s_pos);
+
+        let mut jumps = Vec::new();
+        for d in dest.into_iter().flatten() {
+            if d != o_pos {
+                jumps.push(Move::Jump(s_pos, d));
+                continue;
+            }
+
+            // the straight jump is only possible if the other pawn is not against a wall
+            let o_dest = self.neighbours(o_pos);
+            let jump = (2 * o_pos as isize - s_pos as isize) as usize;
+            if o_dest.contains(&Some(jump)) {
+                jumps.push(Move::Jump(s_pos, jump));
+            } else {
+                jumps.extend(o_dest.into_iter().flatten().filter(|&n| n != s_pos).map(|n| Move::Jump(s_pos, n)));
+            }
+        }
+        return jumps;
+    }
+
+    /// returns the legal moves of a player
+    fn legal_moves(&self, player: usize) -> Vec<Move> {
+        let mut moves = self.jumps(player);
+        if self.walls_left[player] > 0 {
+            moves.extend(self.legal_walls());
+        }
+        return moves;
+    }
+
+    fn place_wall(&mut self, w_type: u8, slot: usize) {
+        if w_type == H { self.h |= 1 << slot; } else { self.v |= 1 << slot; }
+    }
+
+    /// plays a move for a player. The move is NOT verified
+    fn play(&mut self, m: Move, player: usize) {
+        match m {
+            Move::Jump(_, dest) => { self.pawns[player] = dest; }
+            Move::Wall(w_type, slot) => {
+                self.place_wall(w_type, slot);
+                self.walls_left[player] -= 1;
+            }
+        }
+    }
+
+    /// returns the change of the zobrist key of the board when a player plays a move
+    fn move_key(&self, m: Move, player: usize) -> u64 {
+        return match m {
+            Move::Jump(_, dest) => { pawn_key(player, self.pawns[player]) ^ pawn_key(player, dest) }
+            Move::Wall(w_type, slot) => {
+                let walls = self.walls_left[player];
+                wall_key(w_type, slot) ^ walls_left_key(player, walls) ^ walls_left_key(player, walls - 1)
+            }
+        }
+    }
+
+    /// computes the zobrist key of the board from scratch
+    fn zobrist(&self, curr_pid: u32) -> u64 {
+        let mut key = if curr_pid == 2 { ZOBRIST_KEYS[Z_SIDE] } else { 0 };
+        for p in 0..2 {
+            key ^= pawn_key(p, self.pawns[p]) ^ walls_left_key(p, self.walls_left[p]);
+        }
+        for s in 0..64 {
+            if self.v & (1 << s) != 0 { key ^= wall_key(V, s); }
+            if self.h & (1 << s) != 0 { key ^= wall_key(H, s); }
+        }
+        return key;
+    }
+
+    fn winner(&self) -> i64 {
+        // If p2 is in the first row, they win
+        if self.pawns[1] / SIZE == 0 { return 2; }
+        // If p1 is in the last row, they win
+        if self.pawns[0] / SIZE == SIZE - 1 { return 1; }
+        return 0;
+    }
+
+    fn score(&self) -> (usize, usize) {
+        return (self.pawns[0] / SIZE, SIZE - 1 - self.pawns[1] / SIZE);
+    }
+
+    /// plays random moves from a player's turn until the end of the game or `max_plies` moves, see
+    /// `RawQuoridorState.random_playout`
+    fn random_playout(mut self, mut player: usize, rng: &mut SplitMix64, max_plies: u32) -> Playout {
+        let mut plies = 0;
+        while plies < max_plies && self.winner() == 0 {
+            let moves = self.legal_moves(player);
+            if moves.is_empty() { break; }
+
+            self.play(moves[rng.below(moves.len())], player);
+            player = (player + 1) % 2;
+            plies += 1;
+        }
+        return (self.winner(), self.score(), plies);
+    }
+
+    /// counts the leaf positions `depth` moves away from a player's turn, see
+    /// `RawQuoridorState.perft`
+    fn perft(&self, player: usize, depth: u32) -> u64 {
+        if depth == 0 { return 1; }
+        if self.winner() != 0 { return 0; }
+
+        let moves = self.legal_moves(player);
+        // the leaves are counted without being played
+        if depth == 1 { return moves.len() as u64; }
+        return moves.into_iter().map(|m| {
+            let mut child = *self;
+            child.play(m, player);
+            child.perft((player + 1) % 2, depth - 1)
+        }).sum();
+    }
+
+    /// returns the raw board of the python engine: the reachable neighbour of each cell in the 4
+    /// directions (up, down, left, right), -1 if there is none
+    fn raw_board(&self) -> Array2<i64> {
+        return Array2::from_shape_fn((4, CELLS), |(d, p)| {
+            self.neighbours(p)[d].map_or(-1, |n| n as i64)
+        });
+    }
+
+    /// sets the actions of the legal moves of a player in a cleared mask
+    fn legal_mask(&self, player: usize, mask: &mut ArrayViewMut1<bool>) {
+        for m in self.legal_moves(player) {
+            if let Some(action) = m.to_action() { mask[action] = true; }
+        }
+    }
+}
 
 
 #[derive(Clone)]
 #[pyclass(subclass, dict)]
 pub struct RawQuoridorState {
-    // #[pyo3(get, set)]
-    // _board: Py<PyArray2<i64>>, todo
+    _state: Board,
+
     #[pyo3(get, set)]
     _turn: u32,
     #[pyo3(get, set)]
     _curr_pid: u32,
+    #[pyo3(get, set)]
+    _zobrist: u64,
+    // the pushed moves with the board and key they replaced, the last one at the end
+    _undo: Vec<(Move, Board, u64)>,
+    // the legal moves cached by `GameEngines.cache_utils`, dropped when the State changes
+    #[pyo3(get, set)]
+    _move_cache: Option<Py<PySet>>,
+
+    #[pyo3(get)]
+    BOARD_SIZE: usize,
+    #[pyo3(get)]
+    MAX_WALL: u32,
 
     #[pyo3(get, set)]
     _save_mod: Py<PyType>
@@ -32,90 +447,257 @@ impl RawQuoridorState {
             SaveModule.getattr("QuoridorSave").unwrap().extract().unwrap()
         })
     }
+
+    fn player(&self) -> usize { return (self._curr_pid - 1) as usize }
+
+    /// returns the State under a symmetry, the transform 1 being the left/right mirror
+    fn transformed(&self, py: Python, transform: usize) -> PyResult<Self> {
+        let mut new_state = self.copy(py, false)?;
+        if transform == 1 {
+            new_state._state = self._state.mirrored();
+            new_state._zobrist = new_state._state.zobrist(self._curr_pid);
+        }
+        return Ok(new_state);
+    }
+
+    /// plays a move on the State in place
+    fn apply(&mut self, c_move: Move) {
+        self._zobrist ^= self._state.move_key(c_move, self.player()) ^ ZOBRIST_KEYS[Z_SIDE];
+        self._state.play(c_move, self.player());
+        self._turn += 1;
+        self._curr_pid = (self._curr_pid % 2) + 1;
+    }
 }
 
 #[pymethods]
 impl RawQuoridorState {
     #[new]
-    #[pyo3(signature=(save_module=None))]
-    fn new(save_module: Option<Py<PyType>>) -> Self{
-        return Python::with_gil(|_py| {
-            let Quoridor_save: Py<PyType> = match save_module {
-                None => { Self::default_save_mod()}
-                Some(save_mod) => {save_mod}
-            };
-
-            return Self {
-                // _board: PyArray2::from_owned_array(_py, Array2::zeros((9, 9))).to_owned(), todo
-                _turn: 0,
-                _curr_pid: 1,
-                _save_mod: Quoridor_save
-            };
+    #[pyo3(signature=(b_size=9, max_wall=10, *, save_module=None))]
+    /// Creates the initial Quoridor State python object
+    fn new(b_size: usize, max_wall: u32, save_module: Option<Bound<'_, PyType>>) -> PyResult<Self> {
+        if b_size != SIZE {
+            return Err(PyValueError::new_err("The rust engine only supports a board size of 9"));
+        }
+        let quoridor_save: Py<PyType> = match save_module {
+            None => { Self::default_save_mod() }
+            Some(save_mod) => { save_mod.unbind() }
+        };
+
+        return Ok(RawQuoridorState {
+            _state: Board::new(max_wall),
+            _turn: 0,
+            _curr_pid: 1,
+            _zobrist: Board::new(max_wall).zobrist(1),
+            BOARD_SIZE: b_size,
+            MAX_WALL: max_wall,
+            _undo: Vec::new(),
+            _move_cache: None,
+            _save_mod: quoridor_save
         });
     }
 
-    /// copies and returns a python Quoridor State object
-    fn copy(&self) -> Self{
-        return Python::with_gil(|_py|{
-            return Self {
-                // _board: board.to_owned(), todo
-                _turn: self._turn,
-                _curr_pid: self._curr_pid,
-                _save_mod: self._save_mod.clone()
-            };
+    fn __richcmp__<'py>(&self, py: Python<'py>, other: &Self, op: CompareOp) -> PyResult<Bound<'py, PyBool>> {
+        return match op {
+            CompareOp::Eq => {
+                let res = self._state == other._state &&
+                    self._turn == other._turn &&
+                    self._curr_pid == other._curr_pid;
+                Ok(PyBool::new(py, res).to_owned())
+            },
+            _ => { Err(PyErr::new::<PyNotImplemented, _>("")) },
+        }
+    }
+
+    #[pyo3(signature=(*, cache=false))]
+    /// copies and returns a python Quoridor State object. The cached moves are only copied if
+    /// `cache` is true
+    fn copy(&self, py: Python, cache: bool) -> PyResult<Self> {
+        return Ok(RawQuoridorState {
+            _state: self._state,
+            _turn: self._turn,
+            _curr_pid: self._curr_pid,
+            _zobrist: self._zobrist,
+            _undo: Vec::new(),
+            _move_cache: copy_move_cache(py, &self._move_cache, cache)?,
+            BOARD_SIZE: self.BOARD_SIZE,
+            MAX_WALL: self.MAX_WALL,
+            _save_mod: self._save_mod.clone(),
         });
     }
 
     /// play an action on the Quoridor State and returns the following State object
-    fn play(&self, c_move: Move) -> Self {
-        todo!()
+    fn play(&self, py: Python, c_move: Move) -> PyResult<Self> {
+        let mut new_state = self.copy(py, false)?;
+        new_state.apply(c_move);
+        return Ok(new_state);
+    }
+
+    /// plays an action on the Quoridor State in place. The previous board is kept to undo the
+    /// action with `pop`
+    fn push(&mut self, c_move: Move) {
+        self._undo.push((c_move, self._state, self._zobrist));
+        self._move_cache = None;
+        self.apply(c_move);
+    }
+
+    /// undoes the last action played by `push` in place and returns it
+    fn pop<'py>(&mut self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
+        let (c_move, state, zobrist) = self._undo.pop()
+            .ok_or_else(|| PyIndexError::new_err("no pushed move to pop"))?;
+        self._state = state;
+        self._zobrist = zobrist;
+        self._move_cache = None;
+        self._turn -= 1;
+        self._curr_pid = (self._curr_pid % 2) + 1;
+        return c_move.to_py(py);
     }
 
     /// standard implementation of the `get_legal_moves` python method. it returns the legal
-    /// actions the specified player can take. In the case of the Quoridor game, todo
-    fn get_legal_moves(&self) -> PyObject {
-        todo!()
+    /// actions the specified player can take. In the case of the Quoridor game, these are the pawn
+    /// moves and the walls that do not block any player
+    fn get_legal_moves<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PySet>> {
+        let moves = self._state.legal_moves(self.player()).into_iter()
+            .map(|m| m.to_py(py))
+            .collect::<PyResult<Vec<_>>>()?;
+        return PySet::new(py, moves);
+    }
+
+    #[classattr]
+    const ACTION_SIZE: usize = ACTION_SIZE;
+
+    #[pyo3(signature=(out=None))]
+    /// returns the legal actions of the State as a boolean mask over the action space of the game
+    /// (2 wall types x 64 anchors, then 12 pawn moves). If `out` is given, the mask is written in
+    /// it instead of a new array
+    fn legal_action_mask<'py>(&self, py: Python<'py>, out: Option<Bound<'py, PyArray1<bool>>>) -> PyResult<Bound<'py, PyArray1<bool>>> {
+        let mask = mask_buffer(py, out, ACTION_SIZE)?;
+        self._state.legal_mask(self.player(), &mut unsafe { mask.as_array_mut() });
+        return Ok(mask);
+    }
+
+    /// returns the index of a move in the action space of the game
+    fn move_to_action(&self, c_move: Move) -> PyResult<usize> {
+        return c_move.to_action()
+            .ok_or_else(|| PyValueError::new_err(format!("{c_move:?} is not in the action space")));
+    }
+
+    /// returns the move of an index of the action space of the game. Pawn moves are relative to
+    /// the pawn of the current player
+    fn action_to_move<'py>(&self, py: Python<'py>, action: usize) -> PyResult<Bound<'py, PyAny>> {
+        return Move::from_action(action, self._state.pawns[self.player()])
+            .ok_or_else(|| PyValueError::new_err(format!("invalid action {action}")))?
+            .to_py(py);
     }
 
-    /// returns the current score of the State in the case of Quoridor, this means the number of
-    /// towers controlled by each player
-    fn score(&self) -> () {
-        todo!()
+    #[classattr]
+    const N_SYMMETRIES: usize = N_SYMMETRIES;
+
+    /// returns the State under a symmetry of the board. The board is only symmetric by the
+    /// left/right mirror, which is the transform 1
+    fn transform(&self, py: Python, transform: usize) -> PyResult<Self> {
+        check_transform(transform, N_SYMMETRIES)?;
+        return self.transformed(py, transform);
+    }
+
+    /// returns the State under all the symmetries of the board, indexed by transform
+    fn symmetries(&self, py: Python) -> PyResult<Vec<Self>> {
+        return (0..N_SYMMETRIES).map(|t| self.transformed(py, t)).collect();
+    }
+
+    /// returns the canonical State, the transformed State with the smallest zobrist key, and the
+    /// transform giving it
+    fn canonical(&self, py: Python) -> PyResult<(Self, usize)> {
+        let transform = usize::from(self._state.mirrored().zobrist(self._curr_pid) < self._zobrist);
+        return Ok((self.transformed(py, transform)?, transform));
+    }
+
+    #[pyo3(signature=(c_move, transform, *, inverse=false))]
+    /// returns the move of the transformed State matching a move of the State, or the move of the
+    /// State matching a move of the transformed State if `inverse` is set. The mirror being its
+    /// own inverse, both are the same
+    #[allow(unused_variables)]
+    fn transform_move<'py>(&self, py: Python<'py>, c_move: Move, transform: usize, inverse: bool) -> PyResult<Bound<'py, PyAny>> {
+        check_transform(transform, N_SYMMETRIES)?;
+        let c_move = if transform == 1 { c_move.mirrored() } else { c_move };
+        return c_move.to_py(py);
+    }
+
+    #[pyo3(signature=(action, transform, *, inverse=false))]
+    /// returns the index of the action space of `transform_move`
+    #[allow(unused_variables)]
+    fn transform_action(&self, action: usize, transform: usize, inverse: bool) -> PyResult<usize> {
+        check_transform(transform, N_SYMMETRIES)?;
+        if action >= ACTION_SIZE {
+            return Err(PyValueError::new_err(format!("invalid action {action}")));
+        }
+        if transform == 0 { return Ok(action); }
+        if action < WALL_ACTIONS { return Ok(action - action % 64 + mirror_slot(action % 64)); }
+
+        let (dr, dc) = PAWN_MOVES[action - WALL_ACTIONS];
+        return Ok(WALL_ACTIONS + PAWN_MOVES.iter().position(|&d| d == (dr, -dc)).unwrap());
+    }
+
+    /// returns the current score of the State. In the case of Quoridor, this means the number of
+    /// rows each player has advanced
+    fn score(&self) -> (usize, usize) {
+        return self._state.score();
     }
 
     /// return the current winner of the game.
     ///
-    /// If the game is unfinished, it return 0
-    ///
-    /// If the game is a tie it returns -1
+    /// If the game is unfinished, it returns 0
     ///
     /// Otherwise, it returns the player id of the winner
     fn winner(&self) -> i64 {
-        todo!()
+        return self._state.winner();
     }
 
-    fn save(slf: PyObject, file: PyObject) {
-        Python::with_gil(|_py|{
-            let save_mod = slf.getattr(_py, "_save_mod").unwrap();
-            save_mod.call_method(
-                _py, "save_state", (file, slf), None
-            ).unwrap();
-        })
+    #[pyo3(signature=(seed=None, max_plies=None))]
+    /// plays random moves from the State until the end of the game, or until `max_plies` moves
+    /// were played, and returns the winner, the final score and the number of plies. The game is
+    /// played natively on a copy of the board without holding the GIL
+    fn random_playout(&self, py: Python, seed: Option<u64>, max_plies: Option<u32>) -> Playout {
+        let (board, player) = (self._state, self.player());
+        let mut rng = SplitMix64::new(seed);
+        return py.allow_threads(move || board.random_playout(player, &mut rng, max_plies.unwrap_or(u32::MAX)));
+    }
+
+    #[pyo3(signature=(n_games, seed=None, max_plies=None))]
+    /// plays n random playouts from the State (see `random_playout`) without holding the GIL and
+    /// returns the winners, the scores (n_games, 2) and the numbers of plies of the games
+    fn rollout<'py>(&self, py: Python<'py>, n_games: usize, seed: Option<u64>, max_plies: Option<u32>) -> Rollouts<'py> {
+        let (board, player) = (self._state, self.player());
+        let mut rng = SplitMix64::new(seed);
+        let playouts = py.allow_threads(move || {
+            (0..n_games).map(|_| board.random_playout(player, &mut rng, max_plies.unwrap_or(u32::MAX))).collect_vec()
+        });
+        return rollouts_to_py(py, playouts);
+    }
+
+    /// counts the leaf positions `depth` moves away from the State natively, without holding the
+    /// GIL. A finished game has no moves, see `GameEngines.perft`
+    fn perft(&self, py: Python, depth: u32) -> u64 {
+        let (board, player) = (self._state, self.player());
+        return py.allow_threads(move || board.perft(player, depth));
+    }
+
+    fn save<'py>(slf: Bound<'py, Self>, file: Bound<'py, PyAny>) {
+        let save_mod = slf.getattr("_save_mod").unwrap();
+        save_mod.call_method("save_state", (file, slf), None).unwrap();
     }
 
     #[staticmethod]
     #[pyo3(signature=(file, save_module=None))]
-    fn load(file: PyObject, save_module: Option<Py<PyType>>) -> PyObject {
-        let Quoridor_save: Py<PyType> = match save_module {
+    fn load<'py>(file: Bound<'py, PyString>, save_module: Option<Bound<'py, PyType>>) -> PyResult<Bound<'py, PyAny>> {
+        let quoridor_save: Py<PyType> = match save_module {
             None => { Self::default_save_mod()}
-            Some(save_mod) => {save_mod}
+            Some(save_mod) => {save_mod.unbind()}
         };
 
-        Python::with_gil(|_py|{
-            Quoridor_save.call_method(
-                _py, "load_state", (file, _py.get_type::<Self>()), None
-            ).unwrap()
-        })
+        let py = file.py();
+        quoridor_save.bind(py.clone()).call_method(
+            "load_state",  (file, Self::type_object(py.clone())), None
+        )
     }
 
     #[getter]
@@ -124,17 +706,88 @@ impl RawQuoridorState {
     #[getter]
     fn curr_pid(&self) -> u32 { return self._curr_pid }
 
+    /// the walls of the board and the info of both players, as given by the python engine
     #[getter]
-    fn board(&self) -> ()) { todo!() }
+    fn board<'py>(&self, py: Python<'py>) -> PyResult<(Bound<'py, PySet>, (Bound<'py, PyAny>, Bound<'py, PyAny>))> {
+        let player_info = PLAYER_INFO.import(py, "GameEngines.Quoridor.utilsTypes", "PlayerInfo")?;
+        let walls = (0..64).filter_map(|s| {
+            if self._state.v & (1 << s) != 0 { Some(Move::Wall(V, s)) }
+            else if self._state.h & (1 << s) != 0 { Some(Move::Wall(H, s)) }
+            else { None }
+        }).map(|m| Ok(m.to_py(py)?.get_item(1)?)).collect::<PyResult<Vec<_>>>()?;
 
-    fn __richcmp__(&self, other: &Self, op: CompareOp) -> PyObject {
-        Python::with_gil(|_py| {
-            return match op {
-                CompareOp::Eq => {
-                    todo!()
-                },
-                _ => { _py.NotImplemented() },
+        let info = |p: usize| {
+            let pos = self._state.pawns[p];
+            player_info.call1(((pos / SIZE, pos % SIZE), self._state.walls_left[p]))
+        };
+        return Ok((PySet::new(py, walls)?, (info(0)?, info(1)?)));
+    }
+
+    /// the zobrist key of the State, updated by `play`
+    #[getter]
+    fn zobrist(&self) -> u64 { return self._zobrist }
+
+    fn __hash__(&self) -> u64 { return self._zobrist }
+
+    /// computes the zobrist key of the State from scratch, when it was not created by `play`
+    fn _rehash(&mut self) {
+        self._zobrist = self._state.zobrist(self._curr_pid);
+    }
+
+    /// the walls in the local format of the python engine, {(WallType, 9 * r + c)}
+    #[getter(_walls)]
+    fn get_walls<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PySet>> {
+        let wall_type = WALL_TYPE.import(py, "GameEngines.Quoridor.utilsTypes", "WallType")?;
+        let mut walls = Vec::new();
+        for s in 0..64 {
+            for (w_type, mask) in [(V, self._state.v), (H, self._state.h)] {
+                if mask & (1 << s) != 0 {
+                    walls.push((wall_type.call1((w_type,))?, SIZE * (s / 8) + s % 8));
+                }
             }
-        })
+        }
+        return PySet::new(py, walls);
     }
-}
\ No newline at end of file
+
+    #[setter(_walls)]
+    fn set_walls(&mut self, walls: Vec<(u8, usize)>) -> PyResult<()> {
+        let (mut h, mut v) = (0, 0);
+        for (w_type, pos) in walls {
+            let (r, c) = (pos / SIZE, pos % SIZE);
+            if r > 7 || c > 7 { return Err(PyValueError::new_err(format!("invalid wall position {pos}"))); }
+            if w_type == H { h |= 1 << (8 * r + c); } else { v |= 1 << (8 * r + c); }
+        }
+        self._state.h = h;
+        self._state.v = v;
+        return Ok(());
+    }
+
+    /// the local info of both players, [_PlayerInfo(9 * r + c, walls left)]
+    #[getter(_players)]
+    fn get_players<'py>(&self, py: Python<'py>) -> PyResult<Vec<Bound<'py, PyAny>>> {
+        let player_info = LOCAL_PLAYER_INFO.import(py, "GameEngines.Quoridor.PythonEngine.utils", "_PlayerInfo")?;
+        return (0..2).map(|p| player_info.call1((self._state.pawns[p], self._state.walls_left[p]))).collect();
+    }
+
+    #[setter(_players)]
+    fn set_players(&mut self, players: Vec<(usize, u32)>) -> PyResult<()> {
+        if players.len() != 2 || players.iter().any(|p| p.0 >= CELLS) {
+            return Err(PyValueError::new_err("invalid players"));
+        }
+        for (p, (pos, walls)) in players.into_iter().enumerate() {
+            self._state.pawns[p] = pos;
+            self._state.walls_left[p] = walls;
+        }
+        return Ok(());
+    }
+
+    /// the raw board of the python engine, built from the walls
+    #[getter(_board)]
+    fn get_board<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<i64>> {
+        return PyArray2::from_owned_array(py, self._state.raw_board());
+    }
+
+    /// the raw board is derived from the walls, so setting it has no effect
+    #[setter(_board)]
+    fn set_board(&mut self, _board: Bound<'_, PyAny>) {}
+}
@@ -1,28 +1,220 @@
-use std::collections::{HashSet};
 use itertools::{Itertools};
-use ndarray::{Array2};
-use numpy::{PyArray2, PyArrayMethods};
+use ndarray::{Array2, Array3, ArrayView2, ArrayViewMut1};
+use numpy::{PyArray1, PyArray2, PyArray3, PyArrayMethods, PyReadonlyArray1, PyReadonlyArray2};
 use pyo3::prelude::*;
 use pyo3::{Py, pyclass, pymethods, Python, PyTypeInfo};
+use pyo3::exceptions::{PyIndexError, PyValueError};
 use pyo3::types::{PyBool, PyNotImplemented, PySet, PyString, PyType};
 use pyo3::basic::CompareOp;
+use crate::utils::{check_transform, copy_move_cache, d4_coords, d4_inverse, mask_buffer, rollouts_to_py, zobrist_keys, Playout, Rollouts, SplitMix64, D4};
 type Coords = (usize, usize);
 type Move = (Coords, Coords);
 
+/// Action space of the UltiTTT game: 9 sub-boards x 9 cells
+const ACTION_SIZE: usize = 81;
+
+/// Zobrist keys of the UltiTTT game: one key per cell of the action space and player, then the
+/// second player to move, then the active cell. They are the keys of `GameEngines.UltiTTT.utilsTypes`
+static ZOBRIST_KEYS: [u64; 81 * 2 + 1 + 9] = zobrist_keys(1);
+const Z_SIDE: usize = 81 * 2;
+const Z_ACTIVE: usize = Z_SIDE + 1;
+
+
+/// Masks: the bit i of a 9 bits mask is the cell i (3 * row + col) of a tic-tac-toe board. The 81
+/// cells of the game are kept as one mask per player, the sub-board i being the bits 9 * i to
+/// 9 * i + 8, in the order of the action space
+const FULL: u16 = (1 << 9) - 1;
+const LINES: [u16; 8] = [
+    0b100010001, 0b001010100,               // diagonals
+    0b000000111, 0b000111000, 0b111000000,  // rows
+    0b001001001, 0b010010010, 0b100100100,  // cols
+];
+
+/// returns if a mask holds a full line, for every mask
+const fn win_table() -> [bool; 512] {
+    let mut table = [false; 512];
+    let mut mask = 0;
+    while mask < 512 {
+        let mut l = 0;
+        while l < LINES.len() {
+            table[mask] |= mask as u16 & LINES[l] == LINES[l];
+            l += 1;
+        }
+        mask += 1;
+    }
+    return table;
+}
+
+/// returns the cells of the sub-boards of a mask of the meta-board, for every mask
+const fn spread_table() -> [u128; 512] {
+    let mut table = [0u128; 512];
+    let mut mask = 0;
+    while mask < 512 {
+        let mut i = 0;
+        while i < 9 {
+            if mask >> i & 1 == 1 {
+                table[mask] |= (FULL as u128) << (9 * i);
+            }
+            i += 1;
+        }
+        mask += 1;
+    }
+    return table;
+}
+
+/// returns the cell of a tic-tac-toe board (and the sub-board of the meta-board) under each
+/// symmetry, see `d4_coords`
+const fn tiles_table() -> [[usize; 9]; D4] {
+    let mut table = [[0; 9]; D4];
+    let mut t = 0;
+    while t < D4 {
+        let mut cell = 0;
+        while cell < 9 {
+            let (i, j) = d4_coords(t, cell / 3, cell % 3, 3);
+            table[t][cell] = 3 * i + j;
+            cell += 1;
+        }
+        t += 1;
+    }
+    return table;
+}
+
+static WINS: [bool; 512] = win_table();
+static SPREAD: [u128; 512] = spread_table();
+static TILES: [[usize; 9]; D4] = tiles_table();
+
+/// returns the winner of a tic-tac-toe board from the masks of the players and of the cells which
+/// are not free: -1 for a tie and 0 if the board is not over
+fn winner_of(p1: u16, p2: u16, taken: u16) -> i64 {
+    if WINS[p1 as usize] { return 1; }
+    if WINS[p2 as usize] { return 2; }
+    return if taken == FULL { -1 } else { 0 };
+}
+
+/// returns the cells of a mask in increasing order
+fn cells(mut mask: u128) -> impl Iterator<Item=usize> {
+    return std::iter::from_fn(move || {
+        if mask == 0 { return None; }
+        let cell = mask.trailing_zeros() as usize;
+        mask &= mask - 1;
+        Some(cell)
+    });
+}
+
+/// Masks of an UltiTTT board: the cells of each player and the sub-boards won by each player or
+/// tied. The wins are found in a lookup table and the legal moves with a few bitwise operations
+#[derive(Clone, Copy, PartialEq, Eq)]
+struct Masks {
+    cells: [u128; 2],
+    won: [u16; 2],
+    tied: u16,
+}
+
+const EMPTY: Masks = Masks { cells: [0, 0], won: [0, 0], tied: 0 };
+
+impl Masks {
+    /// returns the mask of the cells of a player (0 or 1) in a sub-board
+    fn sub_board(&self, player: usize, tile: usize) -> u16 {
+        return (self.cells[player] >> (9 * tile)) as u16 & FULL;
+    }
+
+    /// returns the mask of the sub-boards which are won or tied
+    fn decided(&self) -> u16 { return self.won[0] | self.won[1] | self.tied }
+
+    /// returns the mask of the cells that can be played
+    fn legal(&self, active_cell: i64) -> u128 {
+        let empty = !(self.cells[0] | self.cells[1]);
+        let decided = self.decided();
+        // if first move or the active cell is over, any cell of the sub-boards not over can be played
+        if active_cell < 0 || decided >> active_cell as u32 & 1 == 1 {
+            return empty & SPREAD[(FULL ^ decided) as usize];
+        }
+        return empty & (FULL as u128) << (9 * active_cell as u32);
+    }
+
+    /// plays the cell of the action space for a player and returns the new active cell
+    fn play(&mut self, action: usize, curr_pid: u32) -> i64 {
+        let (tile, sub_tile) = (action / 9, action % 9);
+        self.cells[(curr_pid - 1) as usize] |= 1 << action;
+
+        let (p1, p2) = (self.sub_board(0, tile), self.sub_board(1, tile));
+        match winner_of(p1, p2, p1 | p2) {
+            1 => self.won[0] |= 1 << tile,
+            2 => self.won[1] |= 1 << tile,
+            -1 => self.tied |= 1 << tile,
+            _ => {}
+        }
+        return if self.decided() >> sub_tile & 1 == 1 { -1 } else { sub_tile as i64 };
+    }
+
+    /// returns the winner of the game, -1 for a tie and 0 if it is not over
+    fn winner(&self) -> i64 {
+        return winner_of(self.won[0], self.won[1], self.decided());
+    }
+
+    /// returns the state of the cells of the meta-board: the winner of the sub-board, -1 for a tie
+    /// and 0 if not over
+    fn win_state(&self) -> [i64; 9] {
+        return std::array::from_fn(|i| {
+            if self.won[0] >> i & 1 == 1 { 1 } else if self.won[1] >> i & 1 == 1 { 2 } else if self.tied >> i & 1 == 1 { -1 } else { 0 }
+        });
+    }
+
+    fn set_win_state(&mut self, win_state: &[i64; 9]) {
+        let mask = |value: i64| (0..9).filter(|&i| win_state[i] == value).fold(0u16, |m, i| m | 1 << i);
+        self.won = [mask(1), mask(2)];
+        self.tied = mask(-1);
+    }
+
+    /// returns the masks under a symmetry: the sub-boards and their cells move the same way
+    fn transformed(&self, transform: usize) -> Masks {
+        let tiles = &TILES[transform];
+        let meta = |mask: u16| cells(mask as u128).fold(0u16, |m, tile| m | 1 << tiles[tile]);
+        return Masks {
+            cells: self.cells.map(|mask| cells(mask).fold(0u128, |m, a| m | 1 << transform_action(transform, a))),
+            won: self.won.map(meta),
+            tied: meta(self.tied),
+        };
+    }
+
+    /// returns the (9, 9) board, a row per sub-board
+    fn to_array(&self) -> Array2<i64> {
+        let mut board = Array2::zeros((9, 9));
+        for (player, &mask) in self.cells.iter().enumerate() {
+            for cell in cells(mask) {
+                board[(cell / 9, cell % 9)] = player as i64 + 1;
+            }
+        }
+        return board;
+    }
+
+    /// replaces the cells by the cells of a (9, 9) board
+    fn set_cells(&mut self, board: &ArrayView2<i64>) {
+        self.cells = [0, 0];
+        for ((i, j), &v) in board.indexed_iter() {
+            if v == 1 || v == 2 { self.cells[(v - 1) as usize] |= 1 << (9 * i + j); }
+        }
+    }
+}
+
 
 #[derive(Clone)]
 #[pyclass(subclass, dict)]
 pub struct RawUltiTTTState {
-    #[pyo3(get, set)]
-    _board: Py<PyArray2<i64>>,
+    _masks: Masks,
     #[pyo3(get, set)]
     _turn: u32,
     #[pyo3(get, set)]
     _curr_pid: u32,
     #[pyo3(get, set)]
-    _win_state: [i64; 9],
-    #[pyo3(get, set)]
     _active_cell: i64,
+    #[pyo3(get, set)]
+    _zobrist: u64,
+    // the pushed moves with the masks, active cell and key they replaced, the last one at the end
+    _undo: Vec<(Move, Masks, i64, u64)>,
+    // the legal moves cached by `GameEngines.cache_utils`, dropped when the State changes
+    #[pyo3(get, set)]
+    _move_cache: Option<Py<PySet>>,
 
     #[pyo3(get, set)]
     _save_mod: Py<PyType>
@@ -31,6 +223,27 @@ pub struct RawUltiTTTState {
 unsafe impl Send for RawUltiTTTState {}
 
 impl RawUltiTTTState {
+    /// plays a move on the State in place
+    fn apply(&mut self, c_move: Move) {
+        let action = move_to_action(c_move);
+        let old_active = self._active_cell;
+        self._active_cell = self._masks.play(action, self._curr_pid);
+
+        self._zobrist ^= cell_key(action, self._curr_pid as i64) ^ ZOBRIST_KEYS[Z_SIDE]
+            ^ active_key(old_active) ^ active_key(self._active_cell);
+        self._turn += 1;
+        self._curr_pid = (self._curr_pid % 2) + 1;
+    }
+
+    /// returns the State under a symmetry, see `Masks.transformed`
+    fn transformed(&self, py: Python, transform: usize) -> PyResult<Self> {
+        let mut new_state = self.copy(py, false)?;
+        new_state._masks = self._masks.transformed(transform);
+        new_state._active_cell = transform_active(transform, self._active_cell);
+        new_state._rehash();
+        return Ok(new_state);
+    }
+
     fn default_save_mod() -> Py<PyType> {
         Python::with_gil(|_py| {
             let SaveModule = _py.import("GameEngines.UltiTTT.SaveModule").unwrap();
@@ -44,93 +257,149 @@ impl RawUltiTTTState {
     #[new]
     #[pyo3(signature=(save_module=None))]
     /// Creates the initial UltiTTT State python object
-    fn new<'py>(py: Python<'py>, save_module: Option<Bound<'py, PyType>>) -> PyResult<Self> {
+    fn new<'py>(_py: Python<'py>, save_module: Option<Bound<'py, PyType>>) -> PyResult<Self> {
         let ultittt_save: Py<PyType> = match save_module {
             None => { Self::default_save_mod()}
             Some(save_mod) => {save_mod.unbind()}
         };
 
-        let board = PyArray2::from_owned_array(py, Array2::zeros((9, 9)));
-
         return Ok(RawUltiTTTState {
-            _board: board.unbind(),
+            _masks: EMPTY,
             _turn: 0,
-            _win_state: [0; 9],
             _active_cell: -1,
             _curr_pid: 1,
+            _zobrist: 0,
+            _undo: Vec::new(),
+            _move_cache: None,
             _save_mod: ultittt_save
         });
     }
 
-    /// copies and returns a python UltiTTT State object
-    fn copy<'py>(&self, py: Python<'py>) -> PyResult<Self> {
-        let board = unsafe { PyArray2::new(py, self._board.bind(py).dims(), false) };
-        self._board.bind(py).copy_to(&board).expect("");
-
+    #[pyo3(signature=(*, cache=false))]
+    /// copies and returns a python UltiTTT State object. The cached moves are only copied if
+    /// `cache` is true
+    fn copy<'py>(&self, py: Python<'py>, cache: bool) -> PyResult<Self> {
         return Ok(RawUltiTTTState{
-            _board: board.unbind(),
+            _masks: self._masks,
             _turn: self._turn,
-            _win_state: self._win_state,
             _active_cell: self._active_cell,
             _curr_pid: self._curr_pid,
+            _zobrist: self._zobrist,
+            _undo: Vec::new(),
+            _move_cache: copy_move_cache(py, &self._move_cache, cache)?,
             _save_mod: self._save_mod.clone()
         });
     }
 
     /// play an action on the UltiTTT State and returns the following State object
     fn play<'py>(&self, py: Python<'py>, c_move: Move) -> PyResult<Self> {
-        let sup_cell = c_move.0;
-        let sub_cell = c_move.1;
-
-        let sup_i = 3 * sup_cell.0 + sup_cell.1;
-        let sub_i = 3 * sub_cell.0 + sub_cell.1;
-
-        let mut new_board = self.copy(py)?;
+        let mut new_board = self.copy(py, false)?;
+        new_board.apply(c_move);
+        return Ok(new_board)
+    }
 
-        let b_ref = new_board._board.bind(py);
-        b_ref.set_item((sup_i, sub_i), self._curr_pid).expect("Cell outside expected range");
+    /// plays an action on the UltiTTT State in place. The replaced values are kept to undo the
+    /// action with `pop`
+    fn push(&mut self, c_move: Move) {
+        self._undo.push((c_move, self._masks, self._active_cell, self._zobrist));
+        self._move_cache = None;
+        self.apply(c_move);
+    }
 
-        new_board._win_state[sup_i] = get_winner_of(
-            unsafe { b_ref.as_array() }.row(sup_i).iter()
-        );
+    /// undoes the last action played by `push` in place and returns it
+    fn pop(&mut self) -> PyResult<Move> {
+        let (c_move, masks, active_cell, zobrist) = self._undo.pop()
+            .ok_or_else(|| PyIndexError::new_err("no pushed move to pop"))?;
 
-        new_board._turn += 1;
-        new_board._active_cell =
-            if new_board._win_state[sub_i] != 0 { -1 }
-            else { i64::try_from(sub_i).expect("Cell outside expected range") };
+        self._masks = masks;
+        self._active_cell = active_cell;
+        self._zobrist = zobrist;
+        self._move_cache = None;
 
-        new_board._curr_pid = (self._curr_pid % 2) + 1;
-        return Ok(new_board)
+        self._turn -= 1;
+        self._curr_pid = (self._curr_pid % 2) + 1;
+        return Ok(c_move);
     }
 
     /// standard implementation of the `get_legal_moves` python method. it returns the legal
     /// actions the specified player can take.
     fn get_legal_moves<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PySet>> {
-        let board = unsafe { self._board.bind(py).as_array() };
-        let active_cell = usize::try_from(self._active_cell);
+        let moves = cells(self._masks.legal(self._active_cell)).map(|a| action_to_move(a).unwrap());
+        return PySet::new(py, moves)
+    }
 
-        let condition: Box<dyn Fn(i64, usize) -> bool> = if self._active_cell == -1 || self._win_state[active_cell?] != 0 {
-            Box::new(|v: i64, i: usize| -> bool { v == 0 && self._win_state[i] == 0 })
-        } else {
-            Box::new(|v: i64, i: usize| -> bool { v == 0  && i == active_cell.unwrap() })
-        };
+    #[classattr]
+    const ACTION_SIZE: usize = ACTION_SIZE;
 
-        let moves = board.indexed_iter().filter_map(|((i,j),&v)| {
-            if condition(v, i) { Some(((i / 3, i % 3), (j / 3, j % 3))) } else { None }
-        }).collect::<HashSet<Move>>();
+    #[pyo3(signature=(out=None))]
+    /// returns the legal actions of the State as a boolean mask over the action space of the game
+    /// (9 sub-boards x 9 cells). If `out` is given, the mask is written in it instead of a new array
+    fn legal_action_mask<'py>(&self, py: Python<'py>, out: Option<Bound<'py, PyArray1<bool>>>) -> PyResult<Bound<'py, PyArray1<bool>>> {
+        let mask = mask_buffer(py, out, ACTION_SIZE)?;
+        mask_cells(self._masks.legal(self._active_cell), &mut unsafe { mask.as_array_mut() });
+        return Ok(mask);
+    }
 
-        return PySet::new(py, &moves)
+    /// returns the index of a move in the action space of the game
+    fn move_to_action(&self, c_move: Move) -> PyResult<usize> {
+        if c_move.0.0 > 2 || c_move.0.1 > 2 || c_move.1.0 > 2 || c_move.1.1 > 2 {
+            return Err(PyValueError::new_err(format!("{c_move:?} is not in the action space")));
+        }
+        return Ok(move_to_action(c_move));
+    }
+
+    /// returns the move of an index of the action space of the game
+    fn action_to_move(&self, action: usize) -> PyResult<Move> {
+        return action_to_move(action)
+            .ok_or_else(|| PyValueError::new_err(format!("invalid action {action}")));
+    }
+
+    #[classattr]
+    const N_SYMMETRIES: usize = D4;
+
+    /// returns the State under a symmetry of the board (see `GameEngines.symmetry`). The sub-boards
+    /// and their cells move the same way
+    fn transform(&self, py: Python, transform: usize) -> PyResult<Self> {
+        check_transform(transform, D4)?;
+        return self.transformed(py, transform);
+    }
+
+    /// returns the State under all the symmetries of the board, indexed by transform
+    fn symmetries(&self, py: Python) -> PyResult<Vec<Self>> {
+        return (0..D4).map(|t| self.transformed(py, t)).collect();
+    }
+
+    /// returns the canonical State, the transformed State with the smallest zobrist key, and the
+    /// transform giving it. The keys are computed on the masks, only the canonical State is built
+    fn canonical(&self, py: Python) -> PyResult<(Self, usize)> {
+        let transform = (0..D4).min_by_key(|&t| {
+            zobrist_of(&self._masks.transformed(t), transform_active(t, self._active_cell), self._curr_pid)
+        }).unwrap();
+        return Ok((self.transformed(py, transform)?, transform));
+    }
+
+    #[pyo3(signature=(c_move, transform, *, inverse=false))]
+    /// returns the move of the transformed State matching a move of the State, or the move of the
+    /// State matching a move of the transformed State if `inverse` is set
+    fn transform_move(&self, c_move: Move, transform: usize, inverse: bool) -> PyResult<Move> {
+        let action = self.move_to_action(c_move)?;
+        return Ok(action_to_move(self.transform_action(action, transform, inverse)?).unwrap());
+    }
+
+    #[pyo3(signature=(action, transform, *, inverse=false))]
+    /// returns the index of the action space of `transform_move`
+    fn transform_action(&self, action: usize, transform: usize, inverse: bool) -> PyResult<usize> {
+        check_transform(transform, D4)?;
+        if action >= ACTION_SIZE {
+            return Err(PyValueError::new_err(format!("invalid action {action}")));
+        }
+        return Ok(transform_action(if inverse { d4_inverse(transform) } else { transform }, action));
     }
 
     /// returns the current score of the State. In the case of UltiTTT, this means the number of
     /// won sub-boards
     fn score(&self) -> (usize, usize) {
-        let w = self.winner();
-        return match w {
-            1 => (1, 0),
-            2 => (0, 1),
-            _ => (0, 0),
-        };
+        return score_of(self.winner());
     }
 
     /// return the current winner of the game.
@@ -141,7 +410,40 @@ impl RawUltiTTTState {
     ///
     /// Otherwise, it returns the player id of the winner
     fn winner(&self) -> i64{
-        return get_winner_of(self._win_state.iter())
+        return self._masks.winner()
+    }
+
+    #[pyo3(signature=(seed=None, max_plies=None))]
+    /// plays random moves from the State until the end of the game, or until `max_plies` moves
+    /// were played, and returns the winner, the final score and the number of plies. The game is
+    /// played natively on a copy of the board without holding the GIL
+    fn random_playout(&self, py: Python, seed: Option<u64>, max_plies: Option<u32>) -> Playout {
+        let (masks, active_cell, curr_pid) = (self._masks, self._active_cell, self._curr_pid);
+        let mut rng = SplitMix64::new(seed);
+        return py.allow_threads(move || {
+            playout_on(masks, active_cell, curr_pid, &mut rng, max_plies.unwrap_or(u32::MAX))
+        });
+    }
+
+    #[pyo3(signature=(n_games, seed=None, max_plies=None))]
+    /// plays n random playouts from the State (see `random_playout`) without holding the GIL and
+    /// returns the winners, the scores (n_games, 2) and the numbers of plies of the games
+    fn rollout<'py>(&self, py: Python<'py>, n_games: usize, seed: Option<u64>, max_plies: Option<u32>) -> Rollouts<'py> {
+        let (masks, active_cell, curr_pid) = (self._masks, self._active_cell, self._curr_pid);
+        let mut rng = SplitMix64::new(seed);
+        let playouts = py.allow_threads(move || {
+            (0..n_games).map(|_| {
+                playout_on(masks, active_cell, curr_pid, &mut rng, max_plies.unwrap_or(u32::MAX))
+            }).collect_vec()
+        });
+        return rollouts_to_py(py, playouts);
+    }
+
+    /// counts the leaf positions `depth` moves away from the State natively, without holding the
+    /// GIL. A finished game has no moves, see `GameEngines.perft`
+    fn perft(&self, py: Python, depth: u32) -> u64 {
+        let (masks, active_cell, curr_pid) = (self._masks, self._active_cell, self._curr_pid);
+        return py.allow_threads(move || perft_on(masks, active_cell, curr_pid, depth));
     }
 
     fn save<'py>(slf: Bound<'py, Self>, file: Bound<'py, PyAny>) {
@@ -169,23 +471,57 @@ impl RawUltiTTTState {
     #[getter]
     fn curr_pid(&self) -> u32 { return self._curr_pid }
 
+    /// the (9, 9) board, a row per sub-board, built from the masks when accessed. Modifying it does
+    /// not change the State
     #[getter]
-    fn board(&self) -> &Py<PyArray2<i64>> { return &self._board }
+    fn board<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<i64>> {
+        return PyArray2::from_owned_array(py, self._masks.to_array());
+    }
+
+    #[getter(_board)]
+    fn get_board_array<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<i64>> {
+        return self.board(py);
+    }
+
+    /// replaces the cells of the State by the cells of a (9, 9) board
+    #[setter(_board)]
+    fn set_board_array(&mut self, board: PyReadonlyArray2<i64>) -> PyResult<()> {
+        let board = board.as_array();
+        if board.shape() != [9, 9] {
+            return Err(PyValueError::new_err("the board must be of shape (9, 9)"));
+        }
+        self._masks.set_cells(&board);
+        return Ok(());
+    }
+
+    /// the state of the cells of the meta-board: the winner of the sub-board, -1 for a tie and 0
+    /// if not over
+    #[getter(_win_state)]
+    fn get_win_state(&self) -> [i64; 9] { return self._masks.win_state() }
+
+    #[setter(_win_state)]
+    fn set_win_state(&mut self, win_state: [i64; 9]) { self._masks.set_win_state(&win_state) }
+
+    /// the zobrist key of the State, updated by `play`
+    #[getter]
+    fn zobrist(&self) -> u64 { return self._zobrist }
+
+    fn __hash__(&self) -> u64 { return self._zobrist }
+
+    /// computes the zobrist key of the State from scratch, when it was not created by `play`
+    fn _rehash(&mut self) {
+        self._zobrist = zobrist_of(&self._masks, self._active_cell, self._curr_pid);
+    }
 
     fn __richcmp__<'py>(&self, py: Python<'py>, other: &Self, op: CompareOp) -> PyResult<Bound<'py, PyBool>> {
         return match op {
             CompareOp::Eq => {
-                let board_eq = std::iter::zip(
-                    self._board.bind(py).to_owned_array(),
-                    other._board.bind(py).to_owned_array()
-                ).all(|(a, b)| a == b);
-
+                let masks_eq = self._masks == other._masks;
                 let turn_eq = self._turn == other._turn;
                 let curr_pid_eq = self._curr_pid == other._curr_pid;
                 let active_cell_eq = self._active_cell == other._active_cell;
-                let win_state_eq = self._win_state == other._win_state;
 
-                let res = board_eq && active_cell_eq && turn_eq && curr_pid_eq && win_state_eq;
+                let res = masks_eq && active_cell_eq && turn_eq && curr_pid_eq;
                 Ok(PyBool::new(py, res).to_owned())
             },
             _ => { Err(PyErr::new::<PyNotImplemented, _>("")) },
@@ -193,37 +529,256 @@ impl RawUltiTTTState {
     }
 }
 
-///
-fn get_winner_of<'z, T: Iterator<Item = &'z i64> + Clone>(section: T) -> i64{
-    let g = section.collect_vec();
+/// returns the score of a game from its winner: 1 for the winner, 0 otherwise
+fn score_of(winner: i64) -> (usize, usize) {
+    return match winner {
+        1 => (1, 0),
+        2 => (0, 1),
+        _ => (0, 0),
+    };
+}
+
+/// returns the index of a move in the action space
+fn move_to_action(m: Move) -> usize {
+    return 9 * (3 * m.0.0 + m.0.1) + 3 * m.1.0 + m.1.1;
+}
+
+/// returns the move of an index of the action space
+fn action_to_move(action: usize) -> Option<Move> {
+    if action >= ACTION_SIZE { return None; }
+    let (sup_i, sub_i) = (action / 9, action % 9);
+    return Some(((sup_i / 3, sup_i % 3), (sub_i / 3, sub_i % 3)));
+}
+
+/// returns the index of the action space of an action under a symmetry
+fn transform_action(transform: usize, action: usize) -> usize {
+    return 9 * TILES[transform][action / 9] + TILES[transform][action % 9];
+}
+
+/// returns the active cell of the meta-board under a symmetry
+fn transform_active(transform: usize, active_cell: i64) -> i64 {
+    return if active_cell >= 0 { TILES[transform][active_cell as usize] as i64 } else { -1 };
+}
 
-    if !g.contains(&&0) {
-        return -1
+/// returns the zobrist key of a cell (index of the action space) taken by a player, 0 if it is empty
+fn cell_key(cell: usize, pid: i64) -> u64 {
+    return if pid > 0 { ZOBRIST_KEYS[2 * cell + pid as usize - 1] } else { 0 };
+}
+
+/// returns the zobrist key of the active cell of the meta-board, 0 if any cell can be played
+fn active_key(active_cell: i64) -> u64 {
+    return if active_cell >= 0 { ZOBRIST_KEYS[Z_ACTIVE + active_cell as usize] } else { 0 };
+}
+
+/// computes the zobrist key of masks from scratch
+fn zobrist_of(masks: &Masks, active_cell: i64, curr_pid: u32) -> u64 {
+    let side = if curr_pid == 2 { ZOBRIST_KEYS[Z_SIDE] } else { 0 };
+    return masks.cells.iter().enumerate().fold(side ^ active_key(active_cell), |key, (player, &mask)| {
+        cells(mask).fold(key, |key, cell| key ^ cell_key(cell, player as i64 + 1))
+    });
+}
+
+/// sets the cells of a mask of the action space in a cleared mask array
+fn mask_cells(legal: u128, mask: &mut ArrayViewMut1<bool>) {
+    for action in cells(legal) {
+        mask[action] = true;
     }
+}
+
+/// plays random moves on masks until the end of the game or `max_plies` moves, see
+/// `RawUltiTTTState.random_playout`
+fn playout_on(mut masks: Masks, mut active_cell: i64, mut curr_pid: u32, rng: &mut SplitMix64, max_plies: u32) -> Playout {
+    let mut plies = 0;
+    while plies < max_plies && masks.winner() == 0 {
+        let legal = masks.legal(active_cell);
+        if legal == 0 { break; }
+
+        let action = cells(legal).nth(rng.below(legal.count_ones() as usize)).unwrap();
+        active_cell = masks.play(action, curr_pid);
+        curr_pid = (curr_pid % 2) + 1;
+        plies += 1;
+    }
+    let winner = masks.winner();
+    return (winner, score_of(winner), plies);
+}
 
-    let win_con = [
-        // diagonals
-        [g[0], g[4], g[8]],
-        [g[2], g[4], g[6]],
-        // rows
-        [g[0], g[1], g[2]],
-        [g[3], g[4], g[5]],
-        [g[6], g[7], g[8]],
-        // cols
-        [g[0], g[3], g[6]],
-        [g[1], g[4], g[7]],
-        [g[2], g[5], g[8]],
-    ];
+/// counts the leaf positions `depth` moves away from masks, see `RawUltiTTTState.perft`
+fn perft_on(masks: Masks, active_cell: i64, curr_pid: u32, depth: u32) -> u64 {
+    if depth == 0 { return 1; }
+    if masks.winner() != 0 { return 0; }
+
+    let legal = masks.legal(active_cell);
+    // the leaves are counted without being played
+    if depth == 1 { return legal.count_ones() as u64; }
+    return cells(legal).map(|action| {
+        let mut child = masks;
+        let active_cell = child.play(action, curr_pid);
+        perft_on(child, active_cell, (curr_pid % 2) + 1, depth - 1)
+    }).sum();
+}
+
+/// Batch of UltiTTT games stored as masks, allowing a whole step of all the games in a single call
+#[pyclass(subclass)]
+pub struct RawUltiTTTBatch {
+    _boards: Vec<Masks>,
+    _active_cells: Vec<i64>,
+    _turns: Vec<u32>,
+    _curr_pids: Vec<u32>,
+
+    #[pyo3(get, set)]
+    auto_reset: bool,
+}
+
+unsafe impl Send for RawUltiTTTBatch {}
 
-    let result = win_con.iter().find(|v| {
-        let val = v.iter().fold(-1, |a: i64, &&v| {
-            return if a == -1 { v } else if a == v { a } else { 0 }
+impl RawUltiTTTBatch {
+    fn _reset_game(&mut self, g: usize) {
+        self._boards[g] = EMPTY;
+        self._active_cells[g] = -1;
+        self._turns[g] = 0;
+        self._curr_pids[g] = 1;
+    }
+
+    fn _check_index(&self, g: usize) -> PyResult<()> {
+        if g >= self._turns.len() {
+            return Err(PyIndexError::new_err("game index out of range"));
+        }
+        return Ok(());
+    }
+}
+
+#[pymethods]
+impl RawUltiTTTBatch {
+    #[classattr]
+    const ACTION_SIZE: usize = ACTION_SIZE;
+
+    #[new]
+    #[pyo3(signature=(n_games, auto_reset=true))]
+    /// Creates a batch of n UltiTTT games in their initial state
+    fn new(n_games: usize, auto_reset: bool) -> PyResult<Self> {
+        return Ok(RawUltiTTTBatch {
+            _boards: vec![EMPTY; n_games],
+            _active_cells: vec![-1; n_games],
+            _turns: vec![0; n_games],
+            _curr_pids: vec![1; n_games],
+            auto_reset
+        })
+    }
+
+    fn __len__(&self) -> usize { return self._turns.len() }
+
+    /// plays one action per game and returns the winner of every game after the action. A negative
+    /// action skips the game. If `auto_reset` is set, finished games are put back in their initial state
+    fn play_batch<'py>(&mut self, py: Python<'py>, actions: PyReadonlyArray1<'py, i64>) -> PyResult<Bound<'py, PyArray1<i64>>> {
+        let actions = actions.as_array();
+        if actions.len() != self._turns.len() {
+            return Err(PyValueError::new_err("one action per game is expected"));
+        }
+
+        let mut winners = vec![0; actions.len()];
+        for (g, &action) in actions.iter().enumerate() {
+            if action >= 0 {
+                if action as usize >= ACTION_SIZE {
+                    return Err(PyValueError::new_err(format!("invalid action {action}")));
+                }
+
+                self._active_cells[g] = self._boards[g].play(action as usize, self._curr_pids[g]);
+                self._turns[g] += 1;
+                self._curr_pids[g] = (self._curr_pids[g] % 2) + 1;
+            }
+            winners[g] = self._boards[g].winner();
+        }
+
+        if self.auto_reset {
+            for g in 0..winners.len() {
+                if winners[g] != 0 { self._reset_game(g); }
+            }
+        }
+        return Ok(PyArray1::from_vec(py, winners));
+    }
+
+    /// returns a (n_games, ACTION_SIZE) boolean mask of the legal actions of every game
+    fn legal_move_mask_batch<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<bool>> {
+        let mut mask = Array2::from_elem((self._turns.len(), ACTION_SIZE), false);
+        for (g, mut row) in mask.outer_iter_mut().enumerate() {
+            mask_cells(self._boards[g].legal(self._active_cells[g]), &mut row);
+        }
+        return PyArray2::from_owned_array(py, mask);
+    }
+
+    /// returns the winner of every game of the batch
+    fn winner_batch<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<i64>> {
+        let winners = self._boards.iter().map(|b| b.winner()).collect_vec();
+        return PyArray1::from_vec(py, winners);
+    }
+
+    /// returns the score of every game of the batch as a (n_games, 2) array
+    fn score_batch<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<i64>> {
+        let scores = Array2::from_shape_fn((self._turns.len(), 2), |(g, p)| {
+            i64::from(self._boards[g].winner() == (p as i64) + 1)
         });
-        return ![0, -1].contains(&val)
-    });
+        return PyArray2::from_owned_array(py, scores);
+    }
 
-    return match result {
-        None => { 0 }
-        Some(v) => { *v[0] }
+    #[pyo3(signature=(indexes=None))]
+    /// puts the given games (or all of them) back in their initial state
+    fn reset(&mut self, indexes: Option<Vec<usize>>) -> PyResult<()> {
+        let indexes = indexes.unwrap_or_else(|| (0..self._turns.len()).collect_vec());
+        for g in indexes {
+            self._check_index(g)?;
+            self._reset_game(g);
+        }
+        return Ok(());
+    }
+
+    /// returns a copy of the state of a game of the batch
+    fn get_state(&self, g: usize) -> PyResult<RawUltiTTTState> {
+        self._check_index(g)?;
+
+        return Ok(RawUltiTTTState {
+            _masks: self._boards[g],
+            _turn: self._turns[g],
+            _curr_pid: self._curr_pids[g],
+            _active_cell: self._active_cells[g],
+            _zobrist: zobrist_of(&self._boards[g], self._active_cells[g], self._curr_pids[g]),
+            _undo: Vec::new(),
+            _move_cache: None,
+            _save_mod: RawUltiTTTState::default_save_mod(),
+        });
+    }
+
+    /// replaces a game of the batch by the given state
+    fn set_state(&mut self, g: usize, state: PyRef<RawUltiTTTState>) -> PyResult<()> {
+        self._check_index(g)?;
+        self._boards[g] = state._masks;
+        self._active_cells[g] = state._active_cell;
+        self._turns[g] = state._turn;
+        self._curr_pids[g] = state._curr_pid;
+        return Ok(());
+    }
+
+    /// the (n_games, 9, 9) boards of the games, built from the masks when accessed
+    #[getter]
+    fn boards<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray3<i64>> {
+        let mut boards = Array3::zeros((self._boards.len(), 9, 9));
+        for (masks, mut board) in self._boards.iter().zip(boards.outer_iter_mut()) {
+            board.assign(&masks.to_array());
+        }
+        return PyArray3::from_owned_array(py, boards);
+    }
+
+    #[getter]
+    fn win_states<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray2<i64>> {
+        let win_states = Array2::from_shape_fn((self._turns.len(), 9), |(g, i)| self._boards[g].win_state()[i]);
+        return PyArray2::from_owned_array(py, win_states);
     }
-}
\ No newline at end of file
+
+    #[getter]
+    fn active_cells<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<i64>> { return PyArray1::from_slice(py, &self._active_cells) }
+
+    #[getter]
+    fn turns<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u32>> { return PyArray1::from_slice(py, &self._turns) }
+
+    #[getter]
+    fn curr_pids<'py>(&self, py: Python<'py>) -> Bound<'py, PyArray1<u32>> { return PyArray1::from_slice(py, &self._curr_pids) }
+}
@@ -6,12 +6,15 @@ extern crate itertools;
 mod Avalam;
 mod Checkers;
 mod UltiTTT;
+mod Quoridor;
+mod utils;
 use pyo3::{pymodule, types::PyModule, PyResult};
 use pyo3::prelude::*;
 
-use crate::Avalam::{RawAvalamState};
-use crate::Checkers::{RawCheckersState};
-use crate::UltiTTT::{RawUltiTTTState};
+use crate::Avalam::{RawAvalamState, RawAvalamBatch};
+use crate::Checkers::{RawCheckersState, RawCheckersBatch};
+use crate::UltiTTT::{RawUltiTTTState, RawUltiTTTBatch};
+use crate::Quoridor::RawQuoridorState;
 
 /// The rust implementation of engines for multiple games
 #[pymodule]
@@ -20,6 +23,7 @@ fn RustEngine(m: &Bound<'_, PyModule>) -> PyResult<()> {
     Avalam(m)?;
     Checkers(m)?;
     UltiTTT(m)?;
+    Quoridor(m)?;
     Ok(())
 }
 
@@ -27,6 +31,7 @@ fn RustEngine(m: &Bound<'_, PyModule>) -> PyResult<()> {
 fn Avalam(main_module: &Bound<'_, PyModule>) -> PyResult<()> {
     let avalam_module = PyModule::new(main_module.py(), "Avalam")?;
     avalam_module.add_class::<RawAvalamState>()?;
+    avalam_module.add_class::<RawAvalamBatch>()?;
     main_module.add_submodule(&avalam_module)
 }
 
@@ -34,6 +39,7 @@ fn Avalam(main_module: &Bound<'_, PyModule>) -> PyResult<()> {
 fn Checkers(main_module: &Bound<'_, PyModule>) -> PyResult<()> {
     let checkers_module = PyModule::new(main_module.py(), "Checkers")?;
     checkers_module.add_class::<RawCheckersState>()?;
+    checkers_module.add_class::<RawCheckersBatch>()?;
     main_module.add_submodule(&checkers_module)
 }
 
@@ -42,6 +48,14 @@ fn Checkers(main_module: &Bound<'_, PyModule>) -> PyResult<()> {
 fn UltiTTT(main_module: &Bound<'_, PyModule>) -> PyResult<()> {
     let ultiTTT_module = PyModule::new(main_module.py(), "UltiTTT")?;
     ultiTTT_module.add_class::<RawUltiTTTState>()?;
+    ultiTTT_module.add_class::<RawUltiTTTBatch>()?;
     main_module.add_submodule(&ultiTTT_module)
 
-}
\ No newline at end of file
+}
+
+/// The rust implementation of a Quoridor engine
+fn Quoridor(main_module: &Bound<'_, PyModule>) -> PyResult<()> {
+    let quoridor_module = PyModule::new(main_module.py(), "Quoridor")?;
+    quoridor_module.add_class::<RawQuoridorState>()?;
+    main_module.add_submodule(&quoridor_module)
+}
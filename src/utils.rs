@@ -0,0 +1,122 @@
+use std::time::{SystemTime, UNIX_EPOCH};
+use ndarray::Array2;
+use numpy::{PyArray1, PyArray2, PyArrayMethods, PyUntypedArrayMethods};
+use pyo3::prelude::*;
+use pyo3::exceptions::PyValueError;
+use pyo3::types::PySet;
+
+/// result of a random playout: the winner, the final score and the number of plies
+pub type Playout = (i64, (usize, usize), u32);
+/// results of many random playouts as numpy arrays: the winners, the scores and the numbers of plies
+pub type Rollouts<'py> = (Bound<'py, PyArray1<i64>>, Bound<'py, PyArray2<i64>>, Bound<'py, PyArray1<u32>>);
+
+/// returns a cleared boolean mask of the given size. If a preallocated array is given, it is reset
+/// and reused instead of allocating a new one
+pub fn mask_buffer<'py>(py: Python<'py>, out: Option<Bound<'py, PyArray1<bool>>>, size: usize) -> PyResult<Bound<'py, PyArray1<bool>>> {
+    return match out {
+        None => { Ok(PyArray1::zeros(py, size, false)) }
+        Some(out) => {
+            if out.len() != size {
+                return Err(PyValueError::new_err(format!("the mask must be of size {size}")));
+            }
+            unsafe { out.as_array_mut() }.fill(false);
+            Ok(out)
+        }
+    }
+}
+
+/// returns the moves cache of the copy of a State (see `GameEngines.cache_utils`): a new set with
+/// the cached moves if the copy keeps the cache, None otherwise
+pub fn copy_move_cache(py: Python, cache: &Option<Py<PySet>>, keep: bool) -> PyResult<Option<Py<PySet>>> {
+    return match cache {
+        Some(moves) if keep => Ok(Some(PySet::new(py, moves.bind(py).iter())?.unbind())),
+        _ => Ok(None),
+    }
+}
+
+/// returns the random keys used for the zobrist hashing of a game. They come from a splitmix64
+/// generator, the same as `GameEngines.zobrist.zobrist_keys`, so both engines hash states the same
+pub const fn zobrist_keys<const N: usize>(seed: u64) -> [u64; N] {
+    let mut keys = [0u64; N];
+    let mut state = seed;
+    let mut i = 0;
+    while i < N {
+        state = state.wrapping_add(0x9E3779B97F4A7C15);
+        keys[i] = mix(state);
+        i += 1;
+    }
+    return keys;
+}
+
+/// output function of the splitmix64 generator
+const fn mix(mut z: u64) -> u64 {
+    z = (z ^ (z >> 30)).wrapping_mul(0xBF58476D1CE4E5B9);
+    z = (z ^ (z >> 27)).wrapping_mul(0x94D049BB133111EB);
+    return z ^ (z >> 31);
+}
+
+/// Number of symmetries of a square board, see `d4_coords`
+pub const D4: usize = 8;
+
+/// returns the coordinates of a cell of a square board after a transform: the columns are mirrored
+/// if the transform is 4 or more, then the board is rotated by transform % 4 quarter turns
+/// clockwise. They are the transforms of `GameEngines.symmetry`
+pub const fn d4_coords(transform: usize, i: usize, j: usize, size: usize) -> (usize, usize) {
+    let (mut i, mut j) = (i, if transform >= 4 { size - 1 - j } else { j });
+    let mut k = 0;
+    while k < transform % 4 {
+        (i, j) = (j, size - 1 - i);
+        k += 1;
+    }
+    return (i, j);
+}
+
+/// returns the transform undoing a transform: the mirrors are their own inverse
+pub const fn d4_inverse(transform: usize) -> usize {
+    return if transform >= 4 { transform } else { (4 - transform) % 4 };
+}
+
+/// returns an error if the game does not have that many symmetries
+pub fn check_transform(transform: usize, n_symmetries: usize) -> PyResult<()> {
+    if transform >= n_symmetries {
+        return Err(PyValueError::new_err(format!(
+            "invalid transform {transform}, the game has {n_symmetries} symmetries"
+        )));
+    }
+    return Ok(());
+}
+
+/// splitmix64 generator picking the moves of the random playouts
+pub struct SplitMix64(u64);
+
+impl SplitMix64 {
+    /// creates a generator from a seed, or from the clock if there is none
+    pub fn new(seed: Option<u64>) -> Self {
+        let seed = seed.unwrap_or_else(|| {
+            SystemTime::now().duration_since(UNIX_EPOCH).map_or(0, |d| d.as_nanos() as u64)
+        });
+        return SplitMix64(seed);
+    }
+
+    pub fn next_u64(&mut self) -> u64 {
+        self.0 = self.0.wrapping_add(0x9E3779B97F4A7C15);
+        return mix(self.0);
+    }
+
+    /// returns a random index below n
+    pub fn below(&mut self, n: usize) -> usize {
+        return (self.next_u64() % n as u64) as usize;
+    }
+}
+
+/// converts the results of random playouts to numpy arrays
+pub fn rollouts_to_py<'py>(py: Python<'py>, playouts: Vec<Playout>) -> Rollouts<'py> {
+    let scores = Array2::from_shape_fn((playouts.len(), 2), |(g, p)| {
+        (if p == 0 { playouts[g].1.0 } else { playouts[g].1.1 }) as i64
+    });
+    return (
+        PyArray1::from_iter(py, playouts.iter().map(|p| p.0)),
+        PyArray2::from_owned_array(py, scores),
+        PyArray1::from_iter(py, playouts.iter().map(|p| p.2)),
+    );
+}
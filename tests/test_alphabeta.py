@@ -0,0 +1,90 @@
+from GameEngines import Game, RandomPlayer, TranspositionTable
+from GameEngines.players import AlphaBetaPlayer
+from GameEngines.players.AlphaBetaPlayer import WIN
+from GameEngines.Avalam import BoardState as Avalam
+from GameEngines.UltiTTT import BoardState as UltiTTT
+from GameEngines.Checkers import BoardState as Checkers
+from GameEngines.Quoridor import BoardState as Quoridor
+from GameEngines.Quoridor.PythonEngine import BoardState as PyQuoridor
+
+import random
+import pytest
+
+
+def test_alphabeta_init():
+    player = AlphaBetaPlayer('test-name')
+    assert player.name == 'test-name'
+
+    with pytest.raises(ValueError):
+        AlphaBetaPlayer(depth=None, time_limit=None)
+    with pytest.raises(ValueError):
+        AlphaBetaPlayer(depth=0)
+
+
+@pytest.mark.parametrize("board", [Avalam, UltiTTT, Checkers, Quoridor])
+def test_alphabeta_play(board):
+    player = AlphaBetaPlayer(depth=2, time_limit=None, table=TranspositionTable(2 ** 12))
+    b = board()
+    copy = b.copy()
+
+    res = player.play(b, b.get_legal_moves(), b.curr_pid)
+
+    assert res in b.get_legal_moves()
+    assert b == copy and b.zobrist == copy.zobrist
+    assert player.stats()["depth"] == 2
+    assert player.last_nodes > len(b.get_legal_moves())
+    assert player.nodes_per_second > 0
+
+
+def hash_evaluation(state, pid):
+    """an evaluation spreading the values of the leaves, unlike the scores which tie most of them"""
+    value = state.zobrist % 201 - 100
+    return value if pid == 1 else -value
+
+
+def test_alphabeta_ordering():
+    b = Checkers()
+
+    # the move ordering and the table only change the number of nodes searched, not the value
+    plain = AlphaBetaPlayer(depth=6, time_limit=None, evaluate=hash_evaluation, killers=False, history=False)
+    move = plain.play(b, b.get_legal_moves(), b.curr_pid)
+    ordered = AlphaBetaPlayer(depth=6, time_limit=None, evaluate=hash_evaluation)
+    table = AlphaBetaPlayer(depth=6, time_limit=None, evaluate=hash_evaluation, table=TranspositionTable(2 ** 16))
+
+    assert ordered.play(b, b.get_legal_moves(), b.curr_pid) == move
+    assert table.play(b, b.get_legal_moves(), b.curr_pid) == move
+    assert plain.last_value == ordered.last_value == table.last_value
+    assert table.last_nodes < ordered.last_nodes < plain.last_nodes
+
+
+def test_alphabeta_winning_move():
+    rng = random.Random(0)
+    b = UltiTTT()
+    while not any(b.play(m).winner() == b.curr_pid for m in b.get_legal_moves()):
+        b = b.play(rng.choice(sorted(b.get_legal_moves())))
+
+    player = AlphaBetaPlayer(depth=3, time_limit=None)
+    move = player.play(b, b.get_legal_moves(), b.curr_pid)
+
+    assert b.play(move).winner() == b.curr_pid
+    assert player.last_value == WIN - 1
+    assert player.last_depth == 1  # the search stops at a known result
+
+
+@pytest.mark.parametrize("board", [UltiTTT, PyQuoridor])
+def test_alphabeta_time_limit(board):
+    # the nodes of the python Quoridor engine are slow, the search must still stop on time
+    player = AlphaBetaPlayer(time_limit=0.2)
+    b = board()
+    player.play(b, b.get_legal_moves(), 1)
+
+    assert player.last_depth > 0
+    assert 0.2 <= player.last_time < 2 * player.time_limit
+
+
+def test_alphabeta_against_random():
+    random.seed(0)  # the moves of the RandomPlayer
+    game = Game(UltiTTT, AlphaBetaPlayer(depth=2, time_limit=None), RandomPlayer())
+    game.play_full()
+
+    assert game.winner == 1
@@ -0,0 +1,71 @@
+from GameEngines import AsyncGame, AsyncAbsPlayer, RandomPlayer, TimeControl, TimeoutPolicy
+from GameEngines.AsyncGame import play_games
+from GameEngines.UltiTTT import BoardState as UltiTTT
+
+import asyncio
+import random
+
+
+class AsyncRandomPlayer(AsyncAbsPlayer):
+    """random player waiting before each move, keeping track of the number of players waiting at once"""
+    waiting = 0
+    max_waiting = 0
+
+    def __init__(self, delay: float = 0., slow_moves: int = None):
+        self.delay = delay
+        self.slow_moves = slow_moves  # the number of moves delayed, all if None
+        self.moves = 0
+
+    async def play(self, board, moves, pid):
+        self.moves += 1
+        if self.slow_moves is None or self.moves <= self.slow_moves:
+            AsyncRandomPlayer.waiting += 1
+            AsyncRandomPlayer.max_waiting = max(AsyncRandomPlayer.max_waiting, AsyncRandomPlayer.waiting)
+            try:
+                await asyncio.sleep(self.delay)
+            finally:
+                AsyncRandomPlayer.waiting -= 1
+        return random.choice(list(moves))
+
+
+def test_concurrent_games():
+    random.seed(0)
+    AsyncRandomPlayer.max_waiting = 0
+    games = [AsyncGame(UltiTTT, AsyncRandomPlayer(.001), RandomPlayer()) for _ in range(20)]
+    winners = asyncio.run(play_games(games, max_concurrent=10))
+
+    assert winners == [g.winner for g in games]
+    assert all(w != 0 for w in winners)
+    assert all(len(g.time_data) == len(g.move_history) for g in games)
+    assert AsyncRandomPlayer.max_waiting == 10
+
+
+def test_timeout_lose():
+    game = AsyncGame(UltiTTT, RandomPlayer(), AsyncRandomPlayer(1.), move_timeout=.01)
+    asyncio.run(game.play_full())
+
+    assert game.winner == 1
+    assert game.lost_on_time == 2
+    assert len(game.move_history) == len(game.time_data) == 1
+
+
+def test_timeout_random():
+    random.seed(1)
+    game = AsyncGame(UltiTTT, AsyncRandomPlayer(1., slow_moves=3), RandomPlayer(), move_timeout=.01,
+                     timeout_policy=TimeoutPolicy.RANDOM, seed=0)
+    asyncio.run(game.play_full())
+
+    assert game.winner != 0
+    assert game.lost_on_time is None
+    assert game.timeouts == [0, 2, 4]
+    assert len(game.time_data) == len(game.move_history)
+
+
+def test_time_control():
+    random.seed(2)
+    game = AsyncGame(UltiTTT, AsyncRandomPlayer(.02), AsyncRandomPlayer(0.), time_control=TimeControl(.05, .001))
+    asyncio.run(game.play(10))
+
+    assert game.lost_on_time == 1 and game.winner == 2
+    assert game.clocks[0] <= 0 < game.clocks[1]
+    assert sum(game.time_data[::2]) < .05 + .001 * len(game.time_data[::2])
@@ -95,3 +95,151 @@ def test_score(board_state):
 
     b = b.play(((3, 7), (3, 6)))
     assert b.score() == (23, 23)
+
+
+@rust_python
+def test_legal_action_mask(board_state):
+    rng = np.random.default_rng(0)
+    b = board_state()
+    out = np.zeros(board_state.ACTION_SIZE, dtype=bool)
+
+    while b.winner() == 0:
+        moves = b.get_legal_moves()
+        actions = {b.move_to_action(m) for m in moves}
+        assert set(np.nonzero(b.legal_action_mask())[0]) == actions
+        assert b.legal_action_mask(out) is out and set(np.nonzero(out)[0]) == actions
+        assert {b.action_to_move(a) for a in actions} == moves
+
+        b = b.play(b.action_to_move(rng.choice(sorted(actions))))
+
+
+@rust_python
+def test_zobrist(board_state, tmp_path):
+    rng = np.random.default_rng(0)
+    b = board_state()
+
+    while b.winner() == 0 and b.turn < 40:
+        moves = sorted(b.get_legal_moves())
+        b = b.play(moves[rng.integers(len(moves))])
+
+        # the key updated by play is the key of the position
+        c = b.copy()
+        c._rehash()
+        assert b == c and hash(b) == hash(c) and b.zobrist == c.zobrist
+
+    b.save(tmp_path / "state.json")
+    assert board_state.load(str(tmp_path / "state.json")).zobrist == b.zobrist
+
+
+@rust_python
+def test_zobrist_transposition(board_state):
+    b = board_state()
+    first = ((3, 1), (3, 2))
+    second = ((5, 6), (5, 7))
+
+    # the same position reached by two move orders has the same key
+    a = b.play(first).play(((0, 2), (1, 2))).play(second)
+    c = b.play(second).play(((0, 2), (1, 2))).play(first)
+    assert a.zobrist == c.zobrist and len({a, c}) == 1
+    assert a.zobrist != b.play(first).zobrist
+
+
+@rust_python
+def test_push_pop(board_state):
+    rng = np.random.default_rng(1)
+    b = board_state()
+    played = [board_state()]
+
+    for _ in range(30):
+        if played[-1].winner() != 0:
+            break
+        moves = sorted(b.get_legal_moves(cache=True))
+        move = moves[rng.integers(len(moves))]
+
+        # push gives the same state as play, with the legal moves of the new position
+        b.push(move)
+        played.append(played[-1].play(move))
+        assert b == played[-1] and b.zobrist == played[-1].zobrist
+        assert b.get_legal_moves() == played[-1].get_legal_moves()
+
+    # the copies do not inherit the pushed moves
+    with pytest.raises(IndexError):
+        b.copy().pop()
+
+    while len(played) > 1:
+        b.pop()
+        played.pop()
+        assert b == played[-1] and b.zobrist == played[-1].zobrist
+
+    with pytest.raises(IndexError):
+        b.pop()
+
+
+@rust_python
+def test_random_playout(board_state):
+    b = board_state()
+    copy = b.copy()
+
+    # the playout is reproducible and leaves the state unchanged
+    winner, score, plies = b.random_playout(seed=3)
+    assert b == copy and b.zobrist == copy.zobrist
+    assert b.random_playout(seed=3) == (winner, score, plies)
+    assert winner in (-1, 1, 2) and plies > 0
+
+    winners, scores, n_plies = b.rollout(4, seed=3, max_plies=10)
+    assert winners.shape == (4,) and scores.shape == (4, 2) and n_plies.shape == (4,)
+    assert np.all(n_plies <= 10)
+    assert b == copy
+
+
+@rust_python
+def test_incremental_moves(board_state):
+    from GameEngines.Avalam.PythonEngine.utils import gen_moves
+    rng = np.random.default_rng(2)
+    b = board_state()
+    b.get_legal_moves()
+
+    # the moves kept up to date by play, push and pop are the moves generated from the board
+    for i in range(60):
+        moves = b.get_legal_moves()
+        assert moves == gen_moves(b._board)
+        assert np.count_nonzero(b.legal_action_mask()) == len(moves)
+        if len(moves) == 0:
+            assert b.winner() != 0
+            break
+
+        move = sorted(moves)[rng.integers(len(moves))]
+        if i % 3 == 2:
+            b.push(move)
+            b.pop()
+        b = b.play(move)
+
+
+@rust_python
+def test_symmetries(board_state):
+    rng = np.random.default_rng(2)
+    b = board_state()
+
+    for _ in range(30):
+        actions = np.flatnonzero(b.legal_action_mask())
+        canonical, transform = b.canonical()
+        assert canonical == b.transform(transform)
+
+        for t, state in enumerate(b.symmetries()):
+            # the moves of the transformed state are the transformed moves
+            assert state.get_legal_moves() == {b.transform_move(m, t) for m in b.get_legal_moves()}
+            transformed = sorted(b.transform_action(a, t) for a in actions)
+            assert transformed == np.flatnonzero(state.legal_action_mask()).tolist()
+            assert all(b.transform_move(b.transform_move(m, t), t, inverse=True) == m for m in b.get_legal_moves())
+            assert all(b.transform_action(b.transform_action(a, t), t, inverse=True) == a for a in actions)
+            assert state.winner() == b.winner() and state.score() == b.score()
+
+            # every symmetric state has the same canonical state
+            assert state.canonical()[0] == canonical and state.canonical()[0].zobrist == canonical.zobrist
+
+        b = b.play(b.action_to_move(rng.choice(actions)))
+        if b.winner() != 0:
+            break
+
+    with pytest.raises(ValueError):
+        b.transform(board_state.N_SYMMETRIES)
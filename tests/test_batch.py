@@ -0,0 +1,83 @@
+from GameEngines import VectorGame
+from GameEngines.Avalam import BatchBoardState as AvalamBatch, BoardState as Avalam
+from GameEngines.Avalam import move_to_action as avalam_action
+from GameEngines.Checkers import BatchBoardState as CheckersBatch, BoardState as Checkers
+from GameEngines.Checkers import move_to_action as checkers_action
+from GameEngines.UltiTTT import BatchBoardState as UltiTTTBatch, BoardState as UltiTTT
+from GameEngines.UltiTTT import move_to_action as ultittt_action
+from GameEngines.Avalam.PythonEngine import BatchBoardState as PyAvalamBatch
+from GameEngines.Checkers.PythonEngine import BatchBoardState as PyCheckersBatch
+from GameEngines.UltiTTT.PythonEngine import BatchBoardState as PyUltiTTTBatch
+
+import numpy as np
+import pytest
+
+engines = [
+    (AvalamBatch, PyAvalamBatch, Avalam, avalam_action),
+    (CheckersBatch, PyCheckersBatch, Checkers, checkers_action),
+    (UltiTTTBatch, PyUltiTTTBatch, UltiTTT, ultittt_action),
+]
+
+all_batches = pytest.mark.parametrize(
+    "batch, engine, to_action",
+    [(b, e, a) for rust, py, e, a in engines for b in ([rust, py] if rust is not py else [py])]
+)
+
+
+@all_batches
+def test_init(batch, engine, to_action):
+    b = batch(4)
+    state = engine()
+
+    assert len(b) == 4
+    assert b.boards.shape == (4, *state.board.shape)
+    assert np.all(b.turns == 0)
+    assert np.all(b.curr_pids == 1)
+    assert np.all(b.winner_batch() == 0)
+
+    mask = b.legal_move_mask_batch()
+    assert mask.shape == (4, batch.ACTION_SIZE)
+    assert set(np.nonzero(mask[0])[0]) == set(to_action(m) for m in state.get_legal_moves())
+
+
+@all_batches
+def test_play_batch(batch, engine, to_action):
+    rng = np.random.default_rng(0)
+    b = batch(3, auto_reset=False)
+    states = [engine() for _ in range(3)]
+
+    for _ in range(10):
+        mask = b.legal_move_mask_batch()
+        actions = np.array([rng.choice(np.nonzero(m)[0]) for m in mask], dtype=np.int64)
+        actions[2] = -1  # the last game is skipped
+
+        moves = {to_action(m): m for s in states for m in s.get_legal_moves()}
+        states = [s.play(moves[a]) if a >= 0 else s for s, a in zip(states, actions)]
+        winners = b.play_batch(actions)
+
+        assert list(winners) == [s.winner() for s in states]
+        assert all(b.get_state(i) == s for i, s in enumerate(states))
+
+
+@all_batches
+def test_auto_reset(batch, engine, to_action):
+    game = VectorGame(batch, 2, seed=0)
+    game.play_random(400)
+
+    assert game.finished > 0
+    assert sum(game.winner_counts.values()) == game.finished
+    assert np.all(game.batch.winner_batch() == 0)
+
+
+@all_batches
+def test_set_state(batch, engine, to_action):
+    b = batch(2)
+    state = engine()
+    state = state.play(next(iter(state.get_legal_moves())))
+
+    b.set_state(1, state)
+    assert b.get_state(1) == state
+    assert b.get_state(0) == engine()
+
+    b.reset([1])
+    assert b.get_state(1) == engine()
@@ -0,0 +1,101 @@
+from GameEngines.Avalam import BoardState as Avalam
+from GameEngines.Avalam.PythonEngine import BoardState as PyAvalam
+from GameEngines.Avalam.SaveModule import AvalamSave, AvalamBinarySave
+from GameEngines.Checkers import BoardState as Checkers
+from GameEngines.Checkers.PythonEngine import BoardState as PyCheckers
+from GameEngines.Checkers.SaveModule import CheckersSave, CheckersBinarySave
+from GameEngines.UltiTTT import BoardState as UltiTTT
+from GameEngines.UltiTTT.PythonEngine import BoardState as PyUltiTTT
+from GameEngines.UltiTTT.SaveModule import UltiTTTSave, UltiTTTBinarySave
+from GameEngines.Quoridor import BoardState as Quoridor
+from GameEngines.Quoridor.PythonEngine import BoardState as PyQuoridor
+from GameEngines.Quoridor.SaveModule import QuoridorSave, QuoridorBinarySave
+from GameEngines import BinarySaveModule
+
+import numpy as np
+import pytest
+
+
+games = [
+    (board_state, json_mod, binary_mod)
+    for rust, python, json_mod, binary_mod in [
+        (Avalam, PyAvalam, AvalamSave, AvalamBinarySave),
+        (Checkers, PyCheckers, CheckersSave, CheckersBinarySave),
+        (UltiTTT, PyUltiTTT, UltiTTTSave, UltiTTTBinarySave),
+        (Quoridor, PyQuoridor, QuoridorSave, QuoridorBinarySave),
+    ]
+    for board_state in ([rust, python] if rust is not python else [python])
+]
+
+
+def random_states(board_state, n: int, seed: int):
+    """states along a random game, the moves of every other state being cached"""
+    rng = np.random.default_rng(seed)
+    state = board_state()
+    states = []
+    for i in range(n):
+        moves = sorted(state.get_legal_moves(cache=i % 2 == 0), key=str)
+        states.append(state)
+        if len(moves) == 0 or state.winner() != 0:
+            break
+        state = state.play(moves[rng.integers(len(moves))])
+    return states
+
+
+@pytest.mark.parametrize("board_state,json_mod,binary_mod", games)
+def test_binary_round_trip(board_state, json_mod, binary_mod, tmp_path):
+    for state in random_states(board_state, 40, seed=5):
+        json_mod.save_state(tmp_path / "state.json", state)
+        binary_mod.save_state(tmp_path / "state.bin", state)
+        from_json = json_mod.load_state(tmp_path / "state.json", board_state)
+        from_binary = binary_mod.load_state(tmp_path / "state.bin", board_state)
+
+        assert from_binary == from_json == state
+        assert from_binary.zobrist == from_json.zobrist == state.zobrist
+        assert from_binary._move_cache == from_json._move_cache == state._move_cache
+        assert from_binary.get_legal_moves() == state.get_legal_moves()
+
+
+@pytest.mark.parametrize("board_state,json_mod,binary_mod", games)
+def test_binary_many(board_state, json_mod, binary_mod, tmp_path):
+    states = random_states(board_state, 30, seed=6)
+    binary_mod.save_many(tmp_path / "states.bin", states, cache=False)
+
+    header = binary_mod.read_header(tmp_path / "states.bin")
+    assert header.count == len(states) and not header.cache
+    assert (tmp_path / "states.bin").stat().st_size == 64 + len(states) * binary_mod.record_dtype(False).itemsize
+    loaded = binary_mod.load_many(tmp_path / "states.bin", board_state)
+    assert loaded == states and all(s._move_cache is None for s in loaded)
+
+    # a file holds a single game and format
+    with pytest.raises(ValueError):
+        binary_mod.load_state(tmp_path / "states.bin", board_state)
+    with pytest.raises(ValueError):
+        (AvalamBinarySave if binary_mod is not AvalamBinarySave else UltiTTTBinarySave).read_header(
+            tmp_path / "states.bin"
+        )
+
+
+def test_binary_save_module():
+    # the binary modules plug in the save_module mechanism of the states
+    state = PyAvalam(save_module=AvalamBinarySave).play(((4, 4), (4, 5)))
+    assert state._save_mod is AvalamBinarySave
+
+
+def test_binary_state_save(tmp_path):
+    state = Checkers(save_module=CheckersBinarySave)
+    state.get_legal_moves(cache=True)
+    state.save(tmp_path / "state.bin")
+    loaded = Checkers.load(tmp_path / "state.bin", save_mod=CheckersBinarySave)
+    assert loaded == state and loaded._move_cache == state._move_cache
+
+
+def test_binary_missing_record(tmp_path):
+    # a module without its record functions cannot save states
+    class NoRecordSave(BinarySaveModule):
+        GAME = "Avalam"
+        FIELDS = [("board", "i1", (81,))]
+        ACTION_SIZE = Avalam.ACTION_SIZE
+
+    with pytest.raises(NotImplementedError):
+        NoRecordSave.save_state(tmp_path / "state.bin", Avalam())
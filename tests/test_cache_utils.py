@@ -0,0 +1,75 @@
+from GameEngines import cache_utils
+from GameEngines.cache_utils import MoveCache
+from GameEngines.UltiTTT import BoardState
+
+import pytest
+
+
+@pytest.fixture
+def global_cache():
+    cache = cache_utils.enable_global_cache(max_entries=4)
+    yield cache
+    cache_utils.disable_global_cache()
+
+
+def test_state_cache():
+    cache_utils.state_stats.reset_stats()
+    state = BoardState()
+
+    moves = state.get_legal_moves(cache=True)
+    assert state.get_legal_moves() is moves
+    assert state.copy(cache=True).get_legal_moves(cache=True) == moves
+    assert state.copy().get_legal_moves() == moves
+    assert (cache_utils.state_stats.hits, cache_utils.state_stats.misses) == (2, 1)
+
+    # the cache is dropped when the state changes
+    state.push(((1, 1), (1, 1)))
+    assert len(state.get_legal_moves()) == 8
+    state.pop()
+    assert state.get_legal_moves() == moves and state.get_legal_moves() is not moves
+
+
+def test_global_cache(global_cache):
+    state = BoardState()
+    moves = state.get_legal_moves()
+    assert (global_cache.hits, global_cache.misses) == (0, 1)
+
+    # the copies of a position and the positions reached by other move orders share the moves
+    assert state.copy().get_legal_moves() == moves
+    a, b = state, state
+    for move in [((0, 0), (1, 1)), ((1, 1), (0, 0)), ((0, 0), (2, 2)), ((2, 2), (0, 0))]:
+        a = a.play(move)
+    for move in [((0, 0), (2, 2)), ((2, 2), (0, 0)), ((0, 0), (1, 1)), ((1, 1), (0, 0))]:
+        b = b.play(move)
+    assert a.zobrist == b.zobrist
+    assert b.get_legal_moves() == a.get_legal_moves()
+    assert (global_cache.hits, global_cache.misses) == (2, 2)
+
+    # the returned moves are copies
+    moves.clear()
+    assert len(state.get_legal_moves()) == 81
+    assert cache_utils.cache_stats()["global"]["entries"] == 2
+
+
+def test_bounds():
+    cache = MoveCache(max_entries=2)
+    states = [BoardState()]
+    for move in [((1, 1), (1, 1)), ((1, 1), (0, 0)), ((0, 0), (2, 2))]:
+        states.append(states[-1].play(move))
+    for state in states:
+        cache.put(state, state.get_legal_moves())
+
+    # the least recently used positions are evicted
+    assert len(cache) == 2 and cache.evictions == 2
+    assert cache.get(states[0]) is None and cache.get(states[-1]) == states[-1].get_legal_moves()
+
+    cache = MoveCache(max_entries=None, max_bytes=1)
+    cache.put(states[0], states[0].get_legal_moves())
+    cache.put(states[1], states[1].get_legal_moves())
+    assert len(cache) == 1 and cache.nbytes > 1
+
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+    with pytest.raises(ValueError):
+        MoveCache(max_entries=None, max_bytes=None)
@@ -34,7 +34,7 @@ def test_play_from_init_1(board_state):
     ref_board = board_state.load("test_files/test_checkers/from_init_board_1.json")
 
     assert b == ref_board
-    assert b.get_legal_moves() == ref_board.__move_cache
+    assert b.get_legal_moves() == ref_board._move_cache
     assert b.winner() == 0
 
 @rust_python
@@ -48,7 +48,7 @@ def test_to_king(board_state):
     ref_board = board_state.load("test_files/test_checkers/to_king_1.json")
 
     assert b == ref_board
-    assert b.get_legal_moves() == ref_board.__move_cache
+    assert b.get_legal_moves() == ref_board._move_cache
     assert b.winner() == 0
 
 @rust_python
@@ -66,3 +66,175 @@ def test_winner_no_move(board_state):
 
     b = b.play(((5, 6), (7, 4)))
     assert b.winner() == 1
+
+
+@rust_python
+def test_legal_action_mask(board_state):
+    rng = np.random.default_rng(0)
+    b = board_state()
+    out = np.zeros(board_state.ACTION_SIZE, dtype=bool)
+
+    while b.winner() == 0:
+        moves = b.get_legal_moves()
+        actions = {b.move_to_action(m) for m in moves}
+        assert set(np.nonzero(b.legal_action_mask())[0]) == actions
+        assert b.legal_action_mask(out) is out and set(np.nonzero(out)[0]) == actions
+        assert {b.action_to_move(a) for a in actions} == moves
+
+        b = b.play(b.action_to_move(rng.choice(sorted(actions))))
+
+
+@rust_python
+def test_zobrist(board_state, tmp_path):
+    rng = np.random.default_rng(0)
+    b = board_state()
+
+    while b.winner() == 0 and b.turn < 40:
+        moves = sorted(b.get_legal_moves())
+        b = b.play(moves[rng.integers(len(moves))])
+
+        # the key updated by play is the key of the position
+        c = b.copy()
+        c._rehash()
+        assert b == c and hash(b) == hash(c) and b.zobrist == c.zobrist
+
+    b.save(tmp_path / "state.json")
+    assert board_state.load(str(tmp_path / "state.json")).zobrist == b.zobrist
+
+
+@rust_python
+def test_push_pop(board_state):
+    rng = np.random.default_rng(1)
+    b = board_state()
+    played = [board_state()]
+
+    for _ in range(30):
+        if played[-1].winner() != 0:
+            break
+        moves = sorted(b.get_legal_moves(cache=True))
+        move = moves[rng.integers(len(moves))]
+
+        # push gives the same state as play, with the legal moves of the new position
+        b.push(move)
+        played.append(played[-1].play(move))
+        assert b == played[-1] and b.zobrist == played[-1].zobrist
+        assert b.get_legal_moves() == played[-1].get_legal_moves()
+
+    # the copies do not inherit the pushed moves
+    with pytest.raises(IndexError):
+        b.copy().pop()
+
+    while len(played) > 1:
+        b.pop()
+        played.pop()
+        assert b == played[-1] and b.zobrist == played[-1].zobrist
+
+    with pytest.raises(IndexError):
+        b.pop()
+
+
+@rust_python
+def test_random_playout(board_state):
+    b = board_state()
+    copy = b.copy()
+
+    # the playout is reproducible and leaves the state unchanged
+    winner, score, plies = b.random_playout(seed=3, max_plies=200)
+    assert b == copy and b.zobrist == copy.zobrist
+    assert b.random_playout(seed=3, max_plies=200) == (winner, score, plies)
+    assert winner in (0, 1, 2) and 0 < plies <= 200
+
+    winners, scores, n_plies = b.rollout(4, seed=3, max_plies=10)
+    assert winners.shape == (4,) and scores.shape == (4, 2) and n_plies.shape == (4,)
+    assert np.all(n_plies <= 10)
+    assert b == copy
+
+
+@rust_python
+def test_winner_with_moves(board_state):
+    rng = np.random.default_rng(4)
+    b = board_state()
+
+    for _ in range(300):
+        # the winner is found by the move generation, by the action mask or on its own
+        by_moves, by_mask, alone = b.copy(), b.copy(), b.copy()
+        moves = by_moves.get_legal_moves()
+        by_mask.legal_action_mask()
+
+        p1, p2 = b.score()
+        expected = (1 if p1 > 0 else 2) if min(p1, p2) == 0 else (0 if moves else b.curr_pid % 2 + 1)
+        assert alone.winner() == by_moves.winner() == by_mask.winner() == expected
+        if expected != 0:
+            break
+
+        move = sorted(moves)[rng.integers(len(moves))]
+        b.push(move)
+        b.pop()
+        assert b.winner() == expected
+        b = b.play(move)
+    else:
+        pytest.fail("the game did not end")
+
+
+@rust_python
+def test_board_array(board_state):
+    rng = np.random.default_rng(5)
+    b = board_state()
+
+    for _ in range(60):
+        moves = sorted(b.get_legal_moves())
+        if b.winner() != 0:
+            break
+        b = b.play(moves[rng.integers(len(moves))])
+
+        # the board array is built from the bitboards, and a state built from the array is the same
+        rebuilt = board_state()
+        rebuilt._board = np.array(b.board)
+        rebuilt._turn, rebuilt._curr_pid, rebuilt._cached_moves = b.turn, b.curr_pid, b._cached_moves
+        rebuilt._rehash()
+
+        assert rebuilt == b and rebuilt.zobrist == b.zobrist
+        assert rebuilt.get_legal_moves() == b.get_legal_moves()
+        assert set(np.unique(b.board)) <= {-2, -1, 0, 1, 2, 3}
+        assert np.sum(b.board == 3) == 7 * 8 - 32
+        assert b.score() == (np.sum(b.board[b.board != 3] > 0), np.sum(b.board < 0))
+
+
+@rust_python
+def test_copy_keeps_multi_jump(board_state):
+    b = board_state.load("test_files/test_checkers/from_init_board_1.json")
+
+    copy = b.copy()
+    assert copy == b and copy.get_legal_moves() == {((5, 4), (7, 2))}
+    assert copy.play(((5, 4), (7, 2))) == b.play(((5, 4), (7, 2)))
+
+
+@rust_python
+def test_symmetries(board_state):
+    b = board_state().play(((2, 1), (3, 0)))
+
+    assert board_state.N_SYMMETRIES == 1
+    assert b.symmetries() == [b] and b.canonical() == (b, 0)
+    assert b.transform_move(((5, 0), (4, 1)), 0) == ((5, 0), (4, 1))
+    with pytest.raises(ValueError):
+        b.transform(1)
+
+
+@rust_python
+def test_numpy_moves(board_state):
+    # moves decoded by the callers may hold numpy ints
+    rng = np.random.default_rng(6)
+    b, np_b, pushed = board_state(), board_state(), board_state()
+    for _ in range(30):
+        moves = sorted(b.get_legal_moves())
+        if b.winner() != 0:
+            break
+        move = moves[rng.integers(len(moves))]
+        np_move = tuple(tuple(np.int64(x) for x in cell) for cell in move)
+        b, np_b = b.play(move), np_b.play(np_move)
+        pushed.push(np_move)
+
+        assert np_b == b and pushed == b
+        assert np_b.zobrist == pushed.zobrist == b.zobrist
+        assert np_b.get_legal_moves() == pushed.get_legal_moves() == b.get_legal_moves()
+        assert np_b.winner() == b.winner()
@@ -0,0 +1,99 @@
+from GameEngines import Game, RandomPlayer
+from GameEngines.Avalam import BoardState as Avalam
+from GameEngines.Avalam.SaveModule import AvalamBinarySave
+from GameEngines.Checkers import BoardState as Checkers
+from GameEngines.Checkers.SaveModule import CheckersBinarySave
+from GameEngines.UltiTTT import BoardState as UltiTTT
+from GameEngines.UltiTTT.SaveModule import UltiTTTBinarySave
+from GameEngines.Quoridor import BoardState as Quoridor
+from GameEngines.Quoridor.SaveModule import QuoridorBinarySave
+from GameEngines.dataset import DatasetWriter, PositionDataset, UNFINISHED
+
+import numpy as np
+import random
+import pytest
+
+
+games = [
+    (Avalam, AvalamBinarySave),
+    (Checkers, CheckersBinarySave),
+    (UltiTTT, UltiTTTBinarySave),
+    (Quoridor, QuoridorBinarySave),
+]
+
+
+@pytest.mark.parametrize("board_state,save_module", games)
+def test_record_games(board_state, save_module, tmp_path):
+    random.seed(3)
+    played = []
+    with DatasetWriter(tmp_path, save_module, shard_size=50) as writer:
+        for _ in range(3):
+            game = Game(board_state, RandomPlayer(), RandomPlayer(), recorder=writer)
+            game.play_full()
+            played.append(game)
+
+    dataset = PositionDataset(tmp_path, save_module)
+    assert len(dataset) == writer.n_records == sum(len(g.move_history) for g in played)
+    assert len(dataset.shards) == -(-len(dataset) // 50)
+    assert dataset.n_games == writer.n_games == 3
+    assert all(isinstance(shard, np.memmap) for shard in dataset.shards)
+
+    i = 0
+    for g, game in enumerate(played):
+        for ply, move in enumerate(game.move_history):
+            record = dataset[i]
+            state = game.history[ply]
+            assert record["game"] == g and record["ply"] == ply
+            assert record["winner"] == game.winner
+            assert record["action"] == state.move_to_action(move)
+            assert np.array_equal(record["mask"], state.legal_action_mask())
+            assert dataset.state(i, board_state) == state
+            i += 1
+
+
+def test_random_access(tmp_path):
+    random.seed(4)
+    with DatasetWriter(tmp_path, UltiTTTBinarySave, shard_size=16) as writer:
+        for _ in range(2):
+            Game(UltiTTT, RandomPlayer(), RandomPlayer(), recorder=writer).play_full()
+
+    dataset = PositionDataset(tmp_path, UltiTTTBinarySave)
+    records = np.concatenate(dataset.shards)
+    indexes = np.array([0, 17, -1, 5, 33])
+
+    assert dataset[-1] == records[-1]
+    assert np.array_equal(dataset[indexes], records[indexes])
+    assert np.array_equal(dataset[3:40:2], records[3:40:2])
+    with pytest.raises(IndexError):
+        dataset[len(dataset)]
+    with pytest.raises(IndexError):
+        dataset[np.array([-len(dataset) - 1])]
+    with pytest.raises(IndexError):
+        dataset[np.array([0, len(dataset)])]
+
+    # a boolean mask selects records, it is not read as indexes
+    mask = np.zeros(len(dataset), dtype=bool)
+    mask[[2, 20, 30]] = True
+    assert np.array_equal(dataset[mask], records[mask])
+    with pytest.raises(IndexError):
+        dataset[mask[:-1]]
+
+
+def test_unfinished_and_append(tmp_path):
+    random.seed(5)
+    with DatasetWriter(tmp_path, AvalamBinarySave) as writer:
+        Game(Avalam, RandomPlayer(), RandomPlayer(), recorder=writer).play(4)
+    dataset = PositionDataset(tmp_path, AvalamBinarySave)
+    assert len(dataset) == 4
+    assert np.all(dataset.shards[0]["winner"] == UNFINISHED)
+
+    # a new writer starts a new shard and continues the game indexes
+    with DatasetWriter(tmp_path, AvalamBinarySave) as writer:
+        Game(Avalam, RandomPlayer(), RandomPlayer(), recorder=writer).play_full()
+    dataset = PositionDataset(tmp_path, AvalamBinarySave)
+    assert len(dataset.shards) == 2
+    assert np.all(dataset.shards[1]["game"] == 1)
+    assert np.all(dataset.shards[1]["winner"] != UNFINISHED)
+
+    with pytest.raises(ValueError):
+        PositionDataset(tmp_path, CheckersBinarySave)
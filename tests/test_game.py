@@ -1,4 +1,4 @@
-from GameEngines import Game, RandomPlayer
+from GameEngines import Game, RandomPlayer, HistoryPolicy
 from GameEngines.Avalam import BoardState as Avalam
 from GameEngines.UltiTTT import BoardState as UltiTTT
 
@@ -60,3 +60,39 @@ def test_branch(engine):
     assert branch.time_data == game.time_data[:4]
     assert len(branch.time_data) == len(branch.history) - 1
     assert ori_len == len(game.history)
+
+
+@all_games
+@pytest.mark.parametrize("policy", list(HistoryPolicy))
+def test_history_policy(engine, policy):
+    game = Game(engine, RandomPlayer(), RandomPlayer(), history=policy, keep=3)
+    game.play(12)
+
+    full = [game.history[0]]
+    for m in game.move_history:
+        full.append(full[-1].play(m))
+
+    assert len(game.history) == 13
+    assert game.history == full
+    assert game.history[-1] == full[-1]
+    assert game.history[4] == full[4]
+    assert game.history[2:9:3] == full[2:9:3]
+    assert game.history[::-1] == full[::-1]
+    assert game.history.kept <= {HistoryPolicy.FULL: 13, HistoryPolicy.LAST_K: 4}.get(policy, 2)
+
+
+@all_games
+@pytest.mark.parametrize("policy", list(HistoryPolicy))
+def test_branch_policy(engine, policy):
+    game = Game(engine, RandomPlayer(), RandomPlayer(), history=policy)
+    game.play(10)
+    branch = game.branch(4)
+
+    assert branch.history == game.history[:5]
+    assert branch.move_history == game.move_history[:4]
+    assert branch.history.policy is policy
+    assert repr(branch).startswith(repr(game.history[4]))
+
+    branch.play(3)
+    assert len(branch.history) == 8
+    assert len(game.history) == 11
@@ -0,0 +1,111 @@
+from GameEngines import Game, RandomPlayer, HistoryPolicy
+from GameEngines.GameRecord import GameRecordWriter, GameRecordReader
+from GameEngines.Avalam import BoardState as Avalam
+from GameEngines.Avalam.SaveModule import AvalamBinarySave
+from GameEngines.Checkers import BoardState as Checkers
+from GameEngines.Checkers.SaveModule import CheckersBinarySave
+from GameEngines.UltiTTT import BoardState as UltiTTT
+from GameEngines.UltiTTT.SaveModule import UltiTTTBinarySave
+from GameEngines.Quoridor import BoardState as Quoridor
+from GameEngines.Quoridor.SaveModule import QuoridorBinarySave
+
+import importlib
+import numpy as np
+import random
+import pytest
+
+
+games = [
+    (Avalam, AvalamBinarySave),
+    (Checkers, CheckersBinarySave),
+    (UltiTTT, UltiTTTBinarySave),
+    (Quoridor, QuoridorBinarySave),
+]
+
+
+def assert_same_game(loaded: Game, game: Game):
+    assert loaded.move_history == game.move_history
+    assert loaded.winner == game.winner
+    assert list(loaded.history) == list(game.history)
+    assert np.allclose(loaded.time_data, game.time_data, atol=1e-6)
+
+
+@pytest.mark.parametrize("board_state,save_module", games)
+def test_save_load(board_state, save_module, tmp_path):
+    random.seed(7)
+    game = Game(board_state, RandomPlayer(), RandomPlayer())
+    game.play(200)
+    game.save(tmp_path / "game.bin", save_module)
+
+    loaded = Game.load(tmp_path / "game.bin", save_module, board_state)
+    # only the initial state is loaded, the others are replayed when accessed
+    assert loaded.history.kept == 0
+    assert_same_game(loaded, game)
+    assert loaded.history[-1] == game.history[-1]
+
+
+@pytest.mark.parametrize("board_state,save_module", games)
+def test_stream_games(board_state, save_module, tmp_path):
+    random.seed(8)
+    start = Game(board_state, RandomPlayer(), RandomPlayer())
+    start.play(5)
+
+    played = []
+    with GameRecordWriter(tmp_path / "games.bin", save_module) as writer:
+        for board in [board_state, start.history[-1], board_state]:
+            game = Game(board, RandomPlayer(), RandomPlayer())
+            if len(played) == 2:
+                game.play(3)
+            else:
+                game.play_full()
+            writer.write(game)
+            played.append(game)
+    with GameRecordWriter(tmp_path / "games.bin", save_module, append=True) as writer:
+        game = Game(board_state, RandomPlayer(), RandomPlayer(), history=HistoryPolicy.NONE)
+        game.play_full()
+        writer.write(game)
+        played.append(game)
+
+    reader = GameRecordReader(tmp_path / "games.bin", save_module, board_state)
+    assert len(reader) == 4
+    for loaded, game in zip(reader, played):
+        assert_same_game(loaded, game)
+    assert_same_game(reader[1], played[1])
+    assert_same_game(reader[-1], played[-1])
+
+    # an unfinished game goes on after loading
+    unfinished = reader[2]
+    unfinished.players = [RandomPlayer(), RandomPlayer()]
+    unfinished.play_full()
+    assert unfinished.winner != 0
+
+    with pytest.raises(ValueError):
+        Game.load(tmp_path / "games.bin", save_module, board_state)
+
+
+def test_wrong_game(tmp_path):
+    game = Game(Avalam, RandomPlayer(), RandomPlayer())
+    game.play(3)
+    game.save(tmp_path / "game.bin", AvalamBinarySave)
+    with pytest.raises(ValueError):
+        Game.load(tmp_path / "game.bin", CheckersBinarySave, Checkers)
+
+
+@pytest.mark.parametrize("save_module", [m for _, m in games])
+def test_read_without_replay(save_module, tmp_path, monkeypatch):
+    board_state = importlib.import_module(f"GameEngines.{save_module.GAME}.PythonEngine").BoardState
+    random.seed(9)
+    game = Game(board_state, RandomPlayer(), RandomPlayer())
+    game.play(50)
+    game.save(tmp_path / "game.bin", save_module)
+
+    played = []
+    monkeypatch.setattr(board_state, "play", lambda s, m: played.append(m) or s.copy())
+    monkeypatch.setattr(board_state, "push", lambda s, m: played.append(m))
+
+    # the moves are decoded without the engine, they are played only when a state is accessed
+    loaded = Game.load(tmp_path / "game.bin", save_module, board_state)
+    assert loaded.move_history == game.move_history
+    assert played == []
+    loaded.history[-1]
+    assert len(played) > 0
@@ -0,0 +1,69 @@
+from GameEngines import Game, RandomPlayer
+from GameEngines.players import MCTSPlayer
+from GameEngines.Avalam import BoardState as Avalam
+from GameEngines.UltiTTT import BoardState as UltiTTT
+from GameEngines.Checkers import BoardState as Checkers
+from GameEngines.Quoridor import BoardState as Quoridor
+
+import random
+import pytest
+
+
+def test_mcts_init():
+    player = MCTSPlayer('test-name')
+    assert player.name == 'test-name'
+
+    with pytest.raises(ValueError):
+        MCTSPlayer(iterations=None, time_limit=None)
+
+
+@pytest.mark.parametrize("board", [Avalam, UltiTTT, Checkers, Quoridor])
+def test_mcts_play(board):
+    player = MCTSPlayer(iterations=20, max_rollout_plies=50, seed=0)
+    b = board()
+    copy = b.copy()
+
+    res = player.play(b, b.get_legal_moves(), b.curr_pid)
+
+    assert res in b.get_legal_moves()
+    assert b == copy and b.zobrist == copy.zobrist
+    assert player.stats()["iterations"] == 20
+    assert player.node_count == 21
+    assert player.rollouts_per_second > 0
+
+
+def test_mcts_time_limit():
+    player = MCTSPlayer(iterations=None, time_limit=0.05, seed=0)
+    b = UltiTTT()
+    player.play(b, b.get_legal_moves(), 1)
+
+    assert player.last_iterations > 0
+    assert 0.05 <= player.last_time < 0.5
+
+
+def test_mcts_reuse_tree():
+    player = MCTSPlayer(iterations=1000, seed=0)
+    b = UltiTTT()
+    move = player.play(b, b.get_legal_moves(), 1)
+    assert player.reused_nodes == 0
+
+    # the opponent answers with a move explored by the search
+    node = player._root.children[move]
+    reply = max(node.children.values(), key=lambda n: n.visits)
+    reused = reply.size() - 1
+    b = b.play(move).play(reply.move)
+    player.play(b, b.get_legal_moves(), 1)
+
+    assert player.reused_nodes == reused > 0
+    assert player.node_count == player.reused_nodes + 1001
+
+    player.reset()
+    assert player.node_count == 0
+
+
+def test_mcts_against_random():
+    random.seed(0)  # the moves of the RandomPlayer
+    game = Game(UltiTTT, MCTSPlayer(iterations=50, seed=0), RandomPlayer())
+    game.play_full()
+
+    assert game.winner == 1
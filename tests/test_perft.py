@@ -0,0 +1,45 @@
+from GameEngines import Avalam, Checkers, UltiTTT, Quoridor
+from GameEngines.perft import REFERENCE, perft, divide
+
+import pytest
+
+# the deepest reference count of each game checked by the tests, the others are left to `benchmarks/perft.py`
+DEPTHS = {"Avalam": 2, "Checkers": 6, "UltiTTT": 4, "Quoridor": 2}
+MODULES = {"Avalam": Avalam, "Checkers": Checkers, "UltiTTT": UltiTTT, "Quoridor": Quoridor}
+
+board_states = pytest.mark.parametrize("game, board_state", [
+    (game, board_state) for game, module in MODULES.items()
+    for board_state in dict.fromkeys([module.BoardState, module.PythonEngine.BoardState])
+])
+
+
+@board_states
+def test_reference(game, board_state):
+    b = board_state()
+    for depth in range(DEPTHS[game] + 1):
+        assert b.perft(depth) == REFERENCE[game][depth]
+    assert b == board_state()
+
+
+@board_states
+def test_perft_result(game, board_state):
+    b = board_state()
+    result = perft(b, 2)
+    assert result.depth == 2 and result.nodes == REFERENCE[game][2]
+    assert result.nodes_per_sec >= 0
+
+
+@board_states
+def test_divide(game, board_state):
+    b = board_state()
+    counts = divide(b, 2)
+    assert set(counts) == b.get_legal_moves()
+    assert sum(counts.values()) == REFERENCE[game][2]
+
+
+@pytest.mark.parametrize("board_state", dict.fromkeys([Checkers.BoardState, Checkers.PythonEngine.BoardState]))
+def test_multi_jump(board_state):
+    # the second jump of a multi jump is a move of its own
+    b = board_state.load("test_files/test_checkers/from_init_board_1.json")
+    assert b.perft(1) == 1
+    assert b.perft(2) == sum(b.play(m).perft(1) for m in b.get_legal_moves())
@@ -0,0 +1,66 @@
+from GameEngines import Game, RandomPlayer, profiling
+from GameEngines.Avalam import BoardState as Avalam
+from GameEngines.Avalam.PythonEngine import BoardState as PyAvalam
+from GameEngines.Avalam.SaveModule import AvalamSave, AvalamBinarySave
+from GameEngines.Checkers.PythonEngine import BoardState as PyCheckers
+
+import random
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def disabled_profiler():
+    yield
+    profiling.disable()
+
+
+def test_profile_game():
+    random.seed(0)
+    originals = {m: vars(PyAvalam).get(m) for m in profiling.STATE_METHODS}
+    profiler = profiling.enable()
+
+    game = Game(PyAvalam, RandomPlayer(), RandomPlayer())
+    game.play_full()
+    stats = profiling.stats()
+
+    moves = stats["Avalam.PythonEngine.BoardState.get_legal_moves"]
+    assert moves["calls"] >= len(game.move_history)
+    assert stats["Avalam.PythonEngine.BoardState.play"]["calls"] == len(game.move_history)
+    assert 0 < moves["p50_ns"] <= moves["p99_ns"] <= moves["max_ns"]
+    assert moves["mean_ns"] * moves["calls"] == pytest.approx(moves["total_ns"])
+    assert "Avalam.PythonEngine.BoardState.winner" in profiler.report()
+
+    game_stats = game.stats()
+    assert game_stats["engine"] == profiling.stats()
+    assert sum(p["moves"] for p in game_stats["players"]) == game_stats["turns"] == len(game.move_history)
+
+    # the classes get their methods back
+    profiling.disable()
+    assert profiling.stats() is None
+    assert {m: vars(PyAvalam).get(m) for m in profiling.STATE_METHODS} == originals
+    assert game.stats()["engine"] is None
+
+
+def test_profile_targets(tmp_path):
+    profiling.enable(
+        [(PyCheckers, "get_legal_moves"), (AvalamSave, "save_state"), (AvalamBinarySave, "save_many")],
+        allocations=True, max_samples=4
+    )
+
+    state = PyCheckers()
+    for _ in range(10):
+        state.get_legal_moves()
+    AvalamSave.save_state(tmp_path / "state.json", Avalam())
+    AvalamBinarySave.save_many(tmp_path / "states.bin", [Avalam(), Avalam()])
+
+    stats = profiling.stats()
+    assert set(stats) == {
+        "Checkers.PythonEngine.BoardState.get_legal_moves", "Avalam.SaveModule.AvalamSave.save_state",
+        "Avalam.SaveModule.AvalamBinarySave.save_many"
+    }
+    assert stats["Checkers.PythonEngine.BoardState.get_legal_moves"]["calls"] == 10
+    assert len(profiling.profiler().methods["Checkers.PythonEngine.BoardState.get_legal_moves"]._samples) == 4
+    assert len(AvalamBinarySave.load_many(tmp_path / "states.bin", Avalam)) == 2
+
+    profiling.profiler().reset()
+    assert profiling.stats() == {}
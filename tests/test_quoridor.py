@@ -43,7 +43,7 @@ def test_play_from_init_1(board_state):
     ref_board = board_state.load("test_files/test_quoridor/play_from_init_1.json")
 
     assert b == ref_board
-    assert b.get_legal_moves() == ref_board.__move_cache
+    assert b.get_legal_moves() == ref_board._move_cache
     assert b.winner() == 0
 
 
@@ -63,7 +63,7 @@ def test_play_from_init_2(board_state):
     ref_board = board_state.load("test_files/test_quoridor/play_from_init_2.json")
 
     assert b == ref_board
-    assert b.get_legal_moves() == ref_board.__move_cache
+    assert b.get_legal_moves() == ref_board._move_cache
     assert b.winner() == 2
 
 
@@ -82,7 +82,7 @@ def test_wall_positions_1(board_state):
     ref_board = board_state.load("test_files/test_quoridor/wall_positions_1.json")
 
     assert b == ref_board
-    assert b.get_legal_moves() == ref_board.__move_cache
+    assert b.get_legal_moves() == ref_board._move_cache
     assert b.winner() == 0
 
 
@@ -102,7 +102,7 @@ def test_wall_positions_2(board_state):
     ref_board = board_state.load("test_files/test_quoridor/wall_positions_2.json")
 
     assert b == ref_board
-    assert b.get_legal_moves() == ref_board.__move_cache
+    assert b.get_legal_moves() == ref_board._move_cache
     assert b.winner() == 0
 
 
@@ -116,3 +116,159 @@ def test_winner(board_state):
 
     ref_board = board_state.load("test_files/test_quoridor/winner_board_2.json")
     assert ref_board.winner() == 1
+
+
+@rust_python
+def test_legal_action_mask(board_state):
+    rng = np.random.default_rng(0)
+    b = board_state()
+    out = np.zeros(board_state.ACTION_SIZE, dtype=bool)
+
+    while b.winner() == 0 and b.turn < 60:
+        moves = b.get_legal_moves()
+        actions = {b.move_to_action(m) for m in moves}
+        assert set(np.nonzero(b.legal_action_mask())[0]) == actions
+        assert b.legal_action_mask(out) is out and set(np.nonzero(out)[0]) == actions
+        assert {b.action_to_move(a) for a in actions} == moves
+
+        b = b.play(b.action_to_move(rng.choice(sorted(actions))))
+
+
+@pytest.mark.skipif(RustBoardState is PyBoardState, reason="the rust engine is not built")
+@pytest.mark.parametrize("seed", range(5))
+def test_rust_parity(seed, tmp_path):
+    rng = np.random.default_rng(seed)
+    rust, py = RustBoardState(), PyBoardState()
+
+    while py.winner() == 0 and py.turn < 100:
+        moves = py.get_legal_moves()
+        assert rust.get_legal_moves() == moves
+        assert rust.board == py.board
+        assert np.array_equal(rust._board, py._board)
+        assert rust.score() == py.score()
+        assert rust.zobrist == py.zobrist
+
+        # favors the pawn moves to get to the end of the games
+        jumps = sorted(m for m in moves if m[0] == Mt.JUMP)
+        pool = jumps if rng.random() < 0.7 else sorted(moves)
+        move = pool[rng.integers(len(pool))]
+        rust, py = rust.play(move), py.play(move)
+
+    assert rust.winner() == py.winner()
+
+    # the states are saved in the same format by both engines
+    py.save(tmp_path / "state.json")
+    assert RustBoardState.load(str(tmp_path / "state.json")) == rust
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_connectivity_walls(seed):
+    from GameEngines.Quoridor.PythonEngine.utils import validate_walls
+    rng = np.random.default_rng(seed)
+    b = PyBoardState()
+
+    while b.winner() == 0 and b.turn < 100:
+        # the incremental check gives the same walls as the search of the whole board
+        expected = validate_walls(b._board, [p.pos for p in b._players], b._get_potential_walls(), b._walls)
+        assert sorted(b._get_legal_walls()) == sorted(expected)
+
+        moves = sorted(b.get_legal_moves())
+        walls = [m for m in moves if m[0] == Mt.WALL]
+        pool = walls if len(walls) > 0 and rng.random() < 0.6 else moves
+        b = b.play(pool[rng.integers(len(pool))])
+
+
+@rust_python
+def test_zobrist(board_state, tmp_path):
+    rng = np.random.default_rng(0)
+    b = board_state()
+
+    while b.winner() == 0 and b.turn < 40:
+        moves = sorted(b.get_legal_moves())
+        b = b.play(moves[rng.integers(len(moves))])
+
+        # the key updated by play is the key of the position
+        c = b.copy()
+        c._rehash()
+        assert b == c and hash(b) == hash(c) and b.zobrist == c.zobrist
+
+    b.save(tmp_path / "state.json")
+    assert board_state.load(str(tmp_path / "state.json")).zobrist == b.zobrist
+
+
+@rust_python
+def test_push_pop(board_state):
+    rng = np.random.default_rng(1)
+    b = board_state()
+    played = [board_state()]
+
+    for _ in range(30):
+        if played[-1].winner() != 0:
+            break
+        moves = sorted(b.get_legal_moves(cache=True))
+        move = moves[rng.integers(len(moves))]
+
+        # push gives the same state as play, with the legal moves of the new position
+        b.push(move)
+        played.append(played[-1].play(move))
+        assert b == played[-1] and b.zobrist == played[-1].zobrist
+        assert b.get_legal_moves() == played[-1].get_legal_moves()
+
+    # the copies do not inherit the pushed moves
+    with pytest.raises(IndexError):
+        b.copy().pop()
+
+    while len(played) > 1:
+        b.pop()
+        played.pop()
+        assert b == played[-1] and b.zobrist == played[-1].zobrist
+
+    with pytest.raises(IndexError):
+        b.pop()
+
+
+@rust_python
+def test_random_playout(board_state):
+    b = board_state()
+    copy = b.copy()
+
+    # the playout is reproducible and leaves the state unchanged
+    winner, score, plies = b.random_playout(seed=3, max_plies=100)
+    assert b == copy and b.zobrist == copy.zobrist
+    assert b.random_playout(seed=3, max_plies=100) == (winner, score, plies)
+    assert winner in (0, 1, 2) and 0 < plies <= 100
+
+    winners, scores, n_plies = b.rollout(4, seed=3, max_plies=10)
+    assert winners.shape == (4,) and scores.shape == (4, 2) and n_plies.shape == (4,)
+    assert np.all(n_plies <= 10)
+    assert b == copy
+
+
+@rust_python
+def test_symmetries(board_state):
+    rng = np.random.default_rng(1)
+    b = board_state()
+
+    for _ in range(60):
+        actions = np.flatnonzero(b.legal_action_mask())
+        canonical, transform = b.canonical()
+        assert canonical == b.transform(transform)
+
+        for t, state in enumerate(b.symmetries()):
+            # the moves of the transformed state are the transformed moves
+            assert state.get_legal_moves() == {b.transform_move(m, t) for m in b.get_legal_moves()}
+            transformed = sorted(b.transform_action(a, t) for a in actions)
+            assert transformed == np.flatnonzero(state.legal_action_mask()).tolist()
+            assert all(b.transform_move(b.transform_move(m, t), t, inverse=True) == m for m in b.get_legal_moves())
+            assert all(b.transform_action(b.transform_action(a, t), t, inverse=True) == a for a in actions)
+            assert state.winner() == b.winner() and state.score() == b.score()
+
+            # every symmetric state has the same canonical state
+            assert state.canonical()[0] == canonical and state.canonical()[0].zobrist == canonical.zobrist
+
+        b = b.play(b.action_to_move(rng.choice(actions)))
+        if b.winner() != 0:
+            break
+
+    with pytest.raises(ValueError):
+        b.transform(board_state.N_SYMMETRIES)
@@ -0,0 +1,38 @@
+from GameEngines import Tournament, RandomPlayer
+from GameEngines.Avalam import BoardState as Avalam
+from GameEngines.UltiTTT import BoardState as UltiTTT
+from GameEngines.Checkers import BoardState as Checkers
+
+import pytest
+
+all_games = pytest.mark.parametrize(
+    "engine",
+    [Avalam, UltiTTT, Checkers]
+)
+
+
+@all_games
+def test_run(engine):
+    tournament = Tournament(engine, RandomPlayer, RandomPlayer, seed=42)
+    result = tournament.run(6, n_workers=1)
+
+    assert len(result) == 6
+    assert sum(result.winner_counts.values()) == 6
+    assert all(m > 0 for m in result.move_counts)
+    assert sum(s["moves"] for s in result.time_stats()) == sum(result.move_counts)
+
+
+@all_games
+def test_deterministic(engine):
+    r1 = Tournament(engine, RandomPlayer, RandomPlayer, seed=7).run(4, n_workers=1)
+    r2 = Tournament(engine, RandomPlayer, RandomPlayer, seed=7).run(4, n_workers=2, chunk_size=1)
+
+    assert [g.winner for g in r1.games] == [g.winner for g in r2.games]
+    assert r1.move_counts == r2.move_counts
+
+
+def test_swap_sides():
+    result = Tournament(UltiTTT, RandomPlayer, RandomPlayer, swap_sides=True).run(4, n_workers=1)
+
+    assert [g.swapped for g in result.games] == [False, True, False, True]
+    assert sum(result.wins) + result.ties == 4
@@ -0,0 +1,68 @@
+from GameEngines import TranspositionTable, ReplacementPolicy, ScoreBound
+from GameEngines.UltiTTT import BoardState
+
+import pytest
+
+
+def test_store_and_get():
+    table = TranspositionTable(16)
+    state = BoardState()
+    child = state.play(((1, 1), (1, 1)))
+
+    assert table.get(state) is None
+    assert table.store(state, 0.5, depth=2, bound=ScoreBound.LOWER, move=((1, 1), (1, 1)))
+
+    entry = table.get(state)
+    assert entry.value == 0.5 and entry.depth == 2 and entry.bound == ScoreBound.LOWER
+    assert entry.move == ((1, 1), (1, 1))
+    assert table.get(state.zobrist) == entry
+    assert state in table and child not in table
+
+    assert len(table) == 1
+    assert (table.hits, table.misses, table.stores) == (2, 1, 1)
+    assert table.hit_rate == pytest.approx(2 / 3)
+
+
+def test_bounded_size():
+    table = TranspositionTable(4, ReplacementPolicy.ALWAYS)
+    for key in range(10):
+        table.store(key, key)
+
+    assert len(table) == 4
+    assert table.replacements == 6
+    assert [table.get(k) is not None for k in range(10)] == [False] * 6 + [True] * 4
+
+
+def test_depth_policy():
+    table = TranspositionTable(4, ReplacementPolicy.DEPTH)
+    table.store(1, "deep", depth=5)
+
+    # a shallower search of another position does not evict the entry
+    assert not table.store(5, "shallow", depth=1)
+    assert table.get(1).value == "deep" and table.rejections == 1
+
+    # the same position is always updated
+    assert table.store(1, "update", depth=0)
+    assert table.get(1).value == "update"
+
+    # entries of an older search can be replaced
+    table.store(1, "deep", depth=5)
+    table.new_search()
+    assert table.store(5, "shallow", depth=1)
+    assert 1 not in table and table.replacements == 1
+
+
+def test_clear():
+    table = TranspositionTable(8)
+    table.store(3, 0)
+    table.get(3)
+    table.clear()
+
+    assert len(table) == 0 and 3 not in table
+    assert table.stats()["hits"] == 1
+
+    table.reset_stats()
+    assert table.stats()["hits"] == 0
+
+    with pytest.raises(ValueError):
+        TranspositionTable(0)
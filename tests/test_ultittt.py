@@ -33,7 +33,7 @@ def test_play_from_init_1(board_state):
     ref_board = board_state.load("test_files/test_ultittt/from_init_board_1.json")
 
     assert b == ref_board
-    assert b.get_legal_moves() == ref_board.__move_cache
+    assert b.get_legal_moves() == ref_board._move_cache
     assert b.winner() == 0
 
 @rust_python
@@ -53,7 +53,7 @@ def test_play_from_init_2(board_state):
     ref_board = board_state.load("test_files/test_ultittt/from_init_board_2.json")
 
     assert b == ref_board
-    assert b.get_legal_moves() == ref_board.__move_cache
+    assert b.get_legal_moves() == ref_board._move_cache
     assert b.winner() == 1
 
 @rust_python
@@ -69,7 +69,7 @@ def complete_to_same(board_state):
     ref_board = board_state.load("test_files/test_ultittt/complete_to_same_1.json")
 
     assert b == ref_board
-    assert b.get_legal_moves() == ref_board.__move_cache
+    assert b.get_legal_moves() == ref_board._move_cache
     assert b.winner() == 1
 @rust_python
 def test_winner(board_state):
@@ -83,4 +83,169 @@ def test_winner(board_state):
     assert ref_board.winner() == 1
 
     ref_board = board_state.load("test_files/test_ultittt/winner_board_3.json")
-    assert ref_board.winner() == -1
\ No newline at end of file
+    assert ref_board.winner() == -1
+
+@rust_python
+def test_legal_action_mask(board_state):
+    rng = np.random.default_rng(0)
+    b = board_state()
+    out = np.zeros(board_state.ACTION_SIZE, dtype=bool)
+
+    while b.winner() == 0:
+        moves = b.get_legal_moves()
+        actions = {b.move_to_action(m) for m in moves}
+        assert set(np.nonzero(b.legal_action_mask())[0]) == actions
+        assert b.legal_action_mask(out) is out and set(np.nonzero(out)[0]) == actions
+        assert {b.action_to_move(a) for a in actions} == moves
+
+        b = b.play(b.action_to_move(rng.choice(sorted(actions))))
+
+
+@rust_python
+def test_zobrist(board_state, tmp_path):
+    rng = np.random.default_rng(0)
+    b = board_state()
+
+    while b.winner() == 0 and b.turn < 40:
+        moves = sorted(b.get_legal_moves())
+        b = b.play(moves[rng.integers(len(moves))])
+
+        # the key updated by play is the key of the position
+        c = b.copy()
+        c._rehash()
+        assert b == c and hash(b) == hash(c) and b.zobrist == c.zobrist
+
+    b.save(tmp_path / "state.json")
+    assert board_state.load(str(tmp_path / "state.json")).zobrist == b.zobrist
+
+
+@rust_python
+def test_push_pop(board_state):
+    rng = np.random.default_rng(1)
+    b = board_state()
+    played = [board_state()]
+
+    for _ in range(30):
+        if played[-1].winner() != 0:
+            break
+        moves = sorted(b.get_legal_moves(cache=True))
+        move = moves[rng.integers(len(moves))]
+
+        # push gives the same state as play, with the legal moves of the new position
+        b.push(move)
+        played.append(played[-1].play(move))
+        assert b == played[-1] and b.zobrist == played[-1].zobrist
+        assert b.get_legal_moves() == played[-1].get_legal_moves()
+
+    # the copies do not inherit the pushed moves
+    with pytest.raises(IndexError):
+        b.copy().pop()
+
+    while len(played) > 1:
+        b.pop()
+        played.pop()
+        assert b == played[-1] and b.zobrist == played[-1].zobrist
+
+    with pytest.raises(IndexError):
+        b.pop()
+
+
+@rust_python
+def test_random_playout(board_state):
+    b = board_state()
+    copy = b.copy()
+
+    # the playout is reproducible and leaves the state unchanged
+    winner, score, plies = b.random_playout(seed=3)
+    assert b == copy and b.zobrist == copy.zobrist
+    assert b.random_playout(seed=3) == (winner, score, plies)
+    assert winner in (-1, 1, 2) and plies > 0
+
+    winners, scores, n_plies = b.rollout(4, seed=3, max_plies=10)
+    assert winners.shape == (4,) and scores.shape == (4, 2) and n_plies.shape == (4,)
+    assert np.all(n_plies <= 10)
+    assert b == copy
+
+
+@rust_python
+def test_board_array(board_state):
+    rng = np.random.default_rng(3)
+    b = board_state()
+
+    while b.winner() == 0:
+        b = b.play(sorted(b.get_legal_moves())[rng.integers(len(b.get_legal_moves()))])
+
+        # the board array is built from the masks, and a state built from the array is the same
+        rebuilt = board_state()
+        rebuilt._board = np.array(b.board)
+        rebuilt._win_state = list(b._win_state)
+        rebuilt._turn, rebuilt._curr_pid, rebuilt._active_cell = b.turn, b.curr_pid, b._active_cell
+        rebuilt._rehash()
+
+        assert rebuilt == b and rebuilt.zobrist == b.zobrist
+        assert rebuilt.get_legal_moves() == b.get_legal_moves()
+        assert b.board.shape == (9, 9) and np.sum(b.board != 0) == b.turn
+
+
+@rust_python
+def test_full_sub_board_with_line(board_state):
+    b = board_state()
+    board = np.zeros((9, 9), dtype=np.int64)
+    board[0] = [1, 2, 1, 2, 2, 1, 1, 1, 0]
+    board[1, :4] = [2, 2, 2, 2]
+    b._board = board
+    b._turn, b._curr_pid, b._active_cell = 12, 1, 0
+    b._rehash()
+
+    # the last cell of the sub-board fills it and completes a column for the first player
+    b = b.play(((0, 0), (2, 2)))
+    assert b._win_state[0] == 1
+    assert b._active_cell == 8
+
+
+@rust_python
+def test_symmetries(board_state):
+    rng = np.random.default_rng(2)
+    b = board_state()
+
+    for _ in range(30):
+        actions = np.flatnonzero(b.legal_action_mask())
+        canonical, transform = b.canonical()
+        assert canonical == b.transform(transform)
+
+        for t, state in enumerate(b.symmetries()):
+            # the moves of the transformed state are the transformed moves
+            assert state.get_legal_moves() == {b.transform_move(m, t) for m in b.get_legal_moves()}
+            transformed = sorted(b.transform_action(a, t) for a in actions)
+            assert transformed == np.flatnonzero(state.legal_action_mask()).tolist()
+            assert all(b.transform_move(b.transform_move(m, t), t, inverse=True) == m for m in b.get_legal_moves())
+            assert all(b.transform_action(b.transform_action(a, t), t, inverse=True) == a for a in actions)
+            assert state.winner() == b.winner() and state.score() == b.score()
+
+            # every symmetric state has the same canonical state
+            assert state.canonical()[0] == canonical and state.canonical()[0].zobrist == canonical.zobrist
+
+        b = b.play(b.action_to_move(rng.choice(actions)))
+        if b.winner() != 0:
+            break
+
+    with pytest.raises(ValueError):
+        b.transform(board_state.N_SYMMETRIES)
+
+
+@rust_python
+def test_numpy_moves(board_state):
+    # moves decoded by the callers, e.g. divmod(np.argmax(mask), 9), may hold numpy ints
+    rng = np.random.default_rng(4)
+    b, np_b, pushed = board_state(), board_state(), board_state()
+    while b.winner() == 0:
+        moves = sorted(b.get_legal_moves())
+        move = moves[rng.integers(len(moves))]
+        np_move = tuple(tuple(np.int64(x) for x in cell) for cell in move)
+        b, np_b = b.play(move), np_b.play(np_move)
+        pushed.push(np_move)
+
+        assert np_b == b and pushed == b
+        assert np_b.zobrist == pushed.zobrist == b.zobrist
+        assert np_b.get_legal_moves() == pushed.get_legal_moves() == b.get_legal_moves()
+        assert np_b.winner() == b.winner()